@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+基准测试：监视窗口每帧更新 + 重绘耗时
+
+比较两种场景更新方式（视口 800x450，帧为原始分辨率，不经过引擎预缩放）：
+- 旧路径：scene.clear() + addPixmap() + setSceneRect() + fitInView()
+- 新路径：CaptureWindow 常驻图像项，只替换图像（尺寸不变时不触碰场景和视图变换）
+
+运行: python benchmarks/bench_capture_view.py
+"""
+import sys
+import time
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import numpy as np
+from PyQt6.QtCore import Qt
+from PyQt6.QtGui import QImage, QPixmap
+from PyQt6.QtWidgets import QApplication, QGraphicsScene, QGraphicsView
+
+from src.core import CaptureEngine
+from src.ui import CaptureWindow
+
+SIZES = {"1080p": (1920, 1080), "4K": (3840, 2160)}
+VIEWPORT = (800, 450)
+ROUNDS = 60
+
+
+def make_frames(width, height, count=4):
+    """生成若干帧不同内容的 RGB32 图像"""
+    frames = []
+    for _ in range(count):
+        pixels = np.random.randint(0, 256, (height, width, 4), dtype=np.uint8)
+        pixels[..., 3] = 255
+        frames.append(QImage(pixels.data, width, height, width * 4,
+                             QImage.Format.Format_RGB32).copy())
+    return frames
+
+
+def bench(name, update, viewport, frames):
+    """每轮更新一帧并同步重绘视口，打印单帧耗时"""
+    for image in frames:
+        update(image)
+        viewport.repaint()
+    start = time.perf_counter()
+    for i in range(ROUNDS):
+        update(frames[i % len(frames)])
+        viewport.repaint()
+    elapsed = (time.perf_counter() - start) / ROUNDS * 1000
+    print(f"  {name:<36} {elapsed:8.3f} ms/帧")
+    return elapsed
+
+
+def old_view(app):
+    """旧实现：每帧清空场景并重建图像项"""
+    scene = QGraphicsScene()
+    view = QGraphicsView(scene)
+    view.setStyleSheet("QGraphicsView { background: #0F172A; border: none; }")
+    view.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+    view.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+    view.resize(*VIEWPORT)
+    view.show()
+    app.processEvents()
+
+    def update(image):
+        scene.clear()
+        scene.addPixmap(QPixmap.fromImage(image))
+        view.setSceneRect(0, 0, image.width(), image.height())
+        view.fitInView(scene.sceneRect(), Qt.AspectRatioMode.KeepAspectRatio)
+
+    return view, update
+
+
+def new_view(app):
+    """新实现：CaptureWindow 的常驻图像项"""
+    engine = CaptureEngine(0, (0, 0, 1, 1), 30, replay=False)
+    window = CaptureWindow(engine, "bench")
+    window.show()
+    app.processEvents()
+    # 调整窗口使视口与旧路径一致
+    viewport = window.view.viewport()
+    window.resize(window.width() + VIEWPORT[0] - viewport.width(),
+                  window.height() + VIEWPORT[1] - viewport.height())
+    app.processEvents()
+    return window, window._show_image
+
+
+def main():
+    app = QApplication.instance() or QApplication(sys.argv)
+
+    print(f"视口 {VIEWPORT[0]}x{VIEWPORT[1]}，{ROUNDS} 轮")
+    for label, (width, height) in SIZES.items():
+        frames = make_frames(width, height)
+        print(f"{label} 区域 ({width}x{height}):")
+
+        view, update = old_view(app)
+        old_ms = bench("scene.clear + addPixmap（旧）", update, view.viewport(), frames)
+        view.close()
+
+        window, update = new_view(app)
+        new_ms = bench("常驻图像项 setPixmap（新）", update, window.view.viewport(), frames)
+        window.close()
+
+        print(f"  每帧节省: {old_ms - new_ms:.3f} ms ({old_ms / new_ms:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
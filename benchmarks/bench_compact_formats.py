@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+基准测试：低位深输出格式的转换开销与每帧内存 / 传输量
+
+1920x1080 的文字控制台画面（深色背景、浅色文字、少量彩色高亮），按各输出格式经过
+CaptureEngine._emit_region（裁剪 + 转换 + 显示帧 + frame_ready + 回放缓冲），统计：
+- 捕获后转换的单帧耗时
+- 帧数组字节数（frame_ready 下游、显示帧、视频流原始输出搬运的数据量）
+- 回放缓冲区中每帧的压缩后字节数
+
+运行: python benchmarks/bench_compact_formats.py
+"""
+import sys
+import time
+import zlib
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import numpy as np
+from PyQt6.QtWidgets import QApplication
+
+from src.core import CaptureEngine, PixelFormat
+
+WIDTH, HEIGHT = 1920, 1080
+ROUNDS = 30
+FORMATS = [PixelFormat.RGB32, PixelFormat.RGB888, PixelFormat.RGB565,
+           PixelFormat.INDEXED8, PixelFormat.GRAYSCALE8]
+
+
+def make_console(rng):
+    """生成类似文字控制台的 BGRA 窗口缓冲区"""
+    window = np.empty((HEIGHT, WIDTH, 4), dtype=np.uint8)
+    window[...] = (36, 30, 30, 0)  # 深色背景，PrintWindow 常见的全零 Alpha
+    # 8x16 字符格，约 40% 的字符格有文字，笔画为浅灰色带抗锯齿
+    rows, cols = HEIGHT // 16, WIDTH // 8
+    cells = rng.random((rows, cols)) < 0.4
+    glyph = rng.random((rows, cols, 16, 8)) < 0.3
+    strokes = np.zeros((HEIGHT, WIDTH), dtype=bool)
+    strokes[:rows * 16] = (cells[:, :, None, None] & glyph).transpose(0, 2, 1, 3).reshape(rows * 16, WIDTH)
+    shade = rng.integers(120, 230, (HEIGHT, WIDTH), dtype=np.uint8)
+    window[strokes, :3] = shade[strokes, None]
+    # 几行彩色高亮（错误、提示）
+    window[160:176, :600][strokes[160:176, :600]] = (60, 60, 220, 0)
+    window[480:496, :800][strokes[480:496, :800]] = (80, 200, 80, 0)
+    return window
+
+
+def main():
+    app = QApplication.instance() or QApplication(sys.argv)
+    rng = np.random.default_rng(0)
+    window = make_console(rng)
+
+    engine = CaptureEngine(0, (0, 0, 1, 1), 30, replay=False)
+    print(f"{WIDTH}x{HEIGHT} 文字控制台，{ROUNDS} 轮")
+    print(f"  {'格式':<12}{'转换+发射':>10}{'帧字节':>12}{'回放/帧':>12}{'相对 RGB32':>12}")
+    baseline = None
+    for pixel_format in FORMATS:
+        output = engine.add_region((0, 0, WIDTH, HEIGHT), pixel_format=pixel_format)
+        received = []
+        output.frame_ready.connect(received.append)
+        output.frame_captured.connect(lambda image: None)
+
+        # 首帧生成查找表等一次性开销，不计时
+        engine._emit_region(output, window.copy(), None, (WIDTH, HEIGHT), "bench", 0.0)
+        elapsed = 0.0
+        for tick in range(1, ROUNDS + 1):
+            # 引擎每帧使用新缓冲区，这里复制一份模拟
+            out = window.copy()
+            start = time.perf_counter()
+            engine._emit_region(output, out, None, (WIDTH, HEIGHT), "bench", float(tick))
+            elapsed += time.perf_counter() - start
+        frame = received[-1]
+        frame_bytes = frame.width * frame.height * frame.channels
+        replay_bytes = len(zlib.compress(frame.tobytes(), 1))
+        baseline = baseline or frame_bytes
+        print(f"  {pixel_format:<12}{elapsed / ROUNDS * 1000:8.2f} ms{frame_bytes / 1024:9.0f} KB"
+              f"{replay_bytes / 1024:9.0f} KB{baseline / frame_bytes:11.1f}x")
+        engine.remove_region(output)
+
+
+if __name__ == "__main__":
+    main()
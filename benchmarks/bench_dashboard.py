@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+基准测试：多个监视窗口 vs 一个监视面板
+
+N 个捕获源每轮各产生一帧（已按显示尺寸预缩放），统计显示这一轮帧的 GUI 线程耗时
+（发射 frame_captured + 事件循环完成全部重绘）和绘制事件数：
+- 监视窗口：每个源一个 CaptureWindow（各自的场景、视图、样式表和重绘）
+- 监视面板：一个 DashboardWindow，刷新定时器把所有脏单元格合并为一次绘制
+
+运行: python benchmarks/bench_dashboard.py
+"""
+import sys
+import time
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import numpy as np
+from PyQt6.QtCore import QObject, QEvent
+from PyQt6.QtGui import QImage
+from PyQt6.QtWidgets import QApplication
+
+from src.core import CaptureEngine
+from src.ui import CaptureWindow, DashboardWindow
+
+COUNTS = [4, 9, 25]
+CELL = (384, 216)
+ROUNDS = 60
+
+
+def make_frames(count):
+    """生成若干帧不同内容的 RGB32 图像"""
+    frames = []
+    for _ in range(count):
+        pixels = np.random.randint(0, 256, (CELL[1], CELL[0], 4), dtype=np.uint8)
+        pixels[..., 3] = 255
+        frames.append(QImage(pixels.data, CELL[0], CELL[1], CELL[0] * 4,
+                             QImage.Format.Format_RGB32).copy())
+    return frames
+
+
+class PaintCounter(QObject):
+    """统计所有组件收到的绘制事件"""
+
+    def __init__(self):
+        super().__init__()
+        self.count = 0
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Type.Paint:
+            self.count += 1
+        return False
+
+
+def run_rounds(app, engines, frames, after_emit=None):
+    """每轮为每个源发射一帧并处理事件直到重绘完成，返回 (平均每轮毫秒数, 每轮绘制事件数)"""
+    for _ in range(5):
+        app.processEvents()
+    counter = PaintCounter()
+    app.installEventFilter(counter)
+    start = time.perf_counter()
+    for i in range(ROUNDS):
+        for j, engine in enumerate(engines):
+            engine.frame_captured.emit(frames[(i + j) % len(frames)])
+        if after_emit is not None:
+            after_emit()
+        app.processEvents()
+    elapsed = (time.perf_counter() - start) / ROUNDS * 1000
+    app.removeEventFilter(counter)
+    return elapsed, counter.count / ROUNDS
+
+
+def bench_windows(app, count, frames):
+    """每个源一个监视窗口"""
+    engines = [CaptureEngine(0, (0, 0, *CELL), 30, replay=False) for _ in range(count)]
+    windows = []
+    for index, engine in enumerate(engines):
+        window = CaptureWindow(engine, f"源 {index}")
+        window.resize(CELL[0], CELL[1] + 50)
+        window.show()
+        windows.append(window)
+    result = run_rounds(app, engines, frames)
+    for window in windows:
+        window.close()
+    app.processEvents()
+    return result
+
+
+def bench_dashboard(app, count, frames):
+    """所有源在一个监视面板中"""
+    engines = [CaptureEngine(0, (0, 0, *CELL), 30, replay=False) for _ in range(count)]
+    columns = int(np.ceil(np.sqrt(count)))
+    rows = int(np.ceil(count / columns))
+    dashboard = DashboardWindow(columns=columns, spacing=4)
+    dashboard.resize(columns * (CELL[0] + 4) + 4, rows * (CELL[1] + 4) + 4)
+    for index, engine in enumerate(engines):
+        dashboard.add_source(engine, f"源 {index}")
+    dashboard.show()
+    # 直接触发刷新，代替等待定时器
+    dashboard.refresh_timer.stop()
+    result = run_rounds(app, engines, frames, dashboard._refresh)
+    dashboard.close()
+    app.processEvents()
+    return result
+
+
+def main():
+    app = QApplication.instance() or QApplication(sys.argv)
+    frames = make_frames(8)
+
+    print(f"单元格 {CELL[0]}x{CELL[1]}，{ROUNDS} 轮，每轮每个源一帧")
+    print(f"  {'源数':<6}{'监视窗口 ms/轮':>16}{'绘制事件/轮':>14}{'监视面板 ms/轮':>16}{'绘制事件/轮':>14}")
+    for count in COUNTS:
+        windows_ms, windows_paints = bench_windows(app, count, frames)
+        dashboard_ms, dashboard_paints = bench_dashboard(app, count, frames)
+        print(f"  {count:<6}{windows_ms:>16.2f}{windows_paints:>14.1f}"
+              f"{dashboard_ms:>16.2f}{dashboard_paints:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
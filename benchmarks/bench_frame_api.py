@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+基准测试：NumPy 帧接口 vs QImage 路径
+
+模拟一次 1920x1080 窗口捕获并裁剪 1280x720 区域，比较：
+- QImage 路径：QImage.copy(裁剪) -> bits() -> NumPy 数组（分析代码目前的做法）
+- NumPy 路径：整窗缓冲区上的零拷贝裁剪视图（frame_ready 信号提供的 Frame）
+
+运行: python benchmarks/bench_frame_api.py
+"""
+import sys
+import time
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import numpy as np
+from PyQt6.QtGui import QImage
+
+from src.core.frame import Frame, allocate_frame_buffer
+
+WINDOW = (1920, 1080)
+REGION = (320, 180, 1280, 720)
+ROUNDS = 200
+
+
+def bench(name, func):
+    """运行并打印单项耗时"""
+    func()
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        func()
+    elapsed = (time.perf_counter() - start) / ROUNDS * 1000
+    print(f"  {name:<36} {elapsed:8.3f} ms/帧")
+    return elapsed
+
+
+def main():
+    width, height = WINDOW
+    x, y, w, h = REGION
+
+    buffer = allocate_frame_buffer(width, height)
+    buffer[:] = np.random.randint(0, 256, buffer.shape, dtype=np.uint8)
+
+    def qimage_path():
+        full = QImage(buffer.data, width, height, width * 4, QImage.Format.Format_RGB32)
+        cropped = full.copy(x, y, w, h)
+        ptr = cropped.constBits()
+        ptr.setsize(cropped.sizeInBytes())
+        return np.frombuffer(ptr, np.uint8).reshape(h, cropped.bytesPerLine() // 4, 4).copy()
+
+    def array_path():
+        return Frame(buffer[y:y + h, x:x + w], time.time(), 0).array
+
+    def qimage_path_analysis():
+        return qimage_path()[..., 1].mean()
+
+    def array_path_analysis():
+        return array_path()[..., 1].mean()
+
+    print(f"窗口 {width}x{height}，裁剪 {w}x{h}，{ROUNDS} 轮")
+    print("获取像素数组:")
+    qimage_ms = bench("QImage.copy + bits() 往返", qimage_path)
+    array_ms = bench("Frame 零拷贝视图", array_path)
+    print("获取 + 计算绿色通道均值:")
+    bench("QImage 路径", qimage_path_analysis)
+    bench("NumPy 路径", array_path_analysis)
+    print(f"获取像素数组加速比: {qimage_ms / array_ms:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+基准测试：感知哈希帧索引的记录和检索耗时
+
+- 单帧哈希：1920x1080 RGB32 帧计算 64/256 位 dHash
+- 检索：模拟一周录制（每秒 10 条记录，约 605 万条）的索引文件，
+  测量打开（读入）和按汉明距离检索最近 10 条的耗时
+
+运行: python benchmarks/bench_frame_index.py
+"""
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import numpy as np
+from PyQt6.QtGui import QImage
+
+from src.core import FrameHashIndex, perceptual_hash
+
+WIDTH, HEIGHT = 1920, 1080
+RECORDS = 7 * 24 * 3600 * 10
+ROUNDS = 20
+
+
+def make_frame(rng):
+    """生成一帧带低频结构的 BGRA 帧（纯随机噪声的 dHash 不稳定）"""
+    small = rng.integers(0, 256, (HEIGHT // 60, WIDTH // 60, 4), dtype=np.uint8)
+    frame = np.repeat(np.repeat(small, 60, axis=0), 60, axis=1)
+    frame[..., 3] = 255
+    return frame
+
+
+def write_index(path, rng, hash_bits, planted):
+    """写入一周的随机哈希，并在中间埋入已知画面的哈希"""
+    words = hash_bits // 64
+    index = FrameHashIndex(path, hash_bits)
+    index.close()
+    dtype = np.dtype([('timestamp', '<f8'), ('hash', '<u8', (words,))])
+    records = np.zeros(RECORDS, dtype=dtype)
+    records['timestamp'] = 1.7e9 + np.arange(RECORDS) * 0.1
+    records['hash'] = rng.integers(0, 2 ** 63, (RECORDS, words), dtype=np.uint64)
+    records['hash'][RECORDS // 2] = planted
+    with open(path, 'ab') as f:
+        records.tofile(f)
+    return float(records['timestamp'][RECORDS // 2])
+
+
+def main():
+    rng = np.random.default_rng(0)
+    frame = make_frame(rng)
+
+    print(f"{WIDTH}x{HEIGHT} 帧单帧哈希:")
+    for hash_bits in (64, 256):
+        perceptual_hash(frame, hash_bits=hash_bits)
+        start = time.perf_counter()
+        for _ in range(ROUNDS):
+            perceptual_hash(frame, hash_bits=hash_bits)
+        elapsed = (time.perf_counter() - start) / ROUNDS * 1000
+        print(f"  {hash_bits:3d} 位  {elapsed:7.3f} ms")
+
+    # 参考图像：同一画面缩小一半（模拟截图比例不同）
+    reference = QImage(np.ascontiguousarray(frame).data, WIDTH, HEIGHT, WIDTH * 4,
+                       QImage.Format.Format_RGB32).scaled(WIDTH // 2, HEIGHT // 2)
+
+    print(f"一周索引（{RECORDS} 条）检索:")
+    with tempfile.TemporaryDirectory() as folder:
+        for hash_bits in (64, 256):
+            path = os.path.join(folder, f"week{hash_bits}.phash")
+            expected = write_index(path, rng, hash_bits, perceptual_hash(frame, hash_bits=hash_bits))
+
+            start = time.perf_counter()
+            index = FrameHashIndex(path)
+            load_ms = (time.perf_counter() - start) * 1000
+
+            index.search(reference)
+            start = time.perf_counter()
+            for _ in range(5):
+                matches = index.search(reference, k=10)
+            search_ms = (time.perf_counter() - start) / 5 * 1000
+            index.close()
+
+            timestamp, distance = matches[0]
+            found = "命中" if timestamp == expected else "未命中"
+            print(f"  {hash_bits:3d} 位  文件 {os.path.getsize(path) / 2 ** 20:6.1f} MB  "
+                  f"打开 {load_ms:7.1f} ms  检索 {search_ms:7.1f} ms  "
+                  f"最近距离 {distance}（{found}埋入帧）")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+基准测试：快照与定时导出对捕获线程的影响及编码吞吐量
+
+8 个 1920x1080 区域同时请求导出（模拟一次全部监视窗口的定时导出），
+比较在调用线程中直接 QImage.save 的耗时（即原先 GUI 线程会卡住的时间）
+与 ImageExporter 的回调耗时，并统计线程池的编码吞吐量。
+
+运行: python benchmarks/bench_image_export.py
+"""
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import numpy as np
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from src.core import Frame, ImageExporter, ImageFormat
+from src.core.image_export import png_quality
+
+REGIONS = 8
+WIDTH, HEIGHT = 1920, 1080
+
+
+class FrameSource(QObject):
+    """模拟一个区域输出"""
+    frame_ready = pyqtSignal(object)
+
+    def __init__(self, index):
+        super().__init__()
+        self.region = (0, 0, WIDTH, HEIGHT)
+        self.index = index
+
+
+def make_frame(rng):
+    """生成一帧类似界面的内容（大块纯色 + 少量噪声）"""
+    array = np.zeros((HEIGHT, WIDTH, 4), dtype=np.uint8)
+    array[..., :3] = rng.integers(0, 4, (HEIGHT, WIDTH, 1), dtype=np.uint8) * 60
+    array[200:600, 100:900] = (30, 90, 200, 255)
+    return array
+
+
+def bench(image_format, folder, rng, **options):
+    """返回 (直接保存单帧 ms, 回调最长 ms, 全部写出耗时 s, 张/秒, 平均编码 ms)"""
+    frames = [Frame(make_frame(rng), 1000.0, i) for i in range(REGIONS)]
+
+    exporter = ImageExporter(os.path.join(folder, image_format), image_format=image_format,
+                             pending_frames=REGIONS, **options)
+    sources = [FrameSource(i) for i in range(REGIONS)]
+    for source in sources:
+        exporter.attach(source, f"区域{source.index}")
+
+    # 原先的做法：在调用线程中编码并写入
+    start = time.perf_counter()
+    quality = (png_quality(options["compression_level"]) if image_format == ImageFormat.PNG
+               else options["quality"])
+    frames[0].to_qimage().save(os.path.join(folder, f"direct.{image_format}"), image_format, quality)
+    direct_ms = (time.perf_counter() - start) * 1000
+
+    worst = 0.0
+    start = time.perf_counter()
+    for source, frame in zip(sources, frames):
+        exporter.snapshot(source)
+        emit_start = time.perf_counter()
+        source.frame_ready.emit(frame)
+        worst = max(worst, time.perf_counter() - emit_start)
+    while exporter.written_files < REGIONS:
+        time.sleep(0.005)
+    elapsed = time.perf_counter() - start
+    _, _, encode_ms = exporter.throughput()
+    exporter.close()
+    return direct_ms, worst * 1000, elapsed, REGIONS / elapsed, encode_ms
+
+
+def main():
+    rng = np.random.default_rng(0)
+    print(f"{REGIONS} 个 {WIDTH}x{HEIGHT} 区域同时导出（CPU 核数 {os.cpu_count()}）")
+    with tempfile.TemporaryDirectory() as folder:
+        for image_format, options in ((ImageFormat.PNG, {"compression_level": 1}),
+                                      (ImageFormat.PNG, {"compression_level": 6}),
+                                      (ImageFormat.JPEG, {"quality": 90}),
+                                      (ImageFormat.WEBP, {"quality": 90})):
+            direct_ms, worst_ms, elapsed, rate, encode_ms = bench(image_format, folder, rng, **options)
+            label = f"{image_format} {options}"
+            print(f"  {label:32s} 直接保存 {direct_ms:7.1f} ms/张 | 回调最长 {worst_ms:6.3f} ms, "
+                  f"全部写出 {elapsed:5.2f} s ({rate:.1f} 张/秒, 编码 {encode_ms:.0f} ms/张)")
+
+
+if __name__ == "__main__":
+    main()
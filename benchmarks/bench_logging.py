@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+基准测试：热路径日志的调用方开销
+
+比较每次调用在调用线程中的耗时：
+- 调试关闭时的 f-string 调试日志（总是格式化）与 % 参数延迟格式化
+- 输出日志时同步写处理器（原实现）与入队后由监听线程写出，
+  输出分别为 os.devnull 和每次写入耗时 0.5 ms 的慢速流（模拟控制台窗口）
+- 连续重复的捕获错误：每次都输出与按 key 限流
+
+只统计调用方耗时。
+
+运行: python benchmarks/bench_logging.py
+"""
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.utils.logger import logger
+
+CALLS = 20000
+SLOW_CALLS = 1000
+SLOW_WRITE = 0.0005
+
+
+class SlowStream:
+    """每次写入耗时 SLOW_WRITE 秒的输出流"""
+
+    def write(self, text):
+        time.sleep(SLOW_WRITE)
+        return len(text)
+
+    def flush(self):
+        pass
+
+
+def per_call_us(func, calls=CALLS):
+    """每次调用的平均耗时（微秒）"""
+    start = time.perf_counter()
+    for i in range(calls):
+        func(i)
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def make_handler(stream):
+    """与 Logger 相同格式的流处理器"""
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(logging.Formatter('[%(levelname)s] %(message)s'))
+    return handler
+
+
+def make_sync_logger(stream):
+    """原实现：处理器直接挂在 logging.Logger 上，在调用线程中格式化并写出"""
+    sync = logging.getLogger(f'bench-sync-{id(stream)}')
+    sync.propagate = False
+    sync.setLevel(logging.DEBUG)
+    sync.addHandler(make_handler(stream))
+    return sync
+
+
+def main():
+    devnull = open(os.devnull, 'w', encoding='utf-8')
+    sync = make_sync_logger(devnull)
+    # 监听线程改为写到 os.devnull
+    saved_handlers = logger._listener.handlers
+    logger._listener.handlers = (make_handler(devnull),)
+
+    fps = 59.94
+    print(f"每种方式 {CALLS} 次调用，调用方平均耗时（微秒/次）")
+
+    # 调试关闭
+    sync.setLevel(logging.INFO)
+    logger.set_debug(False)
+    eager = per_call_us(lambda i: sync.debug(f"✓ 第 {i} 帧完成 (方法: PrintWindow, FPS: {fps:.1f})"))
+    lazy = per_call_us(lambda i: logger.debug("✓ 第 %d 帧完成 (方法: %s, FPS: %.1f)", i, "PrintWindow", fps))
+    print(f"  调试关闭   f-string 同步: {eager:7.2f}    % 参数延迟: {lazy:7.2f}")
+
+    # 调试开启，实际输出
+    sync.setLevel(logging.DEBUG)
+    logger.set_debug(True)
+    eager = per_call_us(lambda i: sync.debug(f"✓ 第 {i} 帧完成 (方法: PrintWindow, FPS: {fps:.1f})"))
+    lazy = per_call_us(lambda i: logger.debug("✓ 第 %d 帧完成 (方法: %s, FPS: %.1f)", i, "PrintWindow", fps))
+    print(f"  调试开启   同步写出:     {eager:7.2f}    入队:       {lazy:7.2f}")
+
+    # 调试开启，慢速输出
+    slow = SlowStream()
+    slow_sync = make_sync_logger(slow)
+    logger._listener.handlers = (make_handler(slow),)
+    eager = per_call_us(lambda i: slow_sync.debug(f"✓ 第 {i} 帧完成 (方法: PrintWindow, FPS: {fps:.1f})"),
+                        SLOW_CALLS)
+    lazy = per_call_us(lambda i: logger.debug("✓ 第 %d 帧完成 (方法: %s, FPS: %.1f)", i, "PrintWindow", fps),
+                       SLOW_CALLS)
+    print(f"  慢速输出   同步写出:     {eager:7.2f}    入队:       {lazy:7.2f}")
+    logger._listener.handlers = (make_handler(devnull),)
+
+    # 重复的捕获错误
+    error = OSError("PrintWindow failed")
+    eager = per_call_us(lambda i: sync.error(f"PrintWindow 捕获失败: {error}"))
+    throttled = per_call_us(lambda i: logger.error("PrintWindow 捕获失败 (hwnd=%s): %s", 1234, error,
+                                                   key="bench:1234"))
+    print(f"  重复错误   每次输出:     {eager:7.2f}    按 key 限流: {throttled:7.2f}")
+
+    logger.shutdown()
+    logger._listener.handlers = saved_handlers
+    devnull.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+基准测试：像素格式归一化对监视窗口绘制耗时的影响
+
+模拟 CaptureWindow 每帧的显示路径（QPixmap.fromImage + 缩放绘制到 800x450 视口），
+比较捕获方法原始格式与归一化后的格式，并给出归一化本身的开销。
+
+运行: python benchmarks/bench_pixel_format.py
+"""
+import sys
+import time
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import numpy as np
+from PyQt6.QtCore import QRect
+from PyQt6.QtGui import QImage, QPainter, QPixmap
+from PyQt6.QtWidgets import QApplication
+
+from src.core.pixel_format import PixelFormat, normalize_array, normalize_image
+
+SIZE = (1920, 1080)
+VIEWPORT = QRect(0, 0, 800, 450)
+ROUNDS = 50
+
+
+def bench(name, func):
+    """运行并打印单项耗时"""
+    func()
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        func()
+    elapsed = (time.perf_counter() - start) / ROUNDS * 1000
+    print(f"  {name:<40} {elapsed:8.3f} ms/帧")
+    return elapsed
+
+
+def main():
+    app = QApplication.instance() or QApplication(sys.argv)
+    width, height = SIZE
+
+    pixels = np.random.randint(0, 256, (height, width, 4), dtype=np.uint8)
+    pixels[..., 3] = 0  # PrintWindow 常见的全零 Alpha
+
+    target = QImage(VIEWPORT.size(), QImage.Format.Format_ARGB32_Premultiplied)
+
+    def paint(image):
+        pixmap = QPixmap.fromImage(image)
+        painter = QPainter(target)
+        painter.drawPixmap(VIEWPORT, pixmap)
+        painter.end()
+
+    def make(image_format):
+        return QImage(pixels.data, width, height, width * 4, image_format).copy()
+
+    printwindow_img = make(QImage.Format.Format_ARGB32)
+    win32ui_img = make(QImage.Format.Format_RGB32)
+    premultiplied_img = normalize_image(make(QImage.Format.Format_ARGB32),
+                                        PixelFormat.ARGB32_PREMULTIPLIED)
+    opaque_img = normalize_image(make(QImage.Format.Format_ARGB32), PixelFormat.RGB32)
+
+    print(f"帧 {width}x{height} -> 视口 {VIEWPORT.width()}x{VIEWPORT.height()}，{ROUNDS} 轮")
+    print("显示耗时 (fromImage + 缩放绘制):")
+    argb_ms = bench("ARGB32（PrintWindow 原始）", lambda: paint(printwindow_img))
+    bench("RGB32（win32ui 原始）", lambda: paint(win32ui_img))
+    bench("ARGB32_Premultiplied（归一化，不透明）", lambda: paint(premultiplied_img))
+    opaque_ms = bench("RGB32（归一化，Alpha=0xff，默认）", lambda: paint(opaque_img))
+
+    print("归一化开销（捕获后一次）:")
+    bench("Qt 批量转换 -> RGB32",
+          lambda: normalize_image(printwindow_img.copy(), PixelFormat.RGB32))
+    bench("NumPy 原地 Alpha 置 255 -> RGB32",
+          lambda: normalize_array(pixels.copy(), PixelFormat.RGB32))
+    bench("Qt SIMD -> RGB888", lambda: normalize_array(pixels, PixelFormat.RGB888))
+    bench("NumPy -> Grayscale8", lambda: normalize_array(pixels, PixelFormat.GRAYSCALE8))
+    bench("Qt SIMD -> RGB565", lambda: normalize_array(pixels, PixelFormat.RGB565))
+    bench("NumPy 查表 -> Indexed8", lambda: normalize_array(pixels, PixelFormat.INDEXED8))
+
+    print(f"相对 PrintWindow 原始格式，每帧显示节省: {argb_ms - opaque_ms:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+基准测试：像素监视规则批量求值耗时
+
+在 1920x1080 RGB32 帧上编译数百条规则（颜色采样点、40x40 模板、进度条填充），
+测量 RuleSet.evaluate 单帧耗时，并与逐条规则单独求值比较。
+
+运行: python benchmarks/bench_pixel_watch.py
+"""
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import numpy as np
+from PyQt6.QtGui import QImage
+
+from src.core import RuleSet, parse_rules
+
+WIDTH, HEIGHT = 1920, 1080
+COLOR_RULES = 300
+TEMPLATE_RULES = 100
+FILL_RULES = 100
+ROUNDS = 50
+
+
+def make_frame(rng):
+    """生成一帧随机内容的 BGRA 帧"""
+    frame = rng.integers(0, 256, (HEIGHT, WIDTH, 4), dtype=np.uint8)
+    frame[..., 3] = 255
+    return frame
+
+
+def make_rules(frame, rng, folder):
+    """在帧上随机生成规则，约一半规则的条件成立"""
+    specs = []
+    for i in range(COLOR_RULES):
+        points = [[int(rng.integers(0, WIDTH)), int(rng.integers(0, HEIGHT))] for _ in range(4)]
+        x, y = points[0]
+        b, g, r = (int(v) for v in frame[y, x, :3])
+        specs.append({"name": f"color{i}", "kind": "color", "points": points,
+                      "color": [r, g, b], "tolerance": 40, "min_ratio": 0.25})
+
+    for i in range(TEMPLATE_RULES):
+        x, y = int(rng.integers(0, WIDTH - 40)), int(rng.integers(0, HEIGHT - 40))
+        source = frame if i % 2 == 0 else make_frame(rng)
+        patch = np.ascontiguousarray(source[y:y + 40, x:x + 40])
+        path = str(Path(folder) / f"template{i}.png")
+        QImage(patch.data, 40, 40, 160, QImage.Format.Format_RGB32).save(path)
+        specs.append({"name": f"template{i}", "kind": "template", "position": [x, y],
+                      "template": path, "min_score": 0.9})
+
+    for i in range(FILL_RULES):
+        x, y = int(rng.integers(0, WIDTH - 200)), int(rng.integers(0, HEIGHT - 12))
+        filled = int(rng.integers(0, 201))
+        frame[y:y + 12, x:x + filled] = (0, 200, 0, 255)
+        specs.append({"name": f"fill{i}", "kind": "fill", "rect": [x, y, 200, 12],
+                      "color": [0, 200, 0], "tolerance": 30, "min_ratio": 0.5})
+    return parse_rules(specs)
+
+
+def timed(evaluate):
+    """返回单帧平均耗时（毫秒）"""
+    evaluate()
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        evaluate()
+    return (time.perf_counter() - start) / ROUNDS * 1000
+
+
+def main():
+    rng = np.random.default_rng(0)
+    frame = make_frame(rng)
+    # 区域帧是整窗缓冲区上的裁剪视图
+    window = np.zeros((HEIGHT + 100, WIDTH + 100, 4), dtype=np.uint8)
+    with tempfile.TemporaryDirectory() as folder:
+        rules = make_rules(frame, rng, folder)
+    window[50:50 + HEIGHT, 50:50 + WIDTH] = frame
+    view = window[50:50 + HEIGHT, 50:50 + WIDTH]
+    image_format = QImage.Format.Format_RGB32
+
+    batched = RuleSet(rules)
+    states, values = batched.evaluate(view, image_format)
+    singles = [RuleSet([rule]) for rule in rules]
+    single_states = np.array([s.evaluate(view, image_format)[0][0] for s in singles])
+    assert (single_states == states).all(), "批量求值与逐条求值结果不一致"
+
+    print(f"{WIDTH}x{HEIGHT} 帧，{len(rules)} 条规则（颜色 {COLOR_RULES}，"
+          f"模板 {TEMPLATE_RULES}，填充 {FILL_RULES}），条件成立 {int(states.sum())} 条")
+    batched_ms = timed(lambda: batched.evaluate(view, image_format))
+    print(f"  批量求值  {batched_ms:8.3f} ms/帧")
+    single_ms = timed(lambda: [s.evaluate(view, image_format) for s in singles])
+    print(f"  逐条求值  {single_ms:8.3f} ms/帧 ({single_ms / batched_ms:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
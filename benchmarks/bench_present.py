@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+基准测试：立即显示 vs 随显示刷新提交（vsync）
+
+后台线程以带抖动的 60 FPS 发射显示帧（帧上记录捕获时间戳），监视窗口按两种方式显示，统计：
+- 提交次数与被合并（未显示）的帧数
+- 同一刷新周期内多次提交的次数（用户看不到的重复更新，按提交时间划分刷新周期）
+- 捕获到提交的平均 / 最大延迟
+- GUI 线程用于显示的 CPU 时间
+
+运行: python benchmarks/bench_present.py
+"""
+import sys
+import threading
+import time
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import numpy as np
+from PyQt6.QtGui import QImage
+from PyQt6.QtWidgets import QApplication
+
+from src.core import CaptureEngine
+from src.core.frame import set_capture_timestamp
+from src.ui import CaptureWindow
+from src.ui.frame_viewer import PresentMode
+
+SIZE = (1280, 720)
+CAPTURE_FPS = 60
+DURATION = 3.0
+
+
+def make_frames(count=4):
+    """生成若干帧不同内容的 RGB32 图像"""
+    frames = []
+    for _ in range(count):
+        pixels = np.random.randint(0, 256, (SIZE[1], SIZE[0], 4), dtype=np.uint8)
+        pixels[..., 3] = 255
+        frames.append(QImage(pixels.data, SIZE[0], SIZE[1], SIZE[0] * 4,
+                             QImage.Format.Format_RGB32).copy())
+    return frames
+
+
+def produce(engine, frames, stop):
+    """模拟捕获线程：60 FPS，每帧 ±80% 的到达抖动"""
+    rng = np.random.default_rng(0)
+    interval = 1.0 / CAPTURE_FPS
+    index = 0
+    while not stop.is_set():
+        time.sleep(interval * (1 + rng.uniform(-0.8, 0.8)))
+        image = frames[index % len(frames)].copy()
+        set_capture_timestamp(image, time.time())
+        engine.frame_captured.emit(image)
+        index += 1
+
+
+def run(app, mode, frames):
+    """以指定提交方式运行 DURATION 秒"""
+    engine = CaptureEngine(0, (0, 0, *SIZE), CAPTURE_FPS, replay=False)
+    window = CaptureWindow(engine, "bench")
+    window.present_mode = mode
+    window.show()
+    # 首帧（调整窗口尺寸）
+    engine.frame_captured.emit(frames[0])
+    for _ in range(10):
+        app.processEvents()
+
+    present_times = []
+    original_present = window._present
+
+    def recording_present(image):
+        present_times.append(time.perf_counter())
+        original_present(image)
+
+    window._present = recording_present
+    window._latencies.clear()
+    presented, coalesced = window.presented_frames, window.coalesced_frames
+
+    stop = threading.Event()
+    producer = threading.Thread(target=produce, args=(engine, frames, stop))
+    cpu_start = time.thread_time()
+    producer.start()
+    deadline = time.perf_counter() + DURATION
+    while time.perf_counter() < deadline:
+        app.processEvents()
+        time.sleep(0.0005)
+    stop.set()
+    producer.join()
+    cpu = time.thread_time() - cpu_start
+
+    refresh = window._refresh_interval()
+    periods = np.floor((np.array(present_times) - present_times[0]) / refresh).astype(np.int64)
+    doubles = len(periods) - len(np.unique(periods))
+    latencies = np.array(window._latencies) * 1000
+    result = (window.presented_frames - presented, window.coalesced_frames - coalesced, doubles,
+              latencies.mean() if len(latencies) else 0.0,
+              latencies.max() if len(latencies) else 0.0, cpu / DURATION * 100, refresh)
+    window.close()
+    app.processEvents()
+    return result
+
+
+def main():
+    app = QApplication.instance() or QApplication(sys.argv)
+    frames = make_frames()
+
+    print(f"{SIZE[0]}x{SIZE[1]}，捕获 {CAPTURE_FPS} FPS（±80% 抖动），每种方式 {DURATION:.0f} 秒")
+    print(f"  {'方式':<10}{'提交':>6}{'合并':>6}{'同刷新重复':>10}{'平均延迟':>10}{'最大延迟':>10}{'GUI CPU':>9}")
+    for mode in (PresentMode.IMMEDIATE, PresentMode.VSYNC):
+        presented, coalesced, doubles, mean_ms, max_ms, cpu, refresh = run(app, mode, frames)
+        print(f"  {mode:<10}{presented:>6}{coalesced:>6}{doubles:>10}"
+              f"{mean_ms:>8.1f}ms{max_ms:>8.1f}ms{cpu:>8.0f}%")
+    print(f"  （屏幕刷新间隔 {refresh * 1000:.1f} ms）")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+基准测试：录制对比吞吐量和内存占用
+
+生成两段 1920x1080 C420jpeg 的 Y4M 录制（被测录制中有两段画面差异），
+分别在当前进程和进程池中对比，测量每帧耗时、峰值内存，并检查差异时间线。
+
+运行: python benchmarks/bench_recording_compare.py
+"""
+import os
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import numpy as np
+
+from src.core.recording_compare import compare_recordings
+
+WIDTH, HEIGHT = 1920, 1080
+FRAMES = 240
+# 被测录制中画面不同的帧区间
+DIVERGENT = [(60, 75), (180, 182)]
+
+
+def write_y4m(path, frames, divergent=()):
+    """写一段亮度缓慢变化的录制，divergent 区间内叠加一个白色方块"""
+    rng = np.random.default_rng(0)
+    base = rng.integers(16, 235, (HEIGHT // 8, WIDTH // 8), dtype=np.uint8)
+    base = np.repeat(np.repeat(base, 8, axis=0), 8, axis=1)
+    chroma = np.full(WIDTH * HEIGHT // 2, 128, dtype=np.uint8).tobytes()
+    with open(path, 'wb') as f:
+        f.write(f"YUV4MPEG2 W{WIDTH} H{HEIGHT} F30:1 Ip A1:1 C420jpeg\n".encode('ascii'))
+        for i in range(frames):
+            luma = np.roll(base, i, axis=1)
+            if any(start <= i < end for start, end in divergent):
+                luma = luma.copy()
+                luma[400:600, 800:1100] = 235
+            f.write(b"FRAME\n")
+            f.write(luma.tobytes())
+            f.write(chroma)
+
+
+def main():
+    with tempfile.TemporaryDirectory() as folder:
+        reference = os.path.join(folder, "reference.y4m")
+        test = os.path.join(folder, "test.y4m")
+        write_y4m(reference, FRAMES)
+        write_y4m(test, FRAMES, DIVERGENT)
+        size = os.path.getsize(test) / 2 ** 20
+        print(f"{WIDTH}x{HEIGHT} C420jpeg，{FRAMES} 帧，每段 {size:.0f} MB")
+
+        # 先运行进程池：主进程只读取差异帧，峰值内存反映汇总开销
+        for label, workers in ((f"进程池 {os.cpu_count()} 进程", None), ("当前进程", 0)):
+            start = time.perf_counter()
+            result = compare_recordings(reference, test, os.path.join(folder, "report"),
+                                        workers=workers)
+            elapsed = time.perf_counter() - start
+            spans = [(d.first.test_index, d.last.test_index + 1) for d in result.divergences]
+            print(f"  {label:<12} {elapsed / FRAMES * 1000:7.2f} ms/帧  "
+                  f"差异 {spans}（预期 {DIVERGENT}）")
+            if workers is None:
+                peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+                print(f"  主进程峰值内存 {peak:.0f} MB（录制共 {size * 2:.0f} MB）")
+
+
+if __name__ == "__main__":
+    main()
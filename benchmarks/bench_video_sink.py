@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+基准测试：视频流输出的转换耗时与捕获线程开销
+
+1. 1920x1080 RGB32 帧转换为 Y4M（YUV 4:2:0）帧的单帧耗时
+2. 下游命名管道停止读取时，捕获线程 frame_ready 回调的最长耗时（应始终为微秒级）
+
+运行: python benchmarks/bench_video_sink.py（命名管道部分仅在支持 os.mkfifo 的系统上运行）
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import numpy as np
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from src.core import Frame, VideoSink, OverflowPolicy
+
+WIDTH, HEIGHT = 1920, 1080
+ROUNDS = 50
+FPS = 30
+STALL_FRAMES = 90
+
+
+class FrameSource(QObject):
+    """模拟一个区域输出"""
+    frame_ready = pyqtSignal(object)
+
+
+def bench_convert(frame):
+    """单帧转换耗时（毫秒）"""
+    with tempfile.TemporaryDirectory() as folder:
+        sink = VideoSink(os.path.join(folder, "bench.y4m"))
+        sink._convert(frame)
+        start = time.perf_counter()
+        for _ in range(ROUNDS):
+            sink._convert(frame)
+        elapsed = (time.perf_counter() - start) / ROUNDS * 1000
+        sink.close()
+    return elapsed
+
+
+def bench_stalled(frame, policy):
+    """读取方连接后停止读取，按 FPS 持续发出帧，返回 (回调最长耗时 ms, 写出帧数, 丢弃帧数)"""
+    with tempfile.TemporaryDirectory() as folder:
+        fifo = os.path.join(folder, "stream")
+        os.mkfifo(fifo)
+        release = threading.Event()
+
+        def reader():
+            with open(fifo, 'rb') as f:
+                f.read(1)          # 连接后只读一个字节，之后停止读取
+                release.wait()
+                while f.read(1 << 20):
+                    pass
+
+        thread = threading.Thread(target=reader, daemon=True)
+        thread.start()
+        source = FrameSource()
+        sink = VideoSink(fifo, policy=policy, buffer_bytes=64 * 1024 * 1024)
+        sink.attach(source)
+
+        worst = 0.0
+        for tick in range(STALL_FRAMES):
+            start = time.perf_counter()
+            source.frame_ready.emit(Frame(frame.array, 1000.0 + tick / FPS, tick))
+            worst = max(worst, time.perf_counter() - start)
+            time.sleep(1 / FPS)
+        release.set()
+        sink.close()
+        thread.join(timeout=10)
+    return worst * 1000, sink.written_frames, sink.dropped_frames
+
+
+def main():
+    rng = np.random.default_rng(0)
+    window = rng.integers(0, 256, (HEIGHT + 1, WIDTH + 1, 4), dtype=np.uint8)
+    # 区域帧是整窗缓冲区上的裁剪视图
+    frame = Frame(window[1:, 1:], 0.0, 0)
+
+    print(f"{WIDTH}x{HEIGHT} RGB32 -> Y4M 4:2:0: {bench_convert(frame):.2f} ms/帧")
+
+    if not hasattr(os, "mkfifo"):
+        return
+    for policy in (OverflowPolicy.DROP, OverflowPolicy.BLOCK):
+        worst, written, dropped = bench_stalled(frame, policy)
+        print(f"下游停止读取 {STALL_FRAMES / FPS:.0f} 秒 ({policy}): 回调最长 {worst:.3f} ms, "
+              f"写出 {written} 帧, 丢弃 {dropped} 帧")
+
+
+if __name__ == "__main__":
+    main()
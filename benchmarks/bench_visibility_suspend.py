@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+基准测试：监视窗口不可见时自动降频节省的 CPU 时间
+
+以 30 FPS 监视目标窗口，分别测量监视窗口可见、最小化、隐藏时的
+进程 CPU 时间和捕获次数，以及重新显示后拿到第一帧的延迟。
+
+运行: python benchmarks/bench_visibility_suspend.py [hwnd]
+      （默认监视当前前台窗口）
+"""
+import sys
+import time
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import win32gui
+from PyQt6.QtCore import QEventLoop, QTimer
+from PyQt6.QtWidgets import QApplication
+
+from src.core import CaptureEngine
+from src.ui import CaptureWindow
+from src.utils import WindowManager
+
+FPS = 30
+SECONDS = 5
+
+
+def measure(engine, seconds):
+    """运行事件循环，返回 (捕获次数, 进程 CPU 秒数)"""
+    loop = QEventLoop()
+    QTimer.singleShot(int(seconds * 1000), loop.quit)
+    captures = engine.capture_count
+    cpu = time.process_time()
+    loop.exec()
+    return engine.capture_count - captures, time.process_time() - cpu
+
+
+def main():
+    app = QApplication.instance() or QApplication(sys.argv)
+
+    hwnd = int(sys.argv[1]) if len(sys.argv) > 1 else win32gui.GetForegroundWindow()
+    left, top, right, bottom = WindowManager.get_window_rect(hwnd)
+    region = (0, 0, right - left, bottom - top)
+
+    engine = CaptureEngine(hwnd, region, FPS, replay=False)
+    window = CaptureWindow(engine, "bench")
+    window.show()
+    engine.start()
+    measure(engine, 1)  # 预热
+
+    print(f"目标窗口 {region[2]}x{region[3]}，{FPS} FPS，每项 {SECONDS}s")
+    visible_count, visible_cpu = measure(engine, SECONDS)
+    print(f"  可见    捕获 {visible_count:4d} 次  CPU {visible_cpu:6.3f}s")
+
+    window.showMinimized()
+    app.processEvents()
+    minimized_count, minimized_cpu = measure(engine, SECONDS)
+    print(f"  最小化  捕获 {minimized_count:4d} 次  CPU {minimized_cpu:6.3f}s")
+
+    window.showNormal()
+    start = time.perf_counter()
+    captures = engine.capture_count
+    while engine.capture_count == captures:
+        app.processEvents()
+    resume_ms = (time.perf_counter() - start) * 1000
+
+    window.hide()
+    app.processEvents()
+    hidden_count, hidden_cpu = measure(engine, SECONDS)
+    print(f"  隐藏    捕获 {hidden_count:4d} 次  CPU {hidden_cpu:6.3f}s")
+
+    saved = (visible_cpu - minimized_cpu) / visible_cpu * 100 if visible_cpu else 0.0
+    print(f"不可见时节省 CPU: {visible_cpu - minimized_cpu:.3f}s / {SECONDS}s ({saved:.0f}%)")
+    print(f"重新显示后首次捕获延迟: {resume_ms:.1f} ms")
+
+    window.show()
+    window.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+基准测试：窗口搜索每次按键的耗时
+
+索引 1000 个标题相似的窗口（标题 + 进程名 + 窗口类名），逐字符输入若干查询，
+统计每次按键 search(query, 20) 的耗时（每个按键取 30 轮中的最小值）。
+
+运行: python benchmarks/bench_window_search.py
+"""
+import random
+import sys
+import time
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.core.window_search import WindowSearchIndex
+
+WINDOWS = 1000
+ROUNDS = 30
+APPS = [("chrome.exe", "Chrome_WidgetWin_1"), ("Code.exe", "Chrome_WidgetWin_1"),
+        ("explorer.exe", "CabinetWClass"), ("notepad.exe", "Notepad"),
+        ("obs64.exe", "Qt5QWindowIcon"), ("game.exe", "UnityWndClass")]
+WORDS = ("Monitor Dashboard Production Line Camera Station Operator Report Sales Inventory "
+         "Alarm Feed Status Console Server Node").split()
+QUERIES = ["camera station 42", "opratr", "cabinet", "obs feed"]
+
+
+def build_index():
+    """生成标题相似的窗口并建立索引"""
+    rng = random.Random(0)
+    index = WindowSearchIndex()
+    for hwnd in range(1, WINDOWS + 1):
+        process, window_class = rng.choice(APPS)
+        title = f"{rng.choice(WORDS)} {rng.choice(WORDS)} {hwnd % 97} - {process.split('.')[0]}"
+        index.add(hwnd, title, process, window_class)
+    return index
+
+
+def time_keystrokes(index, typed):
+    """逐字符输入，返回每次按键的最小耗时（毫秒）和最终结果"""
+    prefixes = [typed[:i] for i in range(1, len(typed) + 1)]
+    best = [float('inf')] * len(prefixes)
+    results = []
+    for _ in range(ROUNDS):
+        index._last_query = None
+        for i, query in enumerate(prefixes):
+            start = time.perf_counter()
+            results = index.search(query, 20)
+            best[i] = min(best[i], (time.perf_counter() - start) * 1000)
+    return best, results
+
+
+def main():
+    start = time.perf_counter()
+    index = build_index()
+    print(f"{WINDOWS} 个窗口，建立索引 {(time.perf_counter() - start) * 1000:.1f} ms")
+    print(f"  {'查询':<20}{'最大 ms/键':>12}{'平均 ms/键':>12}  首个结果")
+    for typed in QUERIES:
+        times, results = time_keystrokes(index, typed)
+        top = index.describe(results[0])[0] if results else "-"
+        print(f"  {typed!r:<20}{max(times):>12.3f}{sum(times) / len(times):>12.3f}  {top}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+基准测试：放大查看的瓦片缓存绘制开销
+
+8 倍放大时，按不同视口尺寸和源图像尺寸绘制一帧（画到与视口等大的 QImage 上），对比：
+- 整图变换：QPainter 设置 8 倍变换后 drawImage 整张源图（QGraphicsView 缩放图像项的方式）
+- 瓦片缓存，静止画面：每帧都是新的 QImage，但内容不变（只校验可见瓦片的源像素）
+- 瓦片缓存，局部变化：每帧有一个 64x64 区域变化（只重绘覆盖该区域的瓦片）
+- 瓦片缓存，整帧变化：每帧所有像素都变化（所有可见瓦片重绘）
+
+运行: python benchmarks/bench_zoom_tiles.py
+"""
+import sys
+import time
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import numpy as np
+from PyQt6.QtWidgets import QApplication
+from PyQt6.QtGui import QImage, QPainter
+
+from src.core import array_to_qimage
+from src.ui.tile_cache import TileCache
+
+ZOOM = 8.0
+ROUNDS = 20
+VIEWPORTS = [(640, 360), (1280, 720), (1920, 1080)]
+SOURCES = [(1920, 1080), (3840, 2160)]
+
+
+def make_frames(width, height, rng):
+    """生成一组帧：基准帧、局部变化帧、整帧变化帧"""
+    base = rng.integers(0, 256, (height, width, 4), dtype=np.uint8)
+    base[..., 3] = 255
+    # 在视口中心附近变化一个 64x64 区域
+    local = []
+    for i in range(ROUNDS):
+        frame = base.copy()
+        frame[height // 2:height // 2 + 64, width // 2:width // 2 + 64, :3] = i * 10
+        local.append(array_to_qimage(frame, QImage.Format.Format_RGB32).copy())
+    full = [array_to_qimage(np.roll(base, i + 1, axis=1), QImage.Format.Format_RGB32).copy()
+            for i in range(ROUNDS)]
+    return base, local, full
+
+
+def paint_transform(target, image, offset_x, offset_y):
+    """整图变换绘制"""
+    painter = QPainter(target)
+    painter.translate(-offset_x, -offset_y)
+    painter.scale(ZOOM, ZOOM)
+    painter.drawImage(0, 0, image)
+    painter.end()
+
+
+def paint_tiles(target, cache, image, offset_x, offset_y):
+    """瓦片缓存绘制"""
+    cache.set_image(image)
+    painter = QPainter(target)
+    cache.paint(painter, ZOOM, offset_x, offset_y, target.width(), target.height())
+    painter.end()
+
+
+def timed(func, frames):
+    """逐帧调用 func，返回平均毫秒数"""
+    start = time.perf_counter()
+    for frame in frames:
+        func(frame)
+    return (time.perf_counter() - start) / len(frames) * 1000
+
+
+def main():
+    app = QApplication.instance() or QApplication(sys.argv)
+    rng = np.random.default_rng(0)
+
+    print(f"{ZOOM:.0f} 倍放大，每项 {ROUNDS} 帧，单帧绘制耗时 (ms)")
+    print(f"  {'源图像':<12}{'视口':<12}{'整图变换':>10}{'静止':>10}{'局部变化':>10}{'整帧变化':>10}")
+    for source_width, source_height in SOURCES:
+        base, local, full = make_frames(source_width, source_height, rng)
+        static = [array_to_qimage(base, QImage.Format.Format_RGB32).copy() for _ in range(ROUNDS)]
+        for view_width, view_height in VIEWPORTS:
+            target = QImage(view_width, view_height, QImage.Format.Format_RGB32)
+            # 视口中心对准源图像中心
+            offset_x = int(source_width * ZOOM / 2 - view_width / 2)
+            offset_y = int(source_height * ZOOM / 2 - view_height / 2)
+
+            transform_ms = timed(lambda image: paint_transform(target, image, offset_x, offset_y),
+                                 static)
+            results = []
+            for frames in (static, local, full):
+                cache = TileCache()
+                # 预热：首帧填充可见瓦片
+                paint_tiles(target, cache, frames[0], offset_x, offset_y)
+                results.append(timed(
+                    lambda image: paint_tiles(target, cache, image, offset_x, offset_y), frames[1:]))
+            print(f"  {source_width}x{source_height:<6}{view_width}x{view_height:<7}"
+                  f"{transform_ms:>10.2f}" + "".join(f"{value:>10.2f}" for value in results))
+
+
+if __name__ == "__main__":
+    main()
@@ -14,6 +14,8 @@ a = Analysis(
         'PyQt6.QtCore',
         'PyQt6.QtGui',
         'PyQt6.QtWidgets',
+        'PyQt6.QtOpenGL',
+        'PyQt6.QtOpenGLWidgets',
         'win32api',
         'win32gui',
         'win32con',
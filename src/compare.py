@@ -0,0 +1,44 @@
+"""
+WindowScope - 录制对比工具
+
+用法:
+    python -m src.compare reference.y4m test.y4m -o report
+    python -m src.compare golden.png test.y4m -o report --min-ssim 0.99
+
+存在差异帧时退出码为 1，便于在界面回归检查脚本中使用。
+"""
+import argparse
+import sys
+
+from .core.recording_compare import AlignMode, compare_recordings
+
+
+def main(argv=None):
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="逐帧比较两段 Y4M 录制，或录制与基准图片")
+    parser.add_argument("reference", help="参考录制（.y4m）或基准图片")
+    parser.add_argument("test", help="被测录制（.y4m）")
+    parser.add_argument("-o", "--output", help="报告目录（逐帧指标、差异时间线、热力图）")
+    parser.add_argument("--align", choices=[AlignMode.TIMESTAMP, AlignMode.SEQUENCE],
+                        default=AlignMode.TIMESTAMP, help="帧对齐方式（默认按时间）")
+    parser.add_argument("--threshold", type=int, default=16, help="视为变化的最小亮度差")
+    parser.add_argument("--min-ssim", type=float, default=0.98, help="SSIM 低于该值视为差异帧")
+    parser.add_argument("--max-area", type=float, default=0.001, help="变化面积超过该比例视为差异帧")
+    parser.add_argument("--workers", type=int, default=None, help="工作进程数（0 表示不使用进程池）")
+    args = parser.parse_args(argv)
+
+    result = compare_recordings(args.reference, args.test, args.output, mode=args.align,
+                                threshold=args.threshold, min_ssim=args.min_ssim,
+                                max_area=args.max_area, workers=args.workers)
+
+    print(f"比较 {len(result.frames)} 帧，未对齐 {result.unmatched} 帧，差异 {len(result.divergences)} 段")
+    for divergence in result.divergences:
+        worst = divergence.worst
+        print(f"  {divergence.first.timestamp:9.3f}s - {divergence.last.timestamp:9.3f}s  "
+              f"{divergence.frames:5d} 帧  最低 SSIM {worst.ssim:.4f}  "
+              f"变化面积 {worst.changed_area:.2%}  {divergence.heatmap_path or ''}")
+    return 0 if result.passed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
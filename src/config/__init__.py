@@ -1,5 +1,10 @@
 """配置模块"""
-from .settings import settings, AppSettings, CaptureSettings, UISettings, DebugSettings
-
-__all__ = ['settings', 'AppSettings', 'CaptureSettings', 'UISettings', 'DebugSettings']
+from .settings import (settings, AppSettings, CaptureSettings, UISettings, DebugSettings,
+                       ReplaySettings, MotionSettings, WatchSettings, IndexSettings,
+                       StreamSettings, ExportSettings, DashboardSettings,
+                       ThumbnailSettings, MetricsSettings)
 
+__all__ = ['settings', 'AppSettings', 'CaptureSettings', 'UISettings', 'DebugSettings',
+           'ReplaySettings', 'MotionSettings', 'WatchSettings', 'IndexSettings',
+           'StreamSettings', 'ExportSettings', 'DashboardSettings', 'ThumbnailSettings',
+           'MetricsSettings']
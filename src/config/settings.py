@@ -2,8 +2,8 @@
 配置管理模块
 集中管理应用程序的所有配置项
 """
-from dataclasses import dataclass
-from typing import Tuple
+from dataclasses import dataclass, field
+from typing import List, Tuple
 
 
 @dataclass
@@ -13,6 +13,10 @@ class CaptureSettings:
     min_fps: int = 1
     max_fps: int = 60
     min_region_size: int = 10  # 最小选择区域尺寸
+    # 默认输出像素格式: rgb32 / argb32_premultiplied / rgb888 / rgb565 / grayscale8 / indexed8
+    # （可在主窗口为每个监视窗口单独选择，文字控制台用 grayscale8 / indexed8 可减少 75% 内存和带宽）
+    pixel_format: str = "rgb32"
+    idle_fps: int = 1  # 没有可见监视窗口时的保活帧率
     
 
 @dataclass
@@ -29,6 +33,18 @@ class UISettings:
     
     # 控制栏高度
     control_bar_height: int = 50
+    
+    # 监视窗口画面显示方式: raster（QGraphicsView）/ opengl（QOpenGLWidget，GPU 缩放）
+    viewer: str = "raster"
+    
+    # 监视窗口画面提交方式: vsync（只保留最新一帧，随显示刷新提交，每次刷新至多一次）/ immediate（收到即显示）
+    present_mode: str = "vsync"
+    
+    # 窗口列表在后台轮询更新的间隔（毫秒）
+    window_poll_ms: int = 1000
+    
+    # 窗口搜索结果最多显示的窗口数
+    window_search_results: int = 20
 
 
 @dataclass
@@ -40,6 +56,115 @@ class DebugSettings:
     log_file_path: str = "window_capture.log"
 
 
+@dataclass
+class ReplaySettings:
+    """即时回放设置"""
+    enabled: bool = True
+    max_bytes: int = 256 * 1024 * 1024  # 回放缓冲区内存预算（压缩后字节数）
+    max_seconds: int = 120  # 最长保留时长（秒）
+    sample_fps: int = 10  # 写入回放缓冲区的最高帧率
+    compression_level: int = 1  # zlib 压缩级别（1 最快，9 最小）
+    pending_frames: int = 4  # 等待压缩的最大帧数，超出则丢弃
+
+
+@dataclass
+class MotionSettings:
+    """画面变化检测设置"""
+    enabled: bool = False
+    sample_fps: int = 10  # 每个区域的最高检测帧率
+    downsample: int = 4  # 降采样步长（每 N 个像素取一个）
+    block_size: int = 8  # 比较块边长（降采样后的像素）
+    threshold: float = 12.0  # 灵敏度：块内平均灰度差超过该值视为变化，越小越灵敏
+    min_area: float = 0.01  # 变化块占区域面积的最小比例
+    debounce_seconds: float = 2.0  # 同一区域两次报警的最小间隔
+    learning_rate: float = 0.05  # 背景模型自适应速率（0~1）
+    hook_command: str = ""  # 报警时执行的命令（不经过 shell），可用 {name} {area} {timestamp} 占位
+    pending_frames: int = 32  # 等待检测的最大帧数，超出则丢弃
+
+
+@dataclass
+class WatchSettings:
+    """像素监视规则设置"""
+    enabled: bool = False
+    sample_fps: int = 10  # 每个区域的最高求值帧率（0 表示每帧求值）
+    pending_frames: int = 2  # 等待求值的最大帧数，超出则丢弃
+    # 规则列表，坐标为监视区域内的像素坐标，例如:
+    # {"name": "led", "kind": "color", "points": [[12, 8]], "color": [255, 0, 0], "tolerance": 40}
+    # {"name": "error", "kind": "template", "position": [100, 40], "template": "error.png", "min_score": 0.9}
+    # {"name": "hp", "kind": "fill", "rect": [20, 300, 200, 12], "color": [0, 200, 0], "min_ratio": 0.8}
+    # 可选键 "window": 窗口标题包含该字符串时规则才生效
+    rules: List[dict] = field(default_factory=list)
+
+
+@dataclass
+class IndexSettings:
+    """感知哈希帧索引设置"""
+    enabled: bool = False
+    directory: str = "index"  # 索引文件目录，每个监视区域一个 .phash 文件
+    sample_fps: int = 2  # 每个区域的最高采样帧率
+    hash_bits: int = 64  # 哈希位数: 64 / 256
+    min_change_bits: int = 4  # 与上一条记录至少相差的位数，达到才记录
+    pending_frames: int = 2  # 等待计算的最大帧数，超出则丢弃
+
+
+@dataclass
+class StreamSettings:
+    """视频流输出设置"""
+    enabled: bool = False
+    target: str = ""  # "-" 为标准输出，否则为文件或命名管道路径，可用 {name} 代表窗口标题
+    format: str = "y4m"  # 输出格式: y4m（YUV 4:2:0）/ raw（原始像素）
+    policy: str = "drop"  # 下游过慢时: drop（少量缓冲，丢弃新帧）/ block（按内存预算缓冲）
+    buffer_frames: int = 4  # drop 方式下最多缓冲的帧数
+    buffer_mb: int = 256  # block 方式下的缓冲内存预算（MB）
+    probe_frames: int = 10  # 用于测量实际帧率的帧数
+
+
+@dataclass
+class ExportSettings:
+    """快照与定时导出设置"""
+    enabled: bool = True
+    directory: str = "snapshots"  # 输出目录
+    format: str = "png"  # 图像格式: png / jpeg / webp
+    compression_level: int = 1  # PNG 压缩级别（0 不压缩，9 最小；1080p 约 150ms / 级别 6 约 400ms）
+    quality: int = 90  # JPEG / WebP 质量（0~100）
+    periodic: bool = False  # 所有监视窗口启动时即开始定时导出
+    interval_seconds: float = 60.0  # 定时导出间隔（秒）
+    workers: int = 2  # 编码线程数
+    pending_frames: int = 8  # 等待编码和写入的最大帧数，超出则丢弃
+    batch_files: int = 8  # 每批最多写入的文件数
+
+
+@dataclass
+class DashboardSettings:
+    """监视面板设置"""
+    enabled: bool = False  # 新的监视默认加入监视面板（单窗口网格），而不是单独的监视窗口
+    refresh_fps: int = 30  # 面板统一刷新频率，所有单元格在同一次绘制中合成
+    columns: int = 0  # 网格列数，0 为按单元格数量自动
+    spacing: int = 4  # 单元格间距（像素）
+
+
+@dataclass
+class ThumbnailSettings:
+    """窗口选择器缩略图设置"""
+    width: int = 240  # 缩略图最大宽度
+    height: int = 135  # 缩略图最大高度
+    ttl_seconds: float = 10.0  # 缓存的缩略图超过该时间后重新捕获
+    max_mb: int = 32  # 缓存字节上限（MB），超出时淘汰最久未使用的
+    workers: int = 4  # 捕获线程数
+    refresh_ms: int = 1000  # 选择器打开时检查可见缩略图是否过期的间隔（毫秒）
+
+
+@dataclass
+class MetricsSettings:
+    """指标导出设置（Prometheus 文本格式）"""
+    enabled: bool = False
+    mode: str = "http"  # http（本机 HTTP 端点 /metrics）/ textfile（定期重写文本文件）
+    host: str = "127.0.0.1"  # HTTP 监听地址（默认只允许本机抓取）
+    port: int = 9464  # HTTP 监听端口
+    textfile_path: str = "windowscope.prom"  # 文本文件路径（供 node_exporter textfile collector 读取）
+    interval_seconds: float = 10.0  # 文本文件重写间隔（秒）
+
+
 @dataclass
 class AppSettings:
     """应用程序总配置"""
@@ -49,6 +174,15 @@ class AppSettings:
     capture: CaptureSettings = None
     ui: UISettings = None
     debug: DebugSettings = None
+    replay: ReplaySettings = None
+    motion: MotionSettings = None
+    watch: WatchSettings = None
+    index: IndexSettings = None
+    stream: StreamSettings = None
+    export: ExportSettings = None
+    dashboard: DashboardSettings = None
+    thumbnails: ThumbnailSettings = None
+    metrics: MetricsSettings = None
     
     def __post_init__(self):
         """初始化后处理"""
@@ -58,6 +192,24 @@ class AppSettings:
             self.ui = UISettings()
         if self.debug is None:
             self.debug = DebugSettings()
+        if self.replay is None:
+            self.replay = ReplaySettings()
+        if self.motion is None:
+            self.motion = MotionSettings()
+        if self.watch is None:
+            self.watch = WatchSettings()
+        if self.index is None:
+            self.index = IndexSettings()
+        if self.stream is None:
+            self.stream = StreamSettings()
+        if self.export is None:
+            self.export = ExportSettings()
+        if self.dashboard is None:
+            self.dashboard = DashboardSettings()
+        if self.thumbnails is None:
+            self.thumbnails = ThumbnailSettings()
+        if self.metrics is None:
+            self.metrics = MetricsSettings()
 
 
 # 全局配置实例
@@ -1,5 +1,27 @@
 """核心模块"""
-from .capture_engine import CaptureEngine
+from .capture_engine import CaptureEngine, RegionOutput
+from .frame import Frame, HAS_NUMPY, qimage_to_array, array_to_qimage, capture_timestamp
+from .pixel_format import PixelFormat
+from .replay_buffer import ReplayBuffer
+from .source_registry import CaptureSourceRegistry, CaptureSubscription
+from .motion_detector import MotionDetector, MotionEvent
+from .pixel_watch import PixelWatcher, WatchRule, WatchEvent, RuleSet, parse_rules
+from .frame_index import FrameHashIndex, FrameIndexer, perceptual_hash, image_hash, index_path
+from .y4m import Y4MReader
+from .video_sink import VideoSink, SinkFormat, OverflowPolicy
+from .image_export import ImageExporter, ImageFormat
+from .recording_compare import compare_recordings, CompareResult, AlignMode
+from .thumbnails import ThumbnailCache, ThumbnailLoader
+from .window_poller import WindowPoller, WindowListDiff, diff_windows
+from .window_search import WindowSearchIndex
+from .metrics import MetricsExporter, LatencyHistogram
 
-__all__ = ['CaptureEngine']
+__all__ = ['CaptureEngine', 'RegionOutput', 'ReplayBuffer', 'Frame', 'HAS_NUMPY', 'qimage_to_array',
+           'array_to_qimage', 'capture_timestamp', 'PixelFormat', 'CaptureSourceRegistry', 'CaptureSubscription',
+           'MotionDetector', 'MotionEvent', 'PixelWatcher', 'WatchRule', 'WatchEvent', 'RuleSet',
+           'parse_rules', 'FrameHashIndex', 'FrameIndexer', 'perceptual_hash', 'image_hash',
+           'index_path', 'Y4MReader', 'compare_recordings', 'CompareResult', 'AlignMode',
+           'VideoSink', 'SinkFormat', 'OverflowPolicy', 'ImageExporter', 'ImageFormat',
+           'ThumbnailCache', 'ThumbnailLoader', 'WindowPoller', 'WindowListDiff', 'diff_windows',
+           'WindowSearchIndex', 'MetricsExporter', 'LatencyHistogram']
 
@@ -3,12 +3,219 @@
 负责实时捕获窗口内容
 """
 import time
-from typing import Optional, Tuple, Callable
-from PyQt6.QtCore import QTimer, QObject, pyqtSignal
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional, Tuple, Callable, List
+from PyQt6.QtCore import QTimer, QObject, Qt, pyqtSignal
 from PyQt6.QtGui import QImage
 
-from ..utils import logger, ScreenCapture, WindowManager
+from ..utils import logger, ScreenCapture, WindowManager, CaptureMethod
 from ..config import settings
+from .frame import Frame, allocate_frame_buffer, set_capture_timestamp
+from .pixel_format import PixelFormat, normalize_array, normalize_image
+from .replay_buffer import ReplayBuffer
+from .metrics import LatencyHistogram
+
+
+def _create_replay_buffer() -> Optional[ReplayBuffer]:
+    """根据配置创建回放缓冲区（配置禁用时返回 None）"""
+    replay = settings.replay
+    if not replay.enabled:
+        return None
+    return ReplayBuffer(
+        max_bytes=replay.max_bytes,
+        max_seconds=replay.max_seconds,
+        sample_fps=replay.sample_fps,
+        compression_level=replay.compression_level,
+        pending_frames=replay.pending_frames,
+    )
+
+
+def _target_size(width: int, height: int) -> Optional[Tuple[int, int]]:
+    """规范化显示目标尺寸，任一值 <= 0 表示原始分辨率"""
+    return (width, height) if width > 0 and height > 0 else None
+
+
+def _scale_for_display(image: QImage, target: Optional[Tuple[int, int]]) -> Optional[QImage]:
+    """
+    按显示目标尺寸等比例缩小图像
+    
+    Qt 的 SmoothTransformation 在缩小时使用面积平均算法，质量与速度兼顾。
+    
+    Args:
+        image: 原始分辨率的显示图像
+        target: 显示目标尺寸 (width, height)
+        
+    Returns:
+        QImage: 缩小后的图像；无需缩小（未设置目标或窗口不小于源尺寸）时返回 None
+    """
+    if target is None:
+        return None
+    target_width, target_height = target
+    if image.width() <= target_width and image.height() <= target_height:
+        return None
+    return image.scaled(target_width, target_height,
+                        Qt.AspectRatioMode.KeepAspectRatio,
+                        Qt.TransformationMode.SmoothTransformation)
+
+
+class RegionOutput(QObject):
+    """
+    区域输出
+    
+    同一捕获引擎上的一个附加感兴趣区域。引擎每个周期只捕获一次窗口，
+    再为每个区域裁剪、转换并发射帧，因此增加区域不会增加捕获开销。
+    每个区域可以使用自己的输出像素格式（例如文字控制台使用 Grayscale8 / Indexed8），
+    格式转换在捕获后一次完成，显示、回放和分析等下游都直接使用紧凑格式。
+    对外接口与 CaptureEngine 的显示相关部分一致，可直接交给 CaptureWindow 显示。
+    """
+    
+    # 信号定义
+    frame_captured = pyqtSignal(QImage)  # 本区域的新帧（用于显示）
+    frame_ready = pyqtSignal(object)      # 本区域的新帧（Frame）
+    capture_failed = pyqtSignal(str)      # 捕获失败（转发自引擎）
+    fps_updated = pyqtSignal(float)       # 本区域实际 FPS
+    method_changed = pyqtSignal(str)      # 捕获方法变更（转发自引擎）
+    
+    def __init__(self, engine: 'CaptureEngine', region: Tuple[int, int, int, int],
+                 fps_divisor: int = 1, max_fps: Optional[int] = None, replay: bool = False,
+                 pixel_format: Optional[str] = None):
+        """
+        初始化区域输出
+        
+        Args:
+            engine: 所属捕获引擎
+            region: 捕获区域 (x, y, width, height)
+            fps_divisor: 帧率分频，每 N 个捕获周期输出一帧
+            max_fps: 可选的输出帧率上限，按时间间隔抽帧（与分频同时生效）
+            replay: 是否为本区域创建回放缓冲区
+            pixel_format: 本区域的输出像素格式（PixelFormat），默认与引擎相同
+        """
+        super().__init__()
+        
+        self.engine = engine
+        self.region = region
+        self.pixel_format = pixel_format or engine.pixel_format
+        PixelFormat.qimage_format(self.pixel_format)  # 校验格式名称
+        self.fps_divisor = max(1, fps_divisor)
+        self.max_fps = max_fps
+        self.target_size: Optional[Tuple[int, int]] = None
+        
+        # 状态
+        self.is_paused = False
+        self.is_visible = True  # 显示本区域的监视窗口是否可见
+        self.capture_count = 0
+        self._last_emit_ts = 0.0
+        
+        # 即时回放缓冲区
+        self.replay_buffer: Optional[ReplayBuffer] = _create_replay_buffer() if replay else None
+        
+        # FPS 计算
+        self.frame_times = []
+        self.actual_fps = 0.0
+        
+        engine.capture_failed.connect(self.capture_failed)
+        engine.method_changed.connect(self.method_changed)
+    
+    @property
+    def fps(self) -> int:
+        """本区域的目标帧率"""
+        return max(1, round(self.engine.fps / self.fps_divisor))
+    
+    @property
+    def current_method(self) -> str:
+        """当前捕获方法"""
+        return self.engine.current_method
+    
+    def set_fps(self, fps: int):
+        """
+        设置本区域帧率（通过分频实现，不超过引擎帧率）
+        
+        Args:
+            fps: 新的帧率
+        """
+        if fps > 0:
+            self.fps_divisor = max(1, round(self.engine.fps / fps))
+            logger.info(f"区域 {self.region} 帧率分频: 1/{self.fps_divisor}")
+    
+    def set_target_size(self, width: int, height: int):
+        """
+        设置显示目标尺寸
+        
+        Args:
+            width: 目标宽度（设备像素）
+            height: 目标高度（设备像素），任一值 <= 0 表示输出原始分辨率
+        """
+        self.target_size = _target_size(width, height)
+    
+    def pause(self):
+        """暂停本区域输出（引擎继续为其他区域捕获）"""
+        self.is_paused = True
+    
+    def resume(self):
+        """恢复本区域输出"""
+        self.is_paused = False
+    
+    def set_visible(self, visible: bool):
+        """
+        报告显示本区域的监视窗口是否可见（所有区域都不可见时引擎降到保活帧率）
+        
+        Args:
+            visible: 是否可见
+        """
+        self.is_visible = visible
+        self.engine.update_suspension()
+    
+    def connectNotify(self, signal):
+        """有新的订阅者时重新评估是否需要全帧率"""
+        super().connectNotify(signal)
+        self.engine.update_suspension()
+    
+    def disconnectNotify(self, signal):
+        """订阅者断开时重新评估是否需要全帧率"""
+        super().disconnectNotify(signal)
+        self.engine.update_suspension()
+    
+    def stop(self):
+        """停止本区域输出并从引擎移除"""
+        self.engine.remove_region(self)
+    
+    def should_emit(self, tick: int, timestamp: float) -> bool:
+        """
+        本捕获周期是否输出帧
+        
+        Args:
+            tick: 引擎成功捕获的帧序号
+            timestamp: 本周期捕获时间戳
+        """
+        if self.is_paused or tick % self.fps_divisor != 0:
+            return False
+        if self.max_fps:
+            # 允许半个引擎周期的抖动，避免定时误差导致有规律地漏帧
+            min_interval = 1.0 / self.max_fps - 0.5 / max(1, self.engine.fps)
+            if timestamp - self._last_emit_ts < min_interval:
+                return False
+        return True
+    
+    def close_replay(self):
+        """关闭本区域的回放缓冲区"""
+        if self.replay_buffer is not None:
+            self.replay_buffer.close()
+    
+    def notify_frame_emitted(self, timestamp: float):
+        """
+        输出一帧后更新计数和 FPS
+        
+        Args:
+            timestamp: 本帧捕获时间戳
+        """
+        self.capture_count += 1
+        self._last_emit_ts = timestamp
+        current_time = time.time()
+        self.frame_times.append(current_time)
+        self.frame_times = [t for t in self.frame_times if current_time - t <= 1.0]
+        if len(self.frame_times) > 1:
+            self.actual_fps = len(self.frame_times)
+            self.fps_updated.emit(self.actual_fps)
 
 
 class CaptureEngine(QObject):
@@ -17,46 +224,91 @@ class CaptureEngine(QObject):
     
     职责：
     - 管理捕获定时器
-    - 执行实际的屏幕捕获
+    - 在工作线程中执行实际的屏幕捕获、格式转换和缩放
+    - 每个周期只捕获一次窗口，为主区域和所有附加区域（RegionOutput）分别输出帧
     - 计算 FPS
     - 发射捕获事件
+    
+    线程模型：定时器在 GUI 线程中计时，每个周期把一帧的工作交给单个工作线程；
+    上一帧尚未完成时跳过本周期（计入 skipped_count），不会排队堆积。
+    信号从工作线程发出，连接到 GUI 对象的槽函数会自动排队到 GUI 线程执行。
     """
     
     # 信号定义
-    frame_captured = pyqtSignal(QImage)  # 捕获到新帧
+    frame_captured = pyqtSignal(QImage)  # 捕获到新帧（用于显示）
+    frame_ready = pyqtSignal(object)      # 捕获到新帧（Frame，NumPy 视图，需安装 numpy）
     capture_failed = pyqtSignal(str)      # 捕获失败
     fps_updated = pyqtSignal(float)       # FPS 更新
     method_changed = pyqtSignal(str)      # 捕获方法变更
     
-    def __init__(self, hwnd: int, region: Tuple[int, int, int, int], fps: int = 30):
+    def __init__(self, hwnd: int, region: Tuple[int, int, int, int], fps: int = 30,
+                 pixel_format: Optional[str] = None,
+                 regions: Optional[List[Tuple[int, int, int, int]]] = None,
+                 capture_method: str = CaptureMethod.AUTO, replay: bool = True):
         """
         初始化捕获引擎
         
         Args:
             hwnd: 目标窗口句柄
-            region: 捕获区域 (x, y, width, height)
+            region: 主捕获区域 (x, y, width, height)，由引擎自身的信号输出
             fps: 目标帧率
+            pixel_format: 输出像素格式（PixelFormat），默认使用配置值
+            regions: 附加捕获区域列表，每个区域创建一个 RegionOutput
+            capture_method: 捕获方法（CaptureMethod），默认自动选择
+            replay: 是否为主区域创建回放缓冲区
         """
         super().__init__()
         
         self.hwnd = hwnd
         self.region = region
         self.fps = fps
+        self.capture_method = capture_method
+        self.pixel_format = pixel_format or settings.capture.pixel_format
+        PixelFormat.qimage_format(self.pixel_format)  # 校验格式名称
         
         # 状态
         self.is_running = False
         self.is_paused = False
+        self.is_visible = True     # 显示主区域的监视窗口是否可见
+        self.is_suspended = False  # 没有可见的监视窗口，以保活帧率运行
         self.capture_count = 0
         self.failed_count = 0
+        self.skipped_count = 0
         self.current_method = ""
         
+        # 显示目标尺寸（设备像素），设置后显示帧在源头预缩放
+        self.target_size: Optional[Tuple[int, int]] = None
+        
+        # 附加区域输出（主区域由引擎自身输出）
+        self.fps_divisor = 1
+        self.region_outputs: List[RegionOutput] = []
+        self._emitted_count = 0
+        for extra_region in regions or []:
+            self.add_region(extra_region)
+        
         # FPS 计算
         self.frame_times = []
         self.actual_fps = 0.0
         
+        # 累计统计（只由捕获线程更新，指标导出直接读取，不经过捕获路径）
+        self.failed_total = 0
+        self.captured_bytes = 0  # 各区域按输出格式产生的像素字节
+        self.bytes_per_second = 0.0
+        self._rate_start = 0.0
+        self._rate_bytes = 0
+        self.last_frame_time = 0.0
+        self.capture_latency = LatencyHistogram()
+        
+        # 即时回放缓冲区
+        self.replay_buffer: Optional[ReplayBuffer] = _create_replay_buffer() if replay else None
+        
+        # 帧处理工作线程
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending: Optional[Future] = None
+        
         # 定时器
         self.timer = QTimer()
-        self.timer.timeout.connect(self._capture_frame)
+        self.timer.timeout.connect(self._schedule_capture)
         
         logger.info(f"捕获引擎已初始化: hwnd={hwnd}, region={region}, fps={fps}")
     
@@ -65,7 +317,11 @@ class CaptureEngine(QObject):
         if not self.is_running:
             self.is_running = True
             self.is_paused = False
-            interval_ms = int(1000 / self.fps)
+            if self.replay_buffer is not None and self.replay_buffer.is_closed:
+                self.replay_buffer = _create_replay_buffer()
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="CaptureWorker")
+            self.is_suspended = not self._has_viewers()
+            interval_ms = self._interval_ms()
             self.timer.start(interval_ms)
             logger.info(f"捕获引擎已启动，刷新间隔: {interval_ms}ms ({self.fps} FPS)")
     
@@ -74,7 +330,15 @@ class CaptureEngine(QObject):
         if self.is_running:
             self.is_running = False
             self.timer.stop()
-            logger.info("捕获引擎已停止")
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+                self._pending = None
+            if self.replay_buffer is not None:
+                self.replay_buffer.close()
+            for output in self.region_outputs:
+                output.close_replay()
+            logger.info(f"捕获引擎已停止 (跳过 {self.skipped_count} 个周期)")
     
     def pause(self):
         """暂停捕获"""
@@ -87,7 +351,7 @@ class CaptureEngine(QObject):
         """恢复捕获"""
         if self.is_running and self.is_paused:
             self.is_paused = False
-            interval_ms = int(1000 / self.fps)
+            interval_ms = self._interval_ms()
             self.timer.start(interval_ms)
             logger.info(f"捕获已恢复，刷新间隔: {interval_ms}ms")
     
@@ -101,19 +365,143 @@ class CaptureEngine(QObject):
         if settings.capture.min_fps <= fps <= settings.capture.max_fps:
             self.fps = fps
             if self.is_running and not self.is_paused:
-                interval_ms = int(1000 / fps)
+                interval_ms = self._interval_ms()
                 self.timer.stop()
                 self.timer.start(interval_ms)
                 logger.info(f"帧率已调整为: {fps} FPS ({interval_ms}ms)")
     
+    def set_visible(self, visible: bool):
+        """
+        报告显示主区域的监视窗口是否可见（所有区域都不可见时降到保活帧率）
+        
+        Args:
+            visible: 是否可见
+        """
+        self.is_visible = visible
+        self.update_suspension()
+    
+    def connectNotify(self, signal):
+        """有新的订阅者时重新评估是否需要全帧率"""
+        super().connectNotify(signal)
+        self.update_suspension()
+    
+    def disconnectNotify(self, signal):
+        """订阅者断开时重新评估是否需要全帧率"""
+        super().disconnectNotify(signal)
+        self.update_suspension()
+    
+    def update_suspension(self):
+        """按监视窗口的可见性和订阅者切换正常帧率和保活帧率（启动时由 start 评估）"""
+        if not self.is_running:
+            return
+        suspended = not self._has_viewers()
+        if suspended == self.is_suspended:
+            return
+        self.is_suspended = suspended
+        
+        if self.is_paused:
+            return
+        self.timer.start(self._interval_ms())
+        if suspended:
+            logger.info(f"没有可见的监视窗口，降到保活帧率 {settings.capture.idle_fps} FPS")
+        else:
+            # 重新可见：立即捕获一帧，不等下一个周期
+            self._schedule_capture()
+            logger.info(f"监视窗口可见，恢复 {self.fps} FPS")
+    
+    def _has_viewers(self) -> bool:
+        """是否有需要全帧率输出的订阅者（可见的显示窗口或 Frame 订阅者）"""
+        for output in [self] + self.region_outputs:
+            if output.receivers(output.frame_ready) > 0:
+                return True
+            if output.is_visible and output.receivers(output.frame_captured) > 0:
+                return True
+        return False
+    
+    def _interval_ms(self) -> int:
+        """当前定时器间隔（暂停显示时使用保活帧率）"""
+        fps = settings.capture.idle_fps if self.is_suspended else self.fps
+        return int(1000 / max(1, min(fps, self.fps)))
+    
+    def set_target_size(self, width: int, height: int):
+        """
+        设置显示目标尺寸，显示帧将在工作线程中预缩放到该尺寸以内
+        
+        Args:
+            width: 目标宽度（设备像素）
+            height: 目标高度（设备像素），任一值 <= 0 表示输出原始分辨率
+        """
+        size = _target_size(width, height)
+        if size != self.target_size:
+            self.target_size = size
+            logger.debug(f"显示目标尺寸: {size[0]}x{size[1]}" if size else "显示目标尺寸: 原始分辨率")
+    
+    def add_region(self, region: Tuple[int, int, int, int], fps_divisor: int = 1,
+                   replay: bool = False, pixel_format: Optional[str] = None) -> RegionOutput:
+        """
+        添加一个附加捕获区域
+        
+        Args:
+            region: 捕获区域 (x, y, width, height)
+            fps_divisor: 帧率分频，每 N 个捕获周期输出一帧
+            replay: 是否为该区域创建回放缓冲区
+            pixel_format: 该区域的输出像素格式，默认与引擎相同
+            
+        Returns:
+            RegionOutput: 区域输出，连接其信号即可接收该区域的帧
+        """
+        return self.add_output(RegionOutput(self, region, fps_divisor, replay=replay,
+                                            pixel_format=pixel_format))
+    
+    def add_output(self, output: RegionOutput) -> RegionOutput:
+        """
+        挂接一个已创建的区域输出（例如共享捕获源的订阅）
+        
+        Args:
+            output: 以本引擎创建的区域输出
+            
+        Returns:
+            RegionOutput: 传入的区域输出
+        """
+        self.region_outputs = self.region_outputs + [output]
+        self.update_suspension()
+        logger.info(f"已添加捕获区域: {output.region} (分频 1/{output.fps_divisor}), "
+                    f"共 {len(self.region_outputs)} 个附加区域")
+        return output
+    
+    def remove_region(self, output: RegionOutput):
+        """
+        移除附加捕获区域
+        
+        Args:
+            output: add_region 返回的区域输出
+        """
+        if output in self.region_outputs:
+            # 替换列表而不是原地修改，工作线程遍历的旧列表不受影响
+            self.region_outputs = [o for o in self.region_outputs if o is not output]
+            output.close_replay()
+            self.update_suspension()
+            logger.info(f"已移除捕获区域: {output.region}")
+    
+    def _schedule_capture(self):
+        """定时器回调：将一帧的捕获工作交给工作线程"""
+        if self._executor is None:
+            return
+        if self._pending is not None and not self._pending.done():
+            self.skipped_count += 1
+            return
+        self._pending = self._executor.submit(self._capture_frame)
+    
     def _capture_frame(self):
-        """捕获一帧（内部方法）"""
+        """捕获一帧（内部方法，在工作线程中执行）"""
+        started = time.perf_counter()
         try:
             self.capture_count += 1
-            verbose = (self.capture_count % settings.debug.verbose_interval == 1)
+            verbose = (logger.debug_enabled
+                       and self.capture_count % settings.debug.verbose_interval == 1)
             
             if verbose:
-                logger.debug(f"--- 第 {self.capture_count} 帧 ---")
+                logger.debug("--- 第 %d 帧 ---", self.capture_count)
             
             # 获取窗口尺寸
             rect = WindowManager.get_window_rect(self.hwnd)
@@ -121,24 +509,28 @@ class CaptureEngine(QObject):
             window_height = rect[3] - rect[1]
             
             if window_width <= 0 or window_height <= 0:
-                if verbose:
-                    logger.warning(f"窗口尺寸无效: {window_width}x{window_height}")
+                logger.warning("窗口尺寸无效: %dx%d", window_width, window_height,
+                               key=f"invalid_size:{self.hwnd}")
                 self.failed_count += 1
+                self.failed_total += 1
                 return
             
-            # 捕获窗口
-            img, method = ScreenCapture.capture_window(self.hwnd, window_width, window_height)
+            # 捕获窗口原始像素（安装 NumPy 时直接写入数组，不经过 QImage）
+            out = allocate_frame_buffer(window_width, window_height)
+            bits, method = ScreenCapture.capture_window_bits(
+                self.hwnd, window_width, window_height, out, self.capture_method
+            )
             
-            if img is None or img.isNull():
+            if bits is None:
                 self.failed_count += 1
-                if verbose:
-                    logger.warning(f"捕获失败 (失败计数: {self.failed_count})")
+                self.failed_total += 1
+                logger.warning("捕获失败 (失败计数: %d)", self.failed_count, key=f"capture_failed:{self.hwnd}")
                 
                 if self.failed_count > 5:
                     # 检查窗口是否被最小化
                     if WindowManager.is_window_minimized(self.hwnd):
                         self.capture_failed.emit("目标窗口已最小化，无法捕获内容。请恢复窗口！")
-                        logger.warning("捕获失败：窗口已最小化")
+                        logger.warning("捕获失败：窗口已最小化", key=f"minimized:{self.hwnd}")
                     else:
                         self.capture_failed.emit("连续捕获失败，请检查目标窗口状态")
                 return
@@ -152,29 +544,113 @@ class CaptureEngine(QObject):
                 self.method_changed.emit(method)
                 logger.info(f"捕获方法: {method}")
             
-            # 裁剪图像
-            x, y, width, height = self.region
-            x = max(0, min(x, window_width - 1))
-            y = max(0, min(y, window_height - 1))
-            width = min(width, window_width - x)
-            height = min(height, window_height - y)
-            
-            cropped_img = img.copy(x, y, width, height)
+            # 为主区域和附加区域分别输出（共用同一次窗口捕获）
+            self._emitted_count += 1
+            timestamp = time.time()
+            window_size = (window_width, window_height)
             
-            # 发射信号
-            self.frame_captured.emit(cropped_img)
+            frame_bytes = self._emit_region(self, out, bits, window_size, method, timestamp)
+            for output in self.region_outputs:
+                if output.should_emit(self._emitted_count, timestamp):
+                    frame_bytes += self._emit_region(output, out, bits, window_size, method,
+                                                     timestamp)
+                    output.notify_frame_emitted(timestamp)
             
             # 计算 FPS
             self._calculate_fps()
             
+            # 累计统计（字节速率按约 1 秒的窗口计算，附加区域可能分频输出）
+            self.captured_bytes += frame_bytes
+            self._rate_bytes += frame_bytes
+            if not self._rate_start:
+                self._rate_start = timestamp
+            elif timestamp - self._rate_start >= 1.0:
+                self.bytes_per_second = self._rate_bytes / (timestamp - self._rate_start)
+                self._rate_start = timestamp
+                self._rate_bytes = 0
+            self.last_frame_time = timestamp
+            self.capture_latency.observe(time.perf_counter() - started)
+            
             if verbose:
-                logger.debug(f"✓ 第 {self.capture_count} 帧完成 "
-                           f"(方法: {self.current_method}, FPS: {self.actual_fps:.1f})")
+                logger.debug("✓ 第 %d 帧完成 (方法: %s, FPS: %.1f)",
+                             self.capture_count, self.current_method, self.actual_fps)
             
         except Exception as e:
-            logger.error(f"捕获帧时发生错误: {e}")
+            logger.error("捕获帧时发生错误: %s", e, key=f"capture_error:{self.hwnd}")
+            self.failed_total += 1
             self.capture_failed.emit(str(e))
     
+    def _emit_region(self, output, out, bits, window_size: Tuple[int, int], method: str,
+                     timestamp: float) -> int:
+        """
+        为一个区域裁剪、转换、缩放、发射帧并写入其回放缓冲区（在工作线程中执行）
+        
+        Args:
+            output: 区域输出（引擎自身或 RegionOutput）
+            out: 整窗 NumPy 缓冲区（未安装 NumPy 时为 None）
+            bits: 整窗原始像素
+            window_size: 窗口尺寸 (width, height)
+            method: 捕获方法
+            timestamp: 捕获时间戳
+        
+        Returns:
+            int: 按输出格式产生的像素字节数（没有订阅者时为 0）
+        """
+        record = output.replay_buffer is not None
+        # 不可见的窗口不需要显示帧（保活周期只维持回放和状态检测）
+        wants_image = output.is_visible and output.receivers(output.frame_captured) > 0
+        wants_frame = output.receivers(output.frame_ready) > 0
+        if not (wants_image or wants_frame or record):
+            return 0
+        
+        # 裁剪区域
+        window_width, window_height = window_size
+        x, y, width, height = output.region
+        x = max(0, min(x, window_width - 1))
+        y = max(0, min(y, window_height - 1))
+        width = min(width, window_width - x)
+        height = min(height, window_height - y)
+        
+        # NumPy 帧：整窗缓冲区上的裁剪视图，一次性归一化为输出格式
+        frame = None
+        if out is not None:
+            array, image_format = normalize_array(out[y:y + height, x:x + width],
+                                                  output.pixel_format)
+            # 多个订阅方共享同一缓冲区，只读视图防止某个订阅方原地修改影响其他订阅方
+            array.setflags(write=False)
+            frame = Frame(array, timestamp, self.capture_count, method, image_format)
+        
+        # 仅在有显示订阅者（或需要 QImage 的回放缓冲区）时构造 QImage
+        full_res_img = None
+        if wants_image or (record and frame is None):
+            if frame is not None:
+                full_res_img = frame.to_qimage()
+            else:
+                window_img = QImage(bits, window_width, window_height, window_width * 4,
+                                    ScreenCapture.image_format(method))
+                full_res_img = normalize_image(window_img.copy(x, y, width, height),
+                                               output.pixel_format)
+        
+        if wants_image:
+            # 按显示尺寸预缩放；无需缩放时，零拷贝视图需复制一份供信号传递
+            display_img = _scale_for_display(full_res_img, output.target_size)
+            if display_img is None:
+                display_img = full_res_img.copy() if frame is not None else full_res_img
+            set_capture_timestamp(display_img, timestamp)
+            output.frame_captured.emit(display_img)
+        
+        if frame is not None and wants_frame:
+            output.frame_ready.emit(frame)
+        
+        # 写入回放缓冲区（压缩在后台线程进行）
+        if record:
+            if frame is not None:
+                output.replay_buffer.push_frame(frame)
+            else:
+                output.replay_buffer.push(full_res_img)
+        
+        return width * height * PixelFormat.BYTES_PER_PIXEL[output.pixel_format]
+    
     def _calculate_fps(self):
         """计算实际 FPS"""
         current_time = time.time()
@@ -0,0 +1,247 @@
+"""
+帧数据模块
+以 NumPy 数组形式零拷贝地访问捕获到的像素（NumPy 为可选依赖）
+"""
+from typing import Optional
+
+from PyQt6 import sip
+from PyQt6.QtGui import QImage
+
+try:
+    import numpy as np
+except ImportError:  # NumPy 为可选依赖，缺失时仅提供 QImage 路径
+    np = None
+
+HAS_NUMPY = np is not None
+
+
+def _indexed8_color_table() -> list:
+    """固定调色板：6×6×6 色立方（索引 0~215）+ 40 级灰阶（216~255），0xffRRGGBB"""
+    levels = [i * 51 for i in range(6)]
+    table = [0xff000000 | r << 16 | g << 8 | b for r in levels for g in levels for b in levels]
+    # 灰阶均匀插在色立方的 6 级灰之间，控制台文字的灰色背景和抗锯齿边缘不会偏色
+    table += [0xff000000 | round((i + 1) * 255 / 41) * 0x010101 for i in range(40)]
+    return table
+
+
+# Indexed8 帧使用的固定调色板（所有 Indexed8 帧共用，回放和导出无需另存调色板）
+INDEXED8_COLOR_TABLE = _indexed8_color_table()
+
+
+class _QImageBuffer:
+    """通过 __array_interface__ 暴露 QImage 像素，并让数组持有图像引用"""
+
+    def __init__(self, image: QImage):
+        self._image = image
+        channels = image.depth() // 8
+        ptr = image.constBits()
+        self.__array_interface__ = {
+            'version': 3,
+            'shape': (image.height(), image.width(), channels),
+            'typestr': '|u1',
+            'strides': (image.bytesPerLine(), channels, 1),
+            'data': (int(ptr), True),
+        }
+
+
+def allocate_frame_buffer(width: int, height: int):
+    """
+    分配一块未初始化的整窗像素缓冲区
+
+    Args:
+        width: 宽度
+        height: 高度
+
+    Returns:
+        np.ndarray: H×W×4 uint8 数组；未安装 NumPy 时返回 None
+    """
+    if not HAS_NUMPY:
+        return None
+    return np.empty((height, width, 4), dtype=np.uint8)
+
+
+def qimage_to_array(image: QImage):
+    """
+    将按字节对齐的 QImage 包装为只读 NumPy 视图（零拷贝）
+
+    Args:
+        image: 8/16/24/32 位格式的图像
+
+    Returns:
+        np.ndarray: H×W×C uint8 数组（C 为每像素字节数，32 位格式为 BGRA 字节序，
+        行跨度为 bytesPerLine），数组持有图像引用，无需担心生命周期
+    """
+    if not HAS_NUMPY:
+        raise RuntimeError("qimage_to_array 需要安装 numpy")
+    if image.depth() not in (8, 16, 24, 32):
+        raise ValueError(f"不支持的图像深度: {image.depth()}")
+    return np.asarray(_QImageBuffer(image))
+
+
+def array_to_qimage(array, image_format: QImage.Format = QImage.Format.Format_RGB32) -> QImage:
+    """
+    将 H×W×C uint8 数组包装为 QImage（零拷贝）
+
+    返回的图像与数组共享内存且不持有数组引用，
+    仅在数组存活期间有效；需要长期保存时请调用 QImage.copy()。
+
+    Args:
+        array: 像素在行内连续的 H×W×C uint8 数组（C 为每像素字节数，
+               允许行跨度大于 W*C，例如裁剪视图）
+        image_format: 图像格式
+
+    Returns:
+        QImage: 共享内存的图像
+    """
+    height, width, channels = array.shape
+    if array.strides[1:] != (channels, 1):
+        raise ValueError(f"数组行内像素必须连续，当前跨度: {array.strides}")
+    image = QImage(sip.voidptr(array.ctypes.data), width, height, array.strides[0], image_format)
+    return apply_color_table(image)
+
+
+def apply_color_table(image: QImage) -> QImage:
+    """
+    为 Indexed8 图像设置固定调色板（其他格式原样返回）
+
+    Args:
+        image: 由原始像素构造的图像
+
+    Returns:
+        QImage: 传入的图像
+    """
+    if image.format() == QImage.Format.Format_Indexed8:
+        image.setColorTable(INDEXED8_COLOR_TABLE)
+    return image
+
+
+# 显示帧上记录捕获时间戳（time.time()）的图像文本键
+CAPTURE_TIMESTAMP_KEY = "capture_ts"
+
+
+def set_capture_timestamp(image: QImage, timestamp: float):
+    """
+    在显示帧上记录捕获时间戳（随图像跨线程传递，用于统计捕获到显示的延迟）
+
+    Args:
+        image: 显示帧
+        timestamp: 捕获时间戳（time.time()）
+    """
+    image.setText(CAPTURE_TIMESTAMP_KEY, repr(timestamp))
+
+
+def capture_timestamp(image: QImage) -> Optional[float]:
+    """
+    读取显示帧的捕获时间戳
+
+    Args:
+        image: 显示帧
+
+    Returns:
+        float: 捕获时间戳；未记录时返回 None
+    """
+    text = image.text(CAPTURE_TIMESTAMP_KEY)
+    return float(text) if text else None
+
+
+def rgb_channel_indices(image_format: QImage.Format) -> tuple:
+    """
+    获取 R、G、B 三个通道在每像素字节中的位置
+
+    Args:
+        image_format: 帧格式
+
+    Returns:
+        tuple: (r, g, b) 字节偏移；32 位格式内存字节序为 BGRA，灰度格式三者均为 0
+        （RGB565 / Indexed8 没有按字节排列的通道，需先用 pixel_format.expand_compact 展开）
+    """
+    if image_format == QImage.Format.Format_RGB888:
+        return (0, 1, 2)
+    if image_format == QImage.Format.Format_Grayscale8:
+        return (0, 0, 0)
+    return (2, 1, 0)
+
+
+class Frame:
+    """
+    捕获帧
+
+    内存规则（copy-on-retain）：
+    - array 是捕获缓冲区上的零拷贝视图，形状 H×W×C、uint8，C 与 image_format 对应
+      （默认 RGB32 为 4，内存字节序 BGRA），行跨度为整个窗口的宽度
+      （裁剪区域不会被复制；RGB888/灰度格式为转换后的紧凑数组）
+    - 视图会让整块窗口缓冲区保持存活；引擎每帧分配新缓冲区，不会覆盖已发出的帧
+    - 引擎发出的 array 为只读视图；需要在槽函数返回后继续持有、或需要修改像素时，
+      调用 retain() 获得一份紧凑、可写的独立拷贝
+    """
+
+    __slots__ = ('array', 'timestamp', 'sequence', 'method', 'image_format')
+
+    def __init__(self, array, timestamp: float, sequence: int, method: str = "",
+                 image_format: QImage.Format = QImage.Format.Format_RGB32):
+        """
+        初始化帧
+
+        Args:
+            array: 像素数组
+            timestamp: 捕获时间戳
+            sequence: 帧序号
+            method: 捕获方法名称
+            image_format: 像素对应的 QImage 格式
+        """
+        self.array = array
+        self.timestamp = timestamp
+        self.sequence = sequence
+        self.method = method
+        self.image_format = image_format
+
+    @property
+    def width(self) -> int:
+        """帧宽度"""
+        return self.array.shape[1]
+
+    @property
+    def height(self) -> int:
+        """帧高度"""
+        return self.array.shape[0]
+
+    @property
+    def channels(self) -> int:
+        """每像素字节数"""
+        return self.array.shape[2]
+
+    @property
+    def owns_data(self) -> bool:
+        """像素是否为独立拷贝（retain 之后为 True）"""
+        return self.array.base is None
+
+    def retain(self) -> 'Frame':
+        """
+        获得可长期持有的帧
+
+        Returns:
+            Frame: 像素为紧凑、可写独立拷贝的新帧（已是可写独立拷贝时返回自身）
+        """
+        if self.owns_data and self.array.flags.writeable:
+            return self
+        return Frame(self.array.copy(), self.timestamp, self.sequence,
+                     self.method, self.image_format)
+
+    def to_qimage(self) -> QImage:
+        """
+        获取共享内存的 QImage 视图
+
+        Returns:
+            QImage: 仅在本帧存活期间有效；需要长期保存时请调用 QImage.copy()
+        """
+        return array_to_qimage(self.array, self.image_format)
+
+    def tobytes(self) -> bytes:
+        """
+        获取紧凑排列（行跨度 W*C）的像素字节
+
+        Returns:
+            bytes: 像素数据
+        """
+        return self.array.tobytes()
+
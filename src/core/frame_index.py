@@ -0,0 +1,447 @@
+"""
+感知哈希帧索引模块
+为每个画面变化记录一个差值哈希（dHash），写入旁路索引文件，按汉明距离检索相似画面
+"""
+import os
+import struct
+import threading
+import time
+from queue import Queue, Full
+from typing import Callable, Dict, List, Optional, Tuple
+
+from PyQt6.QtCore import QObject, Qt
+from PyQt6.QtGui import QImage
+
+from ..utils import logger, safe_filename
+from .frame import HAS_NUMPY, np, Frame, qimage_to_array, rgb_channel_indices
+from .pixel_format import expand_compact
+
+
+# 索引文件头：魔数 + 哈希位数，补齐到 16 字节
+_MAGIC = b"WSPHASH1"
+_HEADER = struct.Struct("<8sI4x")
+
+# 支持的哈希位数 -> dHash 网格边长
+_HASH_SIZES = {64: 8, 256: 16}
+
+# 每个字节的置位数（NumPy 2.0 之前没有 bitwise_count）
+_POPCOUNT = None if not HAS_NUMPY else np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def index_path(directory: str, name: str, region: Optional[Tuple[int, int, int, int]] = None) -> str:
+    """
+    生成区域的索引文件路径
+
+    Args:
+        directory: 索引目录
+        name: 区域名称（通常为窗口标题）
+        region: 捕获区域 (x, y, width, height)，同一窗口的不同区域写入不同文件
+
+    Returns:
+        str: 去掉文件名非法字符后的 .phash 路径
+    """
+    if region is not None:
+        x, y, width, height = region
+        name = f"{name}_{x}_{y}_{width}x{height}"
+    return os.path.join(directory, f"{safe_filename(name)}.phash")
+
+
+def _record_dtype(hash_bits: int):
+    """索引记录：时间戳 + 按 64 位分组的哈希"""
+    return np.dtype([('timestamp', '<f8'), ('hash', '<u8', (hash_bits // 64,))])
+
+
+def perceptual_hash(array, image_format: QImage.Format = QImage.Format.Format_RGB32,
+                    hash_bits: int = 64):
+    """
+    计算帧的差值哈希（dHash）
+
+    灰度图按面积平均缩小到 n×(n+1)（小于网格的区域取各单元中心的最近像素），
+    比较每行相邻像素的亮度得到 n×n 位。
+    对缩放、压缩和轻微色彩变化不敏感，画面内容变化时多数位会翻转。
+
+    Args:
+        array: H×W×C uint8 帧数组
+        image_format: 帧格式
+        hash_bits: 哈希位数（64 或 256）
+
+    Returns:
+        np.ndarray: hash_bits // 64 个 uint64
+    """
+    if not HAS_NUMPY:
+        raise RuntimeError("perceptual_hash 需要安装 numpy")
+    size = _HASH_SIZES.get(hash_bits)
+    if size is None:
+        raise ValueError(f"不支持的哈希位数: {hash_bits}")
+
+    # 先跨步降采样到网格的数倍，再做面积平均，避免对整帧转灰度
+    height, width = array.shape[:2]
+    step = max(1, min(height // (size * 4), width // ((size + 1) * 4)))
+    sample, image_format = expand_compact(array[::step, ::step], image_format)
+    if sample.shape[2] == 1:
+        gray = sample[..., 0].astype(np.float32)
+    else:
+        r, g, b = rgb_channel_indices(image_format)
+        gray = sample[..., r] * np.float32(0.299)
+        gray += sample[..., g] * np.float32(0.587)
+        gray += sample[..., b] * np.float32(0.114)
+
+    height, width = gray.shape
+    if height < size or width < size + 1:
+        # 区域小于网格（例如 256 位哈希的 16×17 网格）：面积平均会出现空单元，
+        # 改为按单元中心取最近像素
+        rows = (np.arange(size) * 2 + 1) * height // (size * 2)
+        cols = (np.arange(size + 1) * 2 + 1) * width // ((size + 1) * 2)
+        grid = gray[np.ix_(rows, cols)]
+    else:
+        rows = np.linspace(0, height, size + 1).astype(np.intp)[:-1]
+        cols = np.linspace(0, width, size + 2).astype(np.intp)[:-1]
+        grid = np.add.reduceat(np.add.reduceat(gray, rows, axis=0), cols, axis=1)
+        counts = np.outer(np.diff(np.append(rows, height)), np.diff(np.append(cols, width)))
+        grid /= counts
+
+    bits = grid[:, 1:] > grid[:, :-1]
+    return np.packbits(bits).view('>u8').astype(np.uint64)
+
+
+def image_hash(image: QImage, hash_bits: int = 64):
+    """
+    计算 QImage 的差值哈希
+
+    Args:
+        image: 任意格式的图像
+        hash_bits: 哈希位数（64 或 256）
+
+    Returns:
+        np.ndarray: hash_bits // 64 个 uint64
+    """
+    if image.format() != QImage.Format.Format_RGB32:
+        image = image.convertToFormat(QImage.Format.Format_RGB32)
+    return perceptual_hash(qimage_to_array(image), QImage.Format.Format_RGB32, hash_bits)
+
+
+def hamming_distances(hashes, query):
+    """
+    计算一批哈希到查询哈希的汉明距离
+
+    Args:
+        hashes: N×words uint64 数组
+        query: words 个 uint64
+
+    Returns:
+        np.ndarray: N 个距离（uint16）
+    """
+    xor = np.bitwise_xor(hashes, query)
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(xor).sum(axis=1, dtype=np.uint16)
+    # 按字节查表计数
+    return _POPCOUNT[xor.view(np.uint8)].sum(axis=1, dtype=np.uint16)
+
+
+class FrameHashIndex:
+    """
+    感知哈希索引
+
+    旁路索引文件由 16 字节文件头和定长记录（float64 时间戳 + 哈希）组成，
+    只追加写入；打开时用 np.fromfile 一次读入，检索时对全部哈希做一次
+    异或 + 置位计数的向量化扫描（一周、每秒数条记录的索引可在一秒内检索完）。
+    """
+
+    def __init__(self, path: str, hash_bits: int = 64):
+        """
+        打开或创建索引文件
+
+        Args:
+            path: 索引文件路径
+            hash_bits: 新建索引的哈希位数（打开已有文件时以文件头为准）
+        """
+        if not HAS_NUMPY:
+            raise RuntimeError("FrameHashIndex 需要安装 numpy")
+        if hash_bits not in _HASH_SIZES:
+            raise ValueError(f"不支持的哈希位数: {hash_bits}")
+
+        self.path = path
+        self.hash_bits = hash_bits
+        self._lock = threading.Lock()
+        self._records = None
+        self._pending: List[bytes] = []
+        self._last_flush = time.monotonic()
+
+        if os.path.exists(path) and os.path.getsize(path) >= _HEADER.size:
+            self._load()
+            self._file = open(path, 'ab')
+        else:
+            folder = os.path.dirname(path)
+            if folder:
+                os.makedirs(folder, exist_ok=True)
+            self._dtype = _record_dtype(hash_bits)
+            self._records = np.zeros(0, dtype=self._dtype)
+            self._file = open(path, 'wb')
+            self._file.write(_HEADER.pack(_MAGIC, hash_bits))
+            self._file.flush()
+
+    def _load(self):
+        """读取已有索引文件"""
+        with open(self.path, 'rb') as f:
+            magic, hash_bits = _HEADER.unpack(f.read(_HEADER.size))
+        if magic != _MAGIC or hash_bits not in _HASH_SIZES:
+            raise ValueError(f"不是有效的帧索引文件: {self.path}")
+        self.hash_bits = hash_bits
+        self._dtype = _record_dtype(hash_bits)
+
+        # 异常退出时末尾可能有半条记录，只读取完整记录并截掉残余
+        size = os.path.getsize(self.path) - _HEADER.size
+        count = size // self._dtype.itemsize
+        self._records = np.fromfile(self.path, dtype=self._dtype, count=count, offset=_HEADER.size)
+        if size % self._dtype.itemsize:
+            os.truncate(self.path, _HEADER.size + count * self._dtype.itemsize)
+        logger.info(f"已加载帧索引: {self.path} ({count} 条, {hash_bits} 位)")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._records) + len(self._pending)
+
+    def append(self, timestamp: float, frame_hash):
+        """
+        追加一条记录（写入文件缓冲区，约每秒刷新一次）
+
+        Args:
+            timestamp: 帧时间戳
+            frame_hash: perceptual_hash 的结果
+        """
+        record = np.zeros(1, dtype=self._dtype)
+        record['timestamp'] = timestamp
+        record['hash'] = frame_hash
+        data = record.tobytes()
+        with self._lock:
+            self._pending.append(data)
+            self._file.write(data)
+            now = time.monotonic()
+            if now - self._last_flush >= 1.0:
+                self._file.flush()
+                self._last_flush = now
+
+    def flush(self):
+        """把缓冲的记录写入磁盘"""
+        with self._lock:
+            self._file.flush()
+            self._last_flush = time.monotonic()
+
+    def close(self):
+        """关闭索引文件"""
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+    def _snapshot(self):
+        """合并新追加的记录，返回全部记录"""
+        with self._lock:
+            if self._pending:
+                pending = np.frombuffer(b"".join(self._pending), dtype=self._dtype)
+                self._records = np.concatenate([self._records, pending])
+                self._pending.clear()
+            return self._records
+
+    def search(self, query, k: int = 10, max_distance: Optional[int] = None) -> List[Tuple[float, int]]:
+        """
+        检索与参考画面最相似的记录
+
+        Args:
+            query: 参考图像（QImage）或 perceptual_hash 的结果
+            k: 最多返回的条数
+            max_distance: 最大汉明距离（None 表示不限）
+
+        Returns:
+            List[Tuple[float, int]]: (时间戳, 汉明距离)，按距离、时间排序
+        """
+        if isinstance(query, QImage):
+            query = image_hash(query, self.hash_bits)
+        query = np.asarray(query, dtype=np.uint64)
+        if query.size != self.hash_bits // 64:
+            raise ValueError(f"查询哈希位数与索引不一致: {query.size * 64} != {self.hash_bits}")
+
+        records = self._snapshot()
+        if len(records) == 0 or k <= 0:
+            return []
+        distances = hamming_distances(records['hash'], query)
+
+        if max_distance is not None:
+            candidates = np.flatnonzero(distances <= max_distance)
+        else:
+            candidates = np.arange(len(distances))
+        if len(candidates) > k:
+            nearest = np.argpartition(distances[candidates], k - 1)[:k]
+            candidates = candidates[nearest]
+
+        timestamps = records['timestamp'][candidates]
+        order = np.lexsort((timestamps, distances[candidates]))
+        return [(float(timestamps[i]), int(distances[candidates[i]])) for i in order]
+
+
+class _IndexTarget:
+    """一个被索引的区域"""
+
+    __slots__ = ('index', 'last_sample_ts', 'last_hash')
+
+    def __init__(self, index: FrameHashIndex):
+        self.index = index
+        self.last_sample_ts = float('-inf')
+        self.last_hash = None
+
+
+class FrameIndexer(QObject):
+    """
+    帧索引记录器
+
+    职责：
+    - 订阅捕获引擎或区域输出的 frame_ready 信号，按采样率把帧交给索引线程
+      （帧的像素缓冲区由引擎每帧新分配，排队时无需拷贝）
+    - 在索引线程中计算差值哈希，与上一条记录相差超过 min_change_bits 位时
+      才追加记录，静止画面不会让索引增长
+
+    需要安装 numpy。
+    """
+
+    def __init__(self, sample_fps: int = 2, hash_bits: int = 64, min_change_bits: int = 4,
+                 pending_frames: int = 2):
+        """
+        初始化记录器
+
+        Args:
+            sample_fps: 每个区域的最高采样帧率
+            hash_bits: 新建索引的哈希位数（64 或 256，继续追加已有索引时沿用其位数）
+            min_change_bits: 与上一条记录至少相差的位数，达到才视为画面变化
+            pending_frames: 等待计算的最大帧数，超出则丢弃
+        """
+        super().__init__()
+        if not HAS_NUMPY:
+            raise RuntimeError("FrameIndexer 需要安装 numpy")
+
+        self.hash_bits = hash_bits
+        self.min_change_bits = min_change_bits
+        self._min_interval = 1.0 / sample_fps if sample_fps > 0 else 0.0
+
+        # 统计
+        self.hashed_frames = 0
+        self.recorded_frames = 0
+        self.dropped_frames = 0
+
+        self._targets: Dict[int, _IndexTarget] = {}
+        self._slots: Dict[int, Callable] = {}
+        self._closed = False
+        self._queue = Queue(maxsize=max(1, pending_frames))
+        self._worker = threading.Thread(target=self._run, name="FrameIndexer", daemon=True)
+        self._worker.start()
+
+    @classmethod
+    def from_settings(cls, index) -> 'FrameIndexer':
+        """
+        按配置创建记录器
+
+        Args:
+            index: IndexSettings
+        """
+        return cls(sample_fps=index.sample_fps, hash_bits=index.hash_bits,
+                   min_change_bits=index.min_change_bits, pending_frames=index.pending_frames)
+
+    def attach(self, output, path: str) -> FrameHashIndex:
+        """
+        开始为一个区域记录索引
+
+        Args:
+            output: CaptureEngine 或 RegionOutput（索引其 frame_ready 帧）
+            path: 索引文件路径（已存在时继续追加）
+
+        Returns:
+            FrameHashIndex: 该区域的索引，可直接检索
+
+        Raises:
+            ValueError: 该文件已由另一个区域写入
+        """
+        key = id(output)
+        if key in self._targets:
+            return self._targets[key].index
+        # 两个写入方交替追加会混入不同区域的哈希
+        target_path = os.path.abspath(path)
+        for target in self._targets.values():
+            if os.path.abspath(target.index.path) == target_path:
+                raise ValueError(f"帧索引文件已被其他监视区域使用: {path}")
+        index = FrameHashIndex(path, self.hash_bits)
+        self._targets[key] = _IndexTarget(index)
+        slot = lambda frame, key=key: self._on_frame(key, frame)
+        self._slots[key] = slot
+        # 直接连接：在捕获线程中入队，不经过 GUI 线程
+        output.frame_ready.connect(slot, Qt.ConnectionType.DirectConnection)
+        logger.info(f"帧索引: 开始记录 {path}")
+        return index
+
+    def detach(self, output):
+        """
+        停止为一个区域记录索引并关闭索引文件
+
+        Args:
+            output: attach 时传入的对象
+        """
+        key = id(output)
+        slot = self._slots.pop(key, None)
+        if slot is None:
+            return
+        try:
+            output.frame_ready.disconnect(slot)
+        except TypeError:
+            pass
+        target = self._targets.pop(key)
+        target.index.close()
+        logger.info(f"帧索引: 已停止记录 {target.index.path} ({len(target.index)} 条)")
+
+    def close(self):
+        """停止索引线程并关闭所有索引文件"""
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self._queue.put(None, timeout=1.0)
+        except Full:
+            pass
+        self._worker.join(timeout=2.0)
+        for target in self._targets.values():
+            target.index.close()
+        logger.info(f"帧索引已关闭 (计算 {self.hashed_frames} 帧, "
+                    f"记录 {self.recorded_frames} 条, 丢弃 {self.dropped_frames} 帧)")
+
+    def _on_frame(self, key: int, frame: Frame):
+        """捕获线程回调：按采样率取帧交给索引线程"""
+        target = self._targets.get(key)
+        if target is None or self._closed:
+            return
+        # 允许少量定时抖动，避免按采样率整数倍到达的帧被有规律地跳过
+        if frame.timestamp - target.last_sample_ts < self._min_interval * 0.9:
+            return
+        target.last_sample_ts = frame.timestamp
+        try:
+            self._queue.put_nowait((target, frame))
+        except Full:
+            self.dropped_frames += 1
+
+    def _run(self):
+        """索引线程"""
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            try:
+                self._process(*item)
+            except Exception as e:
+                logger.error("帧索引计算失败: %s", e, key="frame_index")
+
+    def _process(self, target: _IndexTarget, frame: Frame):
+        """计算哈希，画面变化时追加记录"""
+        frame_hash = perceptual_hash(frame.array, frame.image_format, target.index.hash_bits)
+        self.hashed_frames += 1
+        if target.last_hash is not None:
+            changed = int(hamming_distances(frame_hash[None, :], target.last_hash)[0])
+            if changed < self.min_change_bits:
+                return
+        target.last_hash = frame_hash
+        target.index.append(frame.timestamp, frame_hash)
+        self.recorded_frames += 1
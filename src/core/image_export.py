@@ -0,0 +1,391 @@
+"""
+图像导出模块
+快照与定时导出：在线程池中把捕获帧编码为 PNG / JPEG / WebP，由写线程批量写入文件
+"""
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from queue import Queue, Empty
+from typing import Callable, Dict, Optional, Tuple
+
+from PyQt6.QtCore import QObject, Qt, QBuffer, QByteArray, QIODevice, pyqtSignal
+from PyQt6.QtGui import QImageWriter
+
+from ..utils import logger, safe_filename
+from .frame import Frame
+
+
+class ImageFormat:
+    """导出图像格式"""
+    PNG = "png"
+    JPEG = "jpeg"
+    WEBP = "webp"
+
+
+# 格式 -> 文件扩展名
+_EXTENSIONS = {ImageFormat.PNG: ".png", ImageFormat.JPEG: ".jpg", ImageFormat.WEBP: ".webp"}
+
+# 统计吞吐量的时间窗口（秒）
+_RATE_WINDOW = 10.0
+
+
+def png_quality(compression_level: int) -> int:
+    """
+    zlib 压缩级别转为 Qt PNG 写入器的 quality 参数
+
+    Qt 按 (100 - quality) * 9 / 91 取整得到压缩级别（quality 为 -1 时不压缩），
+    这里取能映射回同一级别的 quality。
+
+    Args:
+        compression_level: 0（不压缩）~ 9（最小）
+
+    Returns:
+        int: 0~100
+    """
+    level = max(0, min(9, compression_level))
+    return 100 - (level * 91 + 8) // 9
+
+
+class _ExportTarget:
+    """单个区域的导出状态"""
+
+    __slots__ = ('output', 'name', 'periodic', 'next_export_ts', 'snapshot_requested', 'connected')
+
+    def __init__(self, output, name: str, periodic: bool):
+        self.output = output
+        self.name = name
+        self.periodic = periodic
+        self.next_export_ts = float('-inf')
+        self.snapshot_requested = False
+        self.connected = False
+
+
+class ImageExporter(QObject):
+    """
+    快照与定时导出
+
+    职责：
+    - 只在有待导出的快照或开启定时导出时连接区域的 frame_ready 信号，其余时间断开，
+      不让隐藏的监视窗口因导出器而保持全帧率捕获
+    - 捕获线程中只判断是否需要导出，需要时把帧（零拷贝视图，引擎每帧分配新缓冲区）
+      交给编码线程池
+    - 编码线程池用 QImageWriter 编码（编码期间释放 GIL，多个线程可并行）
+    - 写线程一次取出所有已编码的文件批量写入，GUI 线程不做任何编码和磁盘操作
+    - 等待编码和写入的帧数超过 pending_frames 时丢弃并计数
+    - 报告队列深度（queue_depth）和最近的编码吞吐量（throughput）
+
+    需要安装 numpy（帧来自 frame_ready 信号）。
+    """
+
+    # 信号定义
+    exported = pyqtSignal(str)  # 已写出一个文件（路径）
+    failed = pyqtSignal(str)    # 编码或写入失败
+    _snapshot_taken = pyqtSignal(object)  # 捕获线程取走快照帧（区域 key），在 GUI 线程中断开连接
+
+    def __init__(self, directory: str, image_format: str = ImageFormat.PNG,
+                 compression_level: int = 1, quality: int = 90, interval_seconds: float = 60.0,
+                 workers: int = 2, pending_frames: int = 8, batch_files: int = 8):
+        """
+        初始化导出器
+
+        Args:
+            directory: 输出目录
+            image_format: 图像格式（ImageFormat）
+            compression_level: PNG 压缩级别（0~9，越大越小越慢）
+            quality: JPEG / WebP 质量（0~100）
+            interval_seconds: 定时导出间隔（秒）
+            workers: 编码线程数
+            pending_frames: 等待编码和写入的最大帧数
+            batch_files: 写线程每批最多写入的文件数
+        """
+        super().__init__()
+        if image_format not in _EXTENSIONS:
+            raise ValueError(f"不支持的导出格式: {image_format}")
+
+        self.directory = directory
+        self.image_format = image_format
+        self.compression_level = compression_level
+        self.quality = quality
+        self.interval_seconds = interval_seconds
+        self.pending_frames = max(1, pending_frames)
+        self.batch_files = max(1, batch_files)
+
+        # 统计
+        self.written_files = 0
+        self.dropped_frames = 0
+        self.failed_frames = 0
+
+        self._targets: Dict[int, _ExportTarget] = {}
+        self._slots: Dict[int, Callable] = {}
+        self._closed = False
+        self._pending = 0
+        self._lock = threading.Lock()
+        # 最近完成的编码 (完成时间, 字节数, 编码耗时)
+        self._recent = deque(maxlen=512)
+
+        self._pool = ThreadPoolExecutor(max_workers=max(1, workers),
+                                        thread_name_prefix="ImageEncode")
+        self._write_queue = Queue()
+        self._writer = threading.Thread(target=self._run_writer, name="ImageWrite", daemon=True)
+        self._writer.start()
+        self._snapshot_taken.connect(self._update_connection, Qt.ConnectionType.QueuedConnection)
+
+        logger.info(f"图像导出已启用: {directory} ({image_format}), 编码线程 {max(1, workers)}, "
+                    f"定时间隔 {interval_seconds}s")
+
+    @classmethod
+    def from_settings(cls, export) -> 'ImageExporter':
+        """
+        按配置创建导出器
+
+        Args:
+            export: ExportSettings
+        """
+        return cls(export.directory, image_format=export.format,
+                   compression_level=export.compression_level, quality=export.quality,
+                   interval_seconds=export.interval_seconds, workers=export.workers,
+                   pending_frames=export.pending_frames, batch_files=export.batch_files)
+
+    @property
+    def queue_depth(self) -> int:
+        """等待编码和写入的帧数"""
+        return self._pending
+
+    def throughput(self) -> Tuple[float, float, float]:
+        """
+        最近 10 秒的编码吞吐量
+
+        Returns:
+            tuple: (张/秒, MB/秒, 平均单张编码耗时毫秒)
+        """
+        now = time.monotonic()
+        with self._lock:
+            recent = [item for item in self._recent if now - item[0] <= _RATE_WINDOW]
+        if not recent:
+            return 0.0, 0.0, 0.0
+        total_bytes = sum(item[1] for item in recent)
+        encode_ms = sum(item[2] for item in recent) / len(recent) * 1000
+        return (len(recent) / _RATE_WINDOW, total_bytes / _RATE_WINDOW / 1024 / 1024, encode_ms)
+
+    def attach(self, output, name: Optional[str] = None, periodic: bool = False):
+        """
+        开始接收一个区域的帧
+
+        Args:
+            output: CaptureEngine 或 RegionOutput
+            name: 区域名称，用于文件名
+            periodic: 是否立即开始定时导出
+        """
+        key = id(output)
+        if key in self._targets:
+            return
+        self._targets[key] = _ExportTarget(output, name or str(output.region), periodic)
+        self._slots[key] = lambda frame, key=key: self._on_frame(key, frame)
+        self._update_connection(key)
+        logger.info(f"图像导出: 已添加区域 '{self._targets[key].name}'")
+
+    def detach(self, output):
+        """
+        停止接收一个区域的帧（已排队的帧仍会写出）
+
+        Args:
+            output: attach 时传入的对象
+        """
+        key = id(output)
+        target = self._targets.get(key)
+        if target is None:
+            return
+        target.periodic = False
+        target.snapshot_requested = False
+        self._update_connection(key)
+        del self._targets[key]
+        del self._slots[key]
+        logger.info(f"图像导出: 已移除区域 '{target.name}'")
+
+    def snapshot(self, output) -> bool:
+        """
+        导出区域的下一帧
+
+        Args:
+            output: attach 时传入的对象
+
+        Returns:
+            bool: 区域是否已连接
+        """
+        key = id(output)
+        target = self._targets.get(key)
+        if target is None:
+            return False
+        target.snapshot_requested = True
+        self._update_connection(key)
+        return True
+
+    def set_periodic(self, output, enabled: bool):
+        """
+        开启或停止区域的定时导出
+
+        Args:
+            output: attach 时传入的对象
+            enabled: 是否定时导出
+        """
+        key = id(output)
+        target = self._targets.get(key)
+        if target is None or target.periodic == enabled:
+            return
+        target.periodic = enabled
+        # 开启时立即导出一帧，之后按间隔导出
+        target.next_export_ts = float('-inf')
+        self._update_connection(key)
+        logger.info(f"图像导出: '{target.name}' 定时导出{'开启' if enabled else '停止'}")
+
+    def is_periodic(self, output) -> bool:
+        """区域是否正在定时导出"""
+        target = self._targets.get(id(output))
+        return target is not None and target.periodic
+
+    def _update_connection(self, key: int):
+        """
+        按是否有待导出的快照或定时导出连接或断开区域的 frame_ready（在 GUI 线程中执行，
+        连接变化会让引擎重新评估是否降到保活帧率）
+
+        Args:
+            key: 区域 key
+        """
+        target = self._targets.get(key)
+        if target is None:
+            return
+        wanted = target.periodic or target.snapshot_requested
+        if wanted == target.connected:
+            return
+        slot = self._slots[key]
+        if wanted:
+            # 直接连接：在捕获线程中判断是否导出，不经过 GUI 线程
+            target.output.frame_ready.connect(slot, Qt.ConnectionType.DirectConnection)
+        else:
+            try:
+                target.output.frame_ready.disconnect(slot)
+            except TypeError:
+                pass
+        target.connected = wanted
+
+    def close(self):
+        """停止接收新帧，编码并写完已排队的帧"""
+        if self._closed:
+            return
+        self._closed = True
+        self._pool.shutdown(wait=True)
+        self._write_queue.put(None)
+        self._writer.join(timeout=10.0)
+        files_per_second, _, encode_ms = self.throughput()
+        logger.info(f"图像导出已关闭 (写出 {self.written_files} 个文件, 丢弃 {self.dropped_frames} 帧, "
+                    f"失败 {self.failed_frames} 帧, 平均编码 {encode_ms:.0f} ms)")
+
+    def _on_frame(self, key: int, frame: Frame):
+        """捕获线程回调：需要导出时交给编码线程池"""
+        target = self._targets.get(key)
+        if target is None or self._closed:
+            return
+        due = target.periodic and frame.timestamp >= target.next_export_ts
+        if not (target.snapshot_requested or due):
+            return
+        with self._lock:
+            if self._pending >= self.pending_frames:
+                self.dropped_frames += 1
+                return
+            self._pending += 1
+        # 快照不影响定时导出的节奏；定时导出按固定间隔排期，错过（暂停等）时从本帧重新排期
+        if target.snapshot_requested:
+            target.snapshot_requested = False
+            if not target.periodic:
+                self._snapshot_taken.emit(key)
+        if due:
+            target.next_export_ts += self.interval_seconds
+            if target.next_export_ts <= frame.timestamp:
+                target.next_export_ts = frame.timestamp + self.interval_seconds
+        try:
+            self._pool.submit(self._encode, frame, self._file_path(target.name, frame.timestamp))
+        except RuntimeError:
+            # close() 已关闭线程池
+            with self._lock:
+                self._pending -= 1
+
+    def _file_path(self, name: str, timestamp: float) -> str:
+        """按区域名称和帧时间生成文件路径"""
+        stamp = time.strftime("%Y%m%d_%H%M%S", time.localtime(timestamp))
+        millis = int(timestamp * 1000) % 1000
+        filename = f"{safe_filename(name)}_{stamp}_{millis:03d}{_EXTENSIONS[self.image_format]}"
+        return os.path.join(self.directory, filename)
+
+    # ---- 编码线程池 ----
+
+    def _encode(self, frame: Frame, path: str):
+        """编码一帧，交给写线程"""
+        start = time.perf_counter()
+        data = QByteArray()
+        buffer = QBuffer(data)
+        buffer.open(QIODevice.OpenModeFlag.WriteOnly)
+        writer = QImageWriter(buffer, self.image_format.encode('ascii'))
+        if self.image_format == ImageFormat.PNG:
+            writer.setQuality(png_quality(self.compression_level))
+        else:
+            writer.setQuality(max(0, min(100, self.quality)))
+
+        if not writer.write(frame.to_qimage()):
+            self._finish_failed(f"图像编码失败: {path}: {writer.errorString()}")
+            return
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self._recent.append((time.monotonic(), data.size(), elapsed))
+        self._write_queue.put((path, data.data()))
+
+    def _finish_failed(self, message: str, count: int = 1):
+        """记录导出失败的帧"""
+        logger.error(message)
+        with self._lock:
+            self._pending -= count
+            self.failed_frames += count
+        self.failed.emit(message)
+
+    # ---- 写线程 ----
+
+    def _run_writer(self):
+        """写线程：阻塞等待第一个文件，再取出已就绪的文件一起写入"""
+        while True:
+            item = self._write_queue.get()
+            if item is None:
+                break
+            batch = [item]
+            stop = False
+            while len(batch) < self.batch_files:
+                try:
+                    item = self._write_queue.get_nowait()
+                except Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+            self._write_batch(batch)
+            if stop:
+                break
+
+    def _write_batch(self, batch):
+        """写入一批文件"""
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+        except OSError as e:
+            self._finish_failed(f"无法创建导出目录 {self.directory}: {e}", len(batch))
+            return
+        for path, data in batch:
+            try:
+                with open(path, 'wb') as f:
+                    f.write(data)
+            except OSError as e:
+                self._finish_failed(f"图像写入失败: {path}: {e}")
+                continue
+            with self._lock:
+                self._pending -= 1
+                self.written_files += 1
+            self.exported.emit(path)
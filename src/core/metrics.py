@@ -0,0 +1,349 @@
+"""
+指标导出模块
+以 Prometheus 文本格式导出捕获引擎的累计统计和进程资源占用，
+可通过本机 HTTP 端点抓取，或定期写入文本文件（node_exporter textfile collector）
+"""
+import ctypes
+import os
+import sys
+import threading
+import time
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+from ..utils import logger
+
+
+class LatencyHistogram:
+    """
+    耗时直方图（预聚合）
+
+    只由一个线程调用 observe()，读取方直接读取计数，不加锁；
+    抓取时个别桶之间可能相差一次观测，对监控没有影响。
+    """
+
+    # 桶上界（秒）
+    BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+    __slots__ = ('counts', 'sum', 'count')
+
+    def __init__(self):
+        # 最后一个为 +Inf 桶
+        self.counts = [0] * (len(self.BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float):
+        """
+        记录一次耗时
+
+        Args:
+            seconds: 耗时（秒）
+        """
+        self.counts[bisect_left(self.BUCKETS, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        """
+        累计桶计数
+
+        Returns:
+            list: [(上界, 小于等于该上界的观测数), ...]，最后一项上界为 "+Inf"
+        """
+        result = []
+        total = 0
+        for bound, count in zip(self.BUCKETS + (float('inf'),), list(self.counts)):
+            total += count
+            result.append(("+Inf" if bound == float('inf') else repr(bound), total))
+        return result
+
+
+class _PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+    """GetProcessMemoryInfo 结果结构"""
+    _fields_ = [
+        ("cb", ctypes.c_uint32),
+        ("PageFaultCount", ctypes.c_uint32),
+        ("PeakWorkingSetSize", ctypes.c_size_t),
+        ("WorkingSetSize", ctypes.c_size_t),
+        ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+        ("QuotaPagedPoolUsage", ctypes.c_size_t),
+        ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+        ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+        ("PagefileUsage", ctypes.c_size_t),
+        ("PeakPagefileUsage", ctypes.c_size_t),
+    ]
+
+
+def process_rss_bytes() -> Optional[int]:
+    """
+    当前进程的常驻内存（工作集）字节数
+
+    Returns:
+        int: 字节数，无法获取时返回 None
+    """
+    if sys.platform == 'win32':
+        counters = _PROCESS_MEMORY_COUNTERS()
+        counters.cb = ctypes.sizeof(counters)
+        kernel32 = ctypes.windll.kernel32
+        if kernel32.K32GetProcessMemoryInfo(kernel32.GetCurrentProcess(), ctypes.byref(counters),
+                                            counters.cb):
+            return counters.WorkingSetSize
+        return None
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _escape_label(value: str) -> str:
+    """转义标签值中的反斜杠、引号和换行"""
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _replay_buffers(engine) -> list:
+    """引擎及其附加区域（共享引擎的订阅）上的回放缓冲区"""
+    return [output.replay_buffer for output in [engine] + list(engine.region_outputs)
+            if output.replay_buffer is not None]
+
+
+class _MetricsSource:
+    """一个被导出的捕获引擎"""
+
+    __slots__ = ('engine', 'labels', 'refs')
+
+    def __init__(self, engine, name: str):
+        self.engine = engine
+        self.labels = f'window="{_escape_label(name)}",hwnd="{engine.hwnd}"'
+        self.refs = 1
+
+
+class MetricsExporter:
+    """
+    指标导出器
+
+    职责：
+    - attach() 登记监视中的帧源（订阅登记其共享引擎，同一引擎只导出一次）
+    - render() 只读取引擎上的累计计数（capture_count、failed_total、耗时直方图等，
+      由捕获线程顺带更新），不加锁、不进入捕获路径
+    - http 模式：在 host:port 的 /metrics 上提供抓取（默认只监听本机）
+    - textfile 模式：每 interval_seconds 秒写入临时文件后原子替换 textfile_path
+    """
+
+    def __init__(self, mode: str = "http", host: str = "127.0.0.1", port: int = 9464,
+                 textfile_path: str = "windowscope.prom", interval_seconds: float = 10.0):
+        """
+        初始化导出器
+
+        Args:
+            mode: "http" 或 "textfile"
+            host: HTTP 监听地址
+            port: HTTP 监听端口
+            textfile_path: 文本文件路径
+            interval_seconds: 文本文件重写间隔（秒）
+
+        Raises:
+            ValueError: mode 无效
+        """
+        if mode not in ("http", "textfile"):
+            raise ValueError(f"未知的指标导出方式: {mode}")
+        self.mode = mode
+        self.host = host
+        self.port = port
+        self.textfile_path = textfile_path
+        self.interval_seconds = max(1.0, interval_seconds)
+
+        self._sources: Dict[int, _MetricsSource] = {}
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @classmethod
+    def from_settings(cls, metrics) -> 'MetricsExporter':
+        """
+        按配置创建导出器
+
+        Args:
+            metrics: MetricsSettings
+        """
+        return cls(mode=metrics.mode, host=metrics.host, port=metrics.port,
+                   textfile_path=metrics.textfile_path, interval_seconds=metrics.interval_seconds)
+
+    def start(self):
+        """
+        开始导出
+
+        Raises:
+            OSError: HTTP 端口无法监听
+        """
+        if self._thread is not None:
+            return
+        if self.mode == "http":
+            exporter = self
+
+            class Handler(BaseHTTPRequestHandler):
+                def do_GET(self):
+                    if self.path.split('?', 1)[0] != '/metrics':
+                        self.send_error(404)
+                        return
+                    body = exporter.render().encode('utf-8')
+                    self.send_response(200)
+                    self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                    self.send_header('Content-Length', str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+
+                def log_message(self, format, *args):
+                    pass
+
+            self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+            self._server.daemon_threads = True
+            self._thread = threading.Thread(target=self._server.serve_forever, name="MetricsHTTP",
+                                            daemon=True)
+            self._thread.start()
+            logger.info(f"指标导出: http://{self.host}:{self._server.server_address[1]}/metrics")
+        else:
+            self._thread = threading.Thread(target=self._run_textfile, name="MetricsTextfile",
+                                            daemon=True)
+            self._thread.start()
+            logger.info(f"指标导出: 每 {self.interval_seconds:g} 秒写入 {self.textfile_path}")
+
+    def close(self):
+        """停止导出"""
+        if self._thread is None:
+            return
+        self._stop.set()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+        self._thread.join(timeout=2.0)
+        self._thread = None
+        logger.info("指标导出已停止")
+
+    def attach(self, source, name: str):
+        """
+        导出一个帧源的引擎统计
+
+        Args:
+            source: CaptureEngine 或 CaptureSubscription
+            name: 窗口标题（标签 window）
+        """
+        engine = getattr(source, 'engine', source)
+        with self._lock:
+            entry = self._sources.get(id(engine))
+            if entry is not None:
+                entry.refs += 1
+            else:
+                self._sources[id(engine)] = _MetricsSource(engine, name)
+
+    def detach(self, source):
+        """
+        停止导出一个帧源（引擎的所有帧源都停止后移除）
+
+        Args:
+            source: attach 时传入的对象
+        """
+        engine = getattr(source, 'engine', source)
+        with self._lock:
+            entry = self._sources.get(id(engine))
+            if entry is None:
+                return
+            entry.refs -= 1
+            if entry.refs <= 0:
+                del self._sources[id(engine)]
+
+    def render(self) -> str:
+        """
+        生成 Prometheus 文本格式的指标
+
+        Returns:
+            str: 指标文本
+        """
+        with self._lock:
+            sources = list(self._sources.values())
+
+        lines = []
+
+        def metric(name: str, kind: str, help_text: str, samples):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                lines.append(f"{name}{{{labels}}} {value}" if labels else f"{name} {value}")
+
+        metric("windowscope_engines", "gauge", "Number of running capture engines.",
+               [("", len(sources))])
+        metric("windowscope_capture_attempts_total", "counter", "Window capture attempts.",
+               [(s.labels, s.engine.capture_count) for s in sources])
+        metric("windowscope_capture_failures_total", "counter", "Failed window captures.",
+               [(s.labels, s.engine.failed_total) for s in sources])
+        metric("windowscope_capture_consecutive_failures", "gauge",
+               "Failed captures since the last successful one.",
+               [(s.labels, s.engine.failed_count) for s in sources])
+        metric("windowscope_capture_skipped_total", "counter",
+               "Capture cycles skipped because the previous capture was still running.",
+               [(s.labels, s.engine.skipped_count) for s in sources])
+        # 回放缓冲区在各区域输出上（共享引擎自身不创建）
+        replay = [(s.labels, _replay_buffers(s.engine)) for s in sources]
+        metric("windowscope_replay_dropped_frames_total", "counter",
+               "Frames dropped by the replay buffer compressor queues of all regions.",
+               [(labels, sum(buffer.dropped_frames for buffer in buffers))
+                for labels, buffers in replay if buffers])
+        metric("windowscope_capture_fps", "gauge", "Captured frames in the last second.",
+               [(s.labels, s.engine.actual_fps) for s in sources])
+        metric("windowscope_capture_target_fps", "gauge", "Configured capture rate.",
+               [(s.labels, s.engine.fps) for s in sources])
+        metric("windowscope_capture_bytes_total", "counter",
+               "Pixel bytes produced by all regions in their output formats.",
+               [(s.labels, s.engine.captured_bytes) for s in sources])
+        metric("windowscope_capture_bytes_per_second", "gauge",
+               "Pixel bytes produced per second in the output formats (about the last second).",
+               [(s.labels, s.engine.bytes_per_second) for s in sources])
+        metric("windowscope_last_frame_timestamp_seconds", "gauge",
+               "Unix time of the last successful capture (0 before the first frame).",
+               [(s.labels, s.engine.last_frame_time) for s in sources])
+        metric("windowscope_engine_paused", "gauge", "1 if the engine is paused.",
+               [(s.labels, int(s.engine.is_paused)) for s in sources])
+        metric("windowscope_engine_suspended", "gauge",
+               "1 if no monitor is visible and the engine runs at the idle rate.",
+               [(s.labels, int(s.engine.is_suspended)) for s in sources])
+        metric("windowscope_capture_method_info", "gauge", "Capture method currently in use.",
+               [(f'{s.labels},method="{_escape_label(s.engine.current_method)}"', 1)
+                for s in sources if s.engine.current_method])
+
+        lines.append("# HELP windowscope_capture_latency_seconds Time to capture, convert and emit one frame.")
+        lines.append("# TYPE windowscope_capture_latency_seconds histogram")
+        for s in sources:
+            histogram = s.engine.capture_latency
+            for bound, count in histogram.cumulative():
+                lines.append(f'windowscope_capture_latency_seconds_bucket{{{s.labels},le="{bound}"}} {count}')
+            lines.append(f"windowscope_capture_latency_seconds_sum{{{s.labels}}} {histogram.sum}")
+            lines.append(f"windowscope_capture_latency_seconds_count{{{s.labels}}} {histogram.count}")
+
+        # 进程资源
+        rss = process_rss_bytes()
+        if rss is not None:
+            metric("process_resident_memory_bytes", "gauge", "Resident memory size in bytes.",
+                   [("", rss)])
+        metric("process_cpu_seconds_total", "counter", "Total user and system CPU time spent in seconds.",
+               [("", time.process_time())])
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self):
+        """写入一次文本文件（先写临时文件再原子替换，收集器不会读到半个文件）"""
+        tmp_path = f"{self.textfile_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(self.render())
+        os.replace(tmp_path, self.textfile_path)
+
+    def _run_textfile(self):
+        """文本文件写入线程"""
+        while True:
+            try:
+                self.write_textfile()
+            except OSError as e:
+                logger.error("指标文件写入失败: %s", e, key="metrics_textfile")
+            if self._stop.wait(self.interval_seconds):
+                break
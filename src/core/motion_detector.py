@@ -0,0 +1,305 @@
+"""
+画面变化检测模块
+在降采样灰度帧上按块比较自适应背景，检测区域内的画面变化并报警
+"""
+import os
+import shlex
+import subprocess
+import threading
+from queue import Queue, Full
+from typing import Callable, Dict, Optional, Tuple
+
+from PyQt6.QtCore import QObject, Qt, pyqtSignal
+
+from ..utils import logger
+from .frame import HAS_NUMPY, np, Frame, rgb_channel_indices
+from .pixel_format import expand_compact
+
+
+class MotionEvent:
+    """一次画面变化报警"""
+
+    __slots__ = ('name', 'timestamp', 'area', 'bbox', 'sequence')
+
+    def __init__(self, name: str, timestamp: float, area: float,
+                 bbox: Tuple[int, int, int, int], sequence: int):
+        """
+        初始化报警事件
+
+        Args:
+            name: 区域名称
+            timestamp: 触发帧的捕获时间戳
+            area: 变化块占区域面积的比例
+            bbox: 变化范围 (x, y, width, height)，区域内像素坐标
+            sequence: 触发帧的帧序号
+        """
+        self.name = name
+        self.timestamp = timestamp
+        self.area = area
+        self.bbox = bbox
+        self.sequence = sequence
+
+    def __repr__(self) -> str:
+        return f"MotionEvent({self.name!r}, area={self.area:.1%}, bbox={self.bbox})"
+
+
+class _RegionState:
+    """单个区域的背景模型和报警状态"""
+
+    __slots__ = ('name', 'background', 'last_sample_ts', 'last_alert_ts', 'format')
+
+    def __init__(self, name: str):
+        self.name = name
+        self.background = None
+        self.last_sample_ts = float('-inf')
+        self.last_alert_ts = float('-inf')
+        self.format = None
+
+
+def _split_command(command: str) -> list:
+    """
+    将钩子命令模板拆分为参数列表
+
+    Windows 下按非 POSIX 规则拆分（保留路径中的反斜杠），并去掉参数两端的引号
+
+    Args:
+        command: 命令模板
+
+    Returns:
+        list: 参数模板列表，模板无效时为空列表
+    """
+    posix = os.name != 'nt'
+    try:
+        argv = shlex.split(command, posix=posix)
+    except ValueError as e:
+        logger.error(f"报警命令无效，已忽略: {e}")
+        return []
+    if not posix:
+        argv = [arg[1:-1] if len(arg) >= 2 and arg[0] == arg[-1] and arg[0] in '"\'' else arg
+                for arg in argv]
+    return argv
+
+
+class MotionDetector(QObject):
+    """
+    画面变化检测器
+
+    职责：
+    - 订阅捕获引擎或区域输出的 frame_ready 信号，在捕获线程中只做一次降采样拷贝
+    - 在单独的检测线程中转为灰度，按块计算与背景的平均绝对差（NumPy 向量化）
+    - 背景按学习率自适应更新，缓慢的光照变化不会持续报警
+    - 变化面积超过阈值时发出 motion_detected 信号、写日志并执行可选的钩子命令，
+      同一区域的报警间隔不小于 debounce_seconds
+
+    需要安装 numpy。
+    """
+
+    # 信号定义
+    motion_detected = pyqtSignal(object)  # 检测到画面变化（MotionEvent）
+
+    def __init__(self, threshold: float = 12.0, min_area: float = 0.01,
+                 debounce_seconds: float = 2.0, downsample: int = 4, block_size: int = 8,
+                 learning_rate: float = 0.05, sample_fps: int = 10,
+                 hook_command: str = "", pending_frames: int = 32):
+        """
+        初始化检测器
+
+        Args:
+            threshold: 块内平均灰度差阈值（0~255），越小越灵敏
+            min_area: 变化块占区域面积的最小比例（0~1）
+            debounce_seconds: 同一区域两次报警的最小间隔（秒）
+            downsample: 降采样步长
+            block_size: 比较块边长（降采样后的像素）
+            learning_rate: 背景模型自适应速率（0~1）
+            sample_fps: 每个区域的最高检测帧率
+            hook_command: 报警时执行的命令，可用 {name} {area} {timestamp} 占位
+                          （按参数拆分后逐个替换，不经过 shell，窗口标题无法注入命令）
+            pending_frames: 等待检测的最大帧数
+        """
+        super().__init__()
+        if not HAS_NUMPY:
+            raise RuntimeError("MotionDetector 需要安装 numpy")
+
+        self.threshold = threshold
+        self.min_area = min_area
+        self.debounce_seconds = debounce_seconds
+        self.downsample = max(1, downsample)
+        self.block_size = max(1, block_size)
+        self.learning_rate = learning_rate
+        self.hook_command = hook_command
+        self._hook_argv = _split_command(hook_command) if hook_command else []
+        self._min_interval = 1.0 / sample_fps if sample_fps > 0 else 0.0
+
+        # 统计
+        self.processed_frames = 0
+        self.dropped_frames = 0
+        self.alert_count = 0
+
+        self._states: Dict[int, _RegionState] = {}
+        self._slots: Dict[int, Callable] = {}
+        self._closed = False
+        self._queue = Queue(maxsize=max(1, pending_frames))
+        self._worker = threading.Thread(target=self._run, name="MotionDetector", daemon=True)
+        self._worker.start()
+
+        logger.info(f"画面变化检测已启用: 阈值 {threshold}, 最小面积 {min_area:.1%}, "
+                    f"间隔 {debounce_seconds}s")
+
+    @classmethod
+    def from_settings(cls, motion) -> 'MotionDetector':
+        """
+        按配置创建检测器
+
+        Args:
+            motion: MotionSettings
+        """
+        return cls(threshold=motion.threshold, min_area=motion.min_area,
+                   debounce_seconds=motion.debounce_seconds, downsample=motion.downsample,
+                   block_size=motion.block_size, learning_rate=motion.learning_rate,
+                   sample_fps=motion.sample_fps, hook_command=motion.hook_command,
+                   pending_frames=motion.pending_frames)
+
+    def attach(self, output, name: Optional[str] = None):
+        """
+        开始检测一个区域
+
+        Args:
+            output: CaptureEngine 或 RegionOutput（检测其 frame_ready 帧）
+            name: 区域名称，用于报警信息
+        """
+        key = id(output)
+        if key in self._states:
+            return
+        self._states[key] = _RegionState(name or str(output.region))
+        slot = lambda frame, key=key: self._on_frame(key, frame)
+        self._slots[key] = slot
+        # 直接连接：在捕获线程中降采样，不经过 GUI 线程
+        output.frame_ready.connect(slot, Qt.ConnectionType.DirectConnection)
+        logger.info(f"画面变化检测: 已添加区域 '{self._states[key].name}'")
+
+    def detach(self, output):
+        """
+        停止检测一个区域
+
+        Args:
+            output: attach 时传入的对象
+        """
+        key = id(output)
+        slot = self._slots.pop(key, None)
+        if slot is None:
+            return
+        try:
+            output.frame_ready.disconnect(slot)
+        except TypeError:
+            pass
+        state = self._states.pop(key)
+        logger.info(f"画面变化检测: 已移除区域 '{state.name}'")
+
+    def close(self):
+        """停止检测线程"""
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self._queue.put(None, timeout=1.0)
+        except Full:
+            pass
+        self._worker.join(timeout=2.0)
+        logger.info(f"画面变化检测已关闭 (检测 {self.processed_frames} 帧, "
+                    f"丢弃 {self.dropped_frames} 帧, 报警 {self.alert_count} 次)")
+
+    def _on_frame(self, key: int, frame: Frame):
+        """捕获线程回调：按采样率取帧，降采样拷贝后交给检测线程"""
+        state = self._states.get(key)
+        if state is None or self._closed:
+            return
+        # 允许少量定时抖动，避免按采样率整数倍到达的帧被有规律地跳过
+        if frame.timestamp - state.last_sample_ts < self._min_interval * 0.9:
+            return
+        state.last_sample_ts = frame.timestamp
+
+        # 跨步切片后拷贝为紧凑的小数组，不持有整窗缓冲区
+        step = self.downsample
+        sample = np.ascontiguousarray(frame.array[::step, ::step])
+        try:
+            self._queue.put_nowait((state, sample, frame.image_format,
+                                    frame.timestamp, frame.sequence))
+        except Full:
+            self.dropped_frames += 1
+
+    def _run(self):
+        """检测线程"""
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            try:
+                self._process(*item)
+            except Exception as e:
+                logger.error("画面变化检测失败: %s", e, key="motion_detector")
+
+    def _process(self, state: _RegionState, sample, image_format, timestamp: float, sequence: int):
+        """对一帧降采样图像做背景比较"""
+        gray = self._to_gray(sample, image_format)
+        self.processed_frames += 1
+
+        # 尺寸或格式变化（窗口缩放等）时重建背景
+        if (state.background is None or state.background.shape != gray.shape
+                or state.format != image_format):
+            state.background = gray
+            state.format = image_format
+            return
+
+        delta = gray - state.background
+        diff = np.abs(delta)
+        delta *= self.learning_rate
+        state.background += delta
+
+        # 按块求平均差：裁掉不足一块的边缘后 reshape 为 (行块, 块高, 列块, 块宽)
+        height, width = diff.shape
+        block = min(self.block_size, height, width)
+        rows, cols = height // block, width // block
+        blocks = diff[:rows * block, :cols * block].reshape(rows, block, cols, block).mean(axis=(1, 3))
+        changed = blocks > self.threshold
+
+        area = float(changed.mean())
+        if area < self.min_area or area == 0.0:
+            return
+        if timestamp - state.last_alert_ts < self.debounce_seconds:
+            return
+        state.last_alert_ts = timestamp
+
+        # 变化块的外接矩形，换算回区域像素坐标
+        row_idx = np.flatnonzero(changed.any(axis=1))
+        col_idx = np.flatnonzero(changed.any(axis=0))
+        scale = block * self.downsample
+        bbox = (int(col_idx[0]) * scale, int(row_idx[0]) * scale,
+                int(col_idx[-1] - col_idx[0] + 1) * scale, int(row_idx[-1] - row_idx[0] + 1) * scale)
+
+        self._alert(MotionEvent(state.name, timestamp, area, bbox, sequence))
+
+    @staticmethod
+    def _to_gray(sample, image_format):
+        """H×W×C uint8 -> H×W float32 灰度（BT.601 权重）"""
+        sample, image_format = expand_compact(sample, image_format)
+        if sample.shape[2] == 1:
+            return sample[..., 0].astype(np.float32)
+        r, g, b = rgb_channel_indices(image_format)
+        gray = sample[..., r] * np.float32(0.299)
+        gray += sample[..., g] * np.float32(0.587)
+        gray += sample[..., b] * np.float32(0.114)
+        return gray
+
+    def _alert(self, event: MotionEvent):
+        """发出报警：信号、日志和钩子命令"""
+        self.alert_count += 1
+        logger.warning(f"检测到画面变化: '{event.name}' 面积 {event.area:.1%}, 范围 {event.bbox}")
+        self.motion_detected.emit(event)
+
+        if self._hook_argv:
+            values = dict(name=event.name, area=f"{event.area:.4f}",
+                          timestamp=f"{event.timestamp:.3f}")
+            try:
+                subprocess.Popen([arg.format(**values) for arg in self._hook_argv])
+            except Exception as e:
+                logger.error(f"报警命令执行失败: {e}")
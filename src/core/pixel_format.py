@@ -0,0 +1,257 @@
+"""
+像素格式归一化模块
+捕获后一次性将帧转换为统一的显示格式，避免 Qt 在绘制时走慢速转换和混合路径
+"""
+import threading
+from typing import Tuple
+
+from PyQt6.QtCore import Qt
+from PyQt6.QtGui import QImage
+
+from .frame import HAS_NUMPY, np, array_to_qimage, qimage_to_array, INDEXED8_COLOR_TABLE
+
+
+class PixelFormat:
+    """输出像素格式"""
+    RGB32 = "rgb32"                                # 默认：0xffRRGGBB，光栅绘制走不透明快速路径
+    ARGB32_PREMULTIPLIED = "argb32_premultiplied"  # 需要 Alpha 通道的下游，Alpha 强制不透明
+    RGB888 = "rgb888"                              # 24 位，节省 25% 内存
+    GRAYSCALE8 = "grayscale8"                      # 8 位灰度，节省 75% 内存
+    RGB565 = "rgb565"                              # 16 位，节省 50% 内存
+    INDEXED8 = "indexed8"                          # 8 位固定调色板，节省 75% 内存，保留大致颜色
+
+    QIMAGE_FORMATS = {
+        RGB32: QImage.Format.Format_RGB32,
+        ARGB32_PREMULTIPLIED: QImage.Format.Format_ARGB32_Premultiplied,
+        RGB888: QImage.Format.Format_RGB888,
+        GRAYSCALE8: QImage.Format.Format_Grayscale8,
+        RGB565: QImage.Format.Format_RGB16,
+        INDEXED8: QImage.Format.Format_Indexed8,
+    }
+
+    BYTES_PER_PIXEL = {
+        RGB32: 4,
+        ARGB32_PREMULTIPLIED: 4,
+        RGB888: 3,
+        GRAYSCALE8: 1,
+        RGB565: 2,
+        INDEXED8: 1,
+    }
+
+    @classmethod
+    def qimage_format(cls, pixel_format: str) -> QImage.Format:
+        """
+        获取输出格式对应的 QImage 格式
+
+        Args:
+            pixel_format: 输出像素格式名称
+
+        Returns:
+            QImage.Format: 图像格式
+        """
+        if pixel_format not in cls.QIMAGE_FORMATS:
+            raise ValueError(f"不支持的像素格式: {pixel_format}")
+        return cls.QIMAGE_FORMATS[pixel_format]
+
+
+def normalize_image(image: QImage, pixel_format: str) -> QImage:
+    """
+    将捕获的 32 位 BGRA 图像原地转换为输出格式（Qt 批量转换，无需 NumPy）
+
+    两种捕获方法的 Alpha 通道都不可信（PrintWindow 常为 0），
+    因此先按 RGB32 解释（忽略 Alpha），再由 Qt 一次性转换为目标格式。
+
+    Args:
+        image: 捕获方法返回的 32 位图像（调用方独占，例如裁剪后的拷贝）
+        pixel_format: 输出像素格式名称
+
+    Returns:
+        QImage: 转换后的图像
+    """
+    target = PixelFormat.qimage_format(pixel_format)
+    image.reinterpretAsFormat(QImage.Format.Format_RGB32)
+
+    if pixel_format == PixelFormat.RGB32:
+        # RGB32 -> ARGB32_Premultiplied 只做 Alpha 置 0xff，随后按原格式解释
+        image.convertTo(QImage.Format.Format_ARGB32_Premultiplied)
+        image.reinterpretAsFormat(QImage.Format.Format_RGB32)
+    elif pixel_format == PixelFormat.INDEXED8:
+        # 指定调色板时 Qt 逐像素查找最近颜色（较慢，仅用于未安装 NumPy 的情况）
+        image = image.convertToFormat(target, INDEXED8_COLOR_TABLE,
+                                      Qt.ImageConversionFlag.ThresholdDither)
+    else:
+        image.convertTo(target)
+    return image
+
+
+def normalize_array(array, pixel_format: str) -> Tuple[object, QImage.Format]:
+    """
+    将 H×W×4 BGRA 数组转换为输出格式（向量化）
+
+    32 位格式直接在原数组上将 Alpha 置为 255（不透明时预乘值与原值相同），不产生拷贝；
+    RGB888 / RGB565 由 Qt 的 SIMD 转换生成，灰度使用 NumPy 整数加权，
+    Indexed8 使用查表量化到固定调色板。
+
+    Args:
+        array: 可写的 H×W×4 uint8 BGRA 数组（允许为裁剪视图）
+        pixel_format: 输出像素格式名称
+
+    Returns:
+        Tuple[array, format]: H×W×C 数组（C 为每像素字节数）和对应的 QImage 格式
+    """
+    if not HAS_NUMPY:
+        raise RuntimeError("normalize_array 需要安装 numpy")
+
+    target = PixelFormat.qimage_format(pixel_format)
+
+    if pixel_format in (PixelFormat.RGB32, PixelFormat.ARGB32_PREMULTIPLIED):
+        array[..., 3] = 255
+        return array, target
+
+    if pixel_format in (PixelFormat.RGB888, PixelFormat.RGB565):
+        converted = array_to_qimage(array, QImage.Format.Format_RGB32).convertToFormat(target)
+        return qimage_to_array(converted), target
+
+    if pixel_format == PixelFormat.INDEXED8:
+        index = _quantize_indexed8(array)
+        return index.reshape(index.shape + (1,)), target
+
+    # GRAYSCALE8：BT.601 整数权重 (77, 150, 29) / 256
+    gray = np.multiply(array[..., 2], 77, dtype=np.uint16)
+    gray += np.multiply(array[..., 1], 150, dtype=np.uint16)
+    gray += np.multiply(array[..., 0], 29, dtype=np.uint16)
+    gray >>= 8
+    return gray.astype(np.uint8).reshape(gray.shape + (1,)), target
+
+
+# 没有按字节排列的 R、G、B 通道的紧凑格式（分析前需用 expand_compact 展开）
+COMPACT_FORMATS = (QImage.Format.Format_RGB16, QImage.Format.Format_Indexed8)
+
+# 量化与展开用的查找表（首次使用时生成，多个捕获线程可能同时请求）
+# 可重入：生成完整查找表时会在锁内再次取用 _indexed8_tables()
+_tables = {}
+_tables_lock = threading.RLock()
+
+
+def _indexed8_tables():
+    """
+    生成 Indexed8 查找表：分量 -> 色立方级别、中位分量 -> 两侧最近的灰阶索引、索引 -> RGB
+    """
+    with _tables_lock:
+        if not _tables:
+            palette = np.array(INDEXED8_COLOR_TABLE, dtype=np.uint32)
+            rgb = np.stack([(palette >> 16) & 0xff, (palette >> 8) & 0xff, palette & 0xff],
+                           axis=1).astype(np.uint8)
+            values = np.arange(256)
+            # 灰阶候选：色立方中的 6 级灰 + 40 级灰阶，按灰度值排序
+            gray_indices = np.concatenate([np.arange(6) * 43, np.arange(216, 256)])
+            gray_indices = gray_indices[np.argsort(rgb[gray_indices, 0], kind='stable')]
+            gray_values = rgb[gray_indices, 0].astype(np.int16)
+            # 不大于 / 不小于每个灰度值的最近灰阶
+            below = np.searchsorted(gray_values, values, side='right') - 1
+            above = np.minimum(np.searchsorted(gray_values, values, side='left'),
+                               len(gray_values) - 1)
+            _tables['gray_below'] = gray_indices[below].astype(np.uint8)
+            _tables['gray_above'] = gray_indices[above].astype(np.uint8)
+            # 色立方级别 0~5（最近的 51 的倍数）及该分量到此级别的距离
+            level = (values * 5 + 127) // 255
+            _tables['level'] = level.astype(np.uint8)
+            _tables['cube_error'] = np.abs(values - level * 51).astype(np.int16)
+            _tables['gray_value'] = rgb[:, 0].astype(np.int16)
+            _tables['rgb'] = rgb
+    return _tables
+
+
+def _quantize_pixels(array):
+    """
+    BGRA 像素量化到固定调色板中最近的颜色（只用于生成完整查找表）
+
+    距离与 Qt 的调色板转换相同（各分量差的绝对值之和，距离相同时取较小的索引），
+    未安装 NumPy 时的 normalize_image 与查表结果一致。色立方上最近的颜色即各分量
+    最近的级别；灰阶上的距离在中位分量两侧递增，只需比较中位分量两侧最近的两个灰阶。
+    """
+    tables = _indexed8_tables()
+    level = tables['level']
+    b, g, r = (array[..., i].astype(np.int16) for i in range(3))
+
+    index = level[r] * np.uint8(36)
+    index += level[g] * np.uint8(6)
+    index += level[b]
+    cube_error = tables['cube_error']
+    best = cube_error[r] + cube_error[g] + cube_error[b]
+
+    median = np.maximum(np.minimum(r, g), np.minimum(np.maximum(r, g), b))
+    for table in (tables['gray_below'], tables['gray_above']):
+        gray = table[median]
+        value = tables['gray_value'][gray]
+        distance = np.abs(r - value) + np.abs(g - value) + np.abs(b - value)
+        closer = (distance < best) | ((distance == best) & (gray < index))
+        index[closer] = gray[closer]
+        best[closer] = distance[closer]
+    return index
+
+
+def _color_lut():
+    """24 位颜色 -> 调色板索引的完整查找表（16 MB，首次使用时约 0.7 秒生成）"""
+    lut = _tables.get('lut')
+    if lut is not None:
+        return lut
+    # 在锁内生成并发布，多个引擎的工作线程同时首次使用时只生成一次
+    with _tables_lock:
+        lut = _tables.get('lut')
+        if lut is None:
+            lut = np.empty(1 << 24, dtype=np.uint8)
+            # 每次处理一个红色分量下的 65536 种颜色
+            block = np.zeros((256, 256, 4), dtype=np.uint8)
+            block[..., 0] = np.arange(256, dtype=np.uint8)[None, :]
+            block[..., 1] = np.arange(256, dtype=np.uint8)[:, None]
+            for red in range(256):
+                block[..., 2] = red
+                lut[red << 16:(red + 1) << 16] = _quantize_pixels(block).ravel()
+            _tables['lut'] = lut
+    return lut
+
+
+def _quantize_indexed8(array):
+    """
+    BGRA 像素量化到固定调色板（以 0x00RRGGBB 为键一次查表）
+
+    Args:
+        array: H×W×4 uint8 BGRA 数组（行内像素连续）
+
+    Returns:
+        np.ndarray: H×W uint8 调色板索引
+    """
+    lut = _color_lut()
+    packed = array.view(np.uint32)[..., 0] & np.uint32(0xffffff)
+    return lut[packed]
+
+
+def expand_compact(array, image_format: QImage.Format):
+    """
+    把紧凑格式（RGB565 / Indexed8）的像素展开为 RGB888，其他格式原样返回
+
+    分析类下游（变化检测、哈希、像素规则、视频编码）按字节访问 R、G、B，
+    对紧凑格式帧应先对降采样或取出的像素调用本函数，而不是展开整帧。
+
+    Args:
+        array: (..., C) uint8 数组，C 与 image_format 对应
+        image_format: 帧格式
+
+    Returns:
+        Tuple[array, format]: 展开后的 (..., 3) 数组和 RGB888 格式；非紧凑格式为传入的数组和格式
+    """
+    if image_format == QImage.Format.Format_Indexed8:
+        return _indexed8_tables()['rgb'][array[..., 0]], QImage.Format.Format_RGB888
+    if image_format == QImage.Format.Format_RGB16:
+        packed = np.ascontiguousarray(array).view('<u2')[..., 0]
+        out = np.empty(packed.shape + (3,), dtype=np.uint8)
+        red = (packed >> 11).astype(np.uint8)
+        green = ((packed >> 5) & 0x3f).astype(np.uint8)
+        blue = (packed & 0x1f).astype(np.uint8)
+        # 高位复制到低位，0x1f / 0x3f 展开为 0xff
+        out[..., 0] = (red << 3) | (red >> 2)
+        out[..., 1] = (green << 2) | (green >> 4)
+        out[..., 2] = (blue << 3) | (blue >> 2)
+        return out, QImage.Format.Format_RGB888
+    return array, image_format
@@ -0,0 +1,586 @@
+"""
+像素监视规则模块
+按配置中声明的规则检查帧上的指定像素（颜色、模板、进度条填充比例），规则状态变化时发出事件
+"""
+import threading
+from queue import Queue, Full
+from typing import Callable, Dict, List, Optional, Tuple
+
+from PyQt6.QtCore import QObject, Qt, pyqtSignal
+from PyQt6.QtGui import QImage
+
+from ..utils import logger
+from .frame import HAS_NUMPY, np, Frame, qimage_to_array, rgb_channel_indices
+from .pixel_format import COMPACT_FORMATS, expand_compact
+
+
+class RuleKind:
+    """规则类型"""
+    COLOR = "color"        # 采样点颜色与目标颜色的距离
+    TEMPLATE = "template"  # 固定位置的小图与模板的归一化互相关
+    FILL = "fill"          # 进度条中目标颜色的填充比例
+
+
+# 灰度权重（BT.601），模板和帧使用同一组权重
+_GRAY_WEIGHTS = (0.299, 0.587, 0.114)
+
+
+class WatchRule:
+    """
+    一条监视规则（坐标为区域帧内的像素坐标）
+
+    配置格式（字典）：
+    - 公共键: name, kind, window（可选，窗口标题包含该字符串时才生效）
+    - color:    points [[x, y], ...], color [r, g, b], tolerance, min_ratio（默认 1.0，全部点匹配）
+    - template: position [x, y], template（图片路径）, min_score（默认 0.9）
+    - fill:     rect [x, y, w, h], color [r, g, b], tolerance,
+                direction（horizontal / vertical）, min_ratio（默认 0.8）
+    """
+
+    __slots__ = ('name', 'kind', 'window', 'points', 'color', 'tolerance', 'min_ratio',
+                 'position', 'template', 'min_score', 'rect', 'direction')
+
+    def __init__(self, name: str, kind: str, window: str = ""):
+        """
+        初始化规则
+
+        Args:
+            name: 规则名称
+            kind: 规则类型（RuleKind）
+            window: 窗口标题过滤（空字符串表示所有窗口）
+        """
+        self.name = name
+        self.kind = kind
+        self.window = window
+        self.points: List[Tuple[int, int]] = []
+        self.color = (0, 0, 0)
+        self.tolerance = 0.0
+        self.min_ratio = 1.0
+        self.position = (0, 0)
+        self.template = None  # 零均值、单位范数的 float32 灰度模板
+        self.min_score = 0.9
+        self.rect = (0, 0, 0, 0)
+        self.direction = "horizontal"
+
+    @classmethod
+    def from_dict(cls, spec: dict) -> 'WatchRule':
+        """
+        解析配置中的一条规则
+
+        Args:
+            spec: 规则字典
+
+        Returns:
+            WatchRule: 解析后的规则
+
+        Raises:
+            ValueError: 规则配置无效
+        """
+        name = spec.get('name')
+        kind = spec.get('kind')
+        if not name:
+            raise ValueError(f"监视规则缺少 name: {spec}")
+        rule = cls(name, kind, spec.get('window', ""))
+
+        if kind == RuleKind.COLOR:
+            rule.points = [(int(x), int(y)) for x, y in spec['points']]
+            if not rule.points:
+                raise ValueError(f"颜色规则 '{name}' 没有采样点")
+            rule.color = tuple(int(c) for c in spec['color'])
+            rule.tolerance = float(spec.get('tolerance', 30.0))
+            rule.min_ratio = float(spec.get('min_ratio', 1.0))
+        elif kind == RuleKind.TEMPLATE:
+            rule.position = tuple(int(v) for v in spec['position'])
+            rule.template = _load_template(spec['template'], name)
+            rule.min_score = float(spec.get('min_score', 0.9))
+        elif kind == RuleKind.FILL:
+            rule.rect = tuple(int(v) for v in spec['rect'])
+            if rule.rect[2] <= 0 or rule.rect[3] <= 0:
+                raise ValueError(f"填充规则 '{name}' 的区域为空: {rule.rect}")
+            rule.color = tuple(int(c) for c in spec['color'])
+            rule.tolerance = float(spec.get('tolerance', 40.0))
+            rule.direction = spec.get('direction', "horizontal")
+            if rule.direction not in ("horizontal", "vertical"):
+                raise ValueError(f"填充规则 '{name}' 的方向无效: {rule.direction}")
+            rule.min_ratio = float(spec.get('min_ratio', 0.8))
+        else:
+            raise ValueError(f"不支持的监视规则类型: {kind}")
+        return rule
+
+    @property
+    def size(self) -> Tuple[int, int]:
+        """规则覆盖范围的右下角坐标 (x, y)，用于检查是否越界"""
+        if self.kind == RuleKind.COLOR:
+            return (max(x for x, _ in self.points) + 1, max(y for _, y in self.points) + 1)
+        if self.kind == RuleKind.TEMPLATE:
+            height, width = self.template.shape
+            return (self.position[0] + width, self.position[1] + height)
+        x, y, width, height = self.rect
+        return (x + width, y + height)
+
+    def matches_window(self, title: str) -> bool:
+        """规则是否适用于指定窗口"""
+        return not self.window or self.window in title
+
+
+def _load_template(path: str, name: str):
+    """读取模板图片，返回零均值、单位范数的 float32 灰度数组"""
+    image = QImage(path)
+    if image.isNull():
+        raise ValueError(f"模板规则 '{name}' 无法读取模板图片: {path}")
+    image = image.convertToFormat(QImage.Format.Format_RGB888)
+    pixels = qimage_to_array(image)
+    template = (pixels[..., 0] * np.float32(_GRAY_WEIGHTS[0])
+                + pixels[..., 1] * np.float32(_GRAY_WEIGHTS[1])
+                + pixels[..., 2] * np.float32(_GRAY_WEIGHTS[2]))
+    template -= template.mean()
+    norm = float(np.linalg.norm(template))
+    if norm < 1e-3:
+        raise ValueError(f"模板规则 '{name}' 的模板是纯色图片，无法做相关匹配")
+    return template / norm
+
+
+def parse_rules(specs: List[dict]) -> List[WatchRule]:
+    """
+    解析配置中的规则列表
+
+    Args:
+        specs: 规则字典列表
+
+    Returns:
+        List[WatchRule]: 规则列表
+
+    Raises:
+        ValueError: 存在无效规则或重名规则
+    """
+    rules = [WatchRule.from_dict(spec) for spec in specs]
+    names = [rule.name for rule in rules]
+    duplicates = {name for name in names if names.count(name) > 1}
+    if duplicates:
+        raise ValueError(f"监视规则重名: {', '.join(sorted(duplicates))}")
+    return rules
+
+
+class WatchEvent:
+    """一次规则状态变化"""
+
+    __slots__ = ('source', 'name', 'active', 'value', 'timestamp', 'sequence')
+
+    def __init__(self, source: str, name: str, active: bool, value: float,
+                 timestamp: float, sequence: int):
+        """
+        初始化事件
+
+        Args:
+            source: 区域名称
+            name: 规则名称
+            active: 规则新的状态（条件成立为 True）
+            value: 触发时的测量值（匹配比例、相关系数或填充比例）
+            timestamp: 触发帧的捕获时间戳
+            sequence: 触发帧的帧序号
+        """
+        self.source = source
+        self.name = name
+        self.active = active
+        self.value = value
+        self.timestamp = timestamp
+        self.sequence = sequence
+
+    def __repr__(self) -> str:
+        return f"WatchEvent({self.source!r}/{self.name!r}, active={self.active}, value={self.value:.3f})"
+
+
+def _gather(array, ys, xs):
+    """
+    按坐标取像素
+
+    32 位帧按 uint32 视图取值，每个像素只做一次 4 字节读取，
+    比在 H×W×4 数组上做花式索引快数倍。
+
+    Returns:
+        np.ndarray: 坐标形状 × C 的 uint8 数组
+    """
+    if array.shape[2] == 4 and array.strides[1] == 4:
+        packed = array.view(np.uint32)[..., 0][ys, xs]
+        return packed.view(np.uint8).reshape(packed.shape + (4,))
+    return array[ys, xs]
+
+
+def _channel_weights(image_format: QImage.Format, channels: int, rgb) -> 'np.ndarray':
+    """
+    把 RGB 三个分量放到帧的字节布局中（单通道帧取加权和）
+
+    Args:
+        image_format: 帧格式
+        channels: 每像素字节数
+        rgb: (..., 3) 的 R、G、B 分量
+
+    Returns:
+        np.ndarray: (..., channels) float32 数组
+    """
+    rgb = np.asarray(rgb, dtype=np.float32)
+    if channels == 1:
+        return (rgb @ np.array(_GRAY_WEIGHTS, dtype=np.float32))[..., None]
+    out = np.zeros(rgb.shape[:-1] + (channels,), dtype=np.float32)
+    for source, target in enumerate(rgb_channel_indices(image_format)):
+        out[..., target] = rgb[..., source]
+    return out
+
+
+class RuleSet:
+    """
+    编译后的规则集
+
+    所有规则按帧尺寸和格式编译为批量索引，每帧只做几次 NumPy 运算：
+    - 颜色规则的采样点和填充规则的像素合并为一次取像素 + 一次颜色距离计算，
+      再用 bincount 按规则（填充规则先按行/列）汇总
+    - 模板规则按模板尺寸分组，每组一次取出所有小图，批量计算归一化互相关
+    """
+
+    def __init__(self, rules: List[WatchRule]):
+        """
+        初始化规则集
+
+        Args:
+            rules: 规则列表
+        """
+        if not HAS_NUMPY:
+            raise RuntimeError("RuleSet 需要安装 numpy")
+        self.rules = rules
+        self.states = [False] * len(rules)
+        self._compiled_for = None
+
+        # 编译结果（_compile 中填充）
+        self._enabled = None
+        self._thresholds = None
+        self._ys = self._xs = None
+        self._targets = None      # 按帧字节布局排列的目标颜色
+        self._tolerances = None   # 颜色距离阈值的平方
+        self._channel_mask = None  # 参与颜色距离的字节（排除 Alpha）
+        self._gray_weights = None  # 按帧字节布局排列的灰度权重
+        self._point_rules = None  # 颜色规则采样点 -> 规则序号
+        self._point_counts = None
+        self._color_count = 0     # 前 N 个像素属于颜色规则
+        self._line_ids = None     # 填充规则像素 -> 行/列序号
+        self._line_lengths = None
+        self._line_rules = None   # 行/列 -> 规则序号
+        self._line_counts = None
+        self._template_groups = []
+
+    def evaluate(self, array, image_format: QImage.Format):
+        """
+        对一帧求值
+
+        Args:
+            array: H×W×C uint8 帧数组
+            image_format: 帧格式
+
+        Returns:
+            (states, values): 每条规则的布尔状态和测量值（NumPy 数组）
+        """
+        height, width, channels = array.shape
+        if self._compiled_for != (width, height, channels, image_format):
+            self._compile(width, height, channels, image_format)
+
+        count = len(self.rules)
+        values = np.zeros(count, dtype=np.float64)
+
+        # 颜色距离：颜色规则和填充规则的所有像素一次完成
+        # 紧凑格式只展开取出的像素，不展开整帧
+        if self._ys.size:
+            pixels = expand_compact(_gather(array, self._ys, self._xs), image_format)[0]
+            pixels = pixels.astype(np.float32)
+            pixels -= self._targets
+            pixels *= pixels
+            matched = pixels @ self._channel_mask <= self._tolerances
+
+            if self._color_count:
+                hits = np.bincount(self._point_rules, weights=matched[:self._color_count],
+                                   minlength=count)
+                values += np.divide(hits, self._point_counts, out=np.zeros(count),
+                                    where=self._point_counts > 0)
+            if self._line_ids is not None:
+                # 一行/列中过半像素匹配即视为已填充
+                line_hits = np.bincount(self._line_ids, weights=matched[self._color_count:],
+                                        minlength=self._line_lengths.size)
+                filled = line_hits * 2 >= self._line_lengths
+                hits = np.bincount(self._line_rules, weights=filled, minlength=count)
+                values += np.divide(hits, self._line_counts, out=np.zeros(count),
+                                    where=self._line_counts > 0)
+
+        # 归一化互相关：同尺寸模板一组
+        for indices, ys, xs, templates in self._template_groups:
+            patches = expand_compact(_gather(array, ys, xs), image_format)[0]
+            gray = patches.astype(np.float32) @ self._gray_weights  # N×h×w
+            gray -= gray.mean(axis=(1, 2), keepdims=True)
+            norms = np.sqrt(np.einsum('nij,nij->n', gray, gray))
+            scores = np.einsum('nij,nij->n', gray, templates)
+            values[indices] = np.divide(scores, norms, out=np.zeros_like(scores), where=norms > 1e-3)
+
+        states = (values >= self._thresholds) & self._enabled
+        return states, values
+
+    def _compile(self, width: int, height: int, channels: int, image_format: QImage.Format):
+        """按帧尺寸和格式生成批量索引；超出帧范围的规则被禁用"""
+        count = len(self.rules)
+        self._compiled_for = (width, height, channels, image_format)
+        self._enabled = np.ones(count, dtype=bool)
+        self._thresholds = np.array(
+            [rule.min_score if rule.kind == RuleKind.TEMPLATE else rule.min_ratio
+             for rule in self.rules], dtype=np.float64)
+
+        for index, rule in enumerate(self.rules):
+            right, bottom = rule.size
+            if right > width or bottom > height:
+                self._enabled[index] = False
+                logger.warning(f"监视规则 '{rule.name}' 超出区域范围 ({width}x{height})，已跳过")
+
+        if image_format in COMPACT_FORMATS:
+            # 取出的像素展开为 RGB888 后再比较
+            channels, image_format = 3, QImage.Format.Format_RGB888
+        self._channel_mask = _channel_weights(image_format, channels, (1.0, 1.0, 1.0))
+        self._gray_weights = _channel_weights(image_format, channels, _GRAY_WEIGHTS)
+
+        # 颜色规则采样点
+        ys, xs, colors, tolerances = [], [], [], []
+        point_rules = []
+        for index, rule in enumerate(self.rules):
+            if rule.kind != RuleKind.COLOR or not self._enabled[index]:
+                continue
+            for x, y in rule.points:
+                xs.append(x)
+                ys.append(y)
+                point_rules.append(index)
+            colors.extend([rule.color] * len(rule.points))
+            tolerances.extend([rule.tolerance ** 2] * len(rule.points))
+        self._color_count = len(point_rules)
+        self._point_rules = np.array(point_rules, dtype=np.intp)
+        self._point_counts = np.bincount(self._point_rules, minlength=count)
+
+        # 填充规则：展开区域内所有像素，并记录所属行/列
+        ys, xs = [np.array(ys, dtype=np.intp)], [np.array(xs, dtype=np.intp)]
+        colors = [np.array(colors, dtype=np.float32).reshape(-1, 3)]
+        tolerances = [np.array(tolerances, dtype=np.float32)]
+        line_ids, line_lengths, line_rules = [], [], []
+        line_offset = 0
+        for index, rule in enumerate(self.rules):
+            if rule.kind != RuleKind.FILL or not self._enabled[index]:
+                continue
+            x, y, w, h = rule.rect
+            grid_y, grid_x = np.mgrid[y:y + h, x:x + w]
+            ys.append(grid_y.ravel())
+            xs.append(grid_x.ravel())
+            pixels = w * h
+            colors.append(np.tile(np.array(rule.color, dtype=np.float32), (pixels, 1)))
+            tolerances.append(np.full(pixels, rule.tolerance ** 2, dtype=np.float32))
+            # 水平进度条按列统计，垂直进度条按行统计
+            if rule.direction == "horizontal":
+                lines, length = w, h
+                local = (grid_x - x).ravel()
+            else:
+                lines, length = h, w
+                local = (grid_y - y).ravel()
+            line_ids.append(local + line_offset)
+            line_lengths.append(np.full(lines, length))
+            line_rules.append(np.full(lines, index, dtype=np.intp))
+            line_offset += lines
+
+        self._ys = np.concatenate(ys).astype(np.intp)
+        self._xs = np.concatenate(xs).astype(np.intp)
+        self._targets = _channel_weights(image_format, channels, np.concatenate(colors))
+        self._tolerances = np.concatenate(tolerances)
+        if line_ids:
+            self._line_ids = np.concatenate(line_ids)
+            self._line_lengths = np.concatenate(line_lengths)
+            self._line_rules = np.concatenate(line_rules)
+            self._line_counts = np.bincount(self._line_rules, minlength=count)
+        else:
+            self._line_ids = None
+
+        # 模板规则按尺寸分组
+        groups: Dict[Tuple[int, int], List[int]] = {}
+        for index, rule in enumerate(self.rules):
+            if rule.kind == RuleKind.TEMPLATE and self._enabled[index]:
+                groups.setdefault(rule.template.shape, []).append(index)
+        self._template_groups = []
+        for (h, w), indices in groups.items():
+            origins = np.array([self.rules[i].position for i in indices], dtype=np.intp)
+            group_xs = origins[:, 0, None, None] + np.arange(w)[None, None, :]
+            group_ys = origins[:, 1, None, None] + np.arange(h)[None, :, None]
+            templates = np.stack([self.rules[i].template for i in indices])
+            self._template_groups.append((np.array(indices), group_ys, group_xs, templates))
+
+        logger.info(f"监视规则已编译: {count} 条, 帧尺寸 {width}x{height}, "
+                    f"颜色像素 {self._ys.size}, 模板 {len(groups)} 组")
+
+    def update(self, states) -> List[int]:
+        """
+        记录新状态
+
+        Args:
+            states: evaluate 返回的状态数组
+
+        Returns:
+            List[int]: 状态发生变化的规则序号
+        """
+        changed = []
+        for index, active in enumerate(states.tolist()):
+            if active != self.states[index]:
+                self.states[index] = active
+                changed.append(index)
+        return changed
+
+
+class _WatchTarget:
+    """一个被监视的区域"""
+
+    __slots__ = ('name', 'rules', 'last_sample_ts')
+
+    def __init__(self, name: str, rules: RuleSet):
+        self.name = name
+        self.rules = rules
+        self.last_sample_ts = float('-inf')
+
+
+class PixelWatcher(QObject):
+    """
+    像素监视器
+
+    职责：
+    - 订阅捕获引擎或区域输出的 frame_ready 信号，按采样率把帧交给监视线程
+      （帧的像素缓冲区由引擎每帧新分配，排队时无需拷贝）
+    - 在监视线程中批量求值该区域的所有规则（RuleSet）
+    - 规则状态变化时发出 rule_changed 信号并写日志
+
+    需要安装 numpy。
+    """
+
+    # 信号定义
+    rule_changed = pyqtSignal(object)  # 规则状态变化（WatchEvent）
+
+    def __init__(self, sample_fps: int = 10, pending_frames: int = 2):
+        """
+        初始化监视器
+
+        Args:
+            sample_fps: 每个区域的最高求值帧率（0 表示每帧求值）
+            pending_frames: 等待求值的最大帧数，超出则丢弃
+        """
+        super().__init__()
+        if not HAS_NUMPY:
+            raise RuntimeError("PixelWatcher 需要安装 numpy")
+
+        self._min_interval = 1.0 / sample_fps if sample_fps > 0 else 0.0
+
+        # 统计
+        self.evaluated_frames = 0
+        self.dropped_frames = 0
+        self.event_count = 0
+
+        self._targets: Dict[int, _WatchTarget] = {}
+        self._slots: Dict[int, Callable] = {}
+        self._closed = False
+        self._queue = Queue(maxsize=max(1, pending_frames))
+        self._worker = threading.Thread(target=self._run, name="PixelWatcher", daemon=True)
+        self._worker.start()
+
+    @classmethod
+    def from_settings(cls, watch) -> 'PixelWatcher':
+        """
+        按配置创建监视器
+
+        Args:
+            watch: WatchSettings
+        """
+        return cls(sample_fps=watch.sample_fps, pending_frames=watch.pending_frames)
+
+    def attach(self, output, rules: List[WatchRule], name: Optional[str] = None):
+        """
+        开始监视一个区域
+
+        Args:
+            output: CaptureEngine 或 RegionOutput（监视其 frame_ready 帧）
+            rules: 该区域的规则（坐标为区域帧内坐标）
+            name: 区域名称，用于事件和日志
+        """
+        key = id(output)
+        if key in self._targets or not rules:
+            return
+        target = _WatchTarget(name or str(output.region), RuleSet(rules))
+        self._targets[key] = target
+        slot = lambda frame, key=key: self._on_frame(key, frame)
+        self._slots[key] = slot
+        # 直接连接：在捕获线程中入队，不经过 GUI 线程
+        output.frame_ready.connect(slot, Qt.ConnectionType.DirectConnection)
+        logger.info(f"像素监视: 区域 '{target.name}' 已添加 {len(rules)} 条规则")
+
+    def detach(self, output):
+        """
+        停止监视一个区域
+
+        Args:
+            output: attach 时传入的对象
+        """
+        key = id(output)
+        slot = self._slots.pop(key, None)
+        if slot is None:
+            return
+        try:
+            output.frame_ready.disconnect(slot)
+        except TypeError:
+            pass
+        target = self._targets.pop(key)
+        logger.info(f"像素监视: 已移除区域 '{target.name}'")
+
+    def close(self):
+        """停止监视线程"""
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self._queue.put(None, timeout=1.0)
+        except Full:
+            pass
+        self._worker.join(timeout=2.0)
+        logger.info(f"像素监视已关闭 (求值 {self.evaluated_frames} 帧, "
+                    f"丢弃 {self.dropped_frames} 帧, 事件 {self.event_count} 次)")
+
+    def _on_frame(self, key: int, frame: Frame):
+        """捕获线程回调：按采样率取帧交给监视线程"""
+        target = self._targets.get(key)
+        if target is None or self._closed:
+            return
+        # 允许少量定时抖动，避免按采样率整数倍到达的帧被有规律地跳过
+        if frame.timestamp - target.last_sample_ts < self._min_interval * 0.9:
+            return
+        target.last_sample_ts = frame.timestamp
+        try:
+            self._queue.put_nowait((target, frame))
+        except Full:
+            self.dropped_frames += 1
+
+    def _run(self):
+        """监视线程"""
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            try:
+                self._process(*item)
+            except Exception as e:
+                logger.error("像素监视求值失败: %s", e, key="pixel_watch")
+
+    def _process(self, target: _WatchTarget, frame: Frame):
+        """求值一帧并发出状态变化事件"""
+        rule_set = target.rules
+        states, values = rule_set.evaluate(frame.array, frame.image_format)
+        self.evaluated_frames += 1
+
+        for index in rule_set.update(states):
+            rule = rule_set.rules[index]
+            event = WatchEvent(target.name, rule.name, bool(states[index]), float(values[index]),
+                               frame.timestamp, frame.sequence)
+            self.event_count += 1
+            logger.info(f"像素监视: '{target.name}' 规则 '{rule.name}' "
+                        f"{'触发' if event.active else '恢复'} ({event.value:.3f})")
+            self.rule_changed.emit(event)
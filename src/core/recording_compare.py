@@ -0,0 +1,404 @@
+"""
+录制对比模块
+逐帧比较两段 Y4M 录制（或一段录制与基准图片）的亮度，输出差异时间线和热力图
+"""
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+from PyQt6.QtGui import QImage
+
+from ..utils import logger
+from .frame import HAS_NUMPY, np, qimage_to_array, rgb_channel_indices, array_to_qimage
+from .y4m import Y4MReader, rgb_to_luma
+
+
+# SSIM 稳定常数（8 位动态范围）
+_SSIM_C1 = (0.01 * 255) ** 2
+_SSIM_C2 = (0.03 * 255) ** 2
+
+
+class AlignMode:
+    """帧对齐方式"""
+    SEQUENCE = "sequence"    # 按帧序号一一对应
+    TIMESTAMP = "timestamp"  # 按相对第一帧的时间取最近帧
+
+
+class FrameDiff:
+    """一对帧的比较结果"""
+
+    __slots__ = ('reference_index', 'test_index', 'timestamp', 'mean_diff', 'changed_area', 'ssim')
+
+    def __init__(self, reference_index: int, test_index: int, timestamp: float,
+                 mean_diff: float, changed_area: float, ssim: float):
+        """
+        初始化比较结果
+
+        Args:
+            reference_index: 参考帧序号
+            test_index: 被测帧序号
+            timestamp: 被测帧时间（秒，相对第一帧）
+            mean_diff: 平均绝对亮度差（0~255）
+            changed_area: 差值超过阈值的像素比例（0~1）
+            ssim: 分块结构相似度（1 为完全相同）
+        """
+        self.reference_index = reference_index
+        self.test_index = test_index
+        self.timestamp = timestamp
+        self.mean_diff = mean_diff
+        self.changed_area = changed_area
+        self.ssim = ssim
+
+
+class Divergence:
+    """一段连续的差异帧"""
+
+    __slots__ = ('first', 'last', 'worst', 'heatmap_path')
+
+    def __init__(self, first: FrameDiff):
+        self.first = first
+        self.last = first
+        self.worst = first
+        self.heatmap_path: Optional[str] = None
+
+    @property
+    def frames(self) -> int:
+        """包含的帧数"""
+        return self.last.test_index - self.first.test_index + 1
+
+    def __repr__(self) -> str:
+        return (f"Divergence({self.first.timestamp:.3f}s-{self.last.timestamp:.3f}s, "
+                f"frames={self.frames}, ssim={self.worst.ssim:.4f})")
+
+
+class CompareResult:
+    """对比结果"""
+
+    def __init__(self):
+        self.frames: List[FrameDiff] = []
+        self.divergences: List[Divergence] = []
+        self.unmatched = 0  # 按时间对齐时找不到参考帧的被测帧数
+
+    @property
+    def passed(self) -> bool:
+        """没有差异帧"""
+        return not self.divergences
+
+
+class _ImageSource:
+    """基准图片：只有一帧的参考源"""
+
+    def __init__(self, path: str):
+        image = QImage(path)
+        if image.isNull():
+            raise ValueError(f"无法读取基准图片: {path}")
+        image = image.convertToFormat(QImage.Format.Format_RGB32)
+        self.width = image.width()
+        self.height = image.height()
+        self.timestamps = [0.0]
+        self._luma = rgb_to_luma(qimage_to_array(image), rgb_channel_indices(image.format()))
+
+    def __len__(self) -> int:
+        return 1
+
+    def luma(self, index: int):
+        return self._luma
+
+    def close(self):
+        pass
+
+
+def open_source(path: str):
+    """
+    打开参考或被测源
+
+    Args:
+        path: .y4m 录制文件，或基准图片（PNG / BMP 等 Qt 支持的格式）
+
+    Returns:
+        Y4MReader 或只有一帧的图片源
+    """
+    if path.lower().endswith('.y4m'):
+        return Y4MReader(path)
+    return _ImageSource(path)
+
+
+def align_frames(reference, test, mode: str = AlignMode.TIMESTAMP,
+                 tolerance: Optional[float] = None) -> Tuple[List[Tuple[int, int]], int]:
+    """
+    生成参考帧与被测帧的对应关系
+
+    Args:
+        reference: 参考源
+        test: 被测源
+        mode: 对齐方式（AlignMode）；参考源只有一帧时所有被测帧都与它比较
+        tolerance: 按时间对齐时允许的最大时间差（秒），默认为被测帧间隔的一半
+
+    Returns:
+        (pairs, unmatched): (参考帧序号, 被测帧序号) 列表，以及找不到参考帧的被测帧数
+    """
+    if len(reference) == 1:
+        return [(0, j) for j in range(len(test))], 0
+    if mode == AlignMode.SEQUENCE:
+        count = min(len(reference), len(test))
+        return [(i, i) for i in range(count)], len(test) - count
+
+    ref_times = np.asarray(reference.timestamps, dtype=np.float64)
+    test_times = np.asarray(test.timestamps, dtype=np.float64)
+    ref_times -= ref_times[0]
+    test_times -= test_times[0]
+    if tolerance is None:
+        intervals = np.diff(test_times)
+        tolerance = float(np.median(intervals)) / 2 if intervals.size else 0.0
+
+    # 二分查找最近的参考帧
+    right = np.clip(np.searchsorted(ref_times, test_times), 1, len(ref_times) - 1)
+    left = right - 1
+    nearest = np.where(test_times - ref_times[left] <= ref_times[right] - test_times, left, right)
+    matched = np.abs(ref_times[nearest] - test_times) <= tolerance + 1e-6
+    pairs = [(int(i), int(j)) for j, i in enumerate(nearest) if matched[j]]
+    return pairs, int((~matched).sum())
+
+
+def _downsample_factor(height: int, width: int) -> int:
+    """SSIM 前的缩小倍数：按 SSIM 参考实现的做法把短边缩小到约 256 像素"""
+    return max(1, min(16, round(min(height, width) / 256)))
+
+
+def _box_downsample(planes, factor: int):
+    """
+    N×H×W uint8 按 factor×factor 求平均（跨步切片累加，比多轴 reshape 求和快数倍）
+
+    Returns:
+        np.ndarray: N×(H/factor)×(W/factor) float32
+    """
+    if factor == 1:
+        return planes.astype(np.float32)
+    count, height, width = planes.shape
+    planes = planes[:, :height // factor * factor, :width // factor * factor]
+    # factor 不超过 16 时 uint16 累加不会溢出
+    columns = planes[:, :, 0::factor].astype(np.uint16)
+    for k in range(1, factor):
+        columns += planes[:, :, k::factor]
+    summed = columns[:, 0::factor].copy()
+    for k in range(1, factor):
+        summed += columns[:, k::factor]
+    return summed.astype(np.float32) * np.float32(1.0 / (factor * factor))
+
+
+def compare_luma(reference, test, threshold: int = 16, block: int = 8):
+    """
+    批量比较亮度平面
+
+    平均差和变化面积在原始分辨率上计算；SSIM 在缩小后的画面上按不重叠分块计算，
+    每块覆盖 block × _downsample_factor 像素，热力图使用同样的分块。
+
+    Args:
+        reference: N×H×W uint8 参考亮度
+        test: N×H×W uint8 被测亮度
+        threshold: 视为变化的最小亮度差
+        block: SSIM 与热力图的分块边长（缩小后的像素）
+
+    Returns:
+        (mean_diff, changed_area, ssim, heat): 前三者为长度 N 的数组，
+        heat 为每块的平均亮度差（N×行块×列块，uint8）
+    """
+    count, height, width = reference.shape
+    pixels = height * width
+    diff = np.maximum(reference, test)
+    diff -= np.minimum(reference, test)
+    mean_diff = diff.sum(axis=(1, 2), dtype=np.int64) / pixels
+    changed_area = np.count_nonzero(diff > threshold, axis=(1, 2)) / pixels
+
+    factor = _downsample_factor(height, width)
+    ref = _box_downsample(reference, factor)
+    cur = _box_downsample(test, factor)
+    small_diff = _box_downsample(diff, factor)
+
+    # 不重叠分块：(N, 行块, 块高, 列块, 块宽)，裁掉不足一块的边缘
+    block = min(block, ref.shape[1], ref.shape[2])
+    rows, cols = ref.shape[1] // block, ref.shape[2] // block
+    shape = (count, rows, block, cols, block)
+    ref = ref[:, :rows * block, :cols * block].reshape(shape)
+    cur = cur[:, :rows * block, :cols * block].reshape(shape)
+    heat = small_diff[:, :rows * block, :cols * block].reshape(shape).mean(axis=(2, 4))
+
+    mu_x = ref.mean(axis=(2, 4))
+    mu_y = cur.mean(axis=(2, 4))
+    var_x = (ref * ref).mean(axis=(2, 4)) - mu_x * mu_x
+    var_y = (cur * cur).mean(axis=(2, 4)) - mu_y * mu_y
+    cov = (ref * cur).mean(axis=(2, 4)) - mu_x * mu_y
+    ssim_map = ((2 * mu_x * mu_y + _SSIM_C1) * (2 * cov + _SSIM_C2)
+                / ((mu_x * mu_x + mu_y * mu_y + _SSIM_C1) * (var_x + var_y + _SSIM_C2)))
+    ssim = ssim_map.mean(axis=(1, 2))
+
+    return mean_diff, changed_area, ssim, np.clip(heat, 0, 255).astype(np.uint8)
+
+
+# 工作进程内复用已打开的源，基准图片只解码一次
+_cached_source = lru_cache(maxsize=4)(open_source)
+
+
+def _compare_chunk(reference_path: str, test_path: str, pairs: List[Tuple[int, int]],
+                   threshold: int, block: int, min_ssim: float, max_area: float):
+    """
+    比较一批帧（在工作进程中运行）
+
+    只传递文件路径和帧序号，帧数据由工作进程自己从内存映射读取。
+
+    Returns:
+        (metrics, heats): metrics 为 N×3 数组（平均差、变化面积、SSIM）；
+        heats 只包含差异帧的热力图 {批内序号: heat}
+    """
+    reference = _cached_source(reference_path)
+    test = _cached_source(test_path)
+    ref_stack = np.stack([reference.luma(i) for i, _ in pairs])
+    test_stack = np.stack([test.luma(j) for _, j in pairs])
+
+    mean_diff, changed_area, ssim, heat = compare_luma(ref_stack, test_stack, threshold, block)
+    divergent = (ssim < min_ssim) | (changed_area > max_area)
+    heats = {int(k): heat[k] for k in np.flatnonzero(divergent)}
+    return np.stack([mean_diff, changed_area, ssim], axis=1), heats
+
+
+def save_heatmap(path: str, luma, heat, block: int):
+    """
+    保存热力图：暗化的被测画面上叠加红色差异
+
+    Args:
+        path: 图片路径
+        luma: H×W 被测亮度
+        heat: compare_luma 输出的分块平均亮度差
+        block: 分块边长（缩小后的像素）
+    """
+    height, width = luma.shape
+    cell = block * _downsample_factor(height, width)
+    strength = np.repeat(np.repeat(heat, cell, axis=0), cell, axis=1)[:height, :width]
+    strength = np.pad(strength, ((0, height - strength.shape[0]), (0, width - strength.shape[1])))
+    # 差值放大 4 倍后叠加到红色通道
+    base = (luma.astype(np.uint16) * 2 // 5).astype(np.uint8)
+    rgb = np.empty((height, width, 3), dtype=np.uint8)
+    rgb[..., 0] = np.minimum(base.astype(np.uint16) + strength.astype(np.uint16) * 4, 255)
+    rgb[..., 1] = base
+    rgb[..., 2] = base
+    array_to_qimage(rgb, QImage.Format.Format_RGB888).save(path)
+
+
+def compare_recordings(reference_path: str, test_path: str, output_dir: Optional[str] = None,
+                       mode: str = AlignMode.TIMESTAMP, threshold: int = 16,
+                       min_ssim: float = 0.98, max_area: float = 0.001, block: int = 8,
+                       workers: Optional[int] = None, chunk_frames: int = 4,
+                       tolerance: Optional[float] = None) -> CompareResult:
+    """
+    逐帧比较两段录制，或一段录制与基准图片
+
+    帧对按 chunk_frames 分批交给进程池，同时在途的批次数有上限，
+    结果按顺序汇总，内存占用与录制长度无关。
+
+    Args:
+        reference_path: 参考录制（.y4m）或基准图片
+        test_path: 被测录制（.y4m）
+        output_dir: 输出目录（逐帧指标 CSV、差异时间线 CSV、热力图），None 表示不输出文件
+        mode: 帧对齐方式（AlignMode）
+        threshold: 视为变化的最小亮度差
+        min_ssim: SSIM 低于该值视为差异帧
+        max_area: 变化面积超过该比例视为差异帧
+        block: SSIM 与热力图的分块边长
+        workers: 工作进程数（None 为 CPU 核数，0 表示在当前进程中计算）
+        chunk_frames: 每批帧数
+        tolerance: 按时间对齐时允许的最大时间差（秒）
+
+    Returns:
+        CompareResult: 逐帧结果与差异时间线
+    """
+    if not HAS_NUMPY:
+        raise RuntimeError("compare_recordings 需要安装 numpy")
+
+    reference = open_source(reference_path)
+    test = open_source(test_path)
+    if (reference.width, reference.height) != (test.width, test.height):
+        raise ValueError(f"画面尺寸不一致: {reference.width}x{reference.height} "
+                         f"与 {test.width}x{test.height}")
+
+    result = CompareResult()
+    pairs, result.unmatched = align_frames(reference, test, mode, tolerance)
+    test_times = test.timestamps
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    logger.info(f"开始对比: {len(pairs)} 对帧, 未对齐 {result.unmatched} 帧")
+
+    chunks = [pairs[i:i + chunk_frames] for i in range(0, len(pairs), chunk_frames)]
+    args = (threshold, block, min_ssim, max_area)
+    current: Optional[Divergence] = None
+    worst_heat = None
+
+    def finish(divergence, heat):
+        """一段差异结束：保存最严重一帧的热力图"""
+        result.divergences.append(divergence)
+        if output_dir:
+            path = os.path.join(output_dir, f"heatmap_{divergence.worst.test_index:06d}.png")
+            save_heatmap(path, test.luma(divergence.worst.test_index), heat, block)
+            divergence.heatmap_path = path
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 0 else None
+    in_flight = deque()
+    next_chunk = 0
+    max_in_flight = workers * 2 if executor else 1
+    try:
+        for chunk in chunks:
+            # 保持有限个批次在途，避免结果在内存中堆积
+            while next_chunk < len(chunks) and len(in_flight) < max_in_flight:
+                task = (reference_path, test_path, chunks[next_chunk]) + args
+                in_flight.append(executor.submit(_compare_chunk, *task) if executor else task)
+                next_chunk += 1
+            item = in_flight.popleft()
+            metrics, heats = item.result() if executor else _compare_chunk(*item)
+
+            for k, (i, j) in enumerate(chunk):
+                mean_diff, changed_area, ssim = (float(v) for v in metrics[k])
+                diff = FrameDiff(i, j, test_times[j], mean_diff, changed_area, ssim)
+                result.frames.append(diff)
+                if k not in heats:
+                    if current is not None:
+                        finish(current, worst_heat)
+                        current = None
+                    continue
+                if current is None:
+                    current, worst_heat = Divergence(diff), heats[k]
+                else:
+                    current.last = diff
+                    if diff.ssim < current.worst.ssim:
+                        current.worst, worst_heat = diff, heats[k]
+        if current is not None:
+            finish(current, worst_heat)
+    finally:
+        if executor:
+            executor.shutdown(cancel_futures=True)
+        else:
+            _cached_source.cache_clear()
+        reference.close()
+        test.close()
+
+    if output_dir:
+        _write_reports(result, output_dir)
+    logger.info(f"对比完成: {len(result.frames)} 帧, 差异 {len(result.divergences)} 段")
+    return result
+
+
+def _write_reports(result: CompareResult, output_dir: str):
+    """写出逐帧指标和差异时间线"""
+    with open(os.path.join(output_dir, "frames.csv"), 'w', encoding='utf-8') as f:
+        f.write("reference_index,test_index,timestamp,mean_diff,changed_area,ssim\n")
+        for d in result.frames:
+            f.write(f"{d.reference_index},{d.test_index},{d.timestamp:.3f},"
+                    f"{d.mean_diff:.3f},{d.changed_area:.6f},{d.ssim:.6f}\n")
+    with open(os.path.join(output_dir, "divergences.csv"), 'w', encoding='utf-8') as f:
+        f.write("start,end,frames,worst_index,worst_ssim,worst_changed_area,heatmap\n")
+        for d in result.divergences:
+            f.write(f"{d.first.timestamp:.3f},{d.last.timestamp:.3f},{d.frames},"
+                    f"{d.worst.test_index},{d.worst.ssim:.6f},{d.worst.changed_area:.6f},"
+                    f"{os.path.basename(d.heatmap_path or '')}\n")
@@ -0,0 +1,283 @@
+"""
+即时回放缓冲模块
+在内存中保留最近一段时间的压缩帧，供回看和拖动浏览
+"""
+import sys
+import threading
+import time
+import zlib
+from bisect import bisect_right
+from collections import deque
+from queue import Queue, Full
+from typing import Optional, Tuple
+
+from PyQt6.QtGui import QImage
+
+from ..utils import logger
+from .frame import Frame, apply_color_table
+
+
+# 每个片段除压缩数据外的固定开销估算（对象头、时间戳、尺寸字段）
+_SEGMENT_OVERHEAD = 160
+
+
+class _Segment:
+    """一段连续相同的帧，共享同一份压缩数据"""
+
+    __slots__ = ('blob', 'width', 'height', 'bytes_per_line', 'format',
+                 'first_ts', 'last_ts', 'frames', 'nbytes')
+
+    def __init__(self, blob: bytes, width: int, height: int, bytes_per_line: int,
+                 image_format: int, timestamp: float):
+        self.blob = blob
+        self.width = width
+        self.height = height
+        self.bytes_per_line = bytes_per_line
+        self.format = image_format
+        self.first_ts = timestamp
+        self.last_ts = timestamp
+        self.frames = 1
+        self.nbytes = sys.getsizeof(blob) + _SEGMENT_OVERHEAD
+
+
+class ReplayBuffer:
+    """
+    即时回放环形缓冲区
+
+    职责：
+    - 按采样帧率接收捕获帧（调用方线程只做一次内存拷贝）
+    - 在后台线程中压缩帧数据，连续相同的帧只保存一份
+    - 按字节预算和最长时长淘汰最旧的帧，长时间运行内存保持平稳
+    - 按时间戳还原帧供回放
+    """
+
+    def __init__(self, max_bytes: int, max_seconds: float, sample_fps: int = 10,
+                 compression_level: int = 1, pending_frames: int = 4):
+        """
+        初始化回放缓冲区
+
+        Args:
+            max_bytes: 内存预算（字节），包含压缩数据和等待压缩的帧
+            max_seconds: 最长保留时长（秒）
+            sample_fps: 写入缓冲区的最高帧率
+            compression_level: zlib 压缩级别
+            pending_frames: 等待压缩的最大帧数
+        """
+        self.max_bytes = max_bytes
+        self.max_seconds = max_seconds
+        self.compression_level = compression_level
+        self._min_interval = 1.0 / sample_fps if sample_fps > 0 else 0.0
+
+        # 统计
+        self.dropped_frames = 0
+        self.stored_frames = 0
+
+        self._segments = deque()
+        self._segment_bytes = 0
+        self._pending_bytes = 0
+        self._reference_bytes = 0
+        self._last_push_ts = 0.0
+        self._closed = False
+
+        self._lock = threading.Lock()
+        self._queue = Queue(maxsize=max(1, pending_frames))
+        self._worker = threading.Thread(target=self._run, name="ReplayCompressor", daemon=True)
+        self._worker.start()
+
+        logger.info(f"回放缓冲区已创建: 预算 {max_bytes / 1024 / 1024:.0f}MB, "
+                    f"时长 {max_seconds}s, 采样 {sample_fps} FPS")
+
+    @property
+    def is_closed(self) -> bool:
+        """缓冲区是否已关闭"""
+        return self._closed
+
+    @property
+    def bytes_held(self) -> int:
+        """当前实际占用的字节数（压缩片段 + 待压缩帧 + 去重参考帧）"""
+        with self._lock:
+            return self._segment_bytes + self._pending_bytes + self._reference_bytes
+
+    @property
+    def frame_count(self) -> int:
+        """缓冲区中可回放的帧数"""
+        with self._lock:
+            return sum(seg.frames for seg in self._segments)
+
+    def push(self, image: QImage, timestamp: Optional[float] = None) -> bool:
+        """
+        写入一帧（非阻塞）
+
+        Args:
+            image: 捕获的图像
+            timestamp: 捕获时间戳，默认为当前时间
+
+        Returns:
+            bool: 是否已加入压缩队列（被采样率跳过或队列已满时返回 False）
+        """
+        if self._closed or image is None or image.isNull():
+            return False
+
+        if timestamp is None:
+            timestamp = time.time()
+        if timestamp - self._last_push_ts < self._min_interval:
+            return False
+
+        ptr = image.constBits()
+        ptr.setsize(image.sizeInBytes())
+        return self._enqueue(bytes(ptr), image.width(), image.height(),
+                             image.bytesPerLine(), image.format().value, timestamp)
+
+    def push_frame(self, frame: Frame) -> bool:
+        """
+        写入一帧 NumPy 帧（非阻塞）
+
+        Args:
+            frame: 捕获帧（Frame）
+
+        Returns:
+            bool: 是否已加入压缩队列
+        """
+        if self._closed:
+            return False
+
+        timestamp = frame.timestamp
+        if timestamp - self._last_push_ts < self._min_interval:
+            return False
+
+        # tobytes 生成紧凑拷贝，不持有整窗缓冲区
+        return self._enqueue(frame.tobytes(), frame.width, frame.height,
+                             frame.width * frame.channels, frame.image_format.value, timestamp)
+
+    def _enqueue(self, raw: bytes, width: int, height: int, bytes_per_line: int,
+                 image_format: int, timestamp: float) -> bool:
+        """将原始像素加入压缩队列"""
+        item = (raw, width, height, bytes_per_line, image_format, timestamp)
+
+        with self._lock:
+            self._pending_bytes += len(raw)
+        try:
+            self._queue.put_nowait(item)
+        except Full:
+            with self._lock:
+                self._pending_bytes -= len(raw)
+            self.dropped_frames += 1
+            return False
+
+        self._last_push_ts = timestamp
+        return True
+
+    def time_range(self) -> Optional[Tuple[float, float]]:
+        """
+        获取可回放的时间范围
+
+        Returns:
+            Tuple[first, last]: 最早和最新帧的时间戳，缓冲区为空时返回 None
+        """
+        with self._lock:
+            if not self._segments:
+                return None
+            return self._segments[0].first_ts, self._segments[-1].last_ts
+
+    def frame_at(self, timestamp: float) -> Optional[Tuple[QImage, float]]:
+        """
+        获取指定时刻显示的帧
+
+        Args:
+            timestamp: 目标时间戳
+
+        Returns:
+            Tuple[QImage, timestamp]: 不晚于目标时刻的最新帧及其时间戳
+        """
+        with self._lock:
+            segments = list(self._segments)
+        if not segments:
+            return None
+
+        index = bisect_right([seg.first_ts for seg in segments], timestamp) - 1
+        seg = segments[max(0, index)]
+        shown_ts = min(max(timestamp, seg.first_ts), seg.last_ts)
+
+        data = zlib.decompress(seg.blob)
+        image = apply_color_table(QImage(data, seg.width, seg.height, seg.bytes_per_line,
+                                         QImage.Format(seg.format))).copy()
+        return image, shown_ts
+
+    def clear(self):
+        """清空缓冲区"""
+        with self._lock:
+            self._segments.clear()
+            self._segment_bytes = 0
+
+    def close(self):
+        """关闭缓冲区并释放所有帧"""
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self._queue.put(None, timeout=1.0)
+        except Full:
+            pass
+        self._worker.join(timeout=2.0)
+        self.clear()
+        logger.info(f"回放缓冲区已关闭 (写入 {self.stored_frames} 帧, 丢弃 {self.dropped_frames} 帧)")
+
+    def _run(self):
+        """后台压缩线程"""
+        last_raw = None
+        last_key = None
+
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+
+            raw, width, height, bytes_per_line, image_format, timestamp = item
+            key = (width, height, bytes_per_line, image_format)
+
+            with self._lock:
+                self._pending_bytes -= len(raw)
+                tail = self._segments[-1] if self._segments else None
+                # 与上一帧完全相同：只延长片段，不再压缩
+                if tail is not None and key == last_key and raw == last_raw:
+                    tail.last_ts = timestamp
+                    tail.frames += 1
+                    self.stored_frames += 1
+                    self._evict(timestamp)
+                    continue
+
+            try:
+                blob = zlib.compress(raw, self.compression_level)
+            except Exception as e:
+                logger.error("回放帧压缩失败: %s", e, key="replay_compress")
+                continue
+
+            segment = _Segment(blob, width, height, bytes_per_line, image_format, timestamp)
+            with self._lock:
+                self._segments.append(segment)
+                self._segment_bytes += segment.nbytes
+                self._reference_bytes = len(raw)
+                self.stored_frames += 1
+                self._evict(timestamp)
+
+            last_raw = raw
+            last_key = key
+
+        with self._lock:
+            self._reference_bytes = 0
+
+    def _evict(self, now: float):
+        """按时长和字节预算淘汰最旧的片段（调用方需持有锁）"""
+        cutoff = now - self.max_seconds
+        while self._segments:
+            oldest = self._segments[0]
+            held = self._segment_bytes + self._pending_bytes + self._reference_bytes
+            over_budget = held > self.max_bytes and len(self._segments) > 1
+
+            if oldest.last_ts < cutoff or over_budget:
+                self._segments.popleft()
+                self._segment_bytes -= oldest.nbytes
+            else:
+                if oldest.first_ts < cutoff:
+                    oldest.first_ts = cutoff
+                break
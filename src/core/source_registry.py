@@ -0,0 +1,179 @@
+"""
+共享捕获源模块
+同一窗口的多个监视窗口共用一个捕获引擎，避免重复的 GDI 捕获开销
+"""
+from typing import Dict, Optional, Tuple
+
+from ..config import settings
+from ..utils import logger, CaptureMethod
+from .capture_engine import CaptureEngine, RegionOutput
+
+
+class CaptureSubscription(RegionOutput):
+    """
+    捕获源订阅
+
+    共享引擎上的一个区域输出，按自身帧率从引擎的捕获周期中抽帧。
+    对外接口与 CaptureEngine 的显示相关部分一致，可直接交给 CaptureWindow 显示；
+    帧率、暂停和停止会通知注册表，由其调整或释放底层引擎。
+    """
+
+    def __init__(self, registry: 'CaptureSourceRegistry', key: Tuple[int, str],
+                 engine: CaptureEngine, region: Tuple[int, int, int, int], fps: int,
+                 pixel_format: Optional[str] = None):
+        """
+        初始化订阅
+
+        Args:
+            registry: 所属注册表
+            key: 捕获源键 (hwnd, method)
+            engine: 共享捕获引擎
+            region: 捕获区域 (x, y, width, height)
+            fps: 本订阅的目标帧率
+            pixel_format: 本订阅的输出像素格式，默认使用配置值
+        """
+        super().__init__(engine, region, max_fps=fps, replay=settings.replay.enabled,
+                         pixel_format=pixel_format)
+        self.registry = registry
+        self.key = key
+
+    @property
+    def fps(self) -> int:
+        """本订阅的目标帧率"""
+        return self.max_fps
+
+    def set_fps(self, fps: int):
+        """
+        设置本订阅帧率（共享引擎按所有订阅的最大帧率运行）
+
+        Args:
+            fps: 新的帧率
+        """
+        if fps > 0:
+            self.max_fps = fps
+            self.registry.retune(self.key)
+
+    def pause(self):
+        """暂停本订阅（所有订阅都暂停时共享引擎随之暂停）"""
+        super().pause()
+        self.registry.retune(self.key)
+
+    def resume(self):
+        """恢复本订阅"""
+        super().resume()
+        self.registry.retune(self.key)
+
+    def stop(self):
+        """取消订阅（最后一个订阅取消时停止共享引擎）"""
+        self.registry.release(self)
+
+
+class CaptureSourceRegistry:
+    """
+    捕获源注册表
+
+    职责：
+    - 按 (hwnd, 捕获方法) 共享捕获引擎，发放带引用计数的订阅
+    - 引擎以所有订阅中的最大帧率运行，各订阅自行抽帧到自身帧率
+    - 所有订阅暂停时暂停引擎，最后一个订阅取消时停止并移除引擎
+    """
+
+    def __init__(self):
+        """初始化注册表"""
+        self._engines: Dict[Tuple[int, str], CaptureEngine] = {}
+
+    def __len__(self) -> int:
+        """当前运行的捕获源数量"""
+        return len(self._engines)
+
+    def engine_for(self, hwnd: int, method: str = CaptureMethod.AUTO) -> Optional[CaptureEngine]:
+        """
+        获取窗口当前的共享捕获引擎
+
+        Args:
+            hwnd: 窗口句柄
+            method: 捕获方法
+
+        Returns:
+            CaptureEngine: 共享引擎，尚无订阅时返回 None
+        """
+        return self._engines.get((hwnd, method))
+
+    def acquire(self, hwnd: int, region: Tuple[int, int, int, int], fps: int,
+                method: str = CaptureMethod.AUTO,
+                pixel_format: Optional[str] = None) -> CaptureSubscription:
+        """
+        订阅窗口的一个区域
+
+        Args:
+            hwnd: 窗口句柄
+            region: 捕获区域 (x, y, width, height)
+            fps: 目标帧率
+            method: 捕获方法
+            pixel_format: 本订阅的输出像素格式（同一窗口的订阅可以各不相同），默认使用配置值
+
+        Returns:
+            CaptureSubscription: 订阅，调用其 stop() 取消
+        """
+        key = (hwnd, method)
+        engine = self._engines.get(key)
+        if engine is None:
+            # 引擎主区域不连接订阅者，回放由各订阅自行记录
+            engine = CaptureEngine(hwnd, region, fps, capture_method=method, replay=False)
+            self._engines[key] = engine
+            logger.info(f"新建共享捕获源: hwnd={hwnd}, 方法={method}")
+        else:
+            logger.info(f"复用共享捕获源: hwnd={hwnd}, 方法={method} "
+                        f"(已有 {len(engine.region_outputs)} 个订阅)")
+
+        subscription = CaptureSubscription(self, key, engine, region, fps, pixel_format)
+        engine.add_output(subscription)
+        self.retune(key)
+        return subscription
+
+    def release(self, subscription: CaptureSubscription):
+        """
+        取消订阅
+
+        Args:
+            subscription: acquire 返回的订阅
+        """
+        engine = self._engines.get(subscription.key)
+        if engine is None:
+            return
+        engine.remove_region(subscription)
+
+        if engine.region_outputs:
+            self.retune(subscription.key)
+        else:
+            engine.stop()
+            del self._engines[subscription.key]
+            logger.info(f"共享捕获源已释放: hwnd={subscription.key[0]}")
+
+    def retune(self, key: Tuple[int, str]):
+        """
+        按当前订阅调整共享引擎的帧率和运行状态
+
+        Args:
+            key: 捕获源键 (hwnd, method)
+        """
+        engine = self._engines.get(key)
+        if engine is None or not engine.region_outputs:
+            return
+
+        fps = max(output.fps for output in engine.region_outputs)
+        if fps != engine.fps:
+            engine.set_fps(fps)
+
+        if not engine.is_running:
+            engine.start()
+        elif all(output.is_paused for output in engine.region_outputs):
+            engine.pause()
+        else:
+            engine.resume()
+
+    def stop_all(self):
+        """停止所有捕获源"""
+        for engine in list(self._engines.values()):
+            engine.stop()
+        self._engines.clear()
@@ -0,0 +1,212 @@
+"""
+窗口缩略图模块
+在线程池中捕获窗口的缩小预览，按窗口句柄缓存（过期时间 + LRU 字节上限）
+"""
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Optional, Tuple
+
+from PyQt6.QtCore import QObject, pyqtSignal
+from PyQt6.QtGui import QImage
+
+from ..utils import logger, ScreenCapture
+
+
+class ThumbnailCache:
+    """
+    缩略图缓存
+
+    按 hwnd 保存最近一次捕获的缩略图和捕获时间；超过 ttl_seconds 的条目仍可显示，
+    但视为过期、需要重新捕获。总字节数超过 max_bytes 时淘汰最久未使用的条目。
+    """
+
+    def __init__(self, ttl_seconds: float = 10.0, max_bytes: int = 32 * 1024 * 1024):
+        """
+        初始化缓存
+
+        Args:
+            ttl_seconds: 缩略图有效期（秒）
+            max_bytes: 缓存字节上限
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.bytes_held = 0
+        self._entries: 'OrderedDict[int, Tuple[QImage, float]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, hwnd: int) -> Tuple[Optional[QImage], bool]:
+        """
+        获取缓存的缩略图
+
+        Args:
+            hwnd: 窗口句柄
+
+        Returns:
+            tuple: (缩略图或 None, 是否仍在有效期内)
+        """
+        with self._lock:
+            entry = self._entries.get(hwnd)
+            if entry is None:
+                return None, False
+            self._entries.move_to_end(hwnd)
+            image, captured_ts = entry
+            return image, time.monotonic() - captured_ts < self.ttl_seconds
+
+    def is_fresh(self, hwnd: int) -> bool:
+        """缩略图是否在有效期内"""
+        with self._lock:
+            entry = self._entries.get(hwnd)
+            return entry is not None and time.monotonic() - entry[1] < self.ttl_seconds
+
+    def put(self, hwnd: int, image: QImage):
+        """
+        保存缩略图
+
+        Args:
+            hwnd: 窗口句柄
+            image: 缩略图
+        """
+        with self._lock:
+            old = self._entries.pop(hwnd, None)
+            if old is not None:
+                self.bytes_held -= old[0].sizeInBytes()
+            self._entries[hwnd] = (image, time.monotonic())
+            self.bytes_held += image.sizeInBytes()
+            while self.bytes_held > self.max_bytes and len(self._entries) > 1:
+                _, (evicted, _) = self._entries.popitem(last=False)
+                self.bytes_held -= evicted.sizeInBytes()
+
+    def retain(self, hwnds: Iterable[int]):
+        """
+        只保留仍存在的窗口的缩略图
+
+        Args:
+            hwnds: 当前存在的窗口句柄
+        """
+        alive = set(hwnds)
+        with self._lock:
+            for hwnd in [h for h in self._entries if h not in alive]:
+                image, _ = self._entries.pop(hwnd)
+                self.bytes_held -= image.sizeInBytes()
+
+
+class ThumbnailLoader(QObject):
+    """
+    缩略图加载器
+
+    职责：
+    - request() 只提交不在有效期内、也不在捕获中的窗口，调用方按可见顺序传入
+    - 捕获在线程池中进行（GDI 中缩小，只读回缩略图像素），GUI 线程从不等待
+    - 捕获完成后写入缓存并发射 thumbnail_ready；捕获失败（如窗口最小化）的窗口
+      在有效期内不再重试
+    """
+
+    # 信号定义
+    thumbnail_ready = pyqtSignal(int, QImage)  # (hwnd, 缩略图)
+    _captured_signal = pyqtSignal(int, object)  # 工作线程 -> GUI 线程（排队连接）
+
+    def __init__(self, cache: ThumbnailCache, max_width: int = 240, max_height: int = 135,
+                 workers: int = 4):
+        """
+        初始化加载器
+
+        Args:
+            cache: 缩略图缓存
+            max_width: 缩略图最大宽度
+            max_height: 缩略图最大高度
+            workers: 捕获线程数
+        """
+        super().__init__()
+        self.cache = cache
+        self.max_width = max_width
+        self.max_height = max_height
+
+        # 统计
+        self.captured = 0
+        self.failed = 0
+
+        self._in_flight: Dict[int, object] = {}
+        self._failed_at: Dict[int, float] = {}
+        self._lock = threading.Lock()
+        self._closed = False
+        self._pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="Thumbnail")
+        self._captured_signal.connect(self._on_captured)
+
+    @classmethod
+    def from_settings(cls, thumbnails) -> 'ThumbnailLoader':
+        """
+        按配置创建加载器（含缓存）
+
+        Args:
+            thumbnails: ThumbnailSettings
+        """
+        cache = ThumbnailCache(thumbnails.ttl_seconds, thumbnails.max_mb * 1024 * 1024)
+        return cls(cache, thumbnails.width, thumbnails.height, thumbnails.workers)
+
+    def request(self, hwnds: Iterable[int]) -> int:
+        """
+        请求捕获缩略图（已在有效期内或正在捕获的窗口被跳过）
+
+        Args:
+            hwnds: 窗口句柄，越靠前越先捕获
+
+        Returns:
+            int: 新提交的捕获数
+        """
+        if self._closed:
+            return 0
+        now = time.monotonic()
+        submitted = 0
+        for hwnd in hwnds:
+            if self.cache.is_fresh(hwnd):
+                continue
+            with self._lock:
+                if hwnd in self._in_flight:
+                    continue
+                failed_at = self._failed_at.get(hwnd)
+                if failed_at is not None and now - failed_at < self.cache.ttl_seconds:
+                    continue
+                self._in_flight[hwnd] = self._pool.submit(self._capture, hwnd)
+            submitted += 1
+        return submitted
+
+    def cancel_pending(self):
+        """取消尚未开始的捕获（选择器关闭时调用）"""
+        with self._lock:
+            for hwnd, future in list(self._in_flight.items()):
+                if future.cancel():
+                    del self._in_flight[hwnd]
+
+    def close(self):
+        """停止加载器，等待正在进行的捕获结束"""
+        if self._closed:
+            return
+        self._closed = True
+        self.cancel_pending()
+        self._pool.shutdown(wait=True)
+        logger.info(f"缩略图加载器已关闭 (捕获 {self.captured} 个, 失败 {self.failed} 个)")
+
+    def _capture(self, hwnd: int):
+        """工作线程：捕获一个窗口的缩略图"""
+        image = ScreenCapture.capture_window_thumbnail(hwnd, self.max_width, self.max_height)
+        self._captured_signal.emit(hwnd, image)
+
+    def _on_captured(self, hwnd: int, image: Optional[QImage]):
+        """GUI 线程：写入缓存并通知"""
+        with self._lock:
+            self._in_flight.pop(hwnd, None)
+            if image is None:
+                self._failed_at[hwnd] = time.monotonic()
+            else:
+                self._failed_at.pop(hwnd, None)
+        if image is None:
+            self.failed += 1
+            return
+        self.captured += 1
+        self.cache.put(hwnd, image)
+        self.thumbnail_ready.emit(hwnd, image)
@@ -0,0 +1,364 @@
+"""
+视频流输出模块
+把捕获帧以 YUV4MPEG2 或原始像素流写入标准输出、命名管道或文件，供外部编码器和分析工具读取
+"""
+import os
+import stat
+import sys
+import threading
+from fractions import Fraction
+from queue import Queue, Full, Empty
+
+from PyQt6.QtCore import QObject, Qt, pyqtSignal
+from PyQt6.QtGui import QImage
+
+from ..utils import logger
+from .frame import HAS_NUMPY, np, Frame, rgb_channel_indices
+from .pixel_format import expand_compact
+from .y4m import FRAME_MAGIC, TIMECODES_HEADER, rgb_to_yuv420, timecodes_path, y4m_header
+
+
+class SinkFormat:
+    """输出格式"""
+    Y4M = "y4m"  # YUV4MPEG2，BT.601 有限范围 4:2:0（灰度帧为 Cmono）
+    RAW = "raw"  # 紧凑排列的原始像素，布局与帧格式一致（默认 RGB32 为 BGRA，RGB565 / Indexed8 保持紧凑）
+
+
+class OverflowPolicy:
+    """下游读取过慢时的处理方式（两种方式都不会阻塞捕获线程）"""
+    DROP = "drop"    # 只缓冲少量帧，缓冲区满时丢弃新帧，延迟最低
+    BLOCK = "block"  # 写线程等待下游，按字节预算缓冲全部帧，预算用尽才丢帧
+
+
+class VideoSink(QObject):
+    """
+    视频流输出
+
+    职责：
+    - 订阅捕获引擎或区域输出的 frame_ready 信号，捕获线程中只做一次非阻塞入队
+    - 转换线程把帧转为 YUV 4:2:0（整数向量运算）或紧凑原始像素
+    - 写线程把转换好的帧写入目标，下游阻塞时只阻塞写线程；
+      缓冲上限由 OverflowPolicy 决定，超出时丢帧并计数
+    - 帧率取自前 probe_frames 帧的真实时间戳；输出为普通文件时
+      另写 timecode v2 旁路文件，记录每帧的实际时间
+
+    需要安装 numpy。
+    """
+
+    # 信号定义
+    failed = pyqtSignal(str)  # 输出失败（下游关闭管道等），输出已停止
+
+    def __init__(self, target: str, sink_format: str = SinkFormat.Y4M,
+                 policy: str = OverflowPolicy.DROP, buffer_frames: int = 4,
+                 buffer_bytes: int = 256 * 1024 * 1024, probe_frames: int = 10):
+        """
+        初始化输出
+
+        Args:
+            target: "-" 表示标准输出，否则为文件或命名管道路径（Windows 为 \\\\.\\pipe\\name）
+            sink_format: 输出格式（SinkFormat）
+            policy: 缓冲区满时的处理方式（OverflowPolicy）
+            buffer_frames: DROP 方式下最多缓冲的帧数
+            buffer_bytes: BLOCK 方式下的缓冲字节预算
+            probe_frames: 用于测量帧率的帧数（Y4M 文件头在测量完成后写出）
+        """
+        super().__init__()
+        if not HAS_NUMPY:
+            raise RuntimeError("VideoSink 需要安装 numpy")
+        if sink_format not in (SinkFormat.Y4M, SinkFormat.RAW):
+            raise ValueError(f"不支持的输出格式: {sink_format}")
+        if policy not in (OverflowPolicy.DROP, OverflowPolicy.BLOCK):
+            raise ValueError(f"不支持的缓冲策略: {policy}")
+
+        self.target = target
+        self.sink_format = sink_format
+        self.policy = policy
+        self.buffer_frames = max(1, buffer_frames)
+        self.buffer_bytes = buffer_bytes
+        self.probe_frames = max(2, probe_frames)
+
+        # 统计
+        self.written_frames = 0
+        self.dropped_frames = 0
+
+        self._output = None
+        self._closed = False
+        self._failed = False
+        self._frame_size = None   # 第一帧的 (宽, 高, 格式)，之后尺寸或格式不同的帧被丢弃
+        self._size_warned = False
+        # 写出 Y4M 文件头之前缓冲的 (时间戳, 数据)；原始流没有文件头，直接写出
+        self._probe = [] if sink_format == SinkFormat.Y4M else None
+        self._timecodes = None
+        self._first_ts = None
+        self._buffered_bytes = 0
+        self._budget = threading.Condition()
+
+        # 转换队列只放少量帧，写队列的上限由缓冲策略控制
+        self._convert_queue = Queue(maxsize=2)
+        self._write_queue = Queue()
+        self._converter = threading.Thread(target=self._run_converter, name="VideoSinkConvert",
+                                           daemon=True)
+        self._writer = threading.Thread(target=self._run_writer, name="VideoSinkWrite", daemon=True)
+        self._converter.start()
+        self._writer.start()
+        self._source = None
+        self._slot = None
+
+    @classmethod
+    def from_settings(cls, stream, target: str) -> 'VideoSink':
+        """
+        按配置创建输出
+
+        Args:
+            stream: StreamSettings
+            target: 输出目标
+        """
+        return cls(target, sink_format=stream.format, policy=stream.policy,
+                   buffer_frames=stream.buffer_frames,
+                   buffer_bytes=stream.buffer_mb * 1024 * 1024, probe_frames=stream.probe_frames)
+
+    def attach(self, output):
+        """
+        开始输出一个区域的帧（每个输出只对应一个区域）
+
+        Args:
+            output: CaptureEngine 或 RegionOutput
+        """
+        if self._source is not None:
+            raise RuntimeError("VideoSink 只能连接一个帧源")
+        self._source = output
+        self._slot = self._on_frame
+        # 直接连接：在捕获线程中入队，不经过 GUI 线程
+        output.frame_ready.connect(self._slot, Qt.ConnectionType.DirectConnection)
+        logger.info(f"视频流输出: {self.target} ({self.sink_format}, {self.policy})")
+
+    def close(self):
+        """
+        断开帧源，写完缓冲的帧后关闭输出
+
+        在 GUI 线程中调用，不会因下游停止读取而阻塞：等待预算的帧被丢弃，
+        写线程在短暂等待后留在后台继续写出（守护线程）。
+        """
+        if self._closed:
+            return
+        self._closed = True
+        if self._source is not None:
+            try:
+                self._source.frame_ready.disconnect(self._slot)
+            except TypeError:
+                pass
+            self._source = None
+        # 唤醒等待预算的转换线程
+        with self._budget:
+            self._budget.notify_all()
+        # 非阻塞地放入结束标记，转换队列满时丢弃最早的一帧腾出位置
+        while True:
+            try:
+                self._convert_queue.put_nowait(None)
+                break
+            except Full:
+                try:
+                    self._convert_queue.get_nowait()
+                    self.dropped_frames += 1
+                except Empty:
+                    pass
+        self._converter.join(timeout=1.0)
+        self._writer.join(timeout=0.5)
+        if self._writer.is_alive():
+            logger.warning(f"视频流输出: {self.target} 下游未读取，剩余的帧在后台继续写出")
+        logger.info(f"视频流输出已关闭: {self.target} (写出 {self.written_frames} 帧, "
+                    f"丢弃 {self.dropped_frames} 帧)")
+
+    def _on_frame(self, frame: Frame):
+        """捕获线程回调：非阻塞入队"""
+        if self._closed or self._failed:
+            return
+        try:
+            self._convert_queue.put_nowait(frame)
+        except Full:
+            self.dropped_frames += 1
+
+    # ---- 转换线程 ----
+
+    def _run_converter(self):
+        """转换线程：帧 -> 待写出的字节"""
+        while True:
+            frame = self._convert_queue.get()
+            if frame is None:
+                break
+            if self._failed:
+                continue
+            try:
+                data = self._convert(frame)
+            except Exception as e:
+                logger.error("视频流帧转换失败: %s", e, key=f"video_sink:{self.target}")
+                continue
+            if data is not None:
+                self._enqueue(frame.timestamp, data)
+        # 帧数不足以测量帧率时按已有的帧写出
+        self._flush_probe()
+        self._write_queue.put(None)
+
+    def _convert(self, frame: Frame):
+        """把一帧转为 Y4M 帧或紧凑原始像素"""
+        size = (frame.width, frame.height, frame.image_format)
+        if self._frame_size is None:
+            self._frame_size = size
+        elif size != self._frame_size:
+            # Y4M 和原始流都不能中途改变尺寸或像素布局
+            if not self._size_warned:
+                self._size_warned = True
+                logger.warning(f"视频流输出: 帧尺寸或格式变为 {size[0]}x{size[1]}，"
+                               f"与开始时的 {self._frame_size[0]}x{self._frame_size[1]} 不同，丢弃")
+            self.dropped_frames += 1
+            return None
+
+        if self.sink_format == SinkFormat.RAW:
+            return frame.tobytes()
+
+        # RGB565 / Indexed8 先展开为 RGB888（原始流保持紧凑格式）
+        array, image_format = expand_compact(frame.array, frame.image_format)
+        if array.shape[2] == 1:
+            planes = (array[..., 0],)
+        else:
+            planes = rgb_to_yuv420(array, rgb_channel_indices(image_format))
+        # 帧头和各平面写入同一块缓冲区，写线程一次写出
+        header = FRAME_MAGIC + b"\n"
+        data = bytearray(len(header) + sum(plane.size for plane in planes))
+        data[:len(header)] = header
+        view = np.frombuffer(data, dtype=np.uint8)
+        offset = len(header)
+        for plane in planes:
+            view[offset:offset + plane.size].reshape(plane.shape)[...] = plane
+            offset += plane.size
+        return data
+
+    def _enqueue(self, timestamp: float, data):
+        """交给写线程；文件头写出之前先缓冲用于测量帧率"""
+        if self._probe is not None:
+            self._probe.append((timestamp, data))
+            if len(self._probe) >= self.probe_frames:
+                self._flush_probe()
+            return
+        self._put(timestamp, data)
+
+    def _flush_probe(self):
+        """测量帧率，把文件头和缓冲的帧交给写线程"""
+        probe, self._probe = self._probe, None
+        if not probe:
+            return
+        self._write_queue.put((None, self._header(probe)))
+        for timestamp, data in probe:
+            self._put(timestamp, data)
+
+    def _header(self, probe) -> bytes:
+        """按缓冲帧的真实时间戳生成 Y4M 文件头"""
+        elapsed = probe[-1][0] - probe[0][0]
+        if len(probe) > 1 and elapsed > 0:
+            # 精确到 0.01 FPS，29.97 之类的帧率保持 NTSC 形式的分数
+            fps = Fraction(round((len(probe) - 1) / elapsed, 2)).limit_denominator(1001)
+        else:
+            fps = Fraction(30)
+        width, height, image_format = self._frame_size
+        colorspace = "mono" if image_format == QImage.Format.Format_Grayscale8 else "420jpeg"
+        logger.info(f"视频流输出: {width}x{height} C{colorspace}, 实测帧率 {float(fps):.2f} FPS")
+        return y4m_header(width, height, fps, colorspace)
+
+    def _put(self, timestamp: float, data):
+        """按缓冲策略把一帧交给写线程（只阻塞转换线程，不影响捕获）"""
+        size = len(data)
+        with self._budget:
+            if self.policy == OverflowPolicy.DROP:
+                if self._write_queue.qsize() >= self.buffer_frames:
+                    self.dropped_frames += 1
+                    return
+            else:
+                # 等待写线程腾出预算；转换期间到达的帧会在转换队列满后被丢弃
+                while self._buffered_bytes + size > self.buffer_bytes and self._buffered_bytes:
+                    if self._failed:
+                        return
+                    if self._closed:
+                        # 关闭时不再等待停止读取的下游
+                        self.dropped_frames += 1
+                        return
+                    self._budget.wait(timeout=0.5)
+            self._buffered_bytes += size
+        self._write_queue.put((timestamp, data))
+
+    # ---- 写线程 ----
+
+    def _run_writer(self):
+        """写线程：打开目标并顺序写出"""
+        try:
+            self._output = self._open()
+        except OSError as e:
+            self._fail(f"无法打开视频流输出 {self.target}: {e}")
+            return
+
+        while True:
+            item = self._write_queue.get()
+            if item is None:
+                break
+            timestamp, data = item
+            try:
+                self._output.write(data)
+                if timestamp is not None:
+                    self._write_timecode(timestamp)
+            except (OSError, ValueError) as e:
+                self._fail(f"视频流输出中断: {e}")
+                return
+            if timestamp is not None:
+                self.written_frames += 1
+                with self._budget:
+                    self._buffered_bytes -= len(data)
+                    self._budget.notify_all()
+        self._close_output()
+
+    def _open(self):
+        """打开输出目标（命名管道会等待读取方连接）"""
+        if self.target == "-":
+            return sys.stdout.buffer
+        output = open(self.target, 'wb')
+        # 只有普通文件才写时间戳旁路文件，管道读取方通常只需要 Y4M 流
+        if self.sink_format == SinkFormat.Y4M and stat.S_ISREG(os.fstat(output.fileno()).st_mode):
+            self._timecodes = open(timecodes_path(self.target), 'w', encoding='utf-8')
+            self._timecodes.write(TIMECODES_HEADER + "\n")
+        return output
+
+    def _write_timecode(self, timestamp: float):
+        """记录一帧相对第一帧的时间（毫秒）"""
+        if self._timecodes is None:
+            return
+        if self._first_ts is None:
+            self._first_ts = timestamp
+        self._timecodes.write(f"{(timestamp - self._first_ts) * 1000:.3f}\n")
+
+    def _fail(self, message: str):
+        """输出失败：停止写出，丢弃之后的帧"""
+        logger.error(message)
+        self._failed = True
+        self._close_output()
+        with self._budget:
+            self._budget.notify_all()
+        # 清空缓冲，捕获线程之后只做一次判断
+        while True:
+            try:
+                self._write_queue.get_nowait()
+            except Empty:
+                break
+        self.failed.emit(message)
+
+    def _close_output(self):
+        """关闭输出目标和旁路文件"""
+        output, self._output = self._output, None
+        if output:
+            try:
+                if output is sys.stdout.buffer:
+                    output.flush()
+                else:
+                    output.close()
+            except OSError:
+                pass
+        if self._timecodes is not None:
+            self._timecodes.close()
+            self._timecodes = None
@@ -0,0 +1,143 @@
+"""
+窗口列表轮询模块
+在后台线程中定期枚举顶层窗口，只把增加、移除和标题变化的窗口通知 GUI 线程
+"""
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from ..utils import logger, WindowManager
+
+
+class WindowListDiff:
+    """两次枚举之间的窗口列表变化"""
+
+    __slots__ = ('added', 'removed', 'retitled', 'details')
+
+    def __init__(self, added: List[Tuple[int, str]], removed: List[int],
+                 retitled: List[Tuple[int, str]],
+                 details: Optional[Dict[int, Tuple[str, str]]] = None):
+        """
+        初始化变化
+
+        Args:
+            added: 新出现的窗口 [(hwnd, title), ...]，按枚举顺序
+            removed: 已消失的窗口句柄
+            retitled: 标题变化的窗口 [(hwnd, 新标题), ...]
+            details: 新出现窗口的 {hwnd: (进程名, 窗口类名)}
+        """
+        self.added = added
+        self.removed = removed
+        self.retitled = retitled
+        self.details = details if details is not None else {}
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.retitled)
+
+    def __repr__(self) -> str:
+        return (f"WindowListDiff(+{len(self.added)}, -{len(self.removed)}, "
+                f"~{len(self.retitled)})")
+
+
+def diff_windows(previous: Dict[int, str], current: List[Tuple[int, str]]) -> WindowListDiff:
+    """
+    比较两次枚举结果
+
+    Args:
+        previous: 上一次的窗口 {hwnd: title}
+        current: 本次枚举结果 [(hwnd, title), ...]
+
+    Returns:
+        WindowListDiff: 变化（无变化时为假值）
+    """
+    added = []
+    retitled = []
+    seen = set()
+    for hwnd, title in current:
+        seen.add(hwnd)
+        old_title = previous.get(hwnd)
+        if old_title is None:
+            added.append((hwnd, title))
+        elif old_title != title:
+            retitled.append((hwnd, title))
+    removed = [hwnd for hwnd in previous if hwnd not in seen]
+    return WindowListDiff(added, removed, retitled)
+
+
+class WindowPoller(QObject):
+    """
+    窗口列表轮询器
+
+    职责：
+    - 在轮询线程中每 interval_ms 毫秒枚举一次窗口，GUI 线程（包括启动时）从不等待枚举
+    - 与上一次结果比较，只在有变化时发出 windows_changed（排队送到 GUI 线程）
+    - 只为新出现的窗口查询进程名和窗口类名（供搜索索引使用），已知窗口不重复查询
+    - poll_now() 唤醒轮询线程立即枚举一次（“刷新窗口列表”按钮）
+    """
+
+    # 信号定义
+    windows_changed = pyqtSignal(object)  # 窗口列表变化（WindowListDiff）
+
+    def __init__(self, interval_ms: int = 1000):
+        """
+        初始化轮询器
+
+        Args:
+            interval_ms: 轮询间隔（毫秒）
+        """
+        super().__init__()
+        self.interval = max(100, interval_ms) / 1000.0
+
+        # 统计
+        self.polls = 0
+        self.changes = 0
+
+        self._known: Dict[int, str] = {}
+        self._closed = False
+        self._wake = threading.Event()
+        self._worker = None
+
+    def start(self):
+        """启动轮询线程（立即进行第一次枚举）"""
+        if self._worker is not None or self._closed:
+            return
+        self._worker = threading.Thread(target=self._run, name="WindowPoller", daemon=True)
+        self._worker.start()
+        logger.debug(f"窗口列表轮询已启动: 间隔 {self.interval * 1000:.0f} ms")
+
+    def poll_now(self):
+        """立即枚举一次"""
+        self._wake.set()
+
+    def close(self):
+        """停止轮询线程"""
+        if self._closed:
+            return
+        self._closed = True
+        self._wake.set()
+        if self._worker is not None:
+            self._worker.join(timeout=2.0)
+        logger.debug(f"窗口列表轮询已停止 (枚举 {self.polls} 次, 变化 {self.changes} 次)")
+
+    def _run(self):
+        """轮询线程主循环"""
+        while not self._closed:
+            try:
+                windows = WindowManager.enum_windows()
+            except Exception as e:
+                logger.warning(f"枚举窗口失败: {e}")
+            else:
+                self.polls += 1
+                diff = diff_windows(self._known, windows)
+                if diff:
+                    self._known = dict(windows)
+                    for hwnd, _ in diff.added:
+                        diff.details[hwnd] = (WindowManager.get_process_name(hwnd),
+                                              WindowManager.get_window_class(hwnd))
+                    self.changes += 1
+                    logger.debug(f"窗口列表变化: 新增 {len(diff.added)}, 移除 {len(diff.removed)}, "
+                                 f"标题变化 {len(diff.retitled)} (共 {len(windows)} 个)")
+                    self.windows_changed.emit(diff)
+            self._wake.wait(self.interval)
+            self._wake.clear()
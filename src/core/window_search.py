@@ -0,0 +1,304 @@
+"""
+窗口搜索模块
+对窗口标题、进程名和窗口类名建立增量维护的三元组索引，支持子序列模糊匹配和排序
+"""
+import heapq
+import re
+from collections import Counter, OrderedDict
+from operator import itemgetter
+from typing import Dict, List, Optional, Set, Tuple
+
+from .window_poller import WindowListDiff
+
+
+def _trigrams(text: str) -> Set[str]:
+    """文本（已转小写）的三元组集合"""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class _SearchEntry:
+    """一个已索引的窗口"""
+
+    __slots__ = ('hwnd', 'title', 'process', 'window_class', 'title_lower', 'history_keys',
+                 'haystack', 'chars', 'trigrams')
+
+    def __init__(self, hwnd: int, title: str, process: str, window_class: str):
+        self.hwnd = hwnd
+        self.process = process
+        self.window_class = window_class
+        self.set_title(title)
+
+    def set_title(self, title: str):
+        """更新标题及派生的匹配文本"""
+        process, window_class = self.process.lower(), self.window_class.lower()
+        self.title = title
+        self.title_lower = title.lower()
+        # (进程名, 标题) / (进程名, 窗口类名)：重新打开的同一目标句柄会变，这两个键不变
+        self.history_keys = ((process, self.title_lower), (process, window_class))
+        # 字段间用不会出现在查询中的分隔符，子序列不跨字段拼出误匹配的子串
+        self.haystack = f"{self.title_lower}\x00{process}\x00{window_class}"
+        self.chars = frozenset(self.haystack)
+        self.trigrams = _trigrams(self.title_lower) | _trigrams(process) | _trigrams(window_class)
+
+
+class WindowSearchIndex:
+    """
+    窗口搜索索引
+
+    职责：
+    - apply_diff() 按 WindowPoller 的变化增量增删索引条目，不重建
+    - search() 匹配标题、进程名和窗口类名：子串 > 子序列（按跨度紧凑程度）> 三元组相似
+      （容忍拼写错误，只在子序列结果不足时补充）；上一次结果是本次的超集时
+      （查询是在末尾追加字符）只在上次结果中查找
+    - remember() 记录选择过的目标（按进程名 + 标题、进程名 + 窗口类名），
+      重新出现的同一目标排在最前，便于重新连接
+    """
+
+    # 三元组相似匹配所需的最小共享比例
+    TRIGRAM_MIN_SHARE = 0.5
+
+    # 排序分值
+    SCORE_HISTORY = 1000
+    SCORE_HISTORY_CLASS = 500
+    SCORE_TITLE_PREFIX = 300
+    SCORE_TITLE_SUBSTRING = 200
+    SCORE_FIELD_SUBSTRING = 150
+    SCORE_SUBSEQUENCE = 100
+    SCORE_TRIGRAM = 50
+
+    def __init__(self, history_size: int = 50):
+        """
+        初始化索引
+
+        Args:
+            history_size: 记住的已选择目标数
+        """
+        self.history_size = history_size
+        self._entries: Dict[int, _SearchEntry] = {}
+        self._postings: Dict[str, Set[int]] = {}
+        # (进程名, 标题) / (进程名, 窗口类名) -> 选择次序（越大越近）
+        self._history: 'OrderedDict[Tuple[str, str], int]' = OrderedDict()
+        self._class_history: 'OrderedDict[Tuple[str, str], int]' = OrderedDict()
+        self._history_serial = 0
+        # 已选择过的目标的加分 {hwnd: 分值}，只在索引或历史变化时更新
+        self._boost: Dict[int, float] = {}
+        # 上一次查询的子序列匹配结果（增量细化）
+        self._last_query: Optional[str] = None
+        self._last_matches: List[_SearchEntry] = []
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, hwnd: int, title: str, process: str = "", window_class: str = ""):
+        """
+        索引一个窗口
+
+        Args:
+            hwnd: 窗口句柄
+            title: 窗口标题
+            process: 进程名
+            window_class: 窗口类名
+        """
+        if hwnd in self._entries:
+            self.remove(hwnd)
+        entry = _SearchEntry(hwnd, title, process, window_class)
+        self._entries[hwnd] = entry
+        self._post(entry)
+        self._update_boost(entry)
+        self._last_query = None
+
+    def remove(self, hwnd: int):
+        """移除一个窗口"""
+        entry = self._entries.pop(hwnd, None)
+        if entry is None:
+            return
+        self._unpost(entry)
+        self._boost.pop(hwnd, None)
+        self._last_query = None
+
+    def retitle(self, hwnd: int, title: str):
+        """更新窗口标题"""
+        entry = self._entries.get(hwnd)
+        if entry is None:
+            return
+        self._unpost(entry)
+        entry.set_title(title)
+        self._post(entry)
+        self._update_boost(entry)
+        self._last_query = None
+
+    def apply_diff(self, diff: WindowListDiff):
+        """
+        按窗口列表变化更新索引
+
+        Args:
+            diff: WindowPoller 发出的变化
+        """
+        for hwnd in diff.removed:
+            self.remove(hwnd)
+        for hwnd, title in diff.retitled:
+            self.retitle(hwnd, title)
+        for hwnd, title in diff.added:
+            process, window_class = diff.details.get(hwnd, ("", ""))
+            self.add(hwnd, title, process, window_class)
+
+    def _post(self, entry: _SearchEntry):
+        for trigram in entry.trigrams:
+            self._postings.setdefault(trigram, set()).add(entry.hwnd)
+
+    def _unpost(self, entry: _SearchEntry):
+        for trigram in entry.trigrams:
+            postings = self._postings.get(trigram)
+            if postings is not None:
+                postings.discard(entry.hwnd)
+                if not postings:
+                    del self._postings[trigram]
+
+    def remember(self, hwnd: int):
+        """
+        记录一次选择，之后同一目标（包括重新打开后句柄变化的）排在最前
+
+        Args:
+            hwnd: 被选择的窗口句柄
+        """
+        entry = self._entries.get(hwnd)
+        if entry is None:
+            return
+        self._history_serial += 1
+        for history, key in zip((self._history, self._class_history), entry.history_keys):
+            history.pop(key, None)
+            history[key] = self._history_serial
+            while len(history) > self.history_size:
+                history.popitem(last=False)
+        # 历史变化后所有加分按新的次序重算
+        self._boost.clear()
+        for other in self._entries.values():
+            self._update_boost(other)
+
+    def describe(self, hwnd: int) -> Optional[Tuple[str, str, str]]:
+        """
+        已索引窗口的信息
+
+        Returns:
+            tuple: (标题, 进程名, 窗口类名)，未索引时返回 None
+        """
+        entry = self._entries.get(hwnd)
+        if entry is None:
+            return None
+        return entry.title, entry.process, entry.window_class
+
+    def _update_boost(self, entry: _SearchEntry):
+        """计算已选择过的目标的加分（越近选择的越高）"""
+        title_key, class_key = entry.history_keys
+        serial = self._history.get(title_key)
+        if serial is not None:
+            self._boost[entry.hwnd] = self.SCORE_HISTORY + serial / (self._history_serial + 1)
+            return
+        serial = self._class_history.get(class_key)
+        if serial is not None:
+            self._boost[entry.hwnd] = self.SCORE_HISTORY_CLASS + serial / (self._history_serial + 1)
+        else:
+            self._boost.pop(entry.hwnd, None)
+
+    def _subsequence_score(self, entry: _SearchEntry, patterns: list) -> Optional[float]:
+        """每个词以子串或子序列匹配时的平均分值，有词不匹配时返回 None"""
+        title, haystack = entry.title_lower, entry.haystack
+        score = 0.0
+        for word, chars, pattern in patterns:
+            # 缺少词中任一字符的不可能匹配，省去正则
+            if not chars <= entry.chars:
+                return None
+            if word in title:
+                score += self.SCORE_TITLE_PREFIX if title.startswith(word) else self.SCORE_TITLE_SUBSTRING
+            elif word in haystack:
+                score += self.SCORE_FIELD_SUBSTRING
+            else:
+                match = pattern.search(haystack)
+                if match is None:
+                    return None
+                # 跨度越紧凑分越高
+                score += self.SCORE_SUBSEQUENCE * len(word) / (match.end() - match.start())
+        return score / len(patterns)
+
+    def search(self, query: str, limit: int = 0) -> List[int]:
+        """
+        搜索窗口
+
+        Args:
+            query: 查询文本（不区分大小写，空白分隔的多个词须全部匹配）
+            limit: 最多返回的结果数，0 表示不限
+
+        Returns:
+            list: 按匹配程度排序的窗口句柄（空查询时返回全部，已选择过的目标在前）
+        """
+        query = " ".join(query.lower().split())
+        boost = self._boost
+        if not query:
+            # 字典保持枚举顺序，排序稳定：先已选择过的目标，其余按枚举顺序
+            first = sorted(boost, key=boost.get, reverse=True)
+            hwnds = first + [hwnd for hwnd in self._entries if hwnd not in boost]
+            return hwnds[:limit] if limit else hwnds
+
+        # 子序列匹配：每个词的字符按顺序出现在同一字段中
+        words = query.split(" ")
+        patterns = [(word, frozenset(word), re.compile("[^\x00]*?".join(map(re.escape, word))))
+                    for word in words]
+        if self._last_query is not None and query.startswith(self._last_query):
+            pool = self._last_matches
+        else:
+            pool = self._entries.values()
+        # 先只做子串比较（快），有词不是子串的条目再做子序列匹配
+        matches = []
+        deferred = []
+        scores: Dict[int, float] = {}
+        for entry in pool:
+            title, haystack = entry.title_lower, entry.haystack
+            score = 0.0
+            for word in words:
+                if word in title:
+                    score += self.SCORE_TITLE_PREFIX if title.startswith(word) else self.SCORE_TITLE_SUBSTRING
+                elif word in haystack:
+                    score += self.SCORE_FIELD_SUBSTRING
+                else:
+                    deferred.append(entry)
+                    break
+            else:
+                matches.append(entry)
+                scores[entry.hwnd] = score / len(words)
+
+        # 单个词时子串匹配的分值都高于子序列匹配：已够 limit 个则只检查有加分的条目，
+        # 其余未检查的留在细化范围内
+        unchecked = []
+        if len(words) == 1 and limit and len(matches) >= limit:
+            unchecked = [entry for entry in deferred if entry.hwnd not in boost]
+            deferred = [entry for entry in deferred if entry.hwnd in boost]
+        for entry in deferred:
+            score = self._subsequence_score(entry, patterns)
+            if score is not None:
+                matches.append(entry)
+                scores[entry.hwnd] = score
+        self._last_query = query
+        self._last_matches = matches + unchecked
+
+        # 三元组相似：结果不足时补充拼写有误、子序列匹配不到的窗口
+        query_trigrams = _trigrams(query.replace(" ", ""))
+        if query_trigrams and (not limit or len(matches) < limit):
+            needed = max(1, int(len(query_trigrams) * self.TRIGRAM_MIN_SHARE + 0.5))
+            counts = Counter()
+            for trigram in query_trigrams:
+                postings = self._postings.get(trigram)
+                if postings:
+                    counts.update(postings)
+            for hwnd, shared in counts.items():
+                if shared >= needed and hwnd not in scores:
+                    scores[hwnd] = self.SCORE_TRIGRAM * shared / len(query_trigrams)
+
+        for hwnd, value in boost.items():
+            if hwnd in scores:
+                scores[hwnd] += value
+        # 排序稳定，同分的按枚举顺序
+        if limit:
+            ranked = heapq.nlargest(limit, scores.items(), key=itemgetter(1))
+        else:
+            ranked = sorted(scores.items(), key=itemgetter(1), reverse=True)
+        return [hwnd for hwnd, _ in ranked]
@@ -0,0 +1,305 @@
+"""
+YUV4MPEG2（Y4M）视频模块
+读写 Y4M 视频及其 timecode v2 时间戳旁路文件：读取时帧数据按需从内存映射中取出，
+写入时 RGB -> YUV 4:2:0 转换全部为整数向量运算
+"""
+import os
+from fractions import Fraction
+from typing import List, Optional, Tuple
+
+from .frame import HAS_NUMPY, np
+
+
+# 文件头与帧头标记
+Y4M_MAGIC = b"YUV4MPEG2"
+FRAME_MAGIC = b"FRAME"
+
+# timecode v2 文件首行
+TIMECODES_HEADER = "# timecode format v2"
+
+# 色度子采样 -> (水平因子, 垂直因子)；None 表示只有亮度平面
+_CHROMA_SUBSAMPLING = {
+    "420jpeg": (2, 2), "420paldv": (2, 2), "420mpeg2": (2, 2), "420": (2, 2),
+    "422": (2, 1), "444": (1, 1), "mono": None,
+}
+
+# BT.601 有限范围 RGB -> YUV 的 8 位定点系数（行为 Y、U、V，列为 R、G、B），
+# 读取端把参考图像转为亮度时与写入端使用同一组系数
+_BT601_COEFFS = ((66, 129, 25), (-38, -74, 112), (112, -94, -18))
+
+
+def timecodes_path(path: str) -> str:
+    """
+    录制文件对应的 timecode v2 旁路文件路径
+
+    Args:
+        path: 视频文件路径
+
+    Returns:
+        str: 同名 .timecodes.txt 路径
+    """
+    return os.path.splitext(path)[0] + ".timecodes.txt"
+
+
+def read_timecodes(path: str) -> List[float]:
+    """
+    读取 timecode v2 文件
+
+    Args:
+        path: 旁路文件路径
+
+    Returns:
+        List[float]: 每帧的显示时间（秒，相对第一帧）
+    """
+    timestamps = []
+    with open(path, 'r', encoding='utf-8') as f:
+        header = f.readline().strip()
+        if header != TIMECODES_HEADER:
+            raise ValueError(f"不是 timecode v2 文件: {path}")
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith('#'):
+                timestamps.append(float(line) / 1000.0)
+    return timestamps
+
+
+def rgb_to_luma(array, channels: Tuple[int, int, int]):
+    """
+    RGB 像素转 BT.601 有限范围亮度（uint16 定点运算）
+
+    Args:
+        array: H×W×C uint8 数组
+        channels: R、G、B 在每像素字节中的位置
+
+    Returns:
+        np.ndarray: H×W uint8 亮度平面
+    """
+    r, g, b = channels
+    kr, kg, kb = _BT601_COEFFS[0]
+    # 最大值 255 × 220 + 128 不超过 uint16
+    # 乘积直接以 uint16 计算（uint8 数组乘标量在 NumPy 2.0 之前仍为 uint8，会溢出）
+    luma = np.multiply(array[..., r], kr, dtype=np.uint16)
+    luma += np.multiply(array[..., g], kg, dtype=np.uint16)
+    luma += np.multiply(array[..., b], kb, dtype=np.uint16)
+    luma += np.uint16(128)
+    luma >>= 8
+    luma += np.uint16(16)
+    return luma.astype(np.uint8)
+
+
+def rgb_to_yuv420(array, channels: Tuple[int, int, int]):
+    """
+    RGB 像素转 BT.601 有限范围 YUV 4:2:0 平面
+
+    色度先对 2×2 像素的 R、G、B 求和（跨步切片累加），再在四分之一分辨率上做矩阵运算；
+    奇数宽高时复制最后一行/列补齐。
+
+    Args:
+        array: H×W×C uint8 数组（C ≥ 3）
+        channels: R、G、B 在每像素字节中的位置
+
+    Returns:
+        tuple: (Y, U, V) uint8 平面，U、V 尺寸为 ceil(H/2)×ceil(W/2)
+    """
+    luma = rgb_to_luma(array, channels)
+
+    height, width = array.shape[:2]
+    if height % 2 or width % 2:
+        array = np.pad(array, ((0, height % 2), (0, width % 2), (0, 0)), mode='edge')
+    sums = []
+    for channel in channels:
+        plane = array[..., channel]
+        total = plane[0::2, 0::2].astype(np.int32)
+        total += plane[0::2, 1::2]
+        total += plane[1::2, 0::2]
+        total += plane[1::2, 1::2]
+        sums.append(total)
+
+    chroma = []
+    for kr, kg, kb in _BT601_COEFFS[1:]:
+        # 四个像素之和乘系数，再除以 4 × 256（加 512 四舍五入）
+        value = sums[0] * kr
+        value += sums[1] * kg
+        value += sums[2] * kb
+        value += 512
+        value >>= 10
+        value += 128
+        chroma.append(value.astype(np.uint8))
+    return luma, chroma[0], chroma[1]
+
+
+def y4m_header(width: int, height: int, fps: Fraction, colorspace: str = "420jpeg") -> bytes:
+    """
+    生成 Y4M 文件头
+
+    Args:
+        width: 宽度
+        height: 高度
+        fps: 帧率
+        colorspace: 色彩空间（420jpeg / mono）
+
+    Returns:
+        bytes: 以换行结尾的文件头
+    """
+    return (f"YUV4MPEG2 W{width} H{height} F{fps.numerator}:{fps.denominator} "
+            f"Ip A1:1 C{colorspace}\n").encode('ascii')
+
+
+class Y4MReader:
+    """
+    Y4M 文件读取器
+
+    整个文件以只读内存映射打开，luma() / planes() 返回映射上的视图，
+    只有被访问的帧才会从磁盘读入，GB 级文件也不会整体载入内存。
+    仅支持 8 位采样（C420* / C422 / C444 / Cmono）。
+    """
+
+    def __init__(self, path: str):
+        """
+        打开 Y4M 文件
+
+        Args:
+            path: 文件路径
+
+        Raises:
+            ValueError: 文件格式无效或不支持
+        """
+        if not HAS_NUMPY:
+            raise RuntimeError("Y4MReader 需要安装 numpy")
+        self.path = path
+        self.width = 0
+        self.height = 0
+        self.fps = (30, 1)
+        self.colorspace = "420jpeg"
+
+        with open(path, 'rb') as f:
+            header = f.readline(4096)
+        if not header.startswith(Y4M_MAGIC) or not header.endswith(b"\n"):
+            raise ValueError(f"不是有效的 Y4M 文件: {path}")
+        self._parse_header(header[len(Y4M_MAGIC):].decode('ascii').split())
+
+        subsampling = _CHROMA_SUBSAMPLING.get(self.colorspace)
+        if self.colorspace not in _CHROMA_SUBSAMPLING:
+            raise ValueError(f"不支持的 Y4M 色彩空间: C{self.colorspace}")
+        self.luma_size = self.width * self.height
+        if subsampling is None:
+            self.chroma_shape = None
+            self.frame_size = self.luma_size
+        else:
+            sx, sy = subsampling
+            self.chroma_shape = (-(-self.height // sy), -(-self.width // sx))
+            self.frame_size = self.luma_size + 2 * self.chroma_shape[0] * self.chroma_shape[1]
+
+        self._data = np.memmap(path, dtype=np.uint8, mode='r')
+        self._offsets = self._scan_frames(len(header))
+        self._timestamps: Optional[List[float]] = None
+
+    def _parse_header(self, tokens: List[str]):
+        """解析文件头参数"""
+        for token in tokens:
+            key, value = token[0], token[1:]
+            if key == 'W':
+                self.width = int(value)
+            elif key == 'H':
+                self.height = int(value)
+            elif key == 'F':
+                num, den = value.split(':')
+                self.fps = (int(num), int(den))
+            elif key == 'C':
+                self.colorspace = value
+        if self.width <= 0 or self.height <= 0:
+            raise ValueError(f"Y4M 文件头缺少尺寸: {self.path}")
+
+    def _scan_frames(self, start: int):
+        """
+        定位每帧数据的偏移
+
+        帧头都是最常见的 "FRAME\\n" 时按定长计算，否则逐帧读取帧头；
+        末尾不完整的帧被忽略。
+        """
+        data = self._data
+        total = len(data)
+        simple_stride = len(FRAME_MAGIC) + 1 + self.frame_size
+        count = (total - start) // simple_stride
+        if count and bytes(data[start:start + 6]) == FRAME_MAGIC + b"\n":
+            offsets = start + np.arange(count, dtype=np.int64) * simple_stride + 6
+            # 抽查最后一帧的帧头，确认所有帧头都是定长的
+            last = int(offsets[-1]) - 6
+            if bytes(data[last:last + 6]) == FRAME_MAGIC + b"\n":
+                return offsets
+
+        offsets = []
+        position = start
+        while position + len(FRAME_MAGIC) <= total:
+            line = bytes(data[position:min(total, position + 1024)])
+            newline = line.find(b"\n")
+            if not line.startswith(FRAME_MAGIC) or newline < 0:
+                break
+            end = position + newline
+            if end + 1 + self.frame_size > total:
+                break
+            offsets.append(end + 1)
+            position = end + 1 + self.frame_size
+        return np.array(offsets, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    @property
+    def frame_interval(self) -> float:
+        """文件头声明的帧间隔（秒）"""
+        num, den = self.fps
+        return den / num if num > 0 else 0.0
+
+    @property
+    def timestamps(self) -> List[float]:
+        """
+        每帧的显示时间（秒，相对第一帧）
+
+        存在 timecode v2 旁路文件时使用其中的实际时间，否则按文件头帧率推算。
+        """
+        if self._timestamps is None:
+            path = timecodes_path(self.path)
+            timestamps = read_timecodes(path) if os.path.exists(path) else []
+            if len(timestamps) < len(self):
+                interval = self.frame_interval
+                start = timestamps[-1] + interval if timestamps else 0.0
+                timestamps += [start + i * interval for i in range(len(self) - len(timestamps))]
+            self._timestamps = timestamps[:len(self)]
+        return self._timestamps
+
+    def luma(self, index: int):
+        """
+        获取一帧的亮度平面
+
+        Args:
+            index: 帧序号
+
+        Returns:
+            np.ndarray: H×W uint8 只读视图
+        """
+        offset = int(self._offsets[index])
+        return self._data[offset:offset + self.luma_size].reshape(self.height, self.width)
+
+    def planes(self, index: int):
+        """
+        获取一帧的 Y、U、V 平面
+
+        Args:
+            index: 帧序号
+
+        Returns:
+            tuple: (Y, U, V) 只读视图；Cmono 时 U、V 为 None
+        """
+        luma = self.luma(index)
+        if self.chroma_shape is None:
+            return luma, None, None
+        offset = int(self._offsets[index]) + self.luma_size
+        chroma_size = self.chroma_shape[0] * self.chroma_shape[1]
+        u = self._data[offset:offset + chroma_size].reshape(self.chroma_shape)
+        v = self._data[offset + chroma_size:offset + 2 * chroma_size].reshape(self.chroma_shape)
+        return luma, u, v
+
+    def close(self):
+        """释放内存映射（已取出的视图仍可使用，映射在其释放后关闭）"""
+        self._data = None
@@ -11,7 +11,8 @@ from .ui import MainWindow
 
 def main():
     """主函数"""
-    # 配置日志
+    # 配置日志（关闭调试模式时不输出调试信息，热路径中的调试日志不再格式化）
+    logger.set_debug(settings.debug.enabled)
     if settings.debug.log_to_file:
         logger.add_file_handler(settings.debug.log_file_path)
     
@@ -2,6 +2,7 @@
 from .main_window import MainWindow
 from .capture_window import CaptureWindow
 from .region_selector import RegionSelector
+from .dashboard import DashboardWindow
 
-__all__ = ['MainWindow', 'CaptureWindow', 'RegionSelector']
+__all__ = ['MainWindow', 'CaptureWindow', 'RegionSelector', 'DashboardWindow']
 
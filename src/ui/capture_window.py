@@ -2,15 +2,18 @@
 监视窗口 UI 组件 - 现代化版本
 显示实时捕获的视频流
 """
+import time
+from collections import deque
+from typing import Optional
 from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, 
-                             QPushButton, QSlider, QGraphicsView, QGraphicsScene,
-                             QWidget, QApplication)
-from PyQt6.QtGui import QPixmap, QImage
-from PyQt6.QtCore import Qt, QPoint, QRectF
+                             QPushButton, QSlider, QWidget, QApplication)
+from PyQt6.QtGui import QImage
+from PyQt6.QtCore import Qt, QPoint, QRectF, QTimer, QEvent, pyqtSignal
 
-from ..core import CaptureEngine
+from ..core import CaptureEngine, ImageExporter, capture_timestamp
 from ..config import settings
-from ..utils import logger
+from ..utils import logger, WindowManager
+from .frame_viewer import ViewerKind, PresentMode, create_frame_viewer, opengl_available
 
 
 class CaptureWindow(QDialog):
@@ -24,9 +27,17 @@ class CaptureWindow(QDialog):
     - 可调整窗口大小
     - 等比例缩放视频内容
     - 窗口置顶，易于拖动和调整
+    - 即时回放，可拖动回看最近的画面
+    - 可选 OpenGL 显示（GPU 缩放），每个窗口单独切换
+    - 快照与定时导出（在后台线程池编码，不阻塞界面）
+    - 随显示刷新提交画面（只保留最新一帧，每次刷新至多提交一次），统计捕获到显示的延迟
     """
     
-    def __init__(self, engine: CaptureEngine, window_title: str, parent=None):
+    # 信号定义
+    closed = pyqtSignal()  # 监视窗口已关闭（引擎或订阅已停止）
+    
+    def __init__(self, engine: CaptureEngine, window_title: str, parent=None,
+                 viewer: Optional[str] = None, exporter: Optional[ImageExporter] = None):
         """
         初始化监视窗口
         
@@ -34,16 +45,37 @@ class CaptureWindow(QDialog):
             engine: 捕获引擎实例
             window_title: 窗口标题
             parent: 父窗口
+            viewer: 画面显示方式（ViewerKind），默认使用配置值
+            exporter: 快照与定时导出（需已 attach 本窗口的 engine），None 时禁用导出按钮
         """
         super().__init__(parent)
         
         self.engine = engine
         self.window_title = window_title
+        self.viewer_kind = viewer or settings.ui.viewer
+        self.exporter = exporter
         
         # 视频原始尺寸（用于等比例缩放）
         self.original_width = 0
         self.original_height = 0
-        self.current_pixmap = None
+        self.current_image = None
+        
+        # 回放状态
+        self.replay_mode = False
+        self._replay_range = None
+        
+        # 画面提交：vsync 模式只保留最新一帧，在窗口的 UpdateRequest 中提交
+        self.present_mode = settings.ui.present_mode
+        self._pending_image = None
+        self._update_requested = False
+        self._last_present_ts = 0.0
+        self.presented_frames = 0
+        self.coalesced_frames = 0  # 被更新的帧覆盖、未提交的帧
+        self._latencies = deque(maxlen=120)  # 最近的捕获到提交延迟（秒）
+        
+        # 可见性状态（不可见时引擎降到保活帧率）
+        self._occluded = False
+        self._reported_visible = None
         
         # 连接信号
         self._connect_signals()
@@ -59,6 +91,8 @@ class CaptureWindow(QDialog):
         self.engine.fps_updated.connect(self.on_fps_updated)
         self.engine.method_changed.connect(self.on_method_changed)
         self.engine.capture_failed.connect(self.on_capture_failed)
+        if self.exporter is not None:
+            self.exporter.exported.connect(self.on_image_exported)
     
     def _init_ui(self):
         """初始化用户界面"""
@@ -91,28 +125,27 @@ class CaptureWindow(QDialog):
         main_layout.setContentsMargins(0, 0, 0, 0)
         main_layout.setSpacing(0)
         
-        # 图形视图
-        self.scene = QGraphicsScene()
-        self.view = QGraphicsView(self.scene)
-        self.view.setStyleSheet("""
-            QGraphicsView {
-                background: #0F172A;
-                border: none;
-            }
-        """)
-        self.view.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
-        self.view.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
-        # 设置等比例缩放模式
-        self.view.setTransformationAnchor(QGraphicsView.ViewportAnchor.AnchorViewCenter)
-        self.view.setResizeAnchor(QGraphicsView.ViewportAnchor.AnchorViewCenter)
-        
+        # 画面显示组件（光栅或 OpenGL）
+        self.view = create_frame_viewer(self.viewer_kind)
+        self._connect_viewer(self.view)
         main_layout.addWidget(self.view)
         
+        # 回放栏（默认隐藏）
+        self.replay_bar = self._create_replay_bar()
+        self.replay_bar.hide()
+        main_layout.addWidget(self.replay_bar)
+        
         # 控制栏
         control_layout = self._create_control_bar()
         main_layout.addLayout(control_layout)
         
         self.setLayout(main_layout)
+        self.main_layout = main_layout
+        
+        # 遮挡检测定时器（窗口被完全覆盖时不会收到隐藏或最小化事件）
+        self.visibility_timer = QTimer(self)
+        self.visibility_timer.setInterval(1000)
+        self.visibility_timer.timeout.connect(self._check_occlusion)
     
     def _create_control_bar(self) -> QHBoxLayout:
         """创建现代化控制栏"""
@@ -152,6 +185,97 @@ class CaptureWindow(QDialog):
         self.pause_btn.clicked.connect(self.toggle_pause)
         control_layout.addWidget(self.pause_btn)
         
+        # 回放按钮
+        self.replay_btn = QPushButton("⏪")
+        self.replay_btn.setFixedSize(32, 32)
+        self.replay_btn.setToolTip("即时回放：回看最近的画面")
+        self.replay_btn.setStyleSheet("""
+            QPushButton {
+                background-color: #334155;
+                color: white;
+                border: none;
+                border-radius: 4px;
+                font-size: 14px;
+            }
+            QPushButton:hover {
+                background-color: #475569;
+            }
+        """)
+        self.replay_btn.clicked.connect(self.toggle_replay)
+        self.replay_btn.setEnabled(self.engine.replay_buffer is not None)
+        control_layout.addWidget(self.replay_btn)
+        
+        # 显示方式切换（OpenGL / 光栅）
+        self.gpu_btn = QPushButton("GPU")
+        self.gpu_btn.setFixedSize(40, 32)
+        self.gpu_btn.setCheckable(True)
+        self.gpu_btn.setToolTip("使用 OpenGL 显示：纹理流式上传，由 GPU 缩放")
+        self.gpu_btn.setStyleSheet("""
+            QPushButton {
+                background-color: #334155;
+                color: white;
+                border: none;
+                border-radius: 4px;
+                font-size: 10px;
+                font-weight: 700;
+            }
+            QPushButton:hover {
+                background-color: #475569;
+            }
+            QPushButton:checked {
+                background-color: #7C3AED;
+            }
+        """)
+        self.gpu_btn.setEnabled(opengl_available())
+        self.gpu_btn.setChecked(self.view.scales_on_gpu)
+        self.gpu_btn.toggled.connect(self.on_gpu_toggled)
+        control_layout.addWidget(self.gpu_btn)
+        
+        # 快照按钮
+        self.snapshot_btn = QPushButton("📷")
+        self.snapshot_btn.setFixedSize(32, 32)
+        self.snapshot_btn.setToolTip("快照：在后台保存下一帧原始分辨率画面")
+        self.snapshot_btn.setStyleSheet("""
+            QPushButton {
+                background-color: #334155;
+                color: white;
+                border: none;
+                border-radius: 4px;
+                font-size: 14px;
+            }
+            QPushButton:hover {
+                background-color: #475569;
+            }
+        """)
+        self.snapshot_btn.clicked.connect(self.take_snapshot)
+        self.snapshot_btn.setEnabled(self.exporter is not None)
+        control_layout.addWidget(self.snapshot_btn)
+        
+        # 定时导出开关
+        self.periodic_btn = QPushButton("⏱")
+        self.periodic_btn.setFixedSize(32, 32)
+        self.periodic_btn.setCheckable(True)
+        self.periodic_btn.setToolTip(f"定时导出：每 {settings.export.interval_seconds:g} 秒保存一帧")
+        self.periodic_btn.setStyleSheet("""
+            QPushButton {
+                background-color: #334155;
+                color: white;
+                border: none;
+                border-radius: 4px;
+                font-size: 14px;
+            }
+            QPushButton:hover {
+                background-color: #475569;
+            }
+            QPushButton:checked {
+                background-color: #7C3AED;
+            }
+        """)
+        self.periodic_btn.setEnabled(self.exporter is not None)
+        self.periodic_btn.setChecked(self.exporter is not None and self.exporter.is_periodic(self.engine))
+        self.periodic_btn.toggled.connect(self.on_periodic_toggled)
+        control_layout.addWidget(self.periodic_btn)
+        
         # FPS 显示
         self.fps_label = QLabel(f"FPS: {self.engine.fps}")
         self.fps_label.setStyleSheet("""
@@ -237,6 +361,69 @@ class CaptureWindow(QDialog):
         
         return container
     
+    def _create_replay_bar(self) -> QWidget:
+        """创建回放拖动条"""
+        bar = QWidget()
+        bar.setStyleSheet("""
+            QWidget {
+                background-color: #1E293B;
+                border-top: 1px solid #334155;
+            }
+            QLabel {
+                color: #94A3B8;
+                font-size: 10px;
+                border: none;
+            }
+        """)
+        
+        layout = QHBoxLayout()
+        layout.setContentsMargins(8, 4, 8, 4)
+        layout.setSpacing(8)
+        
+        # 回放时间
+        self.replay_time_label = QLabel("--:--:--")
+        self.replay_time_label.setFixedWidth(110)
+        layout.addWidget(self.replay_time_label)
+        
+        # 时间轴滑块
+        self.replay_slider = QSlider(Qt.Orientation.Horizontal)
+        self.replay_slider.setRange(0, 1000)
+        self.replay_slider.valueChanged.connect(self.on_replay_slider_changed)
+        layout.addWidget(self.replay_slider)
+        
+        # 缓冲区占用
+        self.replay_bytes_label = QLabel("")
+        layout.addWidget(self.replay_bytes_label)
+        
+        # 返回实时画面
+        self.live_btn = QPushButton("● LIVE")
+        self.live_btn.setFixedHeight(24)
+        self.live_btn.setStyleSheet("""
+            QPushButton {
+                background-color: #EF4444;
+                color: white;
+                border: none;
+                border-radius: 4px;
+                font-size: 10px;
+                font-weight: 700;
+                padding: 0 8px;
+            }
+            QPushButton:hover {
+                background-color: #DC2626;
+            }
+        """)
+        self.live_btn.clicked.connect(self.exit_replay)
+        layout.addWidget(self.live_btn)
+        
+        bar.setLayout(layout)
+        
+        # 回放期间定时刷新缓冲区占用
+        self.replay_info_timer = QTimer(self)
+        self.replay_info_timer.setInterval(500)
+        self.replay_info_timer.timeout.connect(self._refresh_replay_info)
+        
+        return bar
+    
     def on_frame_captured(self, image: QImage):
         """
         处理捕获到的帧
@@ -244,23 +431,182 @@ class CaptureWindow(QDialog):
         Args:
             image: 捕获的图像
         """
-        # 保存原始尺寸和图像
-        if self.original_width == 0:
+        # 首帧：记录尺寸并自动调整窗口大小，之后再让引擎按视图尺寸预缩放
+        first_frame = self.original_width == 0
+        if first_frame:
             self.original_width = image.width()
             self.original_height = image.height()
             logger.info(f"视频原始尺寸: {self.original_width}x{self.original_height}")
+            if not self.view.scales_on_gpu:
+                self.view.set_source_size(self.original_width, self.original_height)
         
-        self.current_pixmap = QPixmap.fromImage(image)
-        
-        # 更新场景
-        self.scene.clear()
-        self.scene.addPixmap(self.current_pixmap)
-        self.view.setSceneRect(0, 0, image.width(), image.height())
+        # 回放期间继续捕获，但不覆盖正在回看的画面
+        if not self.replay_mode:
+            if self.present_mode == PresentMode.VSYNC and not first_frame:
+                self._queue_present(image)
+            else:
+                self._present(image)
         
-        # 自动调整窗口大小（仅首次）
-        if self.engine.capture_count == 1:
+        if first_frame:
             self._set_initial_size(image.width(), image.height())
             self._fit_in_view()
+            self._publish_target_size()
+    
+    def _queue_present(self, image: QImage):
+        """
+        保存最新一帧并请求在下次显示刷新时提交（多帧到达时只提交最新的）
+        
+        Args:
+            image: 捕获的图像
+        """
+        if self._pending_image is not None:
+            self.coalesced_frames += 1
+        self._pending_image = image
+        handle = self.windowHandle()
+        if handle is None:
+            self._present_pending()
+        elif not self._update_requested:
+            self._update_requested = True
+            handle.requestUpdate()
+    
+    def _present_pending(self):
+        """提交等待中的最新一帧，并立即重绘显示组件"""
+        image = self._pending_image
+        self._pending_image = None
+        if image is None or self.replay_mode:
+            return
+        self._present(image)
+        self.view.repaint()
+    
+    def _present(self, image: QImage):
+        """
+        显示一帧并记录捕获到提交的延迟
+        
+        Args:
+            image: 捕获的图像
+        """
+        timestamp = capture_timestamp(image)
+        if timestamp is not None:
+            self._latencies.append(time.time() - timestamp)
+        self.presented_frames += 1
+        self._last_present_ts = time.monotonic()
+        self._show_image(image)
+    
+    def presentation_latency_ms(self) -> Optional[float]:
+        """
+        最近提交的帧的平均捕获到提交延迟
+        
+        Returns:
+            float: 毫秒；尚无数据时返回 None
+        """
+        if not self._latencies:
+            return None
+        return sum(self._latencies) / len(self._latencies) * 1000
+    
+    def retained_frame_bytes(self, engine=None) -> int:
+        """
+        窗口持有的帧字节数（当前画面、等待提交的帧和放大查看的瓦片缓存）
+        
+        Args:
+            engine: 帧源（本窗口只显示一个帧源，忽略）
+        """
+        total = 0
+        for image in (self.current_image, self._pending_image):
+            if image is not None:
+                total += image.sizeInBytes()
+        tile_cache = getattr(self.view, 'tile_cache', None)
+        if tile_cache is not None:
+            total += tile_cache.bytes_held
+        return total
+    
+    def _refresh_interval(self) -> float:
+        """窗口所在屏幕的刷新间隔（秒）"""
+        screen = self.screen()
+        rate = screen.refreshRate() if screen is not None else 0.0
+        return 1.0 / rate if rate > 0 else 1.0 / 60
+    
+    def _show_image(self, image: QImage):
+        """
+        在视图中显示图像
+        
+        Args:
+            image: 要显示的图像
+        """
+        self.current_image = image
+        self.view.set_image(image)
+    
+    def on_gpu_toggled(self, checked: bool):
+        """
+        切换画面显示方式
+        
+        Args:
+            checked: 是否使用 OpenGL 显示
+        """
+        self.set_viewer(ViewerKind.OPENGL if checked else ViewerKind.RASTER)
+    
+    def set_viewer(self, kind: str):
+        """
+        替换画面显示组件，保留当前画面
+        
+        Args:
+            kind: 显示组件类型（ViewerKind）
+        """
+        viewer = create_frame_viewer(kind)
+        self._connect_viewer(viewer)
+        old_view = self.view
+        self.main_layout.replaceWidget(old_view, viewer)
+        old_view.deleteLater()
+        self.view = viewer
+        self.viewer_kind = ViewerKind.OPENGL if viewer.scales_on_gpu else ViewerKind.RASTER
+        logger.info(f"监视窗口 '{self.window_title}' 显示方式: {self.viewer_kind}")
+        
+        if self.original_width > 0 and not viewer.scales_on_gpu:
+            viewer.set_source_size(self.original_width, self.original_height)
+        if self.current_image is not None:
+            self.view.set_image(self.current_image)
+        if self.original_width > 0:
+            self._publish_target_size()
+    
+    def _connect_viewer(self, viewer):
+        """
+        连接显示组件的信号
+        
+        Args:
+            viewer: 帧显示组件
+        """
+        if not viewer.scales_on_gpu:
+            # 放大查看需要原始分辨率的帧，恢复适应窗口后重新按视图尺寸预缩放
+            viewer.zoom_changed.connect(lambda zoom: self._publish_target_size())
+    
+    def take_snapshot(self):
+        """请求导出下一帧（编码和写入在后台线程进行）"""
+        if self.exporter is not None and self.exporter.snapshot(self.engine):
+            self.snapshot_btn.setToolTip(f"快照：等待下一帧（队列 {self.exporter.queue_depth}）")
+    
+    def on_periodic_toggled(self, checked: bool):
+        """
+        开启或停止定时导出
+        
+        Args:
+            checked: 是否定时导出
+        """
+        if self.exporter is not None:
+            self.exporter.set_periodic(self.engine, checked)
+    
+    def on_image_exported(self, path: str):
+        """
+        导出完成回调：在快照按钮提示中显示最近的文件和导出统计
+        
+        Args:
+            path: 已写出的文件路径
+        """
+        files_per_second, mb_per_second, encode_ms = self.exporter.throughput()
+        self.snapshot_btn.setToolTip(
+            f"快照：在后台保存下一帧原始分辨率画面\n"
+            f"最近导出: {path}\n"
+            f"队列 {self.exporter.queue_depth} · {files_per_second:.1f} 张/秒 · "
+            f"{mb_per_second:.1f} MB/秒 · 编码 {encode_ms:.0f} ms/张"
+        )
     
     def on_fps_updated(self, fps: float):
         """
@@ -269,7 +615,15 @@ class CaptureWindow(QDialog):
         Args:
             fps: 实际 FPS
         """
-        self.fps_label.setText(f"FPS: {fps:.1f}")
+        latency = self.presentation_latency_ms()
+        if latency is None:
+            self.fps_label.setText(f"FPS: {fps:.1f}")
+        else:
+            self.fps_label.setText(f"FPS: {fps:.1f} · {latency:.0f} ms")
+            self.fps_label.setToolTip(
+                f"捕获到显示的平均延迟: {latency:.1f} ms\n"
+                f"已显示 {self.presented_frames} 帧，合并（未显示）{self.coalesced_frames} 帧"
+            )
     
     def on_method_changed(self, method: str):
         """
@@ -310,6 +664,84 @@ class CaptureWindow(QDialog):
             self.pause_btn.setText("▶")
             self.status_label.setText("⏸")
     
+    def toggle_replay(self):
+        """切换回放/实时画面"""
+        if self.replay_mode:
+            self.exit_replay()
+        else:
+            self.enter_replay()
+    
+    def enter_replay(self):
+        """进入回放模式，从最新一帧开始"""
+        replay_buffer = self.engine.replay_buffer
+        if replay_buffer is None:
+            return
+        
+        time_range = replay_buffer.time_range()
+        if time_range is None:
+            self.method_label.setText("回放缓冲区为空")
+            return
+        
+        # 进入回放时固定时间轴范围，避免拖动过程中画面随缓冲区推进而跳动
+        self._replay_range = time_range
+        self.replay_mode = True
+        self._pending_image = None
+        self.replay_bar.show()
+        self.replay_info_timer.start()
+        self._refresh_replay_info()
+        
+        self.replay_slider.blockSignals(True)
+        self.replay_slider.setValue(self.replay_slider.maximum())
+        self.replay_slider.blockSignals(False)
+        self.on_replay_slider_changed(self.replay_slider.maximum())
+        
+        logger.info(f"进入回放模式: 可回看 {time_range[1] - time_range[0]:.1f} 秒")
+    
+    def exit_replay(self):
+        """退出回放模式，恢复实时画面"""
+        if not self.replay_mode:
+            return
+        self.replay_mode = False
+        self._replay_range = None
+        self.replay_info_timer.stop()
+        self.replay_bar.hide()
+        logger.info("退出回放模式，恢复实时画面")
+    
+    def on_replay_slider_changed(self, value: int):
+        """
+        回放滑块改变回调
+        
+        Args:
+            value: 滑块位置 (0-1000)
+        """
+        replay_buffer = self.engine.replay_buffer
+        if not self.replay_mode or replay_buffer is None or self._replay_range is None:
+            return
+        
+        first_ts, last_ts = self._replay_range
+        target_ts = first_ts + (last_ts - first_ts) * value / self.replay_slider.maximum()
+        
+        result = replay_buffer.frame_at(target_ts)
+        if result is None:
+            return
+        
+        image, shown_ts = result
+        self._show_image(image)
+        
+        clock = time.strftime("%H:%M:%S", time.localtime(shown_ts))
+        self.replay_time_label.setText(f"{clock} (-{time.time() - shown_ts:.1f}s)")
+    
+    def _refresh_replay_info(self):
+        """刷新回放缓冲区占用信息"""
+        replay_buffer = self.engine.replay_buffer
+        if replay_buffer is None:
+            return
+        held_mb = replay_buffer.bytes_held / 1024 / 1024
+        budget_mb = replay_buffer.max_bytes / 1024 / 1024
+        self.replay_bytes_label.setText(
+            f"{held_mb:.1f}/{budget_mb:.0f} MB · {replay_buffer.frame_count} 帧"
+        )
+    
     def on_fps_slider_changed(self, value: int):
         """
         帧率滑块改变回调
@@ -365,18 +797,98 @@ class CaptureWindow(QDialog):
     
     def _fit_in_view(self):
         """等比例缩放视频以适应窗口"""
-        if self.current_pixmap and not self.current_pixmap.isNull():
-            # 等比例缩放，保持宽高比
-            self.view.fitInView(self.scene.sceneRect(), Qt.AspectRatioMode.KeepAspectRatio)
+        self.view.fit_to_view()
+    
+    def _publish_target_size(self):
+        """
+        将视图的设备像素尺寸告知捕获引擎，使其在源头预缩放显示帧
+        
+        OpenGL 显示由 GPU 缩放、光栅显示放大查看时由瓦片缓存缩放，此时请求原始分辨率的帧。
+        """
+        if self.view.scales_on_gpu or self.view.is_zoomed:
+            self.engine.set_target_size(0, 0)
+            return
+        viewport = self.view.viewport()
+        ratio = viewport.devicePixelRatioF()
+        self.engine.set_target_size(int(viewport.width() * ratio),
+                                    int(viewport.height() * ratio))
     
     def resizeEvent(self, event):
         """窗口大小改变事件"""
         super().resizeEvent(event)
-        # 窗口大小改变时，重新等比例缩放视频
-        self._fit_in_view()
+        # 首帧之后才发布目标尺寸（首帧需以原始分辨率计算初始窗口大小）
+        if self.original_width > 0:
+            self._publish_target_size()
+    
+    def showEvent(self, event):
+        """窗口显示事件"""
+        super().showEvent(event)
+        handle = self.windowHandle()
+        if handle is not None:
+            # 重复安装同一过滤器不会重复生效
+            handle.installEventFilter(self)
+        self.visibility_timer.start()
+        self._update_visibility()
+    
+    def hideEvent(self, event):
+        """窗口隐藏事件"""
+        super().hideEvent(event)
+        self.visibility_timer.stop()
+        self._update_visibility()
+    
+    def changeEvent(self, event):
+        """窗口状态改变事件（最小化 / 还原）"""
+        super().changeEvent(event)
+        if event.type() == QEvent.Type.WindowStateChange:
+            self._update_visibility()
+    
+    def eventFilter(self, obj, event):
+        """
+        监听原生窗口的事件
+        
+        - 暴露：重新暴露时立即恢复捕获
+        - UpdateRequest（requestUpdate 发起，随显示刷新到达）：提交最新一帧。
+          只重绘显示组件并消费该事件，避免整个窗口（含控制栏）随之重绘
+        """
+        if obj is self.windowHandle():
+            if event.type() == QEvent.Type.Expose:
+                self._check_occlusion()
+            elif event.type() == QEvent.Type.UpdateRequest and self._update_requested:
+                # 不支持按刷新驱动 UpdateRequest 的平台由定时器触发，这里保证每次刷新至多提交一次
+                if time.monotonic() - self._last_present_ts < self._refresh_interval() * 0.9:
+                    obj.requestUpdate()
+                    return True
+                self._update_requested = False
+                self._present_pending()
+                return True
+        return super().eventFilter(obj, event)
+    
+    def _check_occlusion(self):
+        """检测窗口是否被其他窗口完全遮挡"""
+        if self.isVisible() and not self.isMinimized():
+            self._occluded = WindowManager.is_window_occluded(int(self.winId()))
+        self._update_visibility()
+    
+    def _update_visibility(self):
+        """向捕获引擎报告画面是否有人可见"""
+        handle = self.windowHandle()
+        visible = (self.isVisible() and not self.isMinimized()
+                   and (handle is None or handle.isExposed())
+                   and not self._occluded)
+        if visible != self._reported_visible:
+            self._reported_visible = visible
+            self.engine.set_visible(visible)
+            logger.debug(f"监视窗口 '{self.window_title}' {'可见' if visible else '不可见'}")
     
     def closeEvent(self, event):
         """窗口关闭事件"""
         logger.info(f"监视窗口关闭: '{self.window_title}'")
+        self.replay_info_timer.stop()
+        self.visibility_timer.stop()
+        self._pending_image = None
+        self.current_image = None
+        if self.exporter is not None:
+            self.exporter.exported.disconnect(self.on_image_exported)
         self.engine.stop()
+        self.closed.emit()
         event.accept()
@@ -0,0 +1,391 @@
+"""
+监视面板 UI 组件
+在一个窗口中按网格显示多个捕获源，所有单元格共用一个刷新定时器和一个后备存储
+"""
+import math
+from typing import List, Optional
+
+from PyQt6.QtWidgets import QWidget, QMenu
+from PyQt6.QtGui import QImage, QPainter, QColor, QFont, QRegion
+from PyQt6.QtCore import Qt, QRect, QRectF, QTimer, QEvent, pyqtSignal
+
+from ..config import settings
+from ..utils import logger
+from .frame_viewer import BACKGROUND_COLOR
+
+
+# 单元格标题栏高度与颜色
+_HEADER_HEIGHT = 22
+_HEADER_COLOR = QColor(15, 23, 42, 190)
+_TEXT_COLOR = QColor("#E2E8F0")
+_CELL_COLOR = QColor("#020617")
+
+# 状态 -> (徽标颜色, 默认文字)
+_STATUS_BADGES = {
+    'waiting': (QColor("#64748B"), "等待首帧"),
+    'live': (QColor("#22C55E"), ""),
+    'paused': (QColor("#EAB308"), "已暂停"),
+    'error': (QColor("#EF4444"), "捕获失败"),
+}
+
+
+class _DashboardCell:
+    """面板中的一个单元格（一个捕获源）"""
+
+    __slots__ = ('engine', 'title', 'image', 'fps', 'status', 'message', 'rect', 'dirty',
+                 'slots')
+
+    def __init__(self, engine, title: str):
+        self.engine = engine
+        self.title = title
+        self.image: Optional[QImage] = None
+        self.fps = 0.0
+        self.status = 'waiting'
+        self.message = ""
+        self.rect = QRect()
+        self.dirty = True
+        # (信号, 槽)，移除单元格时断开
+        self.slots = []
+
+
+class DashboardWindow(QWidget):
+    """
+    监视面板
+
+    职责：
+    - 按网格排列任意数量的捕获源，整个面板只有一个顶层窗口、一个后备存储，
+      没有每个源各自的场景、视图和样式表
+    - 捕获源的新帧只记录到单元格并标记为脏，由统一的刷新定时器把所有脏单元格
+      合并为一个区域，在一次 paintEvent 中合成
+    - 按单元格的设备像素尺寸让引擎预缩放，稳定后绘制时不再缩放
+    - 每个单元格显示标题、实际 FPS 和状态徽标（等待 / 实时 / 暂停 / 失败）
+    - 面板隐藏或最小化时通知所有引擎降到保活帧率
+    """
+
+    # 信号定义
+    source_removed = pyqtSignal(object)  # 捕获源已移出面板（引擎或订阅已停止）
+
+    def __init__(self, parent=None, refresh_fps: Optional[int] = None,
+                 columns: Optional[int] = None, spacing: Optional[int] = None):
+        """
+        初始化监视面板
+
+        Args:
+            parent: 父窗口
+            refresh_fps: 刷新频率，默认使用配置值
+            columns: 网格列数（0 为自动），默认使用配置值
+            spacing: 单元格间距，默认使用配置值
+        """
+        super().__init__(parent)
+        self.columns = settings.dashboard.columns if columns is None else columns
+        self.spacing = settings.dashboard.spacing if spacing is None else spacing
+        self.cells: List[_DashboardCell] = []
+        self._reported_visible = None
+
+        # 统计
+        self.paint_count = 0
+
+        self.setWindowTitle("监视面板")
+        self.resize(1280, 720)
+        self.setMinimumSize(320, 180)
+        # 每次绘制都覆盖整个脏区域，省去 Qt 预先填充背景
+        self.setAttribute(Qt.WidgetAttribute.WA_OpaquePaintEvent)
+        self.setContextMenuPolicy(Qt.ContextMenuPolicy.DefaultContextMenu)
+
+        self._header_font = QFont()
+        self._header_font.setPixelSize(12)
+
+        # 所有单元格共用的刷新定时器
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setTimerType(Qt.TimerType.PreciseTimer)
+        refresh_fps = refresh_fps or settings.dashboard.refresh_fps
+        self.refresh_timer.setInterval(max(1, 1000 // max(1, refresh_fps)))
+        self.refresh_timer.timeout.connect(self._refresh)
+
+    def add_source(self, engine, title: str):
+        """
+        添加一个捕获源
+
+        Args:
+            engine: CaptureEngine 或 CaptureSubscription
+            title: 单元格标题
+        """
+        cell = _DashboardCell(engine, title)
+        connections = (
+            (engine.frame_captured, lambda image, cell=cell: self._on_frame(cell, image)),
+            (engine.fps_updated, lambda fps, cell=cell: self._on_fps(cell, fps)),
+            (engine.capture_failed, lambda message, cell=cell: self._on_failed(cell, message)),
+        )
+        for signal, slot in connections:
+            signal.connect(slot)
+            cell.slots.append((signal, slot))
+        self.cells.append(cell)
+        self._layout_cells()
+        self._update_title()
+        if self._reported_visible is not None:
+            engine.set_visible(self._reported_visible)
+        logger.info(f"监视面板: 已添加 '{title}' (共 {len(self.cells)} 个)")
+
+    def remove_source(self, engine):
+        """
+        移除一个捕获源并停止其引擎或订阅
+
+        Args:
+            engine: add_source 时传入的对象
+        """
+        cell = self._cell_for(engine)
+        if cell is None:
+            return
+        self._release(cell)
+        cell.image = None
+        self.cells.remove(cell)
+        self._layout_cells()
+        self._update_title()
+        self.update()
+        logger.info(f"监视面板: 已移除 '{cell.title}' (剩余 {len(self.cells)} 个)")
+        self.source_removed.emit(engine)
+
+    def _cell_for(self, engine) -> Optional[_DashboardCell]:
+        """查找捕获源对应的单元格"""
+        for cell in self.cells:
+            if cell.engine is engine:
+                return cell
+        return None
+
+    def _release(self, cell: _DashboardCell):
+        """断开单元格的信号并停止其引擎"""
+        for signal, slot in cell.slots:
+            try:
+                signal.disconnect(slot)
+            except TypeError:
+                pass
+        cell.slots.clear()
+        cell.engine.stop()
+
+    def retained_frame_bytes(self, engine) -> int:
+        """
+        捕获源单元格持有的帧字节数
+
+        Args:
+            engine: add_source 时传入的对象
+        """
+        cell = self._cell_for(engine)
+        if cell is None or cell.image is None:
+            return 0
+        return cell.image.sizeInBytes()
+
+    def _update_title(self):
+        """窗口标题显示捕获源数量"""
+        self.setWindowTitle(f"监视面板 ({len(self.cells)})")
+
+    # ---- 捕获源回调：只记录状态，不触发绘制 ----
+
+    def _on_frame(self, cell: _DashboardCell, image: QImage):
+        """新帧：替换单元格图像并标记为脏"""
+        cell.image = image
+        if cell.status != 'live' and not cell.engine.is_paused:
+            cell.status = 'live'
+            cell.message = ""
+        cell.dirty = True
+
+    def _on_fps(self, cell: _DashboardCell, fps: float):
+        """实际 FPS 更新"""
+        cell.fps = fps
+        cell.dirty = True
+
+    def _on_failed(self, cell: _DashboardCell, message: str):
+        """捕获失败：显示失败徽标；窗口最小化时暂停该源"""
+        cell.status = 'error'
+        cell.message = message
+        if "最小化" in message:
+            cell.engine.pause()
+            cell.message = "窗口已最小化"
+        cell.dirty = True
+
+    # ---- 刷新与绘制 ----
+
+    def _refresh(self):
+        """刷新定时器：把所有脏单元格合并为一次重绘"""
+        region = QRegion()
+        for cell in self.cells:
+            if cell.dirty:
+                cell.dirty = False
+                region += cell.rect
+        if not region.isEmpty():
+            self.update(region)
+
+    def paintEvent(self, event):
+        """在一次绘制中合成所有需要重绘的单元格"""
+        self.paint_count += 1
+        painter = QPainter(self)
+        exposed = event.region()
+
+        # 单元格之外的间隙（整窗口重绘时）
+        gaps = QRegion(exposed)
+        for cell in self.cells:
+            gaps -= QRegion(cell.rect)
+        if not gaps.isEmpty():
+            self._fill_region(painter, gaps, QColor(BACKGROUND_COLOR))
+
+        painter.setFont(self._header_font)
+        for cell in self.cells:
+            if exposed.intersects(cell.rect):
+                self._paint_cell(painter, cell)
+        painter.end()
+
+    def _paint_cell(self, painter: QPainter, cell: _DashboardCell):
+        """绘制一个单元格：画面、标题栏和状态徽标"""
+        rect = cell.rect
+        image = cell.image
+        if image is None or image.isNull():
+            painter.fillRect(rect, _CELL_COLOR)
+        else:
+            target = self._fit_rect(image, rect)
+            # 引擎已按单元格尺寸预缩放，稳定后目标矩形与图像设备尺寸一致，不再缩放
+            painter.drawImage(target, image)
+            # 等比例留下的边
+            letterbox = QRegion(rect) - QRegion(target.toAlignedRect())
+            if not letterbox.isEmpty():
+                self._fill_region(painter, letterbox, _CELL_COLOR)
+
+        header = QRect(rect.x(), rect.y(), rect.width(), _HEADER_HEIGHT)
+        painter.fillRect(header, _HEADER_COLOR)
+        color, text = _STATUS_BADGES[cell.status]
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(color)
+        painter.drawEllipse(header.x() + 7, header.y() + 7, 8, 8)
+
+        status = cell.message or text
+        if cell.status == 'live':
+            status = f"FPS: {cell.fps:.1f}"
+        painter.setPen(_TEXT_COLOR)
+        text_rect = header.adjusted(22, 0, -6, 0)
+        painter.drawText(text_rect, Qt.AlignmentFlag.AlignVCenter | Qt.AlignmentFlag.AlignRight, status)
+        status_width = painter.fontMetrics().horizontalAdvance(status) + 8
+        title = painter.fontMetrics().elidedText(cell.title, Qt.TextElideMode.ElideRight,
+                                                 max(0, text_rect.width() - status_width))
+        painter.drawText(text_rect, Qt.AlignmentFlag.AlignVCenter | Qt.AlignmentFlag.AlignLeft, title)
+
+    @staticmethod
+    def _fill_region(painter: QPainter, region: QRegion, color: QColor):
+        """填充一个区域"""
+        painter.setClipRegion(region)
+        painter.fillRect(region.boundingRect(), color)
+        painter.setClipping(False)
+
+    def _fit_rect(self, image: QImage, rect: QRect) -> QRectF:
+        """图像在单元格中等比例居中的逻辑坐标矩形"""
+        ratio = self.devicePixelRatioF()
+        width = image.width() / ratio
+        height = image.height() / ratio
+        # 图像大于单元格时缩小；小于单元格时（源区域本身较小）原尺寸居中
+        scale = min(rect.width() / width, rect.height() / height)
+        if scale < 1.0:
+            width *= scale
+            height *= scale
+        return QRectF(rect.x() + (rect.width() - width) / 2,
+                      rect.y() + (rect.height() - height) / 2, width, height)
+
+    # ---- 布局 ----
+
+    def _grid_shape(self):
+        """网格的 (列数, 行数)"""
+        count = len(self.cells)
+        if count == 0:
+            return 0, 0
+        columns = self.columns if self.columns > 0 else math.ceil(math.sqrt(count))
+        columns = min(columns, count)
+        return columns, math.ceil(count / columns)
+
+    def _layout_cells(self):
+        """重新计算单元格位置，并按单元格尺寸让引擎预缩放"""
+        columns, rows = self._grid_shape()
+        if columns == 0:
+            return
+        spacing = self.spacing
+        cell_width = max(1, (self.width() - spacing * (columns + 1)) // columns)
+        cell_height = max(1, (self.height() - spacing * (rows + 1)) // rows)
+        ratio = self.devicePixelRatioF()
+        for index, cell in enumerate(self.cells):
+            row, column = divmod(index, columns)
+            rect = QRect(spacing + column * (cell_width + spacing),
+                         spacing + row * (cell_height + spacing), cell_width, cell_height)
+            if rect != cell.rect:
+                cell.rect = rect
+                cell.engine.set_target_size(int(cell_width * ratio), int(cell_height * ratio))
+            cell.dirty = True
+
+    def resizeEvent(self, event):
+        """尺寸改变时重新布局"""
+        super().resizeEvent(event)
+        self._layout_cells()
+
+    # ---- 交互 ----
+
+    def contextMenuEvent(self, event):
+        """单元格右键菜单：暂停 / 继续、移除"""
+        cell = next((c for c in self.cells if c.rect.contains(event.pos())), None)
+        if cell is None:
+            return
+        menu = QMenu(self)
+        paused = cell.engine.is_paused
+        toggle = menu.addAction("▶ 继续" if paused else "⏸ 暂停")
+        remove = menu.addAction("✕ 移出面板")
+        chosen = menu.exec(event.globalPos())
+        if chosen is toggle:
+            self._toggle_pause(cell)
+        elif chosen is remove:
+            self.remove_source(cell.engine)
+
+    def mouseDoubleClickEvent(self, event):
+        """双击单元格切换暂停 / 继续"""
+        cell = next((c for c in self.cells if c.rect.contains(event.position().toPoint())), None)
+        if cell is not None:
+            self._toggle_pause(cell)
+
+    def _toggle_pause(self, cell: _DashboardCell):
+        """切换单元格的暂停状态"""
+        if cell.engine.is_paused:
+            cell.engine.resume()
+            cell.status = 'live' if cell.image is not None else 'waiting'
+            cell.message = ""
+        else:
+            cell.engine.pause()
+            cell.status = 'paused'
+        cell.dirty = True
+
+    # ---- 可见性 ----
+
+    def showEvent(self, event):
+        """窗口显示事件"""
+        super().showEvent(event)
+        self.refresh_timer.start()
+        self._update_visibility()
+
+    def hideEvent(self, event):
+        """窗口隐藏事件"""
+        super().hideEvent(event)
+        self.refresh_timer.stop()
+        self._update_visibility()
+
+    def changeEvent(self, event):
+        """窗口状态改变事件（最小化 / 还原）"""
+        super().changeEvent(event)
+        if event.type() == QEvent.Type.WindowStateChange:
+            self._update_visibility()
+
+    def _update_visibility(self):
+        """向所有引擎报告面板是否可见"""
+        visible = self.isVisible() and not self.isMinimized()
+        if visible != self._reported_visible:
+            self._reported_visible = visible
+            for cell in self.cells:
+                cell.engine.set_visible(visible)
+
+    def closeEvent(self, event):
+        """关闭面板时移除所有捕获源"""
+        logger.info(f"监视面板关闭 ({len(self.cells)} 个捕获源)")
+        self.refresh_timer.stop()
+        for cell in list(self.cells):
+            self.remove_source(cell.engine)
+        event.accept()
@@ -0,0 +1,335 @@
+"""
+帧显示组件
+监视窗口的画面显示部分，提供光栅（QGraphicsView）和 OpenGL 两种实现
+"""
+import math
+
+from PyQt6.QtWidgets import QGraphicsView, QGraphicsScene, QGraphicsPixmapItem, QFrame
+from PyQt6.QtGui import QPixmap, QImage, QColor
+from PyQt6.QtCore import Qt, QPoint, pyqtSignal
+
+from ..utils import logger
+from .tile_cache import TileCache
+
+
+class ViewerKind:
+    """显示组件类型"""
+    RASTER = "raster"  # QGraphicsView，CPU 缩放（配合引擎预缩放）
+    OPENGL = "opengl"  # QOpenGLWidget，纹理流式上传，GPU 缩放
+
+
+class PresentMode:
+    """画面提交方式"""
+    IMMEDIATE = "immediate"  # 收到帧立即显示
+    VSYNC = "vsync"          # 只保留最新一帧，在窗口的 UpdateRequest（随显示刷新）中提交
+
+
+# 视图背景色
+BACKGROUND_COLOR = "#0F172A"
+
+# 放大查看的缩放级别（每个源像素对应的逻辑像素数）：1/8 ~ 32 倍，每级约 1.19 倍
+ZOOM_LEVELS = tuple(2 ** (step / 4) for step in range(-12, 21))
+
+
+class RasterFrameViewer(QGraphicsView):
+    """
+    光栅帧显示组件
+
+    场景中只有一个常驻的图像项，每帧只替换其图像，等比例缩放适应视图。
+    显示帧由引擎按视图尺寸预缩放（scales_on_gpu 为 False）。
+
+    滚轮放大后进入放大查看模式（is_zoomed 为 True）：隐藏图像项，由 TileCache
+    按瓦片缩放并绘制视口内的部分，左键拖动平移，双击恢复适应窗口。
+    放大时需要原始分辨率的帧，zoom_changed 信号通知监视窗口切换引擎的预缩放。
+    """
+
+    scales_on_gpu = False
+
+    # 信号定义
+    zoom_changed = pyqtSignal(float)  # 缩放比例改变（0 表示适应窗口）
+
+    def __init__(self, parent=None):
+        """
+        初始化显示组件
+
+        Args:
+            parent: 父组件
+        """
+        self.scene = QGraphicsScene()
+        self.scene.setItemIndexMethod(QGraphicsScene.ItemIndexMethod.NoIndex)
+        self.pixmap_item = QGraphicsPixmapItem()
+        self.scene.addItem(self.pixmap_item)
+        super().__init__(self.scene, parent)
+
+        self.current_pixmap = None
+        self.current_image = None
+
+        # 放大查看状态：zoom 为每个源像素对应的逻辑像素数，0 表示适应窗口；
+        # offset 为视口左上角在放大后图像中的设备像素坐标
+        self.zoom = 0.0
+        self.source_size = None
+        self.tile_cache = TileCache()
+        self._offset = QPoint()
+        self._drag_start = None
+
+        # 背景用画刷而不是样式表设置，避免每帧经过样式表绘制视口背景
+        self.setBackgroundBrush(QColor(BACKGROUND_COLOR))
+        self.setFrameShape(QFrame.Shape.NoFrame)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        self.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        # 设置等比例缩放模式
+        self.setTransformationAnchor(QGraphicsView.ViewportAnchor.AnchorViewCenter)
+        self.setResizeAnchor(QGraphicsView.ViewportAnchor.AnchorViewCenter)
+        # 图像项覆盖整个视图：整视口重绘，省去脏区域计算和画笔状态保存
+        self.setViewportUpdateMode(QGraphicsView.ViewportUpdateMode.FullViewportUpdate)
+        # 每帧内容都会变化，背景缓存只会增加一次额外的位图绘制
+        self.setCacheMode(QGraphicsView.CacheModeFlag.CacheNone)
+        self.setOptimizationFlags(
+            QGraphicsView.OptimizationFlag.DontSavePainterState
+            | QGraphicsView.OptimizationFlag.DontAdjustForAntialiasing
+        )
+
+    @property
+    def is_zoomed(self) -> bool:
+        """是否处于放大查看模式"""
+        return self.zoom > 0
+
+    def has_image(self) -> bool:
+        """是否已有显示内容"""
+        return self.current_image is not None and not self.current_image.isNull()
+
+    def set_source_size(self, width: int, height: int):
+        """
+        设置源图像的原始尺寸
+
+        放大比例按原始像素计算；预缩放帧与原始分辨率帧交替时画面位置保持不变。
+
+        Args:
+            width: 原始宽度
+            height: 原始高度
+        """
+        self.source_size = (width, height)
+
+    def set_image(self, image: QImage):
+        """
+        显示图像
+
+        Args:
+            image: 要显示的图像（已归一化为显示格式）
+        """
+        self.current_image = image
+        if self.is_zoomed:
+            # 放大模式只更新瓦片缓存，瓦片在绘制时按源像素校验
+            self.tile_cache.set_image(image)
+            self.viewport().update()
+            return
+
+        size_changed = (self.current_pixmap is None
+                        or self.current_pixmap.size() != image.size())
+        # 帧已归一化为显示格式，fromImage 直接共享图像内存，不做拷贝
+        self.current_pixmap = QPixmap.fromImage(image)
+        self.pixmap_item.setPixmap(self.current_pixmap)
+
+        # 尺寸不变时场景范围和视图变换都无需更新；
+        # 预缩放帧与原始分辨率帧尺寸不同，切换时重新适配视图
+        if size_changed:
+            self.setSceneRect(0, 0, image.width(), image.height())
+            self.fit_to_view()
+
+    def fit_to_view(self):
+        """等比例缩放图像以适应视图"""
+        if self.is_zoomed:
+            self._clamp_offset()
+            self.viewport().update()
+        elif self.current_pixmap is not None and not self.current_pixmap.isNull():
+            self.fitInView(self.scene.sceneRect(), Qt.AspectRatioMode.KeepAspectRatio)
+
+    def reset_zoom(self):
+        """退出放大查看，恢复适应窗口"""
+        if not self.is_zoomed:
+            return
+        self.zoom = 0.0
+        self.tile_cache.clear()
+        self.unsetCursor()
+        self.pixmap_item.show()
+        self.current_pixmap = None
+        if self.current_image is not None:
+            self.set_image(self.current_image)
+        self.zoom_changed.emit(0.0)
+
+    def set_zoom(self, zoom: float, anchor: QPoint = None):
+        """
+        设置放大比例
+
+        Args:
+            zoom: 每个源像素对应的逻辑像素数；不大于适应窗口的比例时恢复适应窗口
+            anchor: 缩放时保持不动的视口坐标（默认视口中心）
+        """
+        if not self.has_image():
+            return
+        if zoom <= self._fit_zoom():
+            self.reset_zoom()
+            return
+        if anchor is None:
+            anchor = self.viewport().rect().center()
+
+        ratio = self.viewport().devicePixelRatioF()
+        anchor_x, anchor_y = anchor.x() * ratio, anchor.y() * ratio
+        if self.is_zoomed:
+            old_scale = self.zoom * ratio
+            source_x = (self._offset.x() + anchor_x) / old_scale
+            source_y = (self._offset.y() + anchor_y) / old_scale
+        else:
+            # 从适应窗口进入：按图像项当前的显示位置换算锚点下的源像素
+            scene_point = self.mapToScene(anchor)
+            image_scale = self._source_width() / self.current_image.width()
+            source_x = scene_point.x() * image_scale
+            source_y = scene_point.y() * image_scale
+            self.pixmap_item.hide()
+            self.setCursor(Qt.CursorShape.OpenHandCursor)
+
+        self.zoom = zoom
+        scale = zoom * ratio
+        self._offset = QPoint(round(source_x * scale - anchor_x), round(source_y * scale - anchor_y))
+        self._clamp_offset()
+        self.tile_cache.set_image(self.current_image)
+        self.viewport().update()
+        self.zoom_changed.emit(zoom)
+
+    def _source_width(self) -> int:
+        """原始宽度（未设置时为当前图像宽度）"""
+        return self.source_size[0] if self.source_size else self.current_image.width()
+
+    def _fit_zoom(self) -> float:
+        """适应窗口时的缩放比例"""
+        width = self._source_width()
+        height = width * self.current_image.height() / self.current_image.width()
+        viewport = self.viewport()
+        return min(viewport.width() / width, viewport.height() / height)
+
+    def _device_scale(self) -> float:
+        """当前帧像素到视口设备像素的缩放比例"""
+        ratio = self.viewport().devicePixelRatioF()
+        return self.zoom * ratio * self._source_width() / self.current_image.width()
+
+    def _clamp_offset(self):
+        """限制平移范围：图像大于视口时不露出边外，小于视口时居中"""
+        ratio = self.viewport().devicePixelRatioF()
+        scale = self.zoom * ratio
+        width = self._source_width() * scale
+        height = width * self.current_image.height() / self.current_image.width()
+        view_width = self.viewport().width() * ratio
+        view_height = self.viewport().height() * ratio
+
+        def clamp(value, content, view):
+            if content <= view:
+                return -round((view - content) / 2)
+            return max(0, min(value, math.ceil(content - view)))
+
+        self._offset = QPoint(clamp(self._offset.x(), width, view_width),
+                              clamp(self._offset.y(), height, view_height))
+
+    def drawForeground(self, painter, rect):
+        """放大模式下在视口坐标系中绘制可见瓦片"""
+        if not self.is_zoomed or not self.has_image():
+            return
+        painter.resetTransform()
+        viewport = self.viewport()
+        ratio = viewport.devicePixelRatioF()
+        self.tile_cache.paint(painter, self._device_scale(), self._offset.x(), self._offset.y(),
+                              math.ceil(viewport.width() * ratio),
+                              math.ceil(viewport.height() * ratio), ratio)
+
+    def wheelEvent(self, event):
+        """滚轮缩放，以光标位置为锚点"""
+        if not self.has_image():
+            return
+        steps = event.angleDelta().y() // 120
+        if steps == 0:
+            return
+        current = self.zoom if self.is_zoomed else self._fit_zoom()
+        if steps > 0:
+            larger = [level for level in ZOOM_LEVELS if level > current * 1.001]
+            if not larger:
+                return
+            zoom = larger[min(steps, len(larger)) - 1]
+        else:
+            smaller = [level for level in ZOOM_LEVELS if level < current * 0.999]
+            zoom = smaller[max(steps, -len(smaller))] if smaller else 0.0
+        self.set_zoom(zoom, event.position().toPoint())
+        event.accept()
+
+    def mousePressEvent(self, event):
+        """放大模式下左键开始拖动平移"""
+        if self.is_zoomed and event.button() == Qt.MouseButton.LeftButton:
+            self._drag_start = (event.position().toPoint(), QPoint(self._offset))
+            self.setCursor(Qt.CursorShape.ClosedHandCursor)
+            event.accept()
+            return
+        super().mousePressEvent(event)
+
+    def mouseMoveEvent(self, event):
+        """拖动平移"""
+        if self._drag_start is not None:
+            start, offset = self._drag_start
+            ratio = self.viewport().devicePixelRatioF()
+            delta = event.position().toPoint() - start
+            self._offset = QPoint(offset.x() - round(delta.x() * ratio),
+                                  offset.y() - round(delta.y() * ratio))
+            self._clamp_offset()
+            self.viewport().update()
+            event.accept()
+            return
+        super().mouseMoveEvent(event)
+
+    def mouseReleaseEvent(self, event):
+        """结束拖动"""
+        if self._drag_start is not None and event.button() == Qt.MouseButton.LeftButton:
+            self._drag_start = None
+            self.setCursor(Qt.CursorShape.OpenHandCursor)
+            event.accept()
+            return
+        super().mouseReleaseEvent(event)
+
+    def mouseDoubleClickEvent(self, event):
+        """双击恢复适应窗口"""
+        if self.is_zoomed:
+            self.reset_zoom()
+            event.accept()
+            return
+        super().mouseDoubleClickEvent(event)
+
+    def resizeEvent(self, event):
+        """尺寸改变时重新适配"""
+        super().resizeEvent(event)
+        self.fit_to_view()
+
+
+def opengl_available() -> bool:
+    """当前环境能否使用 OpenGL 显示组件"""
+    try:
+        from .gl_viewer import GLFrameViewer
+    except ImportError:  # PyQt6 未包含 QtOpenGL 模块
+        return False
+    return GLFrameViewer.is_supported()
+
+
+def create_frame_viewer(kind: str, parent=None):
+    """
+    创建帧显示组件
+
+    Args:
+        kind: 显示组件类型（ViewerKind）
+        parent: 父组件
+
+    Returns:
+        显示组件；OpenGL 不可用时回退为光栅组件
+    """
+    if kind == ViewerKind.OPENGL:
+        if opengl_available():
+            from .gl_viewer import GLFrameViewer
+            return GLFrameViewer(parent)
+        logger.warning("OpenGL 不可用，回退到光栅显示")
+    elif kind != ViewerKind.RASTER:
+        raise ValueError(f"不支持的显示组件类型: {kind}")
+    return RasterFrameViewer(parent)
@@ -0,0 +1,260 @@
+"""
+OpenGL 帧显示组件
+将帧流式上传到常驻纹理，由 GPU 完成等比例缩放
+"""
+import ctypes
+from typing import Optional
+
+from PyQt6 import sip
+from PyQt6.QtGui import QImage, QColor, QVector2D, QOpenGLContext
+from PyQt6.QtOpenGL import (QOpenGLBuffer, QOpenGLTexture, QOpenGLShaderProgram, QOpenGLShader,
+                            QOpenGLPixelTransferOptions, QOpenGLVersionProfile,
+                            QOpenGLVersionFunctionsFactory)
+from PyQt6.QtOpenGLWidgets import QOpenGLWidget
+
+from ..utils import logger
+from .frame_viewer import BACKGROUND_COLOR
+
+
+GL_COLOR_BUFFER_BIT = 0x4000
+GL_TRIANGLE_STRIP = 0x0005
+
+# 顶点着色器：全屏四边形，纹理坐标由顶点位置推出（图像首行在上）
+_VERTEX_SHADER = """
+attribute highp vec2 position;
+varying highp vec2 uv;
+void main() {
+    uv = vec2(position.x * 0.5 + 0.5, 0.5 - position.y * 0.5);
+    gl_Position = vec4(position, 0.0, 1.0);
+}
+"""
+
+# 片段着色器：忽略 Alpha，输出不透明像素
+_FRAGMENT_SHADER = """
+varying highp vec2 uv;
+uniform sampler2D frame;
+void main() {
+    gl_FragColor = vec4(texture2D(frame, uv).rgb, 1.0);
+}
+"""
+
+_QUAD = [QVector2D(-1.0, -1.0), QVector2D(1.0, -1.0), QVector2D(-1.0, 1.0), QVector2D(1.0, 1.0)]
+
+# QImage 格式 -> (源像素格式, 源数据类型, 每像素字节数)；32 位格式内存字节序为 BGRA，
+# 紧凑格式（RGB565、灰度）按原格式上传，由驱动展开；Indexed8 在上传前转为 RGB32
+_UINT8 = QOpenGLTexture.PixelType.UInt8
+_UPLOAD_FORMATS = {
+    QImage.Format.Format_RGB32: (QOpenGLTexture.PixelFormat.BGRA, _UINT8, 4),
+    QImage.Format.Format_ARGB32: (QOpenGLTexture.PixelFormat.BGRA, _UINT8, 4),
+    QImage.Format.Format_ARGB32_Premultiplied: (QOpenGLTexture.PixelFormat.BGRA, _UINT8, 4),
+    QImage.Format.Format_RGB888: (QOpenGLTexture.PixelFormat.RGB, _UINT8, 3),
+    QImage.Format.Format_RGB16: (QOpenGLTexture.PixelFormat.RGB,
+                                 QOpenGLTexture.PixelType.UInt16_R5G6B5, 2),
+    QImage.Format.Format_Grayscale8: (QOpenGLTexture.PixelFormat.Luminance, _UINT8, 1),
+}
+
+
+class GLFrameViewer(QOpenGLWidget):
+    """
+    OpenGL 帧显示组件
+
+    职责：
+    - 只保留最新一帧，在 paintGL 中上传，避免为看不到的帧上传纹理
+    - 纹理常驻，尺寸不变时只做 glTexSubImage2D 子图像更新
+    - 支持像素缓冲对象（PBO）时经 PBO 上传，驱动可异步传输
+    - 由 GPU 完成等比例缩放（scales_on_gpu 为 True，引擎无需预缩放）
+
+    只使用 OpenGL 2.0 功能（PBO 需要 2.1 或 GL_ARB_pixel_buffer_object），
+    在 Mesa 软件光栅器（llvmpipe，Windows 上为 Qt 附带的 opengl32sw）上同样可用。
+    """
+
+    scales_on_gpu = True
+    # 放大查看（瓦片缓存）只在光栅显示组件中提供
+    is_zoomed = False
+
+    _supported: Optional[bool] = None
+
+    def __init__(self, parent=None):
+        """
+        初始化显示组件
+
+        Args:
+            parent: 父组件
+        """
+        super().__init__(parent)
+
+        self._pending: Optional[QImage] = None
+        self._frame_size = None
+
+        # GL 资源（initializeGL 中创建）
+        self._gl = None
+        self._program: Optional[QOpenGLShaderProgram] = None
+        self._texture: Optional[QOpenGLTexture] = None
+        self._texture_format = None
+        self._pbo: Optional[QOpenGLBuffer] = None
+
+        # 统计
+        self.uploaded_frames = 0
+
+    @classmethod
+    def is_supported(cls) -> bool:
+        """当前平台能否创建 OpenGL 上下文（结果缓存）"""
+        if cls._supported is None:
+            context = QOpenGLContext()
+            cls._supported = context.create() and not context.isOpenGLES()
+        return cls._supported
+
+    def has_image(self) -> bool:
+        """是否已有显示内容"""
+        return self._frame_size is not None
+
+    def set_image(self, image: QImage):
+        """
+        显示图像（只保留最新一帧，下次重绘时上传）
+
+        Args:
+            image: 要显示的图像
+        """
+        if image.format() not in _UPLOAD_FORMATS:
+            image = image.convertToFormat(QImage.Format.Format_RGB32)
+        self._pending = image
+        self._frame_size = (image.width(), image.height())
+        self.update()
+
+    def fit_to_view(self):
+        """等比例缩放图像以适应视图（GPU 缩放，重绘即可）"""
+        self.update()
+
+    def initializeGL(self):
+        """创建着色器、像素缓冲对象，并确定上传路径"""
+        context = self.context()
+        profile = QOpenGLVersionProfile()
+        profile.setVersion(2, 0)
+        self._gl = QOpenGLVersionFunctionsFactory.get(profile, context)
+        if self._gl is None:
+            logger.error("OpenGL 2.0 函数不可用，无法显示画面")
+            return
+
+        self._program = QOpenGLShaderProgram(self)
+        self._program.addShaderFromSourceCode(QOpenGLShader.ShaderTypeBit.Vertex, _VERTEX_SHADER)
+        self._program.addShaderFromSourceCode(QOpenGLShader.ShaderTypeBit.Fragment, _FRAGMENT_SHADER)
+        self._program.bindAttributeLocation("position", 0)
+        if not self._program.link():
+            logger.error(f"着色器链接失败: {self._program.log()}")
+            self._program = None
+            return
+
+        version = context.format().version()
+        if version >= (2, 1) or context.hasExtension(b"GL_ARB_pixel_buffer_object"):
+            self._pbo = QOpenGLBuffer(QOpenGLBuffer.Type.PixelUnpackBuffer)
+            self._pbo.setUsagePattern(QOpenGLBuffer.UsagePattern.StreamDraw)
+            if not self._pbo.create():
+                self._pbo = None
+
+        context.aboutToBeDestroyed.connect(self._release_gl)
+        logger.info(f"OpenGL 显示已初始化: {version[0]}.{version[1]}, "
+                    f"上传路径: {'PBO' if self._pbo else 'glTexSubImage2D'}")
+
+    def paintGL(self):
+        """上传最新帧并绘制等比例缩放的四边形"""
+        gl = self._gl
+        if gl is None or self._program is None:
+            return
+
+        background = QColor(BACKGROUND_COLOR)
+        gl.glClearColor(background.redF(), background.greenF(), background.blueF(), 1.0)
+        gl.glClear(GL_COLOR_BUFFER_BIT)
+
+        if self._pending is not None:
+            self._upload(self._pending)
+            self._pending = None
+        if self._texture is None:
+            return
+
+        # 在设备像素坐标中计算居中、保持宽高比的视口
+        ratio = self.devicePixelRatioF()
+        view_width = int(self.width() * ratio)
+        view_height = int(self.height() * ratio)
+        frame_width, frame_height = self._texture.width(), self._texture.height()
+        scale = min(view_width / frame_width, view_height / frame_height)
+        width = max(1, int(frame_width * scale))
+        height = max(1, int(frame_height * scale))
+        gl.glViewport((view_width - width) // 2, (view_height - height) // 2, width, height)
+
+        self._program.bind()
+        self._texture.bind(0)
+        self._program.setUniformValue("frame", 0)
+        self._program.enableAttributeArray(0)
+        self._program.setAttributeArray(0, _QUAD)
+        gl.glDrawArrays(GL_TRIANGLE_STRIP, 0, 4)
+        self._program.disableAttributeArray(0)
+        self._texture.release()
+        self._program.release()
+
+    def _upload(self, image: QImage):
+        """
+        上传一帧到常驻纹理
+
+        Args:
+            image: _UPLOAD_FORMATS 中格式的图像
+        """
+        width, height = image.width(), image.height()
+        source_format, source_type, bytes_per_pixel = _UPLOAD_FORMATS[image.format()]
+
+        # 尺寸或格式变化时才重新分配纹理存储
+        texture = self._texture
+        if (texture is None or texture.width() != width or texture.height() != height
+                or self._texture_format != (source_format, source_type)):
+            if texture is not None:
+                texture.destroy()
+            texture = QOpenGLTexture(QOpenGLTexture.Target.Target2D)
+            texture.setFormat(QOpenGLTexture.TextureFormat.RGBA8_UNorm)
+            texture.setSize(width, height)
+            texture.setMinMagFilters(QOpenGLTexture.Filter.Linear, QOpenGLTexture.Filter.Linear)
+            texture.setWrapMode(QOpenGLTexture.WrapMode.ClampToEdge)
+            texture.allocateStorage(source_format, source_type)
+            self._texture = texture
+            self._texture_format = (source_format, source_type)
+
+        # 行跨度可能大于 W*C（裁剪视图、RGB888 行对齐）
+        bytes_per_line = image.bytesPerLine()
+        options = QOpenGLPixelTransferOptions()
+        options.setRowLength(bytes_per_line // bytes_per_pixel)
+        options.setAlignment(4 if bytes_per_line % 4 == 0 else 1)
+
+        pixels = image.constBits()
+        size = image.sizeInBytes()
+        if self._pbo is not None:
+            # 重新分配（orphan）缓冲区，驱动不必等待上一帧传输完成
+            self._pbo.bind()
+            self._pbo.allocate(size)
+            mapped = self._pbo.map(QOpenGLBuffer.Access.WriteOnly)
+            if mapped is not None and int(mapped):
+                ctypes.memmove(int(mapped), int(pixels), size)
+                self._pbo.unmap()
+                # 绑定 PBO 时数据指针为缓冲区内偏移
+                texture.setData(0, 0, 0, width, height, 1, source_format, source_type,
+                                sip.voidptr(0), options)
+                self._pbo.release()
+                self.uploaded_frames += 1
+                return
+            self._pbo.release()
+            logger.warning("PBO 映射失败，改用直接上传")
+            self._pbo.destroy()
+            self._pbo = None
+
+        texture.setData(0, 0, 0, width, height, 1, source_format, source_type, pixels, options)
+        self.uploaded_frames += 1
+
+    def _release_gl(self):
+        """上下文销毁前释放 GL 资源"""
+        self.makeCurrent()
+        if self._texture is not None:
+            self._texture.destroy()
+            self._texture = None
+        if self._pbo is not None:
+            self._pbo.destroy()
+            self._pbo = None
+        self._program = None
+        self._gl = None
+        self.doneCurrent()
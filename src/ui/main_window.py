@@ -5,15 +5,22 @@
 import time
 from PyQt6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
                              QLabel, QComboBox, QPushButton, QLineEdit, 
-                             QMessageBox, QApplication, QDialog, QGroupBox)
-from PyQt6.QtCore import Qt, QPropertyAnimation, QEasingCurve
+                             QMessageBox, QApplication, QDialog, QGroupBox, QCheckBox)
+from PyQt6.QtCore import Qt, QPropertyAnimation, QEasingCurve, QTimer
 from PyQt6.QtGui import QFont, QIcon, QPixmap
 
 from ..config import settings
-from ..utils import logger, WindowManager, ScreenCapture
-from ..core import CaptureEngine
+from ..utils import logger, WindowManager, ScreenCapture, safe_filename
+from ..core import (CaptureSourceRegistry, MotionDetector, PixelWatcher, parse_rules, FrameIndexer,
+                    index_path, VideoSink, ImageExporter, PixelFormat, ThumbnailLoader, WindowPoller,
+                    WindowSearchIndex, MetricsExporter, HAS_NUMPY)
 from .region_selector import RegionSelector
 from .capture_window import CaptureWindow
+from .dashboard import DashboardWindow
+from .monitor_registry import MonitorRegistry
+from .window_picker import WindowPickerDialog
+from .window_list_model import WindowListModel
+from .window_search_box import WindowSearchBox
 from .styles import StyleSheet
 
 
@@ -33,8 +40,83 @@ class MainWindow(QMainWindow):
         """初始化主窗口"""
         super().__init__()
         
-        # 保存监视窗口引用（防止垃圾回收）
-        self.capture_windows = []
+        # 运行中的帧源及其窗口（关闭时释放并确认已回收）
+        self.monitors = MonitorRegistry()
+        self.monitors.counts_changed.connect(self._update_monitor_counts)
+        
+        # 监视面板（单窗口网格显示多个捕获源，首次使用时创建）
+        self.dashboard = None
+        
+        # 每个帧源关闭时要执行的清理（id(engine) -> [callable]）
+        self._monitor_cleanups = {}
+        
+        # 共享捕获源（同一窗口的多个监视窗口共用一个捕获引擎）
+        self.capture_sources = CaptureSourceRegistry()
+        
+        # 画面变化检测（需要 numpy）
+        self.motion_detector = None
+        if settings.motion.enabled:
+            if HAS_NUMPY:
+                self.motion_detector = MotionDetector.from_settings(settings.motion)
+            else:
+                logger.warning("画面变化检测需要安装 numpy，已禁用")
+        
+        # 像素监视规则（需要 numpy）
+        self.pixel_watcher = None
+        self.watch_rules = []
+        if settings.watch.enabled and settings.watch.rules:
+            if not HAS_NUMPY:
+                logger.warning("像素监视需要安装 numpy，已禁用")
+            else:
+                try:
+                    self.watch_rules = parse_rules(settings.watch.rules)
+                    self.pixel_watcher = PixelWatcher.from_settings(settings.watch)
+                except ValueError as e:
+                    logger.error(f"像素监视规则无效，已禁用: {e}")
+        
+        # 感知哈希帧索引（需要 numpy）
+        self.frame_indexer = None
+        if settings.index.enabled:
+            if HAS_NUMPY:
+                self.frame_indexer = FrameIndexer.from_settings(settings.index)
+            else:
+                logger.warning("帧索引需要安装 numpy，已禁用")
+        
+        # 视频流输出（目标 -> VideoSink，需要 numpy）
+        self.video_sinks = {}
+        
+        # 快照与定时导出（所有监视窗口共用一个编码线程池，需要 numpy）
+        self.image_exporter = None
+        if settings.export.enabled:
+            if not HAS_NUMPY:
+                logger.warning("快照与定时导出需要安装 numpy，已禁用")
+            else:
+                try:
+                    self.image_exporter = ImageExporter.from_settings(settings.export)
+                except ValueError as e:
+                    logger.error(f"导出配置无效，已禁用: {e}")
+        
+        # 指标导出（Prometheus 文本格式，本机 HTTP 端点或定期重写的文本文件）
+        self.metrics_exporter = None
+        if settings.metrics.enabled:
+            try:
+                self.metrics_exporter = MetricsExporter.from_settings(settings.metrics)
+                self.metrics_exporter.start()
+            except (OSError, ValueError) as e:
+                self.metrics_exporter = None
+                logger.error(f"指标导出无法启动: {e}")
+        
+        # 窗口缩略图（后台捕获，缓存在多次打开选择器之间共享）
+        self.thumbnail_loader = ThumbnailLoader.from_settings(settings.thumbnails)
+        
+        # 窗口列表（后台轮询，按变化增量更新下拉框）
+        self.window_model = WindowListModel(self)
+        self.window_poller = WindowPoller(settings.ui.window_poll_ms)
+        self.window_poller.windows_changed.connect(self.window_model.apply_diff)
+        
+        # 窗口搜索索引（同样按变化增量维护，启动过监视的目标排在最前）
+        self.window_index = WindowSearchIndex()
+        self.window_poller.windows_changed.connect(self.window_index.apply_diff)
         
         # 选择的区域（None 表示整个窗口）
         self.selected_region = None
@@ -45,6 +127,9 @@ class MainWindow(QMainWindow):
         self._init_ui()
         self._setup_animations()
         
+        # 第一次枚举在轮询线程中进行，不阻塞启动
+        self.window_poller.start()
+        
         logger.info("现代化主窗口已初始化")
     
     def _apply_theme(self):
@@ -106,6 +191,19 @@ class MainWindow(QMainWindow):
         button_layout = self._create_action_buttons()
         main_layout.addLayout(button_layout)
         
+        # ===== 运行统计 =====
+        self.monitor_counts_label = QLabel()
+        self.monitor_counts_label.setObjectName("captionLabel")
+        main_layout.addWidget(self.monitor_counts_label)
+        self._update_monitor_counts(self.monitors.counts())
+        
+        # 帧占用随画面变化，定时刷新
+        self.monitor_counts_timer = QTimer(self)
+        self.monitor_counts_timer.setInterval(2000)
+        self.monitor_counts_timer.timeout.connect(
+            lambda: self._update_monitor_counts(self.monitors.counts()))
+        self.monitor_counts_timer.start()
+        
         # ===== 底部提示 =====
         footer = self._create_footer()
         main_layout.addWidget(footer)
@@ -144,6 +242,11 @@ class MainWindow(QMainWindow):
         info.setObjectName("captionLabel")
         layout.addWidget(info)
         
+        # 窗口搜索（窗口很多时按标题、进程名或类名查找）
+        self.window_search = WindowSearchBox(self.window_index, settings.ui.window_search_results)
+        self.window_search.window_chosen.connect(self._select_window)
+        layout.addWidget(self.window_search)
+        
         # 窗口下拉框
         dropdown_layout = QHBoxLayout()
         
@@ -153,7 +256,7 @@ class MainWindow(QMainWindow):
         
         self.combo = QComboBox()
         self.combo.setMinimumHeight(36)
-        self.refresh_windows()
+        self.combo.setModel(self.window_model)
         dropdown_layout.addWidget(self.combo)
         
         layout.addLayout(dropdown_layout)
@@ -164,7 +267,12 @@ class MainWindow(QMainWindow):
         self.refresh_btn.setObjectName("secondaryBtn")
         self.refresh_btn.setFixedHeight(32)
         self.refresh_btn.clicked.connect(self.refresh_windows)
+        self.picker_btn = QPushButton("🖼 缩略图选择")
+        self.picker_btn.setObjectName("secondaryBtn")
+        self.picker_btn.setFixedHeight(32)
+        self.picker_btn.clicked.connect(self.open_window_picker)
         refresh_btn_layout.addStretch()
+        refresh_btn_layout.addWidget(self.picker_btn, 0, Qt.AlignmentFlag.AlignRight)
         refresh_btn_layout.addWidget(self.refresh_btn, 0, Qt.AlignmentFlag.AlignRight)
         
         layout.addLayout(refresh_btn_layout)
@@ -237,6 +345,36 @@ class MainWindow(QMainWindow):
         fps_layout.addStretch()
         layout.addLayout(fps_layout)
         
+        # 像素格式（每个监视窗口单独选择）
+        format_layout = QHBoxLayout()
+        
+        format_label = QLabel("像素格式:")
+        format_label.setFixedWidth(70)
+        format_layout.addWidget(format_label)
+        
+        self.format_combo = QComboBox()
+        for name, pixel_format in (("32 位彩色", PixelFormat.RGB32),
+                                   ("24 位彩色", PixelFormat.RGB888),
+                                   ("16 位彩色 (RGB565)", PixelFormat.RGB565),
+                                   ("8 位调色板", PixelFormat.INDEXED8),
+                                   ("8 位灰度", PixelFormat.GRAYSCALE8)):
+            self.format_combo.addItem(name, pixel_format)
+        # 配置的默认格式不在列表中（如 argb32_premultiplied）时追加
+        if self.format_combo.findData(settings.capture.pixel_format) < 0:
+            self.format_combo.addItem(settings.capture.pixel_format, settings.capture.pixel_format)
+        self.format_combo.setCurrentIndex(self.format_combo.findData(settings.capture.pixel_format))
+        self.format_combo.setToolTip("文字控制台等不关心颜色的窗口可选 8 位格式，内存和带宽减少 75%")
+        format_layout.addWidget(self.format_combo)
+        
+        format_layout.addStretch()
+        layout.addLayout(format_layout)
+        
+        # 显示位置：单独的监视窗口或监视面板
+        self.dashboard_check = QCheckBox("显示在监视面板中（多个窗口合并为一个网格）")
+        self.dashboard_check.setChecked(settings.dashboard.enabled)
+        self.dashboard_check.setToolTip("同时监视很多窗口时，面板在一次绘制中合成所有画面，CPU 占用远低于多个监视窗口")
+        layout.addWidget(self.dashboard_check)
+        
         card.setLayout(layout)
         return card
     
@@ -288,15 +426,35 @@ class MainWindow(QMainWindow):
         self.animation.setEasingCurve(QEasingCurve.Type.OutCubic)
     
     def refresh_windows(self):
-        """刷新窗口列表"""
+        """立即刷新窗口列表（在轮询线程中枚举，变化到达后增量更新，保留当前选择）"""
         logger.debug("刷新窗口列表...")
-        self.combo.clear()
-        
-        windows = WindowManager.enum_windows()
-        for hwnd, title in windows:
-            self.combo.addItem(title, hwnd)
-        
-        logger.debug(f"窗口列表已更新，下拉框中有 {len(windows)} 个选项")
+        self.window_poller.poll_now()
+    
+    def _select_window(self, hwnd: int):
+        """
+        把窗口设为下拉框当前项
+        
+        Args:
+            hwnd: 窗口句柄
+        """
+        index = self.combo.findData(hwnd)
+        if index >= 0:
+            self.combo.setCurrentIndex(index)
+    
+    def open_window_picker(self):
+        """打开窗口缩略图选择器，选中的窗口设为下拉框当前项"""
+        self.refresh_windows()
+        my_hwnd = int(self.winId())
+        windows = [(hwnd, title) for hwnd, title in self.window_model.windows() if hwnd != my_hwnd]
+        
+        picker = WindowPickerDialog(windows, self.thumbnail_loader, settings.thumbnails.refresh_ms, self)
+        accepted = picker.exec() == QDialog.DialogCode.Accepted
+        selected_hwnd = picker.selected_hwnd
+        # 对话框是本窗口的子对象，读取结果后释放（连同其中的缩略图）
+        picker.deleteLater()
+        if accepted and selected_hwnd is not None:
+            self._select_window(selected_hwnd)
+            logger.info(f"已通过缩略图选择窗口: '{self.combo.currentText()}'")
     
     def open_region_selector(self):
         """打开图形化区域选择器"""
@@ -478,46 +636,70 @@ class MainWindow(QMainWindow):
             logger.info(f"  HWND: {hwnd}")
             logger.info(f"  裁剪参数: x={x}, y={y}, width={width}, height={height}")
             logger.info(f"  目标帧率: {fps} FPS")
+            logger.info(f"  像素格式: {self.format_combo.currentData()}")
             logger.info(f"{'*'*60}")
             
             region = (x, y, width, height)
             
-            # 创建捕获引擎
-            engine = CaptureEngine(hwnd, region, fps)
+            # 记住监视过的目标，搜索时排在最前
+            self.window_index.remember(hwnd)
+            
+            # 订阅捕获源（同一窗口已在监视时复用其捕获引擎，首个订阅时启动引擎）
+            pixel_format = self.format_combo.currentData()
+            engine = self.capture_sources.acquire(hwnd, region, fps, pixel_format=pixel_format)
+            
+            # 快照与定时导出（先于监视窗口连接，窗口按其状态初始化导出按钮）
+            cleanups = self._monitor_cleanups.setdefault(id(engine), [])
+            if self.image_exporter is not None:
+                self.image_exporter.attach(engine, window_title, periodic=settings.export.periodic)
+                # 关闭时停止导出（已排队的帧仍会写出）
+                cleanups.append(lambda e=engine: self.image_exporter.detach(e))
             
-            # 创建监视窗口（不设置parent，避免成为子窗口）
-            capture_win = CaptureWindow(engine, window_title, None)
-            logger.info(f"监视窗口已创建，准备显示...")
+            # 指标导出，关闭时停止
+            if self.metrics_exporter is not None:
+                self.metrics_exporter.attach(engine, window_title)
+                cleanups.append(lambda e=engine: self.metrics_exporter.detach(e))
             
-            # 保存引用，防止被垃圾回收
-            self.capture_windows.append((engine, capture_win))
+            # 画面变化检测，关闭时停止
+            if self.motion_detector is not None:
+                self.motion_detector.attach(engine, window_title)
+                cleanups.append(lambda e=engine: self.motion_detector.detach(e))
             
-            # 显示窗口并启动引擎
-            logger.info(f"正在显示监视窗口...")
-            capture_win.show()
-            logger.info(f"监视窗口 show() 已调用")
+            # 像素监视规则，关闭时停止
+            if self.pixel_watcher is not None:
+                rules = [rule for rule in self.watch_rules if rule.matches_window(window_title)]
+                if rules:
+                    self.pixel_watcher.attach(engine, rules, window_title)
+                    cleanups.append(lambda e=engine: self.pixel_watcher.detach(e))
             
-            capture_win.raise_()
-            logger.info(f"监视窗口 raise_() 已调用")
+            # 感知哈希帧索引，关闭时停止
+            if self.frame_indexer is not None:
+                try:
+                    path = index_path(settings.index.directory, window_title, region)
+                    self.frame_indexer.attach(engine, path)
+                    cleanups.append(lambda e=engine: self.frame_indexer.detach(e))
+                except (OSError, ValueError) as e:
+                    logger.error(f"无法打开帧索引: {e}")
             
-            capture_win.activateWindow()
-            logger.info(f"监视窗口 activateWindow() 已调用")
+            # 视频流输出，关闭时停止
+            if settings.stream.enabled and settings.stream.target:
+                self._start_stream(engine, cleanups, window_title)
             
-            # 打印窗口状态
-            logger.info(f"窗口是否可见: {capture_win.isVisible()}")
-            logger.info(f"窗口大小: {capture_win.width()}x{capture_win.height()}")
-            logger.info(f"窗口位置: ({capture_win.x()}, {capture_win.y()})")
+            if self.dashboard_check.isChecked():
+                self._show_in_dashboard(engine, window_title)
+            else:
+                self._show_capture_window(engine, window_title)
             
-            engine.start()
-            logger.info(f"捕获引擎已启动")
+            logger.info(f"共享捕获源数: {len(self.capture_sources)}")
             
-            logger.info("监视窗口已显示并激活，实时视频流开始")
-            print(f"\n✅ 监视窗口已启动！")
+            logger.info("监视已启动，实时视频流开始")
+            print(f"\n✅ 监视已启动！")
             print(f"   窗口标题: 监视: {window_title}")
-            print(f"   位置: 屏幕居中（首帧后自动调整）")
             print(f"   帧率: {fps} FPS")
-            print(f"   已启动监视窗口数: {len(self.capture_windows)}")
-            print(f"   提示: 窗口会在首帧捕获后自动调整大小并居中显示\n")
+            print(f"   运行中的监视数: {len(self.monitors)}")
+            if self.dashboard is not None:
+                print(f"   监视面板中的窗口数: {len(self.dashboard.cells)}")
+            print()
             
         except ValueError as e:
             QMessageBox.warning(self, "错误", f"输入值无效: {e}")
@@ -525,9 +707,139 @@ class MainWindow(QMainWindow):
         except Exception as e:
             QMessageBox.critical(self, "错误", f"启动监视失败：{str(e)}")
             logger.error(f"启动监视失败: {e}")
+
+    def _show_capture_window(self, engine, window_title: str):
+        """
+        在单独的监视窗口中显示帧源
+
+        Args:
+            engine: 帧源
+            window_title: 窗口标题
+        """
+        # 创建监视窗口（不设置parent，避免成为子窗口）
+        capture_win = CaptureWindow(engine, window_title, None, exporter=self.image_exporter)
+        logger.info(f"监视窗口已创建，准备显示...")
+        
+        # 登记（持有唯一强引用），关闭时释放
+        self.monitors.add(engine, capture_win, window_title)
+        capture_win.closed.connect(lambda e=engine: self._on_monitor_closed(e))
+        
+        # 显示窗口
+        logger.info(f"正在显示监视窗口...")
+        capture_win.show()
+        logger.info(f"监视窗口 show() 已调用")
+        
+        capture_win.raise_()
+        logger.info(f"监视窗口 raise_() 已调用")
+        
+        capture_win.activateWindow()
+        logger.info(f"监视窗口 activateWindow() 已调用")
+        
+        # 打印窗口状态
+        logger.info(f"窗口是否可见: {capture_win.isVisible()}")
+        logger.info(f"窗口大小: {capture_win.width()}x{capture_win.height()}")
+        logger.info(f"窗口位置: ({capture_win.x()}, {capture_win.y()})")
+
+    def _show_in_dashboard(self, engine, window_title: str):
+        """
+        在监视面板中显示帧源（面板不存在时创建）
+
+        Args:
+            engine: 帧源
+            window_title: 窗口标题
+        """
+        if self.dashboard is None:
+            self.dashboard = DashboardWindow()
+            self.dashboard.source_removed.connect(self._on_monitor_closed)
+        self.dashboard.add_source(engine, window_title)
+        self.monitors.add(engine, self.dashboard, window_title, owns_viewer=False)
+        self.dashboard.show()
+        self.dashboard.raise_()
+        self.dashboard.activateWindow()
+
+    def _on_monitor_closed(self, engine):
+        """
+        监视窗口关闭或帧源移出面板：停止该帧源的所有下游
+
+        Args:
+            engine: 帧源
+        """
+        for cleanup in self._monitor_cleanups.pop(id(engine), []):
+            cleanup()
+        self.monitors.remove(engine)
     
+    def _update_monitor_counts(self, counts: dict):
+        """
+        显示运行统计
+        
+        Args:
+            counts: MonitorRegistry.counts() 的返回值
+        """
+        text = (f"📊 运行中: 帧源 {counts['engines']} · 窗口 {counts['viewers']} · "
+                f"帧占用 {counts['frame_bytes'] / 1024 / 1024:.1f} MB")
+        if counts['releasing']:
+            text += f" · 待回收 {counts['releasing']}"
+        if counts['leaked']:
+            text += f" · ⚠️ 未回收 {counts['leaked']}"
+        self.monitor_counts_label.setText(text)
+
+    def _start_stream(self, engine, cleanups, window_title: str):
+        """
+        为帧源启动视频流输出
+
+        Args:
+            engine: 帧源
+            cleanups: 帧源关闭时执行的清理列表（追加停止输出）
+            window_title: 窗口标题，替换目标中的 {name}
+        """
+        if not HAS_NUMPY:
+            logger.warning("视频流输出需要安装 numpy，已禁用")
+            return
+        target = settings.stream.target.replace("{name}", safe_filename(window_title))
+        if target in self.video_sinks:
+            logger.warning(f"视频流输出目标 {target} 已被其他监视窗口占用，"
+                           f"可在目标中使用 {{name}} 区分窗口")
+            return
+        try:
+            sink = VideoSink.from_settings(settings.stream, target)
+        except ValueError as e:
+            logger.error(f"视频流输出配置无效: {e}")
+            return
+        sink.attach(engine)
+        self.video_sinks[target] = sink
+
+        def stop_stream():
+            self.video_sinks.pop(target, None)
+            sink.close()
+
+        cleanups.append(stop_stream)
+
     def showEvent(self, event):
         """窗口显示事件"""
         super().showEvent(event)
         if hasattr(self, 'animation'):
             self.animation.start()
+
+    def closeEvent(self, event):
+        """窗口关闭事件：停止捕获，写完并关闭所有下游"""
+        # 先停止所有捕获源，不再产生新帧
+        self.capture_sources.stop_all()
+        
+        # 执行各监视窗口尚未执行的清理（停止导出、检测、索引和视频流输出）
+        for cleanups in list(self._monitor_cleanups.values()):
+            for cleanup in cleanups:
+                cleanup()
+        self._monitor_cleanups.clear()
+        
+        # 关闭共用组件：写完已排队的导出，刷新并关闭索引文件和视频流
+        for sink in list(self.video_sinks.values()):
+            sink.close()
+        self.video_sinks.clear()
+        for component in (self.frame_indexer, self.image_exporter, self.motion_detector,
+                          self.pixel_watcher, self.metrics_exporter):
+            if component is not None:
+                component.close()
+        
+        self.window_poller.close()
+        self.thumbnail_loader.close()
+        super().closeEvent(event)
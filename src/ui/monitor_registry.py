@@ -0,0 +1,148 @@
+"""
+监视生命周期管理模块
+登记运行中的帧源和显示它们的窗口，关闭时释放并用弱引用确认已回收
+"""
+import gc
+import weakref
+from typing import Dict, List
+
+from PyQt6 import sip
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+from ..utils import logger
+
+
+class _MonitorEntry:
+    """一个运行中的帧源"""
+
+    __slots__ = ('engine', 'viewer', 'title', 'owns_viewer')
+
+    def __init__(self, engine, viewer, title: str, owns_viewer: bool):
+        self.engine = engine
+        self.viewer = viewer
+        self.title = title
+        self.owns_viewer = owns_viewer
+
+
+class MonitorRegistry(QObject):
+    """
+    监视生命周期管理器
+
+    职责：
+    - 持有运行中的帧源（引擎或订阅）及其显示窗口的唯一强引用
+    - 帧源关闭时移除登记，并对其独占的窗口调用 deleteLater，
+      使 Qt 一侧的对象、信号连接和定时器随之销毁
+    - 释放后只保留弱引用，延迟 release_check_ms 毫秒做一次垃圾回收并确认对象已回收，
+      仍存活的记为泄漏并记录其引用者类型
+    - 统计运行中的引擎、窗口数量和它们持有的帧字节数（显示帧 + 回放缓冲区）
+    """
+
+    # 信号定义
+    counts_changed = pyqtSignal(dict)  # 统计变化（counts() 的返回值）
+
+    def __init__(self, release_check_ms: int = 2000):
+        """
+        初始化管理器
+
+        Args:
+            release_check_ms: 释放后多久确认对象已回收（毫秒）
+        """
+        super().__init__()
+        self.release_check_ms = release_check_ms
+        self._entries: Dict[int, _MonitorEntry] = {}
+        # 已释放、等待确认回收的对象 (说明, 弱引用)
+        self._releasing: List[tuple] = []
+
+        # 统计
+        self.released_objects = 0
+        self.leaked_objects = 0
+
+    def __len__(self) -> int:
+        """运行中的帧源数量"""
+        return len(self._entries)
+
+    def add(self, engine, viewer, title: str, owns_viewer: bool = True):
+        """
+        登记一个帧源
+
+        Args:
+            engine: CaptureEngine 或 CaptureSubscription
+            viewer: 显示该帧源的窗口（需提供 retained_frame_bytes(engine)）
+            title: 窗口标题，用于日志
+            owns_viewer: 窗口是否只显示这一个帧源（是则帧源关闭时一并销毁窗口）
+        """
+        self._entries[id(engine)] = _MonitorEntry(engine, viewer, title, owns_viewer)
+        self.counts_changed.emit(self.counts())
+
+    def remove(self, engine):
+        """
+        移除一个已停止的帧源，销毁其独占的窗口并安排回收确认
+
+        Args:
+            engine: add 时传入的对象
+        """
+        entry = self._entries.pop(id(engine), None)
+        if entry is None:
+            return
+        self._track(f"'{entry.title}' 的帧源", entry.engine)
+        if entry.owns_viewer and entry.viewer is not None:
+            self._track(f"'{entry.title}' 的监视窗口", entry.viewer)
+            if not sip.isdeleted(entry.viewer):
+                entry.viewer.deleteLater()
+        logger.info(f"监视已释放: '{entry.title}' (剩余 {len(self._entries)} 个)")
+        QTimer.singleShot(self.release_check_ms, self.verify_released)
+        self.counts_changed.emit(self.counts())
+
+    def _track(self, description: str, obj):
+        """记录一个等待确认回收的对象"""
+        self._releasing.append((description, weakref.ref(obj)))
+
+    def verify_released(self):
+        """
+        确认已释放的对象都已回收
+
+        Returns:
+            int: 本次发现的泄漏对象数
+        """
+        if not self._releasing:
+            return 0
+        gc.collect()
+        leaked = 0
+        for description, ref in self._releasing:
+            obj = ref()
+            if obj is None:
+                self.released_objects += 1
+                continue
+            leaked += 1
+            referrers = sorted({type(r).__name__ for r in gc.get_referrers(obj)})
+            logger.warning(f"{description} 关闭后仍未回收，引用者: {', '.join(referrers)}")
+        self._releasing.clear()
+        self.leaked_objects += leaked
+        self.counts_changed.emit(self.counts())
+        return leaked
+
+    def counts(self) -> dict:
+        """
+        当前统计
+
+        Returns:
+            dict: engines（运行中的帧源数）、viewers（窗口数）、frame_bytes（帧占用字节数）、
+            releasing（等待确认回收的对象数）、leaked（累计泄漏对象数）
+        """
+        viewers = {}
+        frame_bytes = 0
+        for entry in self._entries.values():
+            replay_buffer = getattr(entry.engine, 'replay_buffer', None)
+            if replay_buffer is not None:
+                frame_bytes += replay_buffer.bytes_held
+            viewer = entry.viewer
+            if viewer is not None and not sip.isdeleted(viewer):
+                viewers[id(viewer)] = viewer
+                frame_bytes += viewer.retained_frame_bytes(entry.engine)
+        return {
+            'engines': len(self._entries),
+            'viewers': len(viewers),
+            'frame_bytes': frame_bytes,
+            'releasing': len(self._releasing),
+            'leaked': self.leaked_objects,
+        }
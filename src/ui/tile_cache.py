@@ -0,0 +1,210 @@
+"""
+瓦片缓存模块
+放大查看时把帧按固定尺寸的瓦片缩放并缓存：只缩放和绘制视口内可见的瓦片，
+新帧到达时只重绘源像素发生变化的瓦片
+"""
+import math
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from PyQt6.QtGui import QImage, QPainter, QPixmap
+from PyQt6.QtCore import QPointF
+
+
+class _Tile:
+    """一个已缩放的瓦片"""
+
+    __slots__ = ('pixmap', 'source', 'source_key', 'nbytes')
+
+    def __init__(self, pixmap: QPixmap, source: QImage, source_key: int):
+        self.pixmap = pixmap
+        # 绘制该瓦片所用的源像素（用于判断新帧中这部分是否变化）
+        self.source = source
+        self.source_key = source_key
+        self.nbytes = pixmap.width() * pixmap.height() * 4 + source.sizeInBytes()
+
+
+class TileCache:
+    """
+    多缩放级别的瓦片缓存
+
+    瓦片在缩放后的设备像素空间中按 TILE_SIZE 对齐，键为 (缩放比例, 列, 行)，
+    不同缩放级别的瓦片共存，按 LRU 在字节预算内淘汰。
+
+    每个瓦片保存绘制它时的源像素；新帧到达后，瓦片第一次被绘制时只比较其覆盖的源区域，
+    未变化的瓦片直接沿用，变化的瓦片重新缩放。因此每次绘制的开销只与视口内可见的
+    瓦片数（即视口尺寸）有关，与源图像尺寸无关。
+    """
+
+    TILE_SIZE = 256
+
+    def __init__(self, max_bytes: int = 96 * 1024 * 1024):
+        """
+        初始化瓦片缓存
+
+        Args:
+            max_bytes: 缓存的瓦片和源像素总字节上限
+        """
+        self.max_bytes = max_bytes
+        self.bytes_held = 0
+
+        # 统计
+        self.hits = 0
+        self.rendered = 0
+        self.invalidated = 0
+
+        self._tiles: OrderedDict = OrderedDict()  # (缩放, 列, 行) -> _Tile
+        self._image: Optional[QImage] = None
+        self._image_key = 0
+
+    @property
+    def tile_count(self) -> int:
+        """缓存中的瓦片数"""
+        return len(self._tiles)
+
+    def set_image(self, image: QImage):
+        """
+        设置当前帧
+
+        尺寸或格式变化时清空缓存；否则瓦片保留到下次绘制时按源像素校验。
+
+        Args:
+            image: 新的帧图像
+        """
+        previous = self._image
+        if (previous is None or previous.size() != image.size()
+                or previous.format() != image.format()):
+            self.clear()
+        self._image = image
+        self._image_key = image.cacheKey()
+
+    def clear(self):
+        """清空所有瓦片"""
+        self._tiles.clear()
+        self.bytes_held = 0
+
+    def paint(self, painter: QPainter, scale: float, offset_x: int, offset_y: int,
+              width: int, height: int, device_pixel_ratio: float = 1.0):
+        """
+        绘制视口内可见的瓦片
+
+        Args:
+            painter: 视口坐标系（逻辑像素）下的画笔
+            scale: 缩放比例（每个源像素对应的设备像素数）
+            offset_x: 视口左上角在缩放后图像中的设备像素横坐标（可为负，表示图像右移）
+            offset_y: 视口左上角在缩放后图像中的设备像素纵坐标
+            width: 视口设备像素宽度
+            height: 视口设备像素高度
+            device_pixel_ratio: 设备像素比
+        """
+        image = self._image
+        if image is None or image.isNull():
+            return
+        size = self.TILE_SIZE
+        scaled_width = math.ceil(image.width() * scale)
+        scaled_height = math.ceil(image.height() * scale)
+
+        first_col = max(0, offset_x // size)
+        last_col = min((scaled_width - 1) // size, (offset_x + width - 1) // size)
+        first_row = max(0, offset_y // size)
+        last_row = min((scaled_height - 1) // size, (offset_y + height - 1) // size)
+
+        for row in range(first_row, last_row + 1):
+            for col in range(first_col, last_col + 1):
+                pixmap = self._tile(scale, col, row, scaled_width, scaled_height)
+                painter.drawPixmap(
+                    QPointF((col * size - offset_x) / device_pixel_ratio,
+                            (row * size - offset_y) / device_pixel_ratio),
+                    pixmap)
+
+    def _tile(self, scale: float, col: int, row: int,
+              scaled_width: int, scaled_height: int) -> QPixmap:
+        """获取一个瓦片：当前帧已校验的直接使用，源像素未变化的沿用，否则重新缩放"""
+        key = (scale, col, row)
+        tile = self._tiles.get(key)
+        if tile is not None and tile.source_key == self._image_key:
+            self._tiles.move_to_end(key)
+            self.hits += 1
+            return tile.pixmap
+
+        size = self.TILE_SIZE
+        dest_x, dest_y = col * size, row * size
+        dest_w = min(size, scaled_width - dest_x)
+        dest_h = min(size, scaled_height - dest_y)
+        # 瓦片覆盖的源像素范围（向外取整）
+        src_x = int(dest_x / scale)
+        src_y = int(dest_y / scale)
+        src_w = min(self._image.width(), math.ceil((dest_x + dest_w) / scale)) - src_x
+        src_h = min(self._image.height(), math.ceil((dest_y + dest_h) / scale)) - src_y
+        source = self._image.copy(src_x, src_y, src_w, src_h)
+
+        if tile is not None:
+            if tile.source == source:
+                tile.source = source
+                tile.source_key = self._image_key
+                self._tiles.move_to_end(key)
+                self.hits += 1
+                return tile.pixmap
+            self.invalidated += 1
+            self._remove(key)
+
+        pixmap = self._render(source, scale, dest_x - src_x * scale, dest_y - src_y * scale,
+                              dest_w, dest_h)
+        tile = _Tile(pixmap, source, self._image_key)
+        self._tiles[key] = tile
+        self.bytes_held += tile.nbytes
+        self.rendered += 1
+        self._evict()
+        return pixmap
+
+    @staticmethod
+    def _render(source: QImage, scale: float, shift_x: float, shift_y: float,
+                width: int, height: int) -> QPixmap:
+        """
+        把源像素缩放为一个瓦片
+
+        放大时用最近邻插值，像素边界清晰；缩小时用平滑插值。
+
+        Args:
+            source: 瓦片覆盖的源像素
+            scale: 缩放比例
+            shift_x: 源区域左上角相对瓦片左上角的设备像素偏移（取负）
+            shift_y: 同上（纵向）
+            width: 瓦片宽度
+            height: 瓦片高度
+        """
+        tile = QImage(width, height, QImage.Format.Format_RGB32)
+        painter = QPainter(tile)
+        if scale < 1.0:
+            painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform)
+        painter.translate(-shift_x, -shift_y)
+        painter.scale(scale, scale)
+        painter.drawImage(0, 0, source)
+        painter.end()
+        return QPixmap.fromImage(tile)
+
+    def _remove(self, key):
+        """移除一个瓦片"""
+        tile = self._tiles.pop(key)
+        self.bytes_held -= tile.nbytes
+
+    def _evict(self):
+        """超出字节预算时淘汰最久未使用的瓦片"""
+        while self.bytes_held > self.max_bytes and len(self._tiles) > 1:
+            key = next(iter(self._tiles))
+            self._remove(key)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        缓存统计
+
+        Returns:
+            dict: tiles / bytes / hits / rendered / invalidated
+        """
+        return {
+            'tiles': len(self._tiles),
+            'bytes': self.bytes_held,
+            'hits': self.hits,
+            'rendered': self.rendered,
+            'invalidated': self.invalidated,
+        }
@@ -0,0 +1,102 @@
+"""
+窗口列表模型
+按轮询得到的变化增量更新行，不重建列表，视图的当前选择得以保留
+"""
+from typing import Dict, List, Optional, Tuple
+
+from PyQt6.QtCore import Qt, QAbstractListModel, QModelIndex
+
+from ..core.window_poller import WindowListDiff
+
+
+class WindowListModel(QAbstractListModel):
+    """
+    窗口列表模型
+
+    每行一个窗口：DisplayRole 为标题，UserRole 为窗口句柄
+    （QComboBox.itemData / findData 默认使用 UserRole）。
+    apply_diff 只移除、插入或通知变化的行，其他行和视图的当前项不受影响。
+    """
+
+    def __init__(self, parent=None):
+        """
+        初始化模型
+
+        Args:
+            parent: 父对象
+        """
+        super().__init__(parent)
+        self._hwnds: List[int] = []
+        self._titles: Dict[int, str] = {}
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        """行数"""
+        return 0 if parent.isValid() else len(self._hwnds)
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole):
+        """行数据"""
+        if not index.isValid() or not 0 <= index.row() < len(self._hwnds):
+            return None
+        hwnd = self._hwnds[index.row()]
+        if role in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.ToolTipRole):
+            return self._titles[hwnd]
+        if role == Qt.ItemDataRole.UserRole:
+            return hwnd
+        return None
+
+    def windows(self) -> List[Tuple[int, str]]:
+        """
+        当前的窗口列表
+
+        Returns:
+            list: [(hwnd, title), ...]
+        """
+        return [(hwnd, self._titles[hwnd]) for hwnd in self._hwnds]
+
+    def row_of(self, hwnd: int) -> Optional[int]:
+        """窗口所在行，不存在时返回 None"""
+        if hwnd not in self._titles:
+            return None
+        return self._hwnds.index(hwnd)
+
+    def apply_diff(self, diff: WindowListDiff):
+        """
+        按变化增量更新行
+
+        Args:
+            diff: WindowPoller 发出的变化
+        """
+        # 移除：从后往前，相邻行合并为一次 beginRemoveRows
+        removed = {hwnd for hwnd in diff.removed if hwnd in self._titles}
+        if removed:
+            rows = [row for row, hwnd in enumerate(self._hwnds) if hwnd in removed]
+            end = len(rows) - 1
+            while end >= 0:
+                start = end
+                while start > 0 and rows[start - 1] == rows[start] - 1:
+                    start -= 1
+                self.beginRemoveRows(QModelIndex(), rows[start], rows[end])
+                del self._hwnds[rows[start]:rows[end] + 1]
+                self.endRemoveRows()
+                end = start - 1
+            for hwnd in removed:
+                del self._titles[hwnd]
+
+        # 标题变化：只通知对应行
+        for hwnd, title in diff.retitled:
+            if hwnd not in self._titles:
+                continue
+            self._titles[hwnd] = title
+            index = self.index(self._hwnds.index(hwnd))
+            self.dataChanged.emit(index, index, [Qt.ItemDataRole.DisplayRole,
+                                                 Qt.ItemDataRole.ToolTipRole])
+
+        # 新增：追加到末尾，一次 beginInsertRows
+        added = [(hwnd, title) for hwnd, title in diff.added if hwnd not in self._titles]
+        if added:
+            first = len(self._hwnds)
+            self.beginInsertRows(QModelIndex(), first, first + len(added) - 1)
+            for hwnd, title in added:
+                self._hwnds.append(hwnd)
+                self._titles[hwnd] = title
+            self.endInsertRows()
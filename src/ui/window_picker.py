@@ -0,0 +1,171 @@
+"""
+窗口缩略图选择器
+以实时缩略图网格显示可用窗口，缩略图在后台捕获并逐个填入
+"""
+from typing import Dict, List, Optional, Tuple
+
+from PyQt6.QtWidgets import (QDialog, QListWidget, QListWidgetItem, QListView, QLabel,
+                             QPushButton, QVBoxLayout, QHBoxLayout)
+from PyQt6.QtGui import QColor, QIcon, QImage, QPainter, QPixmap
+from PyQt6.QtCore import Qt, QSize, QTimer
+
+from ..utils import logger
+from ..core.thumbnails import ThumbnailLoader
+
+
+class WindowPickerDialog(QDialog):
+    """
+    窗口缩略图选择器
+
+    职责：
+    - 打开时立即用缓存中的缩略图（没有则用占位图）填充网格，从不等待捕获
+    - 每 refresh_ms 毫秒只为当前可见的条目请求捕获，过期的缩略图按需刷新
+    - 缩略图捕获完成后逐个替换条目图标
+    - 双击或点击“选择”后 selected_hwnd 为所选窗口句柄
+    """
+
+    def __init__(self, windows: List[Tuple[int, str]], loader: ThumbnailLoader,
+                 refresh_ms: int = 1000, parent=None):
+        """
+        初始化选择器
+
+        Args:
+            windows: 窗口列表 [(hwnd, title), ...]
+            loader: 缩略图加载器（在多次打开之间共享缓存）
+            refresh_ms: 可见缩略图的刷新间隔（毫秒）
+            parent: 父窗口
+        """
+        super().__init__(parent)
+        self.loader = loader
+        self.selected_hwnd: Optional[int] = None
+        self._items: Dict[int, QListWidgetItem] = {}
+        self._thumb_size = QSize(loader.max_width, loader.max_height)
+        self._placeholder = self._make_placeholder()
+
+        self._init_ui()
+        self._populate(windows)
+
+        self.loader.thumbnail_ready.connect(self._on_thumbnail_ready)
+
+        # 只刷新可见条目（滚动后也由定时器补齐）
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.timeout.connect(self._request_visible)
+        self.refresh_timer.start(max(100, refresh_ms))
+        self.list.verticalScrollBar().valueChanged.connect(self._request_visible)
+
+        logger.debug(f"窗口缩略图选择器已打开: {len(windows)} 个窗口")
+
+    def _init_ui(self):
+        """初始化 UI"""
+        self.setWindowTitle("🖼 选择监视窗口")
+        self.resize(self._thumb_size.width() * 4 + 80, self._thumb_size.height() * 3 + 160)
+
+        layout = QVBoxLayout(self)
+
+        info = QLabel("双击缩略图选择窗口，缩略图在后台更新")
+        info.setObjectName("captionLabel")
+        layout.addWidget(info)
+
+        self.list = QListWidget()
+        self.list.setViewMode(QListView.ViewMode.IconMode)
+        self.list.setResizeMode(QListView.ResizeMode.Adjust)
+        self.list.setMovement(QListView.Movement.Static)
+        self.list.setUniformItemSizes(True)
+        self.list.setWordWrap(True)
+        self.list.setIconSize(self._thumb_size)
+        self.list.setGridSize(QSize(self._thumb_size.width() + 20, self._thumb_size.height() + 48))
+        self.list.setSpacing(4)
+        self.list.itemDoubleClicked.connect(self._on_item_double_clicked)
+        layout.addWidget(self.list)
+
+        button_layout = QHBoxLayout()
+        button_layout.addStretch()
+        cancel_btn = QPushButton("取消")
+        cancel_btn.setObjectName("secondaryBtn")
+        cancel_btn.clicked.connect(self.reject)
+        button_layout.addWidget(cancel_btn)
+        select_btn = QPushButton("选择")
+        select_btn.setDefault(True)
+        select_btn.clicked.connect(self._accept_current)
+        button_layout.addWidget(select_btn)
+        layout.addLayout(button_layout)
+
+    def _make_placeholder(self) -> QPixmap:
+        """缩略图尚未捕获时显示的占位图"""
+        pixmap = QPixmap(self._thumb_size)
+        pixmap.fill(QColor("#1E293B"))
+        painter = QPainter(pixmap)
+        painter.setPen(QColor("#64748B"))
+        painter.drawText(pixmap.rect(), Qt.AlignmentFlag.AlignCenter, "⏳")
+        painter.end()
+        return pixmap
+
+    def _populate(self, windows: List[Tuple[int, str]]):
+        """填充条目，缓存中已有的缩略图直接显示"""
+        self.loader.cache.retain(hwnd for hwnd, _ in windows)
+        cached = 0
+        for hwnd, title in windows:
+            item = QListWidgetItem(title)
+            item.setData(Qt.ItemDataRole.UserRole, hwnd)
+            item.setToolTip(title)
+            image, _ = self.loader.cache.get(hwnd)
+            if image is not None:
+                item.setIcon(QIcon(QPixmap.fromImage(image)))
+                cached += 1
+            else:
+                item.setIcon(QIcon(self._placeholder))
+            self.list.addItem(item)
+            self._items[hwnd] = item
+        logger.debug(f"缩略图缓存命中 {cached}/{len(windows)}")
+
+    def showEvent(self, event):
+        """显示后立即请求可见条目的缩略图"""
+        super().showEvent(event)
+        QTimer.singleShot(0, self._request_visible)
+
+    def visible_hwnds(self) -> List[int]:
+        """
+        当前在视口中可见的窗口句柄（按显示顺序）
+
+        Returns:
+            list: 窗口句柄
+        """
+        viewport = self.list.viewport().rect()
+        visible = []
+        for row in range(self.list.count()):
+            item = self.list.item(row)
+            if self.list.visualItemRect(item).intersects(viewport):
+                visible.append(item.data(Qt.ItemDataRole.UserRole))
+        return visible
+
+    def _request_visible(self):
+        """为可见且缓存过期的条目请求捕获"""
+        if not self.isVisible():
+            return
+        self.loader.request(self.visible_hwnds())
+
+    def _on_thumbnail_ready(self, hwnd: int, image: QImage):
+        """缩略图捕获完成，替换条目图标"""
+        item = self._items.get(hwnd)
+        if item is not None:
+            item.setIcon(QIcon(QPixmap.fromImage(image)))
+
+    def _on_item_double_clicked(self, item: QListWidgetItem):
+        """双击选择"""
+        self.selected_hwnd = item.data(Qt.ItemDataRole.UserRole)
+        self.accept()
+
+    def _accept_current(self):
+        """选择当前条目"""
+        item = self.list.currentItem()
+        if item is None:
+            return
+        self._on_item_double_clicked(item)
+
+    def done(self, result: int):
+        """关闭时停止刷新并取消尚未开始的捕获（缓存保留给下次打开）"""
+        if self.refresh_timer.isActive():
+            self.refresh_timer.stop()
+            self.loader.thumbnail_ready.disconnect(self._on_thumbnail_ready)
+            self.loader.cancel_pending()
+        super().done(result)
@@ -0,0 +1,95 @@
+"""
+窗口搜索框
+输入时按标题、进程名和窗口类名模糊搜索窗口，结果列表随每次按键更新
+"""
+from PyQt6.QtWidgets import QWidget, QLineEdit, QListWidget, QListWidgetItem, QVBoxLayout
+from PyQt6.QtCore import Qt, pyqtSignal
+
+from ..core.window_search import WindowSearchIndex
+
+
+class WindowSearchBox(QWidget):
+    """
+    窗口搜索框
+
+    职责：
+    - 每次按键用 WindowSearchIndex 搜索，列出排序最前的 max_results 个窗口
+    - 上下键在结果中移动，回车或点击选择（无当前项时选择第一个）
+    - 查询为空时隐藏结果列表
+    """
+
+    # 信号定义
+    window_chosen = pyqtSignal(int)  # 选择的窗口句柄
+
+    def __init__(self, index: WindowSearchIndex, max_results: int = 20, parent=None):
+        """
+        初始化搜索框
+
+        Args:
+            index: 窗口搜索索引（由窗口列表轮询增量维护）
+            max_results: 结果列表最多显示的窗口数
+            parent: 父组件
+        """
+        super().__init__(parent)
+        self.index = index
+        self.max_results = max_results
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setSpacing(4)
+
+        self.edit = QLineEdit()
+        self.edit.setPlaceholderText("🔍 搜索窗口标题 / 进程名 / 窗口类名")
+        self.edit.setClearButtonEnabled(True)
+        self.edit.setMinimumHeight(32)
+        self.edit.textChanged.connect(self.update_results)
+        self.edit.returnPressed.connect(self._choose_current)
+        self.edit.installEventFilter(self)
+        layout.addWidget(self.edit)
+
+        self.results = QListWidget()
+        self.results.setMaximumHeight(180)
+        self.results.itemActivated.connect(self._choose_item)
+        self.results.itemClicked.connect(self._choose_item)
+        self.results.hide()
+        layout.addWidget(self.results)
+
+    def update_results(self):
+        """按当前查询刷新结果列表"""
+        query = self.edit.text()
+        self.results.clear()
+        if not query.strip():
+            self.results.hide()
+            return
+        for hwnd in self.index.search(query, self.max_results):
+            title, process, _ = self.index.describe(hwnd)
+            item = QListWidgetItem(f"{title}  ·  {process}" if process else title)
+            item.setData(Qt.ItemDataRole.UserRole, hwnd)
+            self.results.addItem(item)
+        if self.results.count():
+            self.results.setCurrentRow(0)
+        self.results.setVisible(True)
+
+    def eventFilter(self, obj, event):
+        """输入框中的上下键移动结果列表的当前项"""
+        if obj is self.edit and event.type() == event.Type.KeyPress and self.results.isVisible():
+            step = {Qt.Key.Key_Down: 1, Qt.Key.Key_Up: -1}.get(event.key())
+            if step is not None and self.results.count():
+                row = (self.results.currentRow() + step) % self.results.count()
+                self.results.setCurrentRow(row)
+                return True
+            if event.key() == Qt.Key.Key_Escape:
+                self.edit.clear()
+                return True
+        return super().eventFilter(obj, event)
+
+    def _choose_current(self):
+        """回车：选择当前结果"""
+        item = self.results.currentItem() or self.results.item(0)
+        if item is not None:
+            self._choose_item(item)
+
+    def _choose_item(self, item: QListWidgetItem):
+        """选择一个结果"""
+        self.window_chosen.emit(item.data(Qt.ItemDataRole.UserRole))
+        self.edit.clear()
@@ -1,6 +1,7 @@
 """工具模块"""
 from .logger import logger, Logger
 from .win32_helper import WindowManager, ScreenCapture, CaptureMethod
+from .paths import safe_filename
 
-__all__ = ['logger', 'Logger', 'WindowManager', 'ScreenCapture', 'CaptureMethod']
+__all__ = ['logger', 'Logger', 'WindowManager', 'ScreenCapture', 'CaptureMethod', 'safe_filename']
 
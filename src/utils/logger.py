@@ -2,18 +2,46 @@
 日志管理模块
 提供统一的日志记录功能
 """
+import atexit
 import logging
+import queue
 import sys
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Optional
+
+
+class _QueueHandler(QueueHandler):
+    """入队前只合并消息参数，不做完整格式化和记录拷贝（记录只交给这一个处理器）"""
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
 
 
 class Logger:
-    """日志管理器"""
+    """
+    日志管理器
+    
+    - 参数按 % 格式延迟格式化（logger.debug("第 %d 帧", n)），消息也可以是无参可调用对象，
+      级别未启用时既不格式化也不调用
+    - 调用线程只把记录放入队列，控制台和文件输出都在监听线程中进行
+    - 传入 key 的警告和错误按 key 限流：repeat_interval 秒内只输出第一条，
+      其余计数，下一次输出时注明省略了多少条
+    """
     
     _instance: Optional['Logger'] = None
     _logger: Optional[logging.Logger] = None
     
+    # 同一 key 的重复日志最短输出间隔（秒）
+    repeat_interval = 10.0
+    
     def __new__(cls):
         """单例模式"""
         if cls._instance is None:
@@ -40,7 +68,16 @@ class Logger:
         )
         console_handler.setFormatter(formatter)
         
-        self._logger.addHandler(console_handler)
+        # 调用线程只入队，输出在监听线程中进行
+        self._queue = queue.SimpleQueue()
+        self._logger.addHandler(_QueueHandler(self._queue))
+        self._listener = QueueListener(self._queue, console_handler, respect_handler_level=True)
+        self._listener.start()
+        atexit.register(self.shutdown)
+        
+        # 限流状态: key -> [上次输出时间, 省略条数]
+        self._repeats: Dict[str, list] = {}
+        self._repeats_lock = threading.Lock()
     
     def add_file_handler(self, log_file: str):
         """添加文件处理器"""
@@ -53,34 +90,81 @@ class Logger:
         )
         file_handler.setFormatter(formatter)
         
-        self._logger.addHandler(file_handler)
+        # 监听线程每条记录都重新读取 handlers，整体替换元组即可
+        self._listener.handlers = self._listener.handlers + (file_handler,)
+    
+    def set_debug(self, enabled: bool):
+        """
+        设置是否输出调试信息
+        
+        Args:
+            enabled: True 输出 DEBUG 及以上，False 只输出 INFO 及以上
+        """
+        self._logger.setLevel(logging.DEBUG if enabled else logging.INFO)
+    
+    @property
+    def debug_enabled(self) -> bool:
+        """是否输出调试信息（热路径中拼装开销较大的调试内容前先检查）"""
+        return self._logger.isEnabledFor(logging.DEBUG)
+    
+    def shutdown(self):
+        """输出队列中剩余的日志并停止监听线程"""
+        if self._listener is not None and self._listener._thread is not None:
+            self._listener.stop()
+    
+    def _log(self, level: int, message, args: tuple, key: Optional[str]):
+        """级别检查、限流后交给 logging（由其在需要时格式化参数）"""
+        if not self._logger or not self._logger.isEnabledFor(level):
+            return
+        if key is not None:
+            suppressed = self._check_repeat(key)
+            if suppressed is None:
+                return
+            if suppressed:
+                if callable(message):
+                    message = message()
+                message = f"{message}（{self.repeat_interval:g} 秒内省略 {suppressed} 条相同日志）"
+        if callable(message):
+            message = message()
+        self._logger.log(level, message, *args)
     
-    def debug(self, message: str):
+    def _check_repeat(self, key: str) -> Optional[int]:
+        """
+        限流检查
+        
+        Returns:
+            int: 允许输出时返回上次输出以来省略的条数，应省略时返回 None
+        """
+        now = time.monotonic()
+        with self._repeats_lock:
+            state = self._repeats.get(key)
+            if state is None or now - state[0] >= self.repeat_interval:
+                suppressed = state[1] if state is not None else 0
+                self._repeats[key] = [now, 0]
+                return suppressed
+            state[1] += 1
+            return None
+    
+    def debug(self, message, *args):
         """调试信息"""
-        if self._logger:
-            self._logger.debug(message)
+        self._log(logging.DEBUG, message, args, None)
     
-    def info(self, message: str):
+    def info(self, message, *args):
         """一般信息"""
-        if self._logger:
-            self._logger.info(message)
+        self._log(logging.INFO, message, args, None)
     
-    def warning(self, message: str):
-        """警告信息"""
-        if self._logger:
-            self._logger.warning(message)
+    def warning(self, message, *args, key: Optional[str] = None):
+        """警告信息（key 不为空时按 key 限流）"""
+        self._log(logging.WARNING, message, args, key)
     
-    def error(self, message: str):
-        """错误信息"""
-        if self._logger:
-            self._logger.error(message)
+    def error(self, message, *args, key: Optional[str] = None):
+        """错误信息（key 不为空时按 key 限流）"""
+        self._log(logging.ERROR, message, args, key)
     
-    def critical(self, message: str):
+    def critical(self, message, *args):
         """严重错误"""
-        if self._logger:
-            self._logger.critical(message)
+        self._log(logging.CRITICAL, message, args, None)
 
 
 # 全局日志实例
 logger = Logger()
-
@@ -0,0 +1,19 @@
+"""
+路径工具
+"""
+import re
+
+
+def safe_filename(name: str, max_length: int = 80) -> str:
+    """
+    把窗口标题等任意文本转换为可用的文件名
+
+    Args:
+        name: 原始文本
+        max_length: 最大长度
+
+    Returns:
+        str: 去掉文件名非法字符和空白后的名称（为空时返回 "window"）
+    """
+    safe_name = re.sub(r'[\\/:*?"<>|\s]+', '_', name).strip('_')
+    return safe_name[:max_length] or "window"
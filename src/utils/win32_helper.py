@@ -3,12 +3,14 @@ Windows API 辅助工具
 封装常用的 Windows API 调用
 """
 import ctypes
+import ctypes.wintypes
 import win32gui
 import win32con
 import win32ui
+import win32process
 from ctypes import windll
 from typing import List, Tuple, Optional
-from PyQt6.QtGui import QImage
+from PyQt6.QtGui import QImage, QRegion
 
 from .logger import logger
 
@@ -38,6 +40,14 @@ class BITMAPINFO(ctypes.Structure):
     ]
 
 
+# DwmGetWindowAttribute 属性
+DWMWA_EXTENDED_FRAME_BOUNDS = 9
+DWMWA_CLOAKED = 14
+
+# OpenProcess 访问权限（只查询进程映像名，权限不足的进程也可打开）
+PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+
+
 class WindowManager:
     """Windows 窗口管理器"""
     
@@ -49,7 +59,6 @@ class WindowManager:
         Returns:
             List[Tuple[hwnd, title]]: 窗口句柄和标题列表
         """
-        logger.debug("开始枚举窗口...")
         windows = []
         
         def callback(hwnd, windows_list):
@@ -57,10 +66,9 @@ class WindowManager:
                 title = win32gui.GetWindowText(hwnd)
                 if title:
                     windows_list.append((hwnd, title))
-                    logger.debug(f"  找到窗口: HWND={hwnd}, 标题='{title}'")
         
+        # 由 WindowPoller 定期调用，不逐个记录窗口（变化由调用方记录）
         win32gui.EnumWindows(callback, windows)
-        logger.debug(f"窗口枚举完成，共找到 {len(windows)} 个窗口")
         return windows
     
     @staticmethod
@@ -73,6 +81,41 @@ class WindowManager:
         """获取窗口标题"""
         return win32gui.GetWindowText(hwnd)
     
+    @staticmethod
+    def get_window_class(hwnd: int) -> str:
+        """获取窗口类名，失败时返回空字符串"""
+        try:
+            return win32gui.GetClassName(hwnd)
+        except Exception:
+            return ""
+    
+    @staticmethod
+    def get_process_name(hwnd: int) -> str:
+        """
+        获取窗口所属进程的可执行文件名
+        
+        Args:
+            hwnd: 窗口句柄
+            
+        Returns:
+            str: 如 "notepad.exe"；窗口已关闭或无权查询时返回空字符串
+        """
+        try:
+            _, pid = win32process.GetWindowThreadProcessId(hwnd)
+        except Exception:
+            return ""
+        handle = windll.kernel32.OpenProcess(PROCESS_QUERY_LIMITED_INFORMATION, False, pid)
+        if not handle:
+            return ""
+        try:
+            size = ctypes.wintypes.DWORD(260)
+            path = ctypes.create_unicode_buffer(size.value)
+            if not windll.kernel32.QueryFullProcessImageNameW(handle, 0, path, ctypes.byref(size)):
+                return ""
+            return path.value.rsplit('\\', 1)[-1]
+        finally:
+            windll.kernel32.CloseHandle(handle)
+    
     @staticmethod
     def is_window_minimized(hwnd: int) -> bool:
         """
@@ -86,6 +129,56 @@ class WindowManager:
         """
         return win32gui.IsIconic(hwnd)
     
+    @staticmethod
+    def _visible_bounds(hwnd: int) -> Tuple[int, int, int, int]:
+        """获取窗口可见边框（不含 DWM 阴影等不可见边框），失败时返回 GetWindowRect"""
+        rect = ctypes.wintypes.RECT()
+        result = windll.dwmapi.DwmGetWindowAttribute(
+            hwnd, DWMWA_EXTENDED_FRAME_BOUNDS, ctypes.byref(rect), ctypes.sizeof(rect)
+        )
+        if result == 0:
+            return rect.left, rect.top, rect.right, rect.bottom
+        return win32gui.GetWindowRect(hwnd)
+    
+    @staticmethod
+    def _is_opaque_occluder(hwnd: int) -> bool:
+        """窗口是否会遮挡其下方的窗口（可见、未最小化、未被 DWM 隐藏、非分层/透明窗口）"""
+        if not win32gui.IsWindowVisible(hwnd) or win32gui.IsIconic(hwnd):
+            return False
+        ex_style = win32gui.GetWindowLong(hwnd, win32con.GWL_EXSTYLE)
+        if ex_style & (win32con.WS_EX_LAYERED | win32con.WS_EX_TRANSPARENT):
+            return False
+        cloaked = ctypes.c_int(0)
+        windll.dwmapi.DwmGetWindowAttribute(
+            hwnd, DWMWA_CLOAKED, ctypes.byref(cloaked), ctypes.sizeof(cloaked)
+        )
+        return cloaked.value == 0
+    
+    @staticmethod
+    def is_window_occluded(hwnd: int) -> bool:
+        """
+        检查窗口是否被 Z 序在其之上的窗口完全遮挡
+        
+        Args:
+            hwnd: 窗口句柄
+            
+        Returns:
+            bool: 窗口完全被遮挡时返回 True（检查失败时返回 False）
+        """
+        try:
+            left, top, right, bottom = WindowManager._visible_bounds(hwnd)
+            uncovered = QRegion(left, top, right - left, bottom - top)
+            above = win32gui.GetWindow(hwnd, win32con.GW_HWNDPREV)
+            while above and not uncovered.isEmpty():
+                if WindowManager._is_opaque_occluder(above):
+                    l, t, r, b = WindowManager._visible_bounds(above)
+                    uncovered = uncovered.subtracted(QRegion(l, t, r - l, b - t))
+                above = win32gui.GetWindow(above, win32con.GW_HWNDPREV)
+            return uncovered.isEmpty()
+        except Exception as e:
+            logger.debug("遮挡检测失败: %s", e)
+            return False
+    
     @staticmethod
     def restore_window(hwnd: int) -> bool:
         """
@@ -127,6 +220,7 @@ class WindowManager:
 
 class CaptureMethod:
     """屏幕捕获方法枚举"""
+    AUTO = "auto"
     WIN32UI = "win32ui"
     PRINT_WINDOW = "PrintWindow"
     BITBLT = "BitBlt"
@@ -135,18 +229,86 @@ class CaptureMethod:
 class ScreenCapture:
     """屏幕捕获工具"""
     
+    # 各捕获方法输出像素对应的 QImage 格式（内存字节序均为 BGRA）
+    IMAGE_FORMATS = {
+        CaptureMethod.WIN32UI: QImage.Format.Format_RGB32,
+        CaptureMethod.PRINT_WINDOW: QImage.Format.Format_ARGB32,
+    }
+    
+    @classmethod
+    def image_format(cls, method: str) -> QImage.Format:
+        """
+        获取捕获方法输出像素的 QImage 格式
+        
+        Args:
+            method: 捕获方法名称
+            
+        Returns:
+            QImage.Format: 图像格式
+        """
+        return cls.IMAGE_FORMATS.get(method, QImage.Format.Format_RGB32)
+    
     @staticmethod
-    def capture_window_win32ui(hwnd: int, width: int, height: int) -> Tuple[Optional[QImage], bool]:
+    def _new_buffer(width: int, height: int, out=None):
         """
-        使用 win32ui 方法捕获窗口
+        准备接收像素的缓冲区
+        
+        Args:
+            width: 宽度
+            height: 高度
+            out: 可选的可写缓冲区（如 numpy 数组），至少 width*height*4 字节
+            
+        Returns:
+            ctypes 字符数组（与 out 共享内存，或新分配）
+        """
+        buf_len = width * height * 4
+        if out is None:
+            return (ctypes.c_char * buf_len)()
+        return (ctypes.c_char * buf_len).from_buffer(out)
+    
+    @staticmethod
+    def _read_dib_bits(hdc: int, hbitmap: int, width: int, height: int, buffer) -> bool:
+        """
+        将位图读取为自上而下的 32 位 BGRA 像素
+        
+        Args:
+            hdc: 设备上下文句柄
+            hbitmap: 位图句柄
+            width: 宽度
+            height: 高度
+            buffer: 目标缓冲区
+            
+        Returns:
+            bool: 是否成功
+        """
+        bmpinfo = BITMAPINFO()
+        bmpinfo.bmiHeader.biSize = ctypes.sizeof(BITMAPINFOHEADER)
+        bmpinfo.bmiHeader.biWidth = width
+        bmpinfo.bmiHeader.biHeight = -height
+        bmpinfo.bmiHeader.biPlanes = 1
+        bmpinfo.bmiHeader.biBitCount = 32
+        bmpinfo.bmiHeader.biCompression = win32con.BI_RGB
+        
+        dibits_result = windll.gdi32.GetDIBits(
+            hdc, hbitmap, 0, height,
+            ctypes.byref(buffer), ctypes.byref(bmpinfo),
+            win32con.DIB_RGB_COLORS
+        )
+        return dibits_result != 0
+    
+    @staticmethod
+    def capture_window_win32ui_bits(hwnd: int, width: int, height: int, out=None) -> Tuple[Optional[object], bool]:
+        """
+        使用 win32ui 方法捕获窗口原始像素
         
         Args:
             hwnd: 窗口句柄
             width: 窗口宽度
             height: 窗口高度
+            out: 可选的输出缓冲区，提供时像素直接写入其中
             
         Returns:
-            Tuple[QImage, success]: 图像和成功标志
+            Tuple[buffer, success]: BGRA 像素缓冲区（行跨度 width*4）和成功标志
         """
         try:
             hwndDC = win32gui.GetWindowDC(hwnd)
@@ -165,9 +327,11 @@ class ScreenCapture:
                 result = saveDC.BitBlt((0, 0), (width, height), 
                                       mfcDC, (0, 0), win32con.SRCCOPY)
             
-            # 获取位图数据
-            bmpstr = saveBitMap.GetBitmapBits(True)
-            img = QImage(bmpstr, width, height, QImage.Format.Format_RGB32)
+            # 直接读取到输出缓冲区（避免中间 bytes 对象）
+            buffer = ScreenCapture._new_buffer(width, height, out)
+            success = ScreenCapture._read_dib_bits(
+                saveDC.GetSafeHdc(), saveBitMap.GetHandle(), width, height, buffer
+            )
             
             # 清理资源
             win32gui.DeleteObject(saveBitMap.GetHandle())
@@ -175,24 +339,27 @@ class ScreenCapture:
             mfcDC.DeleteDC()
             win32gui.ReleaseDC(hwnd, hwndDC)
             
-            return img, True
+            if not success:
+                return None, False
+            return (buffer if out is None else out), True
             
         except Exception as e:
-            logger.error(f"win32ui 捕获失败: {e}")
+            logger.error("win32ui 捕获失败 (hwnd=%s): %s", hwnd, e, key=f"win32ui:{hwnd}")
             return None, False
     
     @staticmethod
-    def capture_window_printwindow(hwnd: int, width: int, height: int) -> Tuple[Optional[QImage], bool]:
+    def capture_window_printwindow_bits(hwnd: int, width: int, height: int, out=None) -> Tuple[Optional[object], bool]:
         """
-        使用 PrintWindow API 捕获窗口
+        使用 PrintWindow API 捕获窗口原始像素
         
         Args:
             hwnd: 窗口句柄
             width: 窗口宽度
             height: 窗口高度
+            out: 可选的输出缓冲区，提供时像素直接写入其中
             
         Returns:
-            Tuple[QImage, success]: 图像和成功标志
+            Tuple[buffer, success]: BGRA 像素缓冲区（行跨度 width*4）和成功标志
         """
         try:
             hwndDC = win32gui.GetWindowDC(hwnd)
@@ -210,25 +377,9 @@ class ScreenCapture:
                 win32gui.ReleaseDC(hwnd, hwndDC)
                 return None, False
             
-            # 定义BITMAPINFO
-            bmpinfo = BITMAPINFO()
-            bmpinfo.bmiHeader.biSize = ctypes.sizeof(BITMAPINFOHEADER)
-            bmpinfo.bmiHeader.biWidth = width
-            bmpinfo.bmiHeader.biHeight = -height
-            bmpinfo.bmiHeader.biPlanes = 1
-            bmpinfo.bmiHeader.biBitCount = 32
-            bmpinfo.bmiHeader.biCompression = win32con.BI_RGB
-            
-            buf_len = width * height * 4
-            buffer = (ctypes.c_char * buf_len)()
-            
-            hbitmap_int = int(saveBitMap)
-            mfcDC_int = int(mfcDC)
-            
-            dibits_result = windll.gdi32.GetDIBits(
-                mfcDC_int, hbitmap_int, 0, height,
-                ctypes.byref(buffer), ctypes.byref(bmpinfo),
-                win32con.DIB_RGB_COLORS
+            buffer = ScreenCapture._new_buffer(width, height, out)
+            success = ScreenCapture._read_dib_bits(
+                int(mfcDC), int(saveBitMap), width, height, buffer
             )
             
             # 清理资源
@@ -236,15 +387,141 @@ class ScreenCapture:
             win32gui.DeleteDC(mfcDC)
             win32gui.ReleaseDC(hwnd, hwndDC)
             
-            if dibits_result == 0:
+            if not success:
                 return None, False
-            
-            img = QImage(buffer, width, height, QImage.Format.Format_ARGB32)
-            return img, True
+            return (buffer if out is None else out), True
             
         except Exception as e:
-            logger.error(f"PrintWindow 捕获失败: {e}")
+            logger.error("PrintWindow 捕获失败 (hwnd=%s): %s", hwnd, e, key=f"printwindow:{hwnd}")
+            return None, False
+    
+    @classmethod
+    def capture_window_win32ui(cls, hwnd: int, width: int, height: int) -> Tuple[Optional[QImage], bool]:
+        """
+        使用 win32ui 方法捕获窗口
+        
+        Args:
+            hwnd: 窗口句柄
+            width: 窗口宽度
+            height: 窗口高度
+            
+        Returns:
+            Tuple[QImage, success]: 图像和成功标志
+        """
+        bits, success = cls.capture_window_win32ui_bits(hwnd, width, height)
+        if not success:
+            return None, False
+        return QImage(bits, width, height, width * 4, QImage.Format.Format_RGB32), True
+    
+    @classmethod
+    def capture_window_printwindow(cls, hwnd: int, width: int, height: int) -> Tuple[Optional[QImage], bool]:
+        """
+        使用 PrintWindow API 捕获窗口
+        
+        Args:
+            hwnd: 窗口句柄
+            width: 窗口宽度
+            height: 窗口高度
+            
+        Returns:
+            Tuple[QImage, success]: 图像和成功标志
+        """
+        bits, success = cls.capture_window_printwindow_bits(hwnd, width, height)
+        if not success:
             return None, False
+        return QImage(bits, width, height, width * 4, QImage.Format.Format_ARGB32), True
+    
+    @classmethod
+    def capture_window_bits(cls, hwnd: int, width: int, height: int, out=None,
+                            method: str = CaptureMethod.AUTO) -> Tuple[Optional[object], str]:
+        """
+        捕获窗口原始像素（不构造 QImage）
+        
+        Args:
+            hwnd: 窗口句柄
+            width: 窗口宽度
+            height: 窗口高度
+            out: 可选的输出缓冲区（如 numpy 数组），提供时像素直接写入其中
+            method: 指定捕获方法，默认自动尝试多种方法
+            
+        Returns:
+            Tuple[buffer, method]: BGRA 像素缓冲区和使用的方法名称
+        """
+        if method in (CaptureMethod.AUTO, CaptureMethod.WIN32UI):
+            bits, success = cls.capture_window_win32ui_bits(hwnd, width, height, out)
+            if success:
+                return bits, CaptureMethod.WIN32UI
+        
+        if method in (CaptureMethod.AUTO, CaptureMethod.PRINT_WINDOW):
+            bits, success = cls.capture_window_printwindow_bits(hwnd, width, height, out)
+            if success:
+                return bits, CaptureMethod.PRINT_WINDOW
+        
+        return None, ""
+    
+    @staticmethod
+    def capture_window_thumbnail(hwnd: int, max_width: int, max_height: int) -> Optional[QImage]:
+        """
+        捕获窗口的缩小预览
+        
+        PrintWindow 先绘制到显存中的兼容位图，再用 StretchBlt（HALFTONE）在 GDI 中缩小，
+        只有缩小后的像素经 GetDIBits 读回，不读取、不缩放原始分辨率像素。
+        
+        Args:
+            hwnd: 窗口句柄
+            max_width: 预览最大宽度
+            max_height: 预览最大高度
+            
+        Returns:
+            QImage: 等比例缩小的 RGB32 预览；窗口尺寸无效或捕获失败时返回 None
+        """
+        try:
+            left, top, right, bottom = win32gui.GetWindowRect(hwnd)
+        except Exception:
+            return None
+        width, height = right - left, bottom - top
+        if width <= 0 or height <= 0:
+            return None
+        scale = min(max_width / width, max_height / height, 1.0)
+        thumb_width = max(1, int(width * scale))
+        thumb_height = max(1, int(height * scale))
+        
+        hwndDC = srcDC = dstDC = srcBitMap = dstBitMap = None
+        try:
+            hwndDC = win32gui.GetWindowDC(hwnd)
+            srcDC = win32gui.CreateCompatibleDC(hwndDC)
+            srcBitMap = win32gui.CreateCompatibleBitmap(hwndDC, width, height)
+            win32gui.SelectObject(srcDC, srcBitMap)
+            if not windll.user32.PrintWindow(hwnd, srcDC, 2):
+                return None
+            
+            dstDC = win32gui.CreateCompatibleDC(hwndDC)
+            dstBitMap = win32gui.CreateCompatibleBitmap(hwndDC, thumb_width, thumb_height)
+            win32gui.SelectObject(dstDC, dstBitMap)
+            windll.gdi32.SetStretchBltMode(dstDC, win32con.HALFTONE)
+            windll.gdi32.SetBrushOrgEx(dstDC, 0, 0, None)
+            if not windll.gdi32.StretchBlt(dstDC, 0, 0, thumb_width, thumb_height,
+                                           srcDC, 0, 0, width, height, win32con.SRCCOPY):
+                return None
+            
+            buffer = ScreenCapture._new_buffer(thumb_width, thumb_height)
+            if not ScreenCapture._read_dib_bits(dstDC, dstBitMap, thumb_width, thumb_height, buffer):
+                return None
+            # 缓冲区随函数返回释放，复制一份
+            return QImage(buffer, thumb_width, thumb_height, thumb_width * 4,
+                          QImage.Format.Format_RGB32).copy()
+        except Exception as e:
+            logger.debug("窗口预览捕获失败 (hwnd=%s): %s", hwnd, e)
+            return None
+        finally:
+            for bitmap in (srcBitMap, dstBitMap):
+                if bitmap is not None:
+                    win32gui.DeleteObject(bitmap)
+            for dc in (srcDC, dstDC):
+                if dc is not None:
+                    win32gui.DeleteDC(dc)
+            if hwndDC is not None:
+                win32gui.ReleaseDC(hwnd, hwndDC)
     
     @classmethod
     def capture_window(cls, hwnd: int, width: int, height: int) -> Tuple[Optional[QImage], str]:
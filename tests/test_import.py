@@ -37,7 +37,7 @@ except Exception as e:
     sys.exit(1)
 
 try:
-    from src.core import CaptureEngine
+    from src.core import CaptureEngine, ReplayBuffer, Frame, CaptureSourceRegistry
     print("[OK] Capture engine module imported successfully")
 except Exception as e:
     print(f"[FAIL] Capture engine module: {e}")